@@ -0,0 +1,152 @@
+"""
+Async versions of the read endpoints of ``ContactViewSet``.
+
+Under ASGI, Django runs every synchronous view in a worker thread and waits for it, so a
+deployment serving many concurrent clients needs as many threads as requests in flight.
+These views run on the event loop instead: the ORM is queried with ``acount()``,
+``aaggregate()``, ``afirst()`` and async iteration, and a request occupies a thread only
+while one of its queries runs, not while it waits for the database, the client or other
+I/O. Under WSGI they still work, each request running its own event loop.
+
+The responses are those of the ``/api/contacts/`` list and detail for the JSON format:
+the same filtering (`status`, `city`), ranked `search`, `ordering`, page number or keyset
+pagination, ETags and 304 responses, and the same bytes, built with the ``values()`` fast
+path of ``api.fast_serializers``. They authenticate with the session only and answer GET
+and HEAD requests only; writes stay on the DRF endpoints.
+"""
+
+from asgiref.sync import sync_to_async
+from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponse
+from django.views.decorators.http import require_safe
+from rest_framework import filters, status
+from rest_framework.exceptions import (
+    APIException,
+    NotAuthenticated,
+    NotFound,
+    ValidationError,
+)
+from rest_framework.request import Request
+
+from api.fast_serializers import ordering_lookups, values_serializer
+from api.filters import ContactSearchFilter
+from api.pagination import AsyncPageNumberPagination, ContactKeysetPagination
+from api.renderers import FastJSONRenderer
+from api.serializers import ContactSerializer
+from api.views import ContactViewSet
+from contacts.conditional import (
+    alist_validators,
+    not_modified,
+    request_parts,
+    row_validators,
+    set_validators,
+)
+from contacts.fuzzy import fuzzy_vocabulary
+from contacts.pagination import KEYSET, get_pagination_mode
+from contacts.search import fuzzy_requested
+from contacts.statuses import status_registry
+
+# Filter backends of ContactViewSet that only build the queryset; the `status` and `city` filters are
+# applied by `filter_contacts`, because django-filter validates the status with a blocking query.
+QUERYSET_FILTERS = (ContactSearchFilter, filters.OrderingFilter)
+
+INVALID_STATUS_MESSAGE = "Select a valid choice. That choice is not one of the available choices."
+
+
+def json_response(data: object, status_code: int = status.HTTP_200_OK) -> HttpResponse:
+    """Render data as a JSON response the way the DRF endpoints render it."""
+    return HttpResponse(FastJSONRenderer().render(data), content_type="application/json", status=status_code)
+
+
+def error_response(exc: APIException, status_code: int | None = None) -> HttpResponse:
+    """Return the response DRF's exception handler gives for an API exception."""
+    data = exc.detail if isinstance(exc.detail, list | dict) else {"detail": exc.detail}
+    return json_response(data, status_code or exc.status_code)
+
+
+def authentication_required() -> HttpResponse:
+    """Return the response of ``SessionAuthentication`` to anonymous requests, a 403 as it sends no challenge."""
+    return error_response(NotAuthenticated(), status.HTTP_403_FORBIDDEN)
+
+
+async def filter_contacts(request: Request) -> QuerySet:
+    """
+    Return the contacts a list request asks for, filtered, searched and ordered like ``ContactViewSet``.
+
+    :param request: The list request.
+
+    :return:
+        QuerySet: The filtered contacts, before pagination.
+
+    :raises ValidationError: If the `status` parameter is not the id of a status.
+    """
+    queryset = ContactViewSet.queryset.all()
+    status_id = request.query_params.get("status")
+    if status_id:
+        statuses = {str(contact_status.pk) for contact_status in await status_registry.aall()}
+        if status_id not in statuses:
+            raise ValidationError({"status": [INVALID_STATUS_MESSAGE]})
+        queryset = queryset.filter(status_id=status_id)
+    if city := request.query_params.get("city"):
+        queryset = queryset.filter(city=city)
+
+    if fuzzy_requested(request.query_params):
+        # Load the fuzzy search vocabulary in a thread, so that the search filter finds it loaded.
+        await sync_to_async(fuzzy_vocabulary.index)()
+
+    view = ContactViewSet(request=request, format_kwarg=None, action="list", args=(), kwargs={})
+    for backend in QUERYSET_FILTERS:
+        queryset = backend().filter_queryset(request, queryset, view)
+    return queryset
+
+
+@require_safe
+async def contact_list(request: HttpRequest) -> HttpResponse:
+    """Return a page of contacts, or 304 Not Modified if the client's copy is current."""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return authentication_required()
+
+    api_request = Request(request)
+    try:
+        queryset = await filter_contacts(api_request)
+    except ValidationError as e:
+        return error_response(e)
+
+    parts = ("list", "json", user.pk, request_parts(request))
+    etag, last_modified = await alist_validators(queryset, *parts)
+    if response := not_modified(request, etag):
+        return response
+
+    serializer = values_serializer(ContactSerializer)
+    rows = serializer.values(queryset, *ordering_lookups(queryset))
+    paginator = ContactKeysetPagination() if get_pagination_mode() == KEYSET else AsyncPageNumberPagination()
+    try:
+        page = await paginator.apaginate_queryset(rows, api_request)
+    except NotFound as e:
+        return error_response(e)
+
+    if page is None:
+        data = serializer.many([row async for row in rows])
+    else:
+        data = paginator.get_paginated_response(serializer.many(page)).data
+    return set_validators(json_response(data), etag, last_modified)
+
+
+@require_safe
+async def contact_detail(request: HttpRequest, pk: int) -> HttpResponse:
+    """Return a contact, or 304 Not Modified if the client's copy is current."""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return authentication_required()
+
+    serializer = values_serializer(ContactSerializer)
+    queryset = ContactViewSet.queryset.filter(pk=pk)
+    row = await serializer.values(queryset, "pk", "updated_at", "status__name").afirst()
+    if row is None:
+        return error_response(NotFound("No Contact matches the given query."))
+
+    etag, last_modified = row_validators(row, "detail", "json", user.pk)
+    if response := not_modified(request, etag, last_modified):
+        return response
+    return set_validators(json_response(serializer.to_representation(row)), etag, last_modified)
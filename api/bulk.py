@@ -0,0 +1,282 @@
+"""
+Batch create, update and delete of contacts for the `bulk/` endpoint of ContactViewSet.
+
+Every request is validated in one pass: statuses come from the status registry, the
+contacts being updated are loaded with one query, and taken phone numbers and emails are
+checked with one query per field for the whole batch. Valid items are then written with
+``bulk_create``, ``bulk_update`` or a single ``DELETE`` in one transaction. Invalid items
+are reported next to the written ones instead of failing the whole request.
+"""
+
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from django.db import IntegrityError, transaction
+from django.db.models import Model
+from django.utils import timezone
+from django.utils.text import capfirst
+from rest_framework import serializers
+
+from api.serializers import BulkContactSerializer, ContactSerializer
+from contacts.changes import record_changes
+from contacts.counters import count_contacts
+from contacts.list_cache import list_cache
+from contacts.models import Contact, ContactChange
+
+# Most items one bulk request may contain.
+MAX_BULK_ITEMS = 1000
+
+UNIQUE_FIELDS = ("phone_number", "email")
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+ERROR = "error"
+
+INVALID_ID_MESSAGE = "Must be an integer."
+
+
+def validate_items(items: object, *, key: str | None = None) -> list:
+    """
+    Check the shape of a bulk request body.
+
+    :param items: Parsed request body, or the value under ``key`` of it.
+    :param key: Key holding the list when the body is an object.
+
+    :return:
+        list: The items.
+
+    :raises serializers.ValidationError: If the items are not a non-empty list within ``MAX_BULK_ITEMS``.
+    """
+    if key is not None:
+        items = items.get(key) if isinstance(items, dict) else None
+    name = key or "non_field_errors"
+    if not isinstance(items, list) or not items:
+        raise serializers.ValidationError({name: ["Expected a non-empty list."]})
+    if len(items) > MAX_BULK_ITEMS:
+        raise serializers.ValidationError({name: [f"At most {MAX_BULK_ITEMS} items can be sent at once."]})
+    return items
+
+
+def is_id(value: object) -> bool:
+    """Return whether a JSON value can be a primary key."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+@dataclass
+class BulkItem:
+    """A validated item applied to an unsaved or existing contact."""
+
+    index: int
+    contact: Contact
+    # Names of the fields the item assigns, and of those whose value it changes.
+    fields: set[str]
+    changed: set[str]
+
+
+class ContactBulkWriter:
+    """Validate and write a batch of contacts, collecting a result for every item."""
+
+    def __init__(self: "ContactBulkWriter", items: list, context: dict | None = None) -> None:
+        """
+        Initialize the writer.
+
+        :param items: Items of the request body.
+        :param context: Serializer context, e.g. the request.
+        """
+        self.items = items
+        self.context = context or {}
+        self.results: list[dict | None] = [None] * len(items)
+
+    def fail(self: "ContactBulkWriter", index: int, errors: dict | list) -> None:
+        """Record the errors of an item."""
+        self.results[index] = {"status": ERROR, "errors": errors}
+
+    def check_id(self: "ContactBulkWriter", index: int, value: object) -> bool:
+        """Reject an item whose id is not an integer, before it is looked up; return whether it is one."""
+        if is_id(value):
+            return True
+        self.fail(index, {"id": [INVALID_ID_MESSAGE]})
+        return False
+
+    def succeed(self: "ContactBulkWriter", written: Iterable[BulkItem], status: str) -> None:
+        """Record the written contacts."""
+        for item in written:
+            data = ContactSerializer(item.contact, context=self.context).data
+            self.results[item.index] = {"status": status, "data": data}
+
+    def validate(
+        self: "ContactBulkWriter",
+        instances: dict[int, Contact] | None = None,
+        *,
+        partial: bool = False,
+    ) -> list[BulkItem]:
+        """
+        Validate every item not rejected yet and apply it to an unsaved or existing contact.
+
+        :param instances: Contacts being updated by id, ``None`` when creating.
+        :param partial: Whether omitted fields keep their current value.
+
+        :return:
+            list[BulkItem]: The valid items.
+        """
+        valid = []
+        for index, data in enumerate(self.items):
+            if self.results[index] is not None:
+                continue
+            if not isinstance(data, dict):
+                self.fail(index, {"non_field_errors": ["Expected an object."]})
+                continue
+
+            instance = None
+            if instances is not None:
+                instance = instances.get(data.get("id"))
+                if instance is None:
+                    self.fail(index, {"id": ["Not found."]})
+                    continue
+
+            serializer = BulkContactSerializer(instance, data=data, partial=partial, context=self.context)
+            if not serializer.is_valid():
+                self.fail(index, serializer.errors)
+                continue
+
+            contact = instance or Contact()
+            changed = {name for name, value in serializer.validated_data.items() if getattr(contact, name) != value}
+            for name, value in serializer.validated_data.items():
+                setattr(contact, name, value)
+            valid.append(BulkItem(index, contact, set(serializer.validated_data), changed))
+        return self.drop_duplicates(valid, creating=instances is None)
+
+    def drop_duplicates(self: "ContactBulkWriter", valid: list[BulkItem], *, creating: bool) -> list[BulkItem]:
+        """
+        Reject items giving a contact a phone number or email that another contact has or gets.
+
+        A contact keeping its value owns it, so only the items changing a value can conflict.
+        """
+        own = {item.contact.pk for item in valid if not creating}
+        taken = {}
+        for name in UNIQUE_FIELDS:
+            claims = [getattr(item.contact, name) for item in valid if creating or name in item.changed]
+            existing = Contact.objects.filter(**{f"{name}__in": set(claims)}).exclude(pk__in=own)
+            taken[name] = set(existing.values_list(name, flat=True))
+            # Values kept by contacts of the batch, and those claimed by more than one item.
+            taken[name] |= {getattr(item.contact, name) for item in valid if not creating and name not in item.changed}
+            taken[name] |= {value for value, count in Counter(claims).items() if count > 1}
+
+        unique = []
+        for item in valid:
+            errors = {
+                name: [f"Contact with this {capfirst(self.verbose_name(Contact, name))} already exists."]
+                for name in UNIQUE_FIELDS
+                if (creating or name in item.changed) and getattr(item.contact, name) in taken[name]
+            }
+            if errors:
+                self.fail(item.index, errors)
+            else:
+                unique.append(item)
+        return unique
+
+    @staticmethod
+    def verbose_name(model: type[Model], name: str) -> str:
+        """Return the verbose name of a model field."""
+        return model._meta.get_field(name).verbose_name  # noqa: SLF001
+
+    def write_separately(self: "ContactBulkWriter", valid: list[BulkItem], status: str) -> None:
+        """Save items one by one so that only those conflicting with concurrent writes fail."""
+        for item in valid:
+            try:
+                with transaction.atomic():
+                    if status == UPDATED:
+                        item.contact.save(update_fields=item.fields)
+                    else:
+                        item.contact.pk = None
+                        item.contact.save(force_insert=True)
+            except IntegrityError:
+                self.fail(item.index, {"non_field_errors": ["Contact with this phone number or email already exists."]})
+            else:
+                self.succeed([item], status)
+
+    def create(self: "ContactBulkWriter") -> list[dict]:
+        """
+        Create a contact from every valid item.
+
+        :return:
+            list[dict]: Result of each item, in request order.
+        """
+        valid = self.validate()
+        if valid:
+            try:
+                with transaction.atomic():
+                    Contact.objects.bulk_create([item.contact for item in valid])
+                    # bulk_create() and bulk_update() send no signals.
+                    list_cache.invalidate(Contact.objects.db)
+                    record_changes([item.contact.pk for item in valid], ContactChange.Action.CREATED)
+                    count_contacts([item.contact for item in valid])
+            except IntegrityError:
+                self.write_separately(valid, CREATED)
+            else:
+                self.succeed(valid, CREATED)
+        return self.results
+
+    def update(self: "ContactBulkWriter", *, partial: bool = True) -> list[dict]:
+        """
+        Update the contact identified by the `id` of every valid item.
+
+        :param partial: Whether omitted fields keep their current value.
+
+        :return:
+            list[dict]: Result of each item, in request order.
+        """
+        ids = {
+            index: data["id"]
+            for index, data in enumerate(self.items)
+            if isinstance(data, dict) and self.check_id(index, data.get("id"))
+        }
+        counts = Counter(ids.values())
+        # A contact repeated in the batch would be written twice with different values.
+        for index, pk in ids.items():
+            if counts[pk] > 1:
+                self.fail(index, {"id": ["Contact appears more than once in the request."]})
+        instances = Contact.objects.select_related("status").in_bulk([pk for pk, count in counts.items() if count == 1])
+
+        valid = self.validate(instances, partial=partial)
+        if valid:
+            # bulk_update() does not apply auto_now, so stamp the contacts here.
+            now = timezone.now()
+            for item in valid:
+                item.contact.updated_at = now
+                item.fields.add("updated_at")
+            fields = set().union(*(item.fields for item in valid))
+            try:
+                with transaction.atomic():
+                    Contact.objects.bulk_update([item.contact for item in valid], fields)
+                    list_cache.invalidate(Contact.objects.db)
+                    record_changes([item.contact.pk for item in valid], ContactChange.Action.UPDATED)
+                    count_contacts([item.contact for item in valid])
+            except IntegrityError:
+                self.write_separately(valid, UPDATED)
+            else:
+                self.succeed(valid, UPDATED)
+        return self.results
+
+    def delete(self: "ContactBulkWriter") -> list[dict]:
+        """
+        Delete the contacts whose ids are the items.
+
+        :return:
+            list[dict]: Result of each item, in request order.
+        """
+        ids = {item for index, item in enumerate(self.items) if self.check_id(index, item)}
+        with transaction.atomic():
+            existing = set(Contact.objects.filter(pk__in=ids).values_list("pk", flat=True))
+            Contact.objects.filter(pk__in=existing).delete()
+
+        for index, item in enumerate(self.items):
+            if self.results[index] is not None:
+                continue
+            if item in existing:
+                self.results[index] = {"status": DELETED, "id": item}
+            else:
+                self.fail(index, {"id": ["Not found."]})
+        return self.results
@@ -0,0 +1,258 @@
+"""
+Read-only fast path for list endpoints with large pages.
+
+``ValuesSerializer`` inspects a ``ModelSerializer`` once and compiles its readable fields
+into a plan of ``values()`` lookups and converters, including nested serializers of
+foreign keys. Rows are then turned into representations with plain dict operations
+instead of instantiating models and calling ``to_representation`` of every field, while
+producing exactly what the model serializer produces:
+
+- text and integer fields of text and integer columns are copied as read, since their
+  ``to_representation`` would return them unchanged, and so are related primary keys,
+- ISO 8601 datetimes are converted to the current time zone looked up once per page
+  instead of once per value,
+- other fields keep their own ``to_representation``,
+- ``None`` stays ``None``, and a nested object is ``None`` when its primary key is.
+
+Read-only fields of the root serializer that no model field backs are read as annotations
+of the view's queryset. Fields that cannot be read from ``values()`` (method fields,
+``source="*"``, many-related fields, properties) are rejected when the plan is compiled.
+"""
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from dataclasses import field as dataclass_field
+from datetime import datetime, tzinfo
+from functools import cache, partial
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db import models
+from django.db.models import ForeignObjectRel, Model, QuerySet
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+# Serializer fields whose to_representation returns values of these model fields unchanged.
+PASSTHROUGH_FIELDS = (
+    (serializers.CharField, (models.CharField, models.TextField)),
+    (serializers.IntegerField, (models.IntegerField,)),
+)
+
+
+@dataclass
+class FieldPlan:
+    """How to build one output field from a row."""
+
+    name: str
+    lookup: str | None = None
+    # Serializer field converting the value, None when the value is copied as read.
+    field: serializers.Field | None = None
+    nested: "SerializerPlan | None" = None
+
+
+@dataclass
+class SerializerPlan:
+    """How to build a representation from the lookups of a row."""
+
+    fields: list[FieldPlan]
+    # Lookup of the primary key of a nested object, telling whether the object exists.
+    pk_lookup: str | None = None
+    lookups: list[str] = dataclass_field(default_factory=list)
+
+
+def compile_plan(serializer: serializers.ModelSerializer, prefix: str = "") -> SerializerPlan:
+    """
+    Compile the readable fields of a model serializer.
+
+    :param serializer: Serializer instance whose fields are compiled.
+    :param prefix: Lookup path of the serializer's model from the root model.
+
+    :return:
+        SerializerPlan: The plan, with every ``values()`` lookup it needs.
+
+    :raises ImproperlyConfigured: If a field cannot be built from ``values()`` rows.
+    """
+    model = serializer.Meta.model
+    plans = []
+    for name, serializer_field in serializer.fields.items():
+        if serializer_field.write_only:
+            continue
+        source = serializer_field.source
+        if source == "*" or "." in source or isinstance(serializer_field, serializers.ManyRelatedField):
+            msg = f"{type(serializer).__name__}.{name} cannot be built from values() rows."
+            raise ImproperlyConfigured(msg)
+        if not prefix and is_annotation(model, source, serializer_field):
+            plans.append(FieldPlan(name, lookup=source, field=serializer_field))
+            continue
+        model_field = get_concrete_field(model, source, f"{type(serializer).__name__}.{name}")
+
+        if isinstance(serializer_field, serializers.ModelSerializer):
+            nested = compile_plan(serializer_field, f"{prefix}{source}__")
+            plans.append(FieldPlan(name, nested=nested))
+        elif isinstance(serializer_field, serializers.PrimaryKeyRelatedField) and serializer_field.pk_field is None:
+            # The related primary key is the foreign key column itself.
+            plans.append(FieldPlan(name, lookup=f"{prefix}{model_field.attname}"))
+        elif isinstance(serializer_field, serializers.BaseSerializer) or model_field.is_relation:
+            msg = f"{type(serializer).__name__}.{name} is a relation without a nested ModelSerializer."
+            raise ImproperlyConfigured(msg)
+        else:
+            passthrough = any(
+                isinstance(serializer_field, serializer_type) and isinstance(model_field, model_types)
+                for serializer_type, model_types in PASSTHROUGH_FIELDS
+            )
+            plans.append(FieldPlan(name, lookup=f"{prefix}{source}", field=None if passthrough else serializer_field))
+
+    pk_lookup = f"{prefix}{model._meta.pk.name}" if prefix else None  # noqa: SLF001
+    plan = SerializerPlan(plans, pk_lookup)
+    plan.lookups = collect_lookups(plan)
+    return plan
+
+
+def is_annotation(model: type[Model], name: str, serializer_field: serializers.Field) -> bool:
+    """Return whether a serializer field reads a value annotated on the queryset rather than a model attribute."""
+    if not serializer_field.read_only or isinstance(
+        serializer_field,
+        serializers.RelatedField | serializers.BaseSerializer,
+    ):
+        return False
+    try:
+        model._meta.get_field(name)  # noqa: SLF001
+    except FieldDoesNotExist:
+        return not hasattr(model, name)
+    return False
+
+
+def get_concrete_field(model: type[Model], name: str, label: str) -> object:
+    """Return the concrete model field a serializer field reads, rejecting anything else."""
+    try:
+        model_field = model._meta.get_field(name)  # noqa: SLF001
+    except FieldDoesNotExist:
+        model_field = None
+    if model_field is None or isinstance(model_field, ForeignObjectRel) or model_field.many_to_many:
+        msg = f"{label} does not read a concrete field of {model.__name__}."
+        raise ImproperlyConfigured(msg)
+    return model_field
+
+
+def collect_lookups(plan: SerializerPlan) -> list[str]:
+    """Return the ``values()`` lookups of a plan and its nested plans."""
+    lookups = [plan.pk_lookup] if plan.pk_lookup else []
+    for field_plan in plan.fields:
+        if field_plan.nested is not None:
+            lookups.extend(field_plan.nested.lookups)
+        else:
+            lookups.append(field_plan.lookup)
+    return list(dict.fromkeys(lookups))
+
+
+def iso_datetime(field: serializers.DateTimeField, tz: tzinfo, value: datetime) -> str:
+    """Represent an aware datetime like ``DateTimeField`` with the ISO 8601 format does."""
+    if not isinstance(value, datetime) or not timezone.is_aware(value):
+        return field.to_representation(value)
+    text = value.astimezone(tz).isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+
+def make_converter(field: serializers.Field) -> Callable[[object], object]:
+    """
+    Return a function representing non-null values of a field.
+
+    ``DateTimeField`` looks up the current time zone for every value; it is looked up once here instead.
+    """
+    if isinstance(field, serializers.DateTimeField):
+        output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+        tz = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+        if output_format is not None and output_format.lower() == ISO_8601 and tz is not None:
+            return partial(iso_datetime, field, tz)
+    return field.to_representation
+
+
+def build_representer(plan: SerializerPlan) -> Callable[[dict], dict | None]:
+    """
+    Compile a plan into a function building the representation of a row.
+
+    Converters depend on the active time zone, so representers are built for each batch of rows.
+    """
+    getters = []
+    for field_plan in plan.fields:
+        if field_plan.nested is not None:
+            getters.append((field_plan.name, build_representer(field_plan.nested)))
+        elif field_plan.field is None:
+            getters.append((field_plan.name, itemgetter(field_plan.lookup)))
+        else:
+            convert = make_converter(field_plan.field)
+            getters.append((field_plan.name, partial(convert_value, field_plan.lookup, convert)))
+
+    pk_lookup = plan.pk_lookup
+
+    def represent(row: dict) -> dict | None:
+        """Build the representation of a row."""
+        if pk_lookup is not None and row[pk_lookup] is None:
+            return None
+        return {name: get(row) for name, get in getters}
+
+    return represent
+
+
+def convert_value(lookup: str, convert: Callable[[object], object], row: dict) -> object:
+    """Return the converted value of a lookup, keeping ``None``."""
+    value = row[lookup]
+    return None if value is None else convert(value)
+
+
+class ValuesSerializer:
+    """Read-only serializer producing the representations of a model serializer from ``values()`` rows."""
+
+    def __init__(self: "ValuesSerializer", serializer_class: type[serializers.ModelSerializer]) -> None:
+        """
+        Compile the plan of a model serializer.
+
+        :param serializer_class: Serializer whose output is reproduced.
+        """
+        self.serializer_class = serializer_class
+        self.plan = compile_plan(serializer_class())
+
+    @property
+    def lookups(self: "ValuesSerializer") -> list[str]:
+        """Return the lookups the rows must contain."""
+        return self.plan.lookups
+
+    def values(self: "ValuesSerializer", queryset: QuerySet, *extra: str) -> QuerySet:
+        """
+        Return the queryset reading the rows.
+
+        :param queryset: Filtered and ordered queryset of the serializer's model.
+        :param extra: Further lookups or annotations to read, e.g. ordering fields a paginator needs.
+
+        :return:
+            QuerySet: Queryset of dicts.
+        """
+        return queryset.values(*dict.fromkeys([*self.lookups, *extra]))
+
+    def to_representation(self: "ValuesSerializer", row: dict) -> dict:
+        """Return the representation of one row."""
+        return build_representer(self.plan)(row)
+
+    def many(self: "ValuesSerializer", rows: Iterable[dict]) -> list[dict]:
+        """Return the representations of rows."""
+        represent = build_representer(self.plan)
+        return [represent(row) for row in rows]
+
+
+def fast_serialization_enabled() -> bool:
+    """Return whether ``CONTACT_API_FAST_SERIALIZATION`` turns the fast path on."""
+    return getattr(settings, "CONTACT_API_FAST_SERIALIZATION", False)
+
+
+def ordering_lookups(queryset: QuerySet) -> list[str]:
+    """Return the fields a queryset is ordered by, and its primary key, as ``values()`` lookups."""
+    ordering = [field.lstrip("-") for field in queryset.query.order_by if isinstance(field, str)]
+    return [*ordering, "pk"] if "pk" not in ordering else ordering
+
+
+@cache
+def values_serializer(serializer_class: type[serializers.ModelSerializer]) -> ValuesSerializer:
+    """Return the compiled ``ValuesSerializer`` of a model serializer, compiling it once per process."""
+    return ValuesSerializer(serializer_class)
@@ -0,0 +1,37 @@
+from django.db.models import QuerySet
+from rest_framework import filters
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from contacts.fuzzy import FUZZY_FIELDS
+from contacts.search import SEARCH_FIELDS, fuzzy_requested, get_search_backend
+
+
+class ContactSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter delegating plain-field contact searches to the indexed search backend.
+
+    Results are ordered by relevance unless the request asks for an explicit `ordering`.
+    Search fields with lookup prefixes or outside the indexed fields use DRF's default lookups.
+    With `fuzzy=1`, terms tolerate typos, searching the view's search fields whose words are indexed.
+    """
+
+    def filter_queryset(self: "ContactSearchFilter", request: Request, queryset: QuerySet, view: APIView) -> QuerySet:
+        """Filter the queryset with the search backend for the requested search terms."""
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+
+        if not search_fields or not search_terms or not set(search_fields).issubset(SEARCH_FIELDS):
+            return super().filter_queryset(request, queryset, view)
+
+        ranked = api_settings.ORDERING_PARAM not in request.query_params
+        backend = get_search_backend(queryset.db)
+        fuzzy_fields = [field for field in search_fields if field in FUZZY_FIELDS]
+        if fuzzy_requested(request.query_params) and fuzzy_fields:
+            queryset = backend.fuzzy_search(queryset, search_terms, fuzzy_fields, ranked=ranked)
+        else:
+            queryset = backend.search(queryset, search_terms, search_fields, ranked=ranked)
+        if ranked:
+            return queryset.order_by("-search_rank", "pk")
+        return queryset
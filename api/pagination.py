@@ -0,0 +1,98 @@
+from django.core.paginator import InvalidPage
+from django.db.models import QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+
+from contacts.pagination import InvalidCursor, KeysetPaginator
+
+
+class ContactKeysetPagination(CursorPagination):
+    """
+    Cursor pagination over whatever ordering the filter backends applied.
+
+    Unlike DRF's ``CursorPagination``, which orders by one fixed field and skips duplicates
+    with an offset, the position covers every ordering field plus the primary key, so the
+    `ordering` parameter and ranked search results page in constant time without offsets.
+    """
+
+    def paginate_queryset(
+        self: "ContactKeysetPagination",
+        queryset: QuerySet,
+        request: Request,
+        view: APIView | None = None,  # noqa: ARG002
+    ) -> list | None:
+        """Return the rows of the page the `cursor` query parameter points to."""
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.request = request
+        try:
+            cursor = request.query_params.get(self.cursor_query_param)
+            self.page = KeysetPaginator(queryset, self.page_size).page(cursor)
+        except InvalidCursor as e:
+            raise NotFound(self.invalid_cursor_message) from e
+        return list(self.page)
+
+    async def apaginate_queryset(self: "ContactKeysetPagination", queryset: QuerySet, request: Request) -> list | None:
+        """Return the rows of the page the `cursor` query parameter points to, read with the async ORM."""
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.request = request
+        try:
+            cursor = request.query_params.get(self.cursor_query_param)
+            self.page = await KeysetPaginator(queryset, self.page_size).apage(cursor)
+        except InvalidCursor as e:
+            raise NotFound(self.invalid_cursor_message) from e
+        return list(self.page)
+
+    def get_next_link(self: "ContactKeysetPagination") -> str | None:
+        """Return the URL of the next page."""
+        if not self.page.has_next():
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.page.next_cursor)
+
+    def get_previous_link(self: "ContactKeysetPagination") -> str | None:
+        """Return the URL of the previous page."""
+        if not self.page.has_previous():
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.page.previous_cursor)
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    """
+    ``PageNumberPagination`` reading the count and the page with the async ORM.
+
+    Django's ``Paginator`` counts lazily with a blocking query, so the count is read with
+    ``acount()`` first and handed to it; the page's slice is then iterated asynchronously.
+    Links and the response body are those of ``PageNumberPagination``.
+    """
+
+    async def apaginate_queryset(
+        self: "AsyncPageNumberPagination",
+        queryset: QuerySet,
+        request: Request,
+    ) -> list | None:
+        """Return the rows of the page the `page` query parameter asks for."""
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as e:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(e))
+            raise NotFound(msg) from e
+
+        self.request = request
+        return [row async for row in self.page.object_list]
@@ -0,0 +1,45 @@
+"""
+JSON renderer encoding with orjson when it is installed.
+
+``FastJSONRenderer`` produces the same bytes as DRF's ``JSONRenderer`` with the default
+``UNICODE_JSON`` and ``COMPACT_JSON`` settings for the data of the contact endpoints:
+compact separators, non-ASCII characters as UTF-8, line and paragraph separators escaped,
+and dates, decimals and lazy strings encoded by DRF's own ``JSONEncoder``. It falls back
+to ``JSONRenderer`` for indented output, other settings and anything orjson refuses to
+encode, e.g. integers beyond 64 bits. Floats in exponent notation are written without
+the ``+`` that ``json`` adds, so keep it off endpoints returning such floats.
+"""
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional speedup, the `fast` extra
+    orjson = None
+
+# Types orjson would encode differently from DRF's JSONEncoder are handed to its default().
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS if orjson else 0
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer encoding compact output with orjson."""
+
+    def render(
+        self: "FastJSONRenderer",
+        data: object,
+        accepted_media_type: str | None = None,
+        renderer_context: dict | None = None,
+    ) -> bytes:
+        """Render data into the bytes JSONRenderer would produce."""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if orjson is None or data is None or indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            rendered = orjson.dumps(data, default=self.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return rendered.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+    def default(self: "FastJSONRenderer", obj: object) -> object:
+        """Encode what orjson passes through like DRF's JSONEncoder does."""
+        return self.encoder_class().default(obj)
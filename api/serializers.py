@@ -1,6 +1,8 @@
+from django.db import IntegrityError, router, transaction
 from rest_framework import serializers
 
-from contacts.models import Contact, ContactStatusChoices
+from contacts.models import Contact, ContactStatusChoices, DuplicateCandidate, Job
+from contacts.statuses import status_registry
 
 
 class ContactStatusSerializer(serializers.ModelSerializer):
@@ -11,6 +13,47 @@ class ContactStatusSerializer(serializers.ModelSerializer):
         fields = ["id", "name"]  # noqa: RUF012
 
 
+class ContactStatusCountSerializer(ContactStatusSerializer):
+    """
+    Serializer for contact statuses with their number of contacts.
+
+    `contact_count` is read from the `contact_count` annotation of `contacts.counters.with_contact_counts`.
+    """
+
+    contact_count = serializers.IntegerField(read_only=True)
+
+    class Meta(ContactStatusSerializer.Meta):
+        """Metaclass for ContactStatusCountSerializer adding the number of contacts."""
+
+        fields = [*ContactStatusSerializer.Meta.fields, "contact_count"]  # noqa: RUF012
+
+
+class StatusPrimaryKeyField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField for contact statuses, looked up in the status registry.
+
+    A status missing from the registry may have been created by another process since it
+    was loaded, so it is looked up in the database before being rejected.
+    """
+
+    def to_internal_value(self: "StatusPrimaryKeyField", data: object) -> ContactStatusChoices:
+        """Return the registered status with the given primary key."""
+        if isinstance(data, bool) or (isinstance(data, float) and not data.is_integer()):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        status = status_registry.get(pk)
+        if status is None:
+            status = self.get_queryset().filter(pk=pk).first()
+            if status is not None:
+                status_registry.clear()
+        if status is None:
+            self.fail("does_not_exist", pk_value=data)
+        return status
+
+
 class ContactSerializer(serializers.ModelSerializer):
     """
     Serializer for the Contact model including related status data.
@@ -21,7 +64,7 @@ class ContactSerializer(serializers.ModelSerializer):
     """
 
     status = ContactStatusSerializer(read_only=True)
-    status_id = serializers.PrimaryKeyRelatedField(
+    status_id = StatusPrimaryKeyField(
         queryset=ContactStatusChoices.objects.all(),
         source="status",
         write_only=True,
@@ -42,4 +85,83 @@ class ContactSerializer(serializers.ModelSerializer):
             "status",
             "status_id",
             "created_at",
+            "updated_at",
+        ]
+
+    def save(self: "ContactSerializer", **kwargs: dict) -> Contact:
+        """
+        Save the contact, rejecting a status deleted by another process since the registry loaded it.
+
+        :raises serializers.ValidationError: If the status no longer exists.
+        """
+        status = self.validated_data.get("status")
+        try:
+            with transaction.atomic(using=router.db_for_write(Contact)):
+                return super().save(**kwargs)
+        except IntegrityError:
+            if status is None or ContactStatusChoices.objects.filter(pk=status.pk).exists():
+                raise
+            status_registry.clear()
+            message = self.fields["status_id"].error_messages["does_not_exist"].format(pk_value=status.pk)
+            raise serializers.ValidationError({"status_id": [message]}) from None
+
+
+class BulkContactSerializer(ContactSerializer):
+    """
+    ContactSerializer validating one item of a bulk request without database queries.
+
+    Unique checks on `phone_number` and `email` are left out; the bulk endpoint checks
+    all items against the database with one query per field. Statuses come from the
+    status registry, like in ContactSerializer.
+    """
+
+    class Meta(ContactSerializer.Meta):
+        """Metaclass for BulkContactSerializer dropping the per-item unique validators."""
+
+        extra_kwargs = {"phone_number": {"validators": []}, "email": {"validators": []}}  # noqa: RUF012
+
+
+class DuplicateCandidateSerializer(serializers.ModelSerializer):
+    """Serializer for a pair of likely duplicate contacts, both represented in full."""
+
+    contact = ContactSerializer(read_only=True)
+    duplicate = ContactSerializer(read_only=True)
+
+    class Meta:
+        """Metaclass for DuplicateCandidateSerializer."""
+
+        model = DuplicateCandidate
+        fields = ["id", "contact", "duplicate", "score", "created_at"]  # noqa: RUF012
+
+
+class MergeSerializer(serializers.Serializer):
+    """Serializer validating the ids of the contacts merged into another one."""
+
+    duplicates = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=100)
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Serializer for a background job, with its progress and outcome."""
+
+    class Meta:
+        """Metaclass for JobSerializer."""
+
+        model = Job
+        fields = [  # noqa: RUF012
+            "id",
+            "name",
+            "payload",
+            "status",
+            "priority",
+            "attempts",
+            "max_attempts",
+            "progress",
+            "total",
+            "result",
+            "error",
+            "run_after",
+            "created_at",
+            "started_at",
+            "finished_at",
         ]
+        read_only_fields = fields
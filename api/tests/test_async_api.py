@@ -0,0 +1,133 @@
+import warnings
+
+from django.core.paginator import UnorderedObjectListWarning
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from contacts.fuzzy import fuzzy_vocabulary
+from contacts.pagination import KEYSET
+from testing.factories import ContactFactory, ContactStatusFactory, UserFactory
+
+
+class AsyncContactAPITests(TestCase):
+    """Test suite checking that the async contact endpoints respond like the DRF ones."""
+
+    def setUp(self):
+        """Set up contacts in two cities, with and without a status."""
+        self.user = UserFactory()
+        self.client.force_login(self.user)
+        self.active = ContactStatusFactory(name="Aktywny")
+        for n in range(15):
+            ContactFactory(
+                first_name=f"Zoë{n}",
+                last_name=f"Łukasiewicz{n % 4}",
+                phone_number=f"{n:09d}",
+                city="Gdańsk" if n % 2 else "New York",
+                status=self.active if n % 3 else None,
+            )
+        self.contact = ContactFactory(first_name="Anna", phone_number="999999999", status=self.active)
+
+    def assert_same_responses(self, query=""):
+        """Assert that the DRF and async list endpoints answer a query with the same status and body."""
+        regular = self.client.get(reverse("contact-list") + query, HTTP_ACCEPT="application/json")
+        response = self.client.get(reverse("async-contact-list") + query)
+        self.assertEqual(response.status_code, regular.status_code)
+        self.assertEqual(response.content, regular.content.replace(b"/api/contacts/", b"/api/async/contacts/"))
+        return response
+
+    def test_list_matches_drf(self):
+        """Test that pages, filters, search and ordering give the same bodies."""
+        for query in (
+            "",
+            "?page=2",
+            "?city=Gda%C5%84sk",
+            f"?status={self.active.pk}",
+            "?search=Zo%C3%AB1",
+            "?search=anna",
+            "?ordering=-last_name",
+            "?ordering=last_name&page=2",
+        ):
+            with self.subTest(query=query):
+                self.assertEqual(self.assert_same_responses(query).status_code, status.HTTP_200_OK)
+
+    def test_unordered_list_pages_by_primary_key(self):
+        """Test that lists without a search or ordering are paged by primary key on both endpoints."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", UnorderedObjectListWarning)
+            pages = [self.assert_same_responses(query).json()["results"] for query in ("", "?page=2")]
+        ids = [row["id"] for page in pages for row in page]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(ids), 16)
+
+    def test_list_errors_match_drf(self):
+        """Test that an invalid page or status is rejected like by the DRF endpoint."""
+        self.assertEqual(self.assert_same_responses("?page=9").status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.assert_same_responses("?status=0").status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.assert_same_responses("?status=x").status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(CONTACT_PAGINATION=KEYSET)
+    def test_keyset_list_matches_drf(self):
+        """Test that keyset pages and their cursors are the same."""
+        first = self.assert_same_responses("?ordering=last_name").json()
+        next_query = first["next"].split("?", 1)[1]
+        self.assertEqual(self.assert_same_responses(f"?{next_query}").status_code, status.HTTP_200_OK)
+        self.assertEqual(self.assert_same_responses("?cursor=bogus").status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_etag_matches_drf(self):
+        """Test that the list ETag is the DRF endpoint's and answers 304."""
+        regular = self.client.get(reverse("contact-list"), HTTP_ACCEPT="application/json")
+        response = self.client.get(reverse("async-contact-list"), HTTP_IF_NONE_MATCH=regular["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], regular["ETag"])
+
+    def test_detail_matches_drf(self):
+        """Test that a contact is represented the same and answers 304 to its ETag."""
+        regular = self.client.get(reverse("contact-detail", kwargs={"pk": self.contact.pk}))
+        url = reverse("async-contact-detail", kwargs={"pk": self.contact.pk})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, regular.content)
+        self.assertEqual(response["ETag"], regular["ETag"])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=regular["ETag"]).status_code, 304)
+
+    def test_detail_not_found(self):
+        """Test that a missing contact gives the DRF endpoint's 404."""
+        regular = self.client.get(reverse("contact-detail", kwargs={"pk": 0}))
+        response = self.client.get(reverse("async-contact-detail", kwargs={"pk": 0}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.content, regular.content)
+
+    def test_requires_authentication(self):
+        """Test that anonymous requests are rejected like by the DRF endpoints."""
+        self.client.logout()
+        for name, kwargs in (("list", {}), ("detail", {"pk": self.contact.pk})):
+            with self.subTest(name=name):
+                regular = self.client.get(reverse(f"contact-{name}", kwargs=kwargs))
+                response = self.client.get(reverse(f"async-contact-{name}", kwargs=kwargs))
+                self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+                self.assertEqual(response.content, regular.content)
+
+    def test_read_only(self):
+        """Test that writes are not allowed."""
+        response = self.client.post(reverse("async-contact-list"), {})
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    async def test_asgi_request(self):
+        """Test that the endpoints answer through the ASGI handler."""
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("async-contact-list"), {"search": "anna"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["id"] for row in response.json()["results"]], [self.contact.pk])
+
+        response = await self.async_client.get(reverse("async-contact-detail", kwargs={"pk": self.contact.pk}))
+        self.assertEqual(response.json()["first_name"], "Anna")
+
+    async def test_fuzzy_search_with_cold_vocabulary(self):
+        """Test that a fuzzy search loads the vocabulary off the event loop on the first search."""
+        fuzzy_vocabulary.clear()
+        self.addCleanup(fuzzy_vocabulary.clear)
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("async-contact-list"), {"search": "Annna", "fuzzy": "1"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(self.contact.pk, [row["id"] for row in response.json()["results"]])
@@ -0,0 +1,71 @@
+"""
+Tests for the contact autocomplete endpoint.
+"""
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from contacts.autocomplete import autocomplete_index
+from testing.factories import ContactFactory, UserFactory
+
+
+class ContactAutocompleteAPITests(APITestCase):
+    """Test suite for `/api/contacts/autocomplete/`."""
+
+    def setUp(self):
+        """Set up test data."""
+        autocomplete_index.clear()
+        self.addCleanup(autocomplete_index.clear)
+        self.client.force_authenticate(user=UserFactory())
+        self.jan = ContactFactory(first_name="Jan", last_name="Kowalski", email="jan@example.com")
+        self.janina = ContactFactory(first_name="Janina", last_name="Nowak", email="janina@example.com")
+        self.url = reverse("contact-autocomplete")
+
+    def test_url(self):
+        """Test that the endpoint is routed under the contacts API."""
+        self.assertEqual(self.url, "/api/contacts/autocomplete/")
+
+    def test_suggestions(self):
+        """Test that contacts are suggested by name or email prefix."""
+        response = self.client.get(self.url, {"prefix": "Jan"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([contact["id"] for contact in response.data["results"]], [self.jan.id, self.janina.id])
+        self.assertEqual(
+            response.data["results"][0],
+            {"id": self.jan.id, "first_name": "Jan", "last_name": "Kowalski", "email": "jan@example.com"},
+        )
+
+        response = self.client.get(self.url, {"prefix": "jan now"})
+        self.assertEqual([contact["id"] for contact in response.data["results"]], [self.janina.id])
+
+    def test_limit(self):
+        """Test that the number of suggestions is limited by `limit` and the setting."""
+        response = self.client.get(self.url, {"prefix": "jan", "limit": "1"})
+        self.assertEqual(len(response.data["results"]), 1)
+
+        with override_settings(CONTACT_AUTOCOMPLETE_LIMIT=1):
+            response = self.client.get(self.url, {"prefix": "jan"})
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_invalid_parameters(self):
+        """Test that missing prefixes and invalid limits are rejected."""
+        for params, field in [
+            ({}, "prefix"),
+            ({"prefix": "  "}, "prefix"),
+            ({"prefix": "j" * 101}, "prefix"),
+            ({"prefix": "jan", "limit": "0"}, "limit"),
+            ({"prefix": "jan", "limit": "51"}, "limit"),
+            ({"prefix": "jan", "limit": "many"}, "limit"),
+        ]:
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn(field, response.data)
+
+    def test_requires_authentication(self):
+        """Test that anonymous requests are rejected."""
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.url, {"prefix": "jan"})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,157 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.bulk import MAX_BULK_ITEMS
+from contacts.models import Contact
+from testing.factories import ContactFactory, ContactStatusFactory, UserFactory
+
+
+def item(n, **overrides):
+    """Return the fields of a valid contact to create."""
+    return {
+        "first_name": "Anna",
+        "last_name": f"Nowak{n}",
+        "phone_number": f"{n:09d}",
+        "email": f"anna.{n}@example.com",
+        "city": "Warsaw",
+        **overrides,
+    }
+
+
+class ContactBulkAPITests(APITestCase):
+    """Test suite for the bulk create, update and delete endpoint."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.active = ContactStatusFactory(name="Active")
+        self.archived = ContactStatusFactory(name="Archived")
+        self.existing = ContactFactory(phone_number="999999999", email="taken@example.com", status=self.active)
+        self.url = reverse("contact-bulk")
+
+    def test_bulk_create(self):
+        """Test that valid items are created and invalid ones reported in request order."""
+        items = [
+            item(1, status_id=self.active.id),
+            item(2, email="taken@example.com"),
+            item(3, status_id=12345),
+            item(4, email="not-an-email"),
+            item(5),
+            item(6, phone_number="000000005"),
+        ]
+        response = self.client.post(self.url, items, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data["succeeded"], response.data["failed"]), (1, 5))
+        results = response.data["results"]
+        self.assertEqual([result["status"] for result in results], ["created"] + ["error"] * 5)
+        self.assertEqual(results[0]["data"]["status"], {"id": self.active.id, "name": "Active"})
+        self.assertEqual(Contact.objects.get(pk=results[0]["data"]["id"]).status, self.active)
+        self.assertEqual(results[1]["errors"], {"email": ["Contact with this Email already exists."]})
+        self.assertIn("status_id", results[2]["errors"])
+        self.assertIn("email", results[3]["errors"])
+        # Both items claiming the same phone number are rejected.
+        self.assertIn("phone_number", results[4]["errors"])
+        self.assertIn("phone_number", results[5]["errors"])
+
+    def test_bulk_create_query_count(self):
+        """Test that the number of queries does not grow with the number of items."""
+        statuses = [self.active.id, self.archived.id]
+        # Statuses loaded into the registry, two unique checks, and the insert, its changes and counts in a savepoint.
+        with self.assertNumQueries(8):
+            response = self.client.post(
+                self.url,
+                [item(n, status_id=statuses[n % 2]) for n in range(50)],
+                format="json",
+            )
+        self.assertEqual(response.data["succeeded"], 50)
+
+    def test_bulk_update(self):
+        """Test that partial updates are applied to the contacts identified by id."""
+        other = ContactFactory(phone_number="888888888", email="other@example.com")
+        items = [
+            {"id": self.existing.id, "city": "Gdańsk", "status_id": self.archived.id},
+            {"id": other.id, "email": "taken@example.com"},
+            {"id": 12345, "city": "Nowhere"},
+            {"city": "Nowhere"},
+        ]
+        response = self.client.patch(self.url, items, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual([result["status"] for result in results], ["updated", "error", "error", "error"])
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.city, self.existing.status), ("Gdańsk", self.archived))
+        self.assertEqual(results[0]["data"]["status"]["name"], "Archived")
+        self.assertIn("email", results[1]["errors"])
+        self.assertEqual(results[2]["errors"], {"id": ["Not found."]})
+        other.refresh_from_db()
+        self.assertEqual(other.email, "other@example.com")
+
+    def test_bulk_update_keeps_own_values(self):
+        """Test that a contact keeping its own email and phone number is not a duplicate."""
+        items = [{"id": self.existing.id, "email": "taken@example.com", "phone_number": "999999999"}]
+        response = self.client.patch(self.url, items, format="json")
+        self.assertEqual(response.data["results"][0]["status"], "updated")
+
+    def test_bulk_update_repeated_id(self):
+        """Test that items updating the same contact twice are rejected."""
+        items = [{"id": self.existing.id, "city": "A"}, {"id": self.existing.id, "city": "B"}]
+        response = self.client.patch(self.url, items, format="json")
+        self.assertEqual(response.data["failed"], 2)
+        self.existing.refresh_from_db()
+        self.assertNotIn(self.existing.city, ("A", "B"))
+
+    def test_bulk_update_query_count(self):
+        """Test that updates load, check and write all contacts at once."""
+        contacts = [ContactFactory(phone_number=f"{n:09d}") for n in range(30)]
+        items = [{"id": contact.id, "city": f"City {n}"} for n, contact in enumerate(contacts)]
+        # Contacts, and the update, its changes and counts in a savepoint; no unique field changes, so nothing is checked.
+        with self.assertNumQueries(6):
+            response = self.client.patch(self.url, items, format="json")
+        self.assertEqual(response.data["succeeded"], 30)
+        self.assertEqual(Contact.objects.filter(city__startswith="City ").count(), 30)
+
+    def test_bulk_delete(self):
+        """Test that contacts are deleted by id and unknown ids reported."""
+        other = ContactFactory(phone_number="888888888")
+        response = self.client.delete(self.url, {"ids": [self.existing.id, 12345, other.id]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result["status"] for result in response.data["results"]], ["deleted", "error", "deleted"])
+        self.assertFalse(Contact.objects.filter(pk__in=[self.existing.id, other.id]).exists())
+
+    def test_invalid_ids(self):
+        """Test that ids which are not integers, including booleans, are reported per item."""
+        error = {"id": ["Must be an integer."]}
+        items = [{"id": [self.existing.id]}, {"id": {"a": 1}}, {"id": True, "city": "Nowhere"}, {"city": "Nowhere"}]
+        response = self.client.patch(self.url, items, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result["errors"] for result in response.data["results"]], [error] * 4)
+
+        ids = [[self.existing.id], {"a": 1}, True, self.existing.id]
+        response = self.client.delete(self.url, {"ids": ids}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result.get("errors") for result in response.data["results"]], [error] * 3 + [None])
+        self.assertFalse(Contact.objects.exists())
+
+    def test_invalid_bodies(self):
+        """Test that bodies which are not lists of items are rejected as a whole."""
+        for method, body in (
+            ("post", {"first_name": "Anna"}),
+            ("post", []),
+            ("post", [item(n) for n in range(MAX_BULK_ITEMS + 1)]),
+            ("delete", [1, 2]),
+        ):
+            with self.subTest(method=method):
+                response = getattr(self.client, method)(self.url, body, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Contact.objects.count(), 1)
+
+    def test_requires_authentication(self):
+        """Test that anonymous users cannot write in bulk."""
+        self.client.force_authenticate(user=None)
+        response = self.client.post(self.url, [item(1)], format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
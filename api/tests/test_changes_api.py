@@ -0,0 +1,97 @@
+"""
+Tests for the contact delta sync endpoint.
+"""
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from contacts.changes import latest_token
+from contacts.models import Contact
+from testing.factories import ContactFactory, UserFactory
+
+
+class ContactChangesAPITests(APITestCase):
+    """Test suite for `/api/contacts/changes/`."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client.force_authenticate(user=UserFactory())
+        self.contact = ContactFactory(first_name="Jan")
+        self.url = reverse("contact-changes")
+
+    def sync(self, since, **params):
+        """Return the response to a sync from a token."""
+        response = self.client.get(self.url, {"since": since, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_url(self):
+        """Test that the endpoint is routed under the contacts API."""
+        self.assertEqual(self.url, "/api/contacts/changes/")
+
+    def test_latest_token(self):
+        """Test that a request without a token returns the latest one only."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"results": [], "next": latest_token(), "has_more": False})
+
+    def test_sync(self):
+        """Test that creates, updates and deletes after a token are returned, with the current contacts."""
+        token = latest_token()
+        self.client.patch(reverse("contact-detail", args=[self.contact.pk]), {"city": "Gdańsk"})
+        created = self.client.post(
+            reverse("contact-list"),
+            {
+                "first_name": "Anna",
+                "last_name": "Nowak",
+                "phone_number": "123123123",
+                "email": "anna@example.com",
+                "city": "Kraków",
+            },
+        ).data
+        deleted = ContactFactory()
+        self.client.delete(reverse("contact-detail", args=[deleted.pk]))
+
+        data = self.sync(token)
+        self.assertEqual(
+            [(result["action"], result["id"]) for result in data["results"]],
+            [("updated", self.contact.pk), ("created", created["id"]), ("deleted", deleted.pk)],
+        )
+        self.assertEqual(data["results"][0]["contact"]["city"], "Gdańsk")
+        self.assertEqual(data["results"][1]["contact"], created)
+        self.assertIsNone(data["results"][2]["contact"])
+        self.assertEqual(data["next"], data["results"][-1]["seq"])
+        self.assertEqual(self.sync(data["next"])["results"], [])
+
+    def test_bulk_writes(self):
+        """Test that contacts written through the bulk API are synced."""
+        token = latest_token()
+        response = self.client.patch(
+            reverse("contact-bulk"),
+            [{"id": self.contact.pk, "city": "Gdańsk"}],
+            format="json",
+        )
+        self.assertEqual(response.data["succeeded"], 1)
+        self.assertEqual([result["action"] for result in self.sync(token)["results"]], ["updated"])
+
+    def test_contact_deleted_after_the_page(self):
+        """Test that a contact deleted after the changes read is reported as deleted at once."""
+        token, pk = latest_token(), self.contact.pk
+        self.contact.save()
+        self.contact.delete()
+        data = self.sync(token, limit=1)
+        self.assertEqual(data["results"], [{"seq": data["next"], "action": "deleted", "id": pk, "contact": None}])
+        self.assertTrue(data["has_more"])
+
+    def test_invalid_parameters(self):
+        """Test that invalid tokens and limits are rejected."""
+        for params in ({"since": "abc"}, {"since": -1}, {"since": 0, "limit": 0}, {"since": 0, "limit": 5001}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+        self.assertEqual(Contact.objects.count(), 1)
+
+    def test_authentication_required(self):
+        """Test that anonymous clients are rejected."""
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
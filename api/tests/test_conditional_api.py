@@ -0,0 +1,122 @@
+from unittest import mock
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from contacts.fuzzy import fuzzy_vocabulary
+from contacts.models import Contact
+from contacts.statuses import status_registry
+from testing.factories import ContactFactory, ContactStatusFactory, UserFactory
+
+
+class ContactConditionalGetAPITests(APITestCase):
+    """Test suite for ETags and 304 responses of the contact list and detail endpoints."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.active = ContactStatusFactory(name="Active")
+        self.contact = ContactFactory(phone_number="111111111", city="Warsaw", status=self.active)
+        self.other = ContactFactory(phone_number="222222222", city="Gdańsk")
+        self.list_url = reverse("contact-list")
+        self.detail_url = reverse("contact-detail", kwargs={"pk": self.contact.pk})
+        status_registry.all()
+
+    def assert_not_modified(self, url, etag):
+        """Assert that the URL answers 304 to the ETag."""
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertFalse(response.content)
+
+    def assert_modified(self, url, etag):
+        """Assert that the URL answers 200 with a new ETag."""
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_list_headers(self):
+        """Test that list responses carry validators and must be revalidated."""
+        response = self.client.get(self.list_url)
+        self.assertTrue(response["ETag"].startswith('W/"'))
+        self.assertIn("Last-Modified", response)
+        self.assertIn("no-cache", response["Cache-Control"])
+        self.assertIn("private", response["Cache-Control"])
+
+    def test_list_not_modified(self):
+        """Test that an unchanged list is answered with 304 and only the aggregate query."""
+        etag = self.client.get(self.list_url)["ETag"]
+        with self.assertNumQueries(1):
+            self.assert_not_modified(self.list_url, etag)
+
+    def test_list_changes(self):
+        """Test that every change to the listed contacts changes the ETag."""
+        etag = self.client.get(self.list_url)["ETag"]
+
+        self.contact.city = "Kraków"
+        self.contact.save()
+        self.assert_modified(self.list_url, etag)
+
+        etag = self.client.get(self.list_url)["ETag"]
+        self.other.delete()
+        self.assert_modified(self.list_url, etag)
+
+        etag = self.client.get(self.list_url)["ETag"]
+        self.active.name = "Current"
+        self.active.save()
+        self.assert_modified(self.list_url, etag)
+
+        etag = self.client.get(self.list_url)["ETag"]
+        response = self.client.patch(reverse("contact-bulk"), [{"id": self.contact.pk, "city": "Łódź"}], format="json")
+        self.assertEqual(response.data["succeeded"], 1)
+        self.assert_modified(self.list_url, etag)
+
+    def test_list_etag_depends_on_filters(self):
+        """Test that filtered lists have their own ETag, unaffected by contacts they leave out."""
+        url = f"{self.list_url}?city=Warsaw"
+        etag = self.client.get(url)["ETag"]
+        self.assertNotEqual(etag, self.client.get(self.list_url)["ETag"])
+
+        Contact.objects.filter(pk=self.other.pk).delete()
+        self.assert_not_modified(url, etag)
+
+    def test_list_searches_once(self):
+        """Test that the ETag and the page read the same search, expanded once."""
+        with mock.patch.object(fuzzy_vocabulary, "similar_words", wraps=fuzzy_vocabulary.similar_words) as similar:
+            response = self.client.get(self.list_url, {"search": self.contact.last_name, "fuzzy": "1"})
+        self.assertEqual(similar.call_count, 1)
+        self.assertIn(self.contact.pk, [row["id"] for row in response.data["results"]])
+
+    def test_list_ignores_if_modified_since_alone(self):
+        """Test that a list is not answered with 304 based on its last modification time only."""
+        last_modified = self.client.get(self.list_url)["Last-Modified"]
+        self.other.delete()
+        response = self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+
+    def test_detail_not_modified(self):
+        """Test that an unchanged contact is answered with 304 by ETag or modification time."""
+        response = self.client.get(self.detail_url)
+        with self.assertNumQueries(1):
+            self.assert_not_modified(self.detail_url, response["ETag"])
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_changes(self):
+        """Test that editing the contact or renaming its status changes the ETag."""
+        etag = self.client.get(self.detail_url)["ETag"]
+        self.client.patch(self.detail_url, {"city": "Kraków"}, format="json")
+        self.assert_modified(self.detail_url, etag)
+
+        etag = self.client.get(self.detail_url)["ETag"]
+        self.active.name = "Current"
+        self.active.save()
+        self.assert_modified(self.detail_url, etag)
+
+    def test_renderers_have_their_own_etag(self):
+        """Test that the JSON and browsable API representations do not share an ETag."""
+        etag = self.client.get(self.detail_url, HTTP_ACCEPT="application/json")["ETag"]
+        self.assertNotEqual(etag, self.client.get(self.detail_url, HTTP_ACCEPT="text/html")["ETag"])
@@ -0,0 +1,56 @@
+"""
+Tests for the contact counts exposed by the API.
+"""
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from contacts.counters import reconcile_counts
+from testing.factories import ContactFactory, ContactStatusFactory, UserFactory
+
+
+class ContactCountsAPITests(APITestCase):
+    """Test suite for the status counts and the city counts endpoint."""
+
+    def setUp(self):
+        """Authenticate and set up contacts in two statuses and cities."""
+        self.client.force_authenticate(user=UserFactory())
+        self.lead = ContactStatusFactory(name="Lead")
+        self.archived = ContactStatusFactory(name="Archived")
+        ContactFactory.create_batch(2, status=self.lead, city="Kraków")
+        ContactFactory(status=None, city="Gdańsk")
+
+    def test_status_counts(self):
+        """Test that statuses have their numbers of contacts, on the regular and the fast path."""
+        expected = {"Lead": 2, "Archived": 0}
+        response = self.client.get(reverse("status-list"))
+        self.assertEqual({item["name"]: item["contact_count"] for item in response.data["results"]}, expected)
+        with override_settings(CONTACT_API_FAST_SERIALIZATION=True):
+            response = self.client.get(reverse("status-list"))
+        self.assertEqual({item["name"]: item["contact_count"] for item in response.json()["results"]}, expected)
+
+        response = self.client.get(reverse("status-detail", kwargs={"pk": self.lead.pk}))
+        self.assertEqual(response.data["contact_count"], 2)
+
+    def test_bulk_writes_are_counted(self):
+        """Test that contacts created and moved by the bulk API are counted."""
+        contact = {"first_name": "Anna", "last_name": "Nowak", "city": "Gdańsk", "status_id": self.archived.pk}
+        response = self.client.post(
+            reverse("contact-bulk"),
+            [{**contact, "phone_number": "111222333", "email": "anna@example.com"}],
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(reconcile_counts(dry_run=True), {})
+
+        response = self.client.get(reverse("contact-cities"))
+        self.assertEqual(response.data["results"], [{"city": "Gdańsk", "count": 2}, {"city": "Kraków", "count": 2}])
+
+    def test_cities(self):
+        """Test that cities are listed from the most contacts, up to the limit."""
+        response = self.client.get(reverse("contact-cities"), {"limit": 1})
+        self.assertEqual(response.data["results"], [{"city": "Kraków", "count": 2}])
+        response = self.client.get(reverse("contact-cities"), {"limit": 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
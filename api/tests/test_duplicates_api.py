@@ -0,0 +1,74 @@
+"""
+Tests for the duplicate candidate and merge endpoints.
+"""
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from contacts.dedupe import DuplicateFinder
+from contacts.models import Contact, DuplicateCandidate
+from testing.factories import ContactFactory, ContactStatusFactory, UserFactory
+
+
+class DuplicateAPITests(APITestCase):
+    """Test suite for `/api/duplicates/` and `/api/contacts/<id>/merge/`."""
+
+    def setUp(self):
+        """Set up a pair of duplicates with their candidate."""
+        self.client.force_authenticate(user=UserFactory())
+        self.status = ContactStatusFactory(name="Active")
+        self.jan = ContactFactory(first_name="Jan", last_name="Kowalski", email="jan.kowalski@a.com", city="Kraków")
+        self.copy = ContactFactory(
+            first_name="Jan",
+            last_name="Kowalski",
+            email="jan.kowalski@b.com",
+            city="Kraków",
+            status=self.status,
+        )
+        ContactFactory(first_name="Anna", last_name="Nowak", email="anna@a.com", city="Gdańsk")
+        DuplicateFinder().run()
+        self.candidate = DuplicateCandidate.objects.get()
+
+    def test_list_candidates(self):
+        """Test that candidates are listed with both contacts."""
+        response = self.client.get(reverse("duplicate-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+        candidate = response.data["results"][0]
+        self.assertEqual(candidate["contact"]["id"], self.jan.id)
+        self.assertEqual(candidate["duplicate"]["status"]["name"], "Active")
+        self.assertGreaterEqual(candidate["score"], 0.7)
+
+    def test_dismiss_candidate(self):
+        """Test that deleting a candidate keeps both contacts."""
+        response = self.client.delete(reverse("duplicate-detail", args=[self.candidate.id]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(DuplicateCandidate.objects.exists())
+        self.assertEqual(Contact.objects.count(), 3)
+
+    def test_merge(self):
+        """Test that merging deletes the duplicates and their candidates and returns the merged contact."""
+        response = self.client.post(
+            reverse("contact-merge", args=[self.jan.id]),
+            {"duplicates": [self.copy.id]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["email"], "jan.kowalski@a.com")
+        self.assertEqual(response.data["status"]["name"], "Active")
+        self.assertFalse(Contact.objects.filter(pk=self.copy.id).exists())
+        self.assertFalse(DuplicateCandidate.objects.exists())
+
+    def test_invalid_merges(self):
+        """Test that invalid merges are rejected without changes."""
+        url = reverse("contact-merge", args=[self.jan.id])
+        for data in [{}, {"duplicates": []}, {"duplicates": [self.jan.id]}, {"duplicates": [0]}]:
+            with self.subTest(data=data):
+                response = self.client.post(url, data, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn("duplicates", response.data)
+        self.assertEqual(Contact.objects.count(), 3)
+
+        response = self.client.post(reverse("contact-merge", args=[0]), {"duplicates": [self.copy.id]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
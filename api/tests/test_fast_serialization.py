@@ -0,0 +1,168 @@
+import datetime
+import decimal
+import importlib.util
+import sys
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from api.fast_serializers import ValuesSerializer
+from api.renderers import FastJSONRenderer
+from api.serializers import ContactSerializer
+from contacts.models import Contact
+from testing.factories import ContactFactory, ContactStatusFactory, UserFactory
+
+
+class FastListAPITests(APITestCase):
+    """Test suite checking that the fast list path responds exactly like the regular one."""
+
+    def setUp(self):
+        """Set up contacts with and without a status and with characters JSON escapes."""
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        active = ContactStatusFactory(name="Aktywny – ż")
+        for n in range(15):
+            ContactFactory(
+                first_name=f'Zoë "{n}" \\ \u2028',
+                last_name=f"Łukasiewicz{n % 4}\t",
+                phone_number=f"{n:09d}",
+                city="Gdańsk" if n % 2 else "New York",
+                status=active if n % 3 else None,
+            )
+
+    def assert_same_responses(self, url, **headers):
+        """Assert that the regular and fast paths answer a request with the same bytes."""
+        with override_settings(CONTACT_API_FAST_SERIALIZATION=False):
+            regular = self.client.get(url, **headers)
+        with override_settings(CONTACT_API_FAST_SERIALIZATION=True):
+            fast = self.client.get(url, **headers)
+        self.assertEqual(regular.status_code, 200)
+        self.assertEqual(fast.content, regular.content)
+        return regular
+
+    def test_contact_lists(self):
+        """Test filtered, ordered, searched and paginated contact lists."""
+        url = reverse("contact-list")
+        for query in ("", "?page=2", "?ordering=-created_at", "?search=gdańsk", "?status=1&city=Gda%C5%84sk"):
+            with self.subTest(query=query):
+                self.assert_same_responses(url + query)
+
+    @override_settings(CONTACT_PAGINATION="keyset")
+    def test_keyset_contact_lists(self):
+        """Test that cursors of the fast path lead to the same pages."""
+        url = reverse("contact-list") + "?ordering=last_name"
+        while url:
+            response = self.assert_same_responses(url)
+            url = response.data["next"]
+
+    def test_status_list(self):
+        """Test the status list."""
+        self.assert_same_responses(reverse("status-list"))
+
+    def test_indented_and_browsable_responses(self):
+        """Test that indented JSON and the browsable API are unaffected."""
+        url = reverse("contact-list")
+        self.assert_same_responses(url, HTTP_ACCEPT="application/json; indent=2")
+        with override_settings(CONTACT_API_FAST_SERIALIZATION=True):
+            response = self.client.get(url, HTTP_ACCEPT="text/html")
+        self.assertContains(response, "Łukasiewicz")
+
+    @override_settings(CONTACT_API_FAST_SERIALIZATION=True)
+    def test_fast_path_query_count(self):
+        """Test that a fast page is read with a count and one joined query besides the ETag aggregate."""
+        self.client.get(reverse("contact-list"))
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("contact-list"))
+        self.assertEqual(len(response.json()["results"]), 10)
+
+
+class ValuesSerializerTests(TestCase):
+    """Test suite for compiling model serializers into values() plans."""
+
+    def test_contact_serializer_plan(self):
+        """Test the lookups read for ContactSerializer and the representation built from them."""
+        serializer = ValuesSerializer(ContactSerializer)
+        self.assertEqual(
+            serializer.lookups,
+            [
+                "id",
+                "first_name",
+                "last_name",
+                "phone_number",
+                "email",
+                "city",
+                "status__id",
+                "status__name",
+                "created_at",
+                "updated_at",
+            ],
+        )
+        contact = ContactFactory(status=ContactStatusFactory(name="Active"))
+        row = serializer.values(Contact.objects.all()).get()
+        self.assertEqual(serializer.to_representation(row), ContactSerializer(contact).data)
+
+    def test_datetimes_follow_the_current_time_zone(self):
+        """Test that datetimes are represented in the active time zone, like DateTimeField does."""
+        contact = ContactFactory()
+        serializer = ValuesSerializer(ContactSerializer)
+        for zone in ("UTC", "Europe/Warsaw", "America/New_York"):
+            with self.subTest(zone=zone), timezone.override(zone):
+                rows = serializer.values(Contact.objects.all())
+                self.assertEqual(serializer.many(rows), [dict(ContactSerializer(contact).data)])
+
+    def test_unsupported_fields_are_rejected(self):
+        """Test that fields not readable from values() rows are rejected when compiling."""
+
+        class MethodSerializer(ContactSerializer):
+            full_name = serializers.SerializerMethodField()
+
+            class Meta(ContactSerializer.Meta):
+                fields = [*ContactSerializer.Meta.fields, "full_name"]  # noqa: RUF012
+
+            def get_full_name(self, obj):
+                return str(obj)
+
+        with self.assertRaises(ImproperlyConfigured):
+            ValuesSerializer(MethodSerializer)
+
+
+class FastJSONRendererTests(TestCase):
+    """Test suite for the orjson renderer."""
+
+    def test_same_bytes_as_json_renderer(self):
+        """Test that the renderer encodes like JSONRenderer, including types orjson handles differently."""
+        data = self.data()
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        # orjson refuses integers beyond 64 bits, so JSONRenderer encodes them.
+        self.assertEqual(FastJSONRenderer().render({"big": 2**70}), JSONRenderer().render({"big": 2**70}))
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+    def test_without_orjson(self):
+        """Test that the renderer falls back to JSONRenderer when orjson is not installed."""
+        spec = importlib.util.find_spec("api.renderers")
+        renderers = importlib.util.module_from_spec(spec)
+        with mock.patch.dict(sys.modules, {"orjson": None}):
+            spec.loader.exec_module(renderers)
+        self.assertIsNone(renderers.orjson)
+        data = self.data()
+        self.assertEqual(renderers.FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(renderers.FastJSONRenderer().render(None), b"")
+
+    @staticmethod
+    def data():
+        """Return data with every type the contact endpoints render."""
+        return {
+            "text": "\u017c\u00f3\u0142\u0107 \u2028\u2029 </script> \x00\x1f\x7f \U0001f600",
+            "when": datetime.datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.UTC),
+            "day": datetime.date(2026, 1, 2),
+            "price": decimal.Decimal("1.10"),
+            "lazy": gettext_lazy("Not found."),
+            "nested": [None, True, 1, {"key": []}],
+        }
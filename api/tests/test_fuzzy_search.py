@@ -0,0 +1,30 @@
+"""
+Tests for fuzzy search through the contacts API.
+"""
+
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from contacts.fuzzy import fuzzy_vocabulary
+from testing.factories import ContactFactory, UserFactory
+
+
+class FuzzyAPISearchTest(APITestCase):
+    """Test suite for fuzzy search through the contacts API."""
+
+    def setUp(self):
+        """Set up test data."""
+        fuzzy_vocabulary.clear()
+        self.addCleanup(fuzzy_vocabulary.clear)
+        self.client.force_authenticate(user=UserFactory())
+        self.nowak = ContactFactory(first_name="Anna", last_name="Nowak")
+        ContactFactory(first_name="Bob", last_name="Johnson")
+        self.list_url = reverse("contact-list")
+
+    def test_fuzzy_api_search(self):
+        """Test that `fuzzy=1` makes the search tolerate typos."""
+        response = self.client.get(self.list_url, {"search": "nowack"})
+        self.assertEqual(response.data["results"], [])
+
+        response = self.client.get(self.list_url, {"search": "nowack", "fuzzy": "1"})
+        self.assertEqual([contact["id"] for contact in response.data["results"]], [self.nowak.id])
@@ -0,0 +1,66 @@
+import json
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from contacts.models import Contact
+from testing.factories import ContactFactory, UserFactory
+
+
+class ContactImportAPITests(APITestCase):
+    """Test suite for the contact import endpoint."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("contact-import-file")
+        ContactFactory(phone_number="111111111", email="taken@example.com")
+
+    def upload(self, name, rows, **data):
+        """Post rows as an NDJSON file."""
+        content = "\n".join(json.dumps(row) for row in rows).encode()
+        return self.client.post(self.url, {"file": SimpleUploadedFile(name, content), **data}, format="multipart")
+
+    def rows(self):
+        """Return one valid and one duplicate row."""
+        valid = {
+            "first_name": "Anna",
+            "last_name": "Nowak",
+            "phone_number": "222222222",
+            "email": "anna@example.com",
+            "city": "Warsaw",
+        }
+        return [valid, {**valid, "phone_number": "333333333", "email": "taken@example.com"}]
+
+    def test_import(self):
+        """Test that valid rows are created and rejected rows reported."""
+        response = self.upload("contacts.ndjson", self.rows())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["error_count"], 1)
+        self.assertEqual(response.data["errors"][0]["row"], 2)
+        self.assertIn("email", response.data["errors"][0]["errors"])
+        self.assertTrue(Contact.objects.filter(email="anna@example.com").exists())
+
+    def test_dry_run(self):
+        """Test that dry runs do not create contacts."""
+        response = self.upload("contacts.ndjson", self.rows(), dry_run="true")
+        self.assertEqual(response.data["created"], 1)
+        self.assertFalse(Contact.objects.filter(email="anna@example.com").exists())
+
+    def test_format_field(self):
+        """Test that the format field overrides the file extension."""
+        response = self.upload("upload.txt", self.rows(), format="ndjson")
+        self.assertEqual(response.data["created"], 1)
+
+    def test_invalid_requests(self):
+        """Test that missing files and unknown formats are rejected."""
+        response = self.client.post(self.url, {}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.upload("contacts.xlsx", self.rows())
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("file", response.data)
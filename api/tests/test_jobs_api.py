@@ -0,0 +1,59 @@
+"""
+Tests for the background jobs endpoint.
+"""
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from contacts.models import Job
+from testing.factories import UserFactory
+
+
+class JobAPITests(APITestCase):
+    """Test suite for `/api/jobs/`."""
+
+    def setUp(self):
+        """Set up a queued and a running job."""
+        self.client.force_authenticate(user=UserFactory())
+        self.queued = Job.objects.create(name="find_duplicates")
+        self.running = Job.objects.create(name="delete", status=Job.Status.RUNNING, progress=40, total=100)
+        self.url = reverse("job-list")
+
+    def test_url(self):
+        """Test that the endpoint is routed under the API."""
+        self.assertEqual(self.url, "/api/jobs/")
+
+    def test_list(self):
+        """Test that jobs are listed newest first, with their progress."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([job["id"] for job in response.data["results"]], [self.running.id, self.queued.id])
+        self.assertEqual(
+            {key: response.data["results"][0][key] for key in ("status", "progress", "total")},
+            {"status": "running", "progress": 40, "total": 100},
+        )
+
+    def test_filter(self):
+        """Test that jobs are filtered by status and name."""
+        response = self.client.get(self.url, {"status": "queued"})
+        self.assertEqual([job["id"] for job in response.data["results"]], [self.queued.id])
+        response = self.client.get(self.url, {"name": "delete"})
+        self.assertEqual([job["id"] for job in response.data["results"]], [self.running.id])
+
+    def test_retrieve(self):
+        """Test that a job is retrieved by id."""
+        response = self.client.get(reverse("job-detail", args=[self.queued.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data["name"], response.data["status"]), ("find_duplicates", "queued"))
+
+    def test_read_only(self):
+        """Test that jobs cannot be created or changed through the API."""
+        self.assertEqual(self.client.post(self.url, {"name": "x"}).status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        response = self.client.delete(reverse("job-detail", args=[self.queued.id]))
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_authentication_required(self):
+        """Test that anonymous clients are rejected."""
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,54 @@
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from testing.factories import ContactFactory, ContactStatusFactory, UserFactory
+
+
+@override_settings(CONTACT_PAGINATION="keyset")
+class ContactKeysetPaginationAPITests(APITestCase):
+    """Test suite for the Contact API in keyset pagination mode."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        status_ = ContactStatusFactory(name="Active")
+        for n in range(25):
+            ContactFactory(last_name=f"Last{n:02d}", phone_number=f"{n:09d}", city="Warsaw", status=status_)
+        self.list_url = reverse("contact-list")
+
+    def collect(self, url):
+        """Follow next links and return all last names in order."""
+        names = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            names.extend(contact["last_name"] for contact in response.data["results"])
+            url = response.data["next"]
+        return names
+
+    def test_follow_next_links(self):
+        """Test that next links walk the whole result set in order."""
+        self.assertEqual(
+            self.collect(f"{self.list_url}?ordering=-last_name"), [f"Last{n:02d}" for n in range(24, -1, -1)]
+        )
+
+    def test_previous_link(self):
+        """Test that the previous link returns to the preceding page."""
+        first = self.client.get(f"{self.list_url}?ordering=last_name")
+        second = self.client.get(first.data["next"])
+        self.assertIsNone(first.data["previous"])
+        back = self.client.get(second.data["previous"])
+        self.assertEqual(back.data["results"], first.data["results"])
+
+    def test_search_results_are_paginated(self):
+        """Test that ranked search results are paginated by cursor."""
+        self.assertEqual(len(self.collect(f"{self.list_url}?search=Last")), 25)
+
+    def test_invalid_cursor(self):
+        """Test that an invalid cursor returns 404."""
+        response = self.client.get(f"{self.list_url}?cursor=bogus")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,59 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.test import APITestCase
+
+from contacts.statuses import status_registry
+from testing.factories import ContactFactory, ContactStatusFactory, UserFactory
+
+
+class ContactAPIQueryCountTests(APITestCase):
+    """Regression tests keeping the number of queries per API page independent of the page size."""
+
+    def setUp(self):
+        """Set up contacts that each have their own status."""
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        for n in range(30):
+            ContactFactory(phone_number=f"{n:09d}", status=ContactStatusFactory(name=f"Status {n}"))
+        self.list_url = reverse("contact-list")
+        # Load the statuses up front so that every measured request reads them from the registry.
+        status_registry.all()
+
+    def count_queries(self, url, page_size):
+        """Return the number of queries issued to fetch a page of the given size."""
+        with (
+            mock.patch.object(PageNumberPagination, "page_size", page_size),
+            CaptureQueriesContext(connection) as queries,
+        ):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data["results"]), page_size)
+        return len(queries)
+
+    def test_list_queries_do_not_grow_with_page_size(self):
+        """Test that listing contacts joins their statuses instead of querying each one."""
+        for url in (self.list_url, f"{self.list_url}?ordering=-created_at", f"{self.list_url}?search=example"):
+            with self.subTest(url=url):
+                self.assertEqual(self.count_queries(url, 5), self.count_queries(url, 25))
+
+    def test_list_query_count(self):
+        """Test the exact number of queries of a list page: the ETag aggregate, a count and the joined page."""
+        with self.assertNumQueries(3):
+            self.client.get(self.list_url)
+
+    @override_settings(CONTACT_PAGINATION="keyset")
+    def test_keyset_list_query_count(self):
+        """Test that a keyset page is fetched with the ETag aggregate and a single joined query."""
+        with self.assertNumQueries(2):
+            self.client.get(self.list_url)
+
+    def test_detail_query_count(self):
+        """Test that a contact and its status are fetched with one query."""
+        contact = ContactFactory(phone_number="999999999", status=ContactStatusFactory(name="Detail"))
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("contact-detail", kwargs={"pk": contact.pk}))
+        self.assertEqual(response.data["status"]["name"], "Detail")
@@ -43,7 +43,17 @@ class ContactSerializerTests(TestCase):
     def test_contains_expected_fields(self):
         """Test that the serializer contains the expected fields."""
         data = self.serializer.data
-        expected_fields = {"id", "first_name", "last_name", "phone_number", "email", "city", "status", "created_at"}
+        expected_fields = {
+            "id",
+            "first_name",
+            "last_name",
+            "phone_number",
+            "email",
+            "city",
+            "status",
+            "created_at",
+            "updated_at",
+        }
         self.assertEqual(set(data.keys()), expected_fields)
         # status_id is write-only, so it shouldn't be in the output data
 
@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.views import MAX_WEATHER_CITIES
+from testing.factories import UserFactory
+from testing.weather_stub import WeatherStub
+
+
+class WeatherAPITests(APITestCase):
+    """Test suite for the weather endpoint."""
+
+    def setUp(self):
+        """Authenticate and start the stub services."""
+        cache.clear()
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("weather")
+        self.stub = WeatherStub({"warsaw": (52.23, 21.01), "kraków": (50.06, 19.94)})
+        self.stub.__enter__()
+        self.addCleanup(self.stub.__exit__, None, None, None)
+        settings_override = override_settings(**self.stub.settings)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_weather_of_page_cities(self):
+        """Test that one request returns the weather of every city on a page."""
+        response = self.client.get(self.url, {"city": ["Warsaw", "Kraków", "Warsaw", "Atlantis"]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data), {"Warsaw", "Kraków", "Atlantis"})
+        self.assertEqual(response.data["Warsaw"]["temperature"], 52.23)
+        self.assertEqual(response.data["Kraków"]["humidity"], 65)
+        self.assertEqual(response.data["Atlantis"], {"status": "not_found"})
+        self.assertEqual(self.stub.requests, {"/search": 3, "/forecast": 2})
+
+    def test_city_is_required(self):
+        """Test that a request without cities is rejected."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_too_many_cities(self):
+        """Test that requests for more cities than a page can show are rejected."""
+        cities = [f"City {n}" for n in range(MAX_WEATHER_CITIES + 1)]
+        response = self.client.get(self.url, {"city": cities})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.stub.requests, {})
+
+    def test_city_too_long(self):
+        """Test that names longer than a contact's city are rejected."""
+        response = self.client.get(self.url, {"city": "x" * 51})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requires_authentication(self):
+        """Test that anonymous users cannot use the endpoint."""
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.url, {"city": "Warsaw"})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
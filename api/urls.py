@@ -1,12 +1,24 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import ContactStatusViewSet, ContactViewSet
+from . import async_views
+from .views import (
+    ContactStatusViewSet,
+    ContactViewSet,
+    DuplicateCandidateViewSet,
+    JobViewSet,
+    WeatherView,
+)
 
 router = DefaultRouter()
 router.register(r"contacts", ContactViewSet, basename="contact")
 router.register(r"statuses", ContactStatusViewSet, basename="status")
+router.register(r"duplicates", DuplicateCandidateViewSet, basename="duplicate")
+router.register(r"jobs", JobViewSet, basename="job")
 
 urlpatterns = [
+    path("weather/", WeatherView.as_view(), name="weather"),
+    path("async/contacts/", async_views.contact_list, name="async-contact-list"),
+    path("async/contacts/<int:pk>/", async_views.contact_detail, name="async-contact-detail"),
     path("", include(router.urls)),
 ]
@@ -1,40 +1,408 @@
 from typing import ClassVar
 
+from django.conf import settings
+from django.db.models import QuerySet
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, viewsets
+from rest_framework import filters, mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.parsers import MultiPartParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from api.serializers import ContactSerializer, ContactStatusSerializer
-from contacts.models import Contact, ContactStatusChoices
+from api.bulk import ERROR, ContactBulkWriter, validate_items
+from api.fast_serializers import (
+    fast_serialization_enabled,
+    ordering_lookups,
+    values_serializer,
+)
+from api.filters import ContactSearchFilter
+from api.pagination import ContactKeysetPagination
+from api.renderers import FastJSONRenderer
+from api.serializers import (
+    ContactSerializer,
+    ContactStatusCountSerializer,
+    DuplicateCandidateSerializer,
+    JobSerializer,
+    MergeSerializer,
+)
+from contacts.autocomplete import autocomplete_index
+from contacts.changes import changes_since, latest_token
+from contacts.conditional import (
+    list_validators,
+    not_modified,
+    object_validators,
+    request_parts,
+    set_validators,
+)
+from contacts.counters import city_counts, with_contact_counts
+from contacts.dedupe import MergeError, merge_contacts
+from contacts.importing import ImportFormatError, detect_format, import_contacts
+from contacts.models import (
+    CityLocation,
+    Contact,
+    ContactChange,
+    ContactStatusChoices,
+    DuplicateCandidate,
+    Job,
+)
+from contacts.pagination import KEYSET, get_pagination_mode
+from contacts.weather import get_weather
 
+# Most distinct cities one weather request may ask for; a list page shows far fewer.
+MAX_WEATHER_CITIES = 100
 
-class ContactViewSet(viewsets.ModelViewSet):
+# Most contacts one autocomplete request may ask for, and the longest prefix it may send.
+MAX_AUTOCOMPLETE_LIMIT = 50
+MAX_AUTOCOMPLETE_PREFIX_LENGTH = 100
+
+# Most changes one delta sync request may read.
+MAX_CHANGES_LIMIT = 5000
+
+# Cities listed with their contact counts by default, and at most.
+DEFAULT_CITIES_LIMIT = 100
+MAX_CITIES_LIMIT = 1000
+
+
+class FastListMixin:
+    """
+    Read-only fast path of the `list` action, enabled by `CONTACT_API_FAST_SERIALIZATION`.
+
+    Pages are read with `values()` and represented by the compiled `ValuesSerializer` of the
+    view's serializer, then rendered with `FastJSONRenderer`; the output is the same as the
+    regular path's.
+    """
+
+    def get_renderers(self: "FastListMixin") -> list[BaseRenderer]:
+        """Replace the JSON renderer by the fast one when the fast path is enabled."""
+        renderers = super().get_renderers()
+        if not fast_serialization_enabled():
+            return renderers
+        return [FastJSONRenderer() if type(renderer) is JSONRenderer else renderer for renderer in renderers]
+
+    def list(self: "FastListMixin", request: Request, *args: tuple, **kwargs: dict) -> Response:
+        """Return a page of objects, through the fast path when it is enabled."""
+        if not fast_serialization_enabled():
+            return super().list(request, *args, **kwargs)
+
+        serializer = values_serializer(self.get_serializer_class())
+        queryset = self.filter_queryset(self.get_queryset())
+        # Keyset pagination reads the ordering values of the page's edge rows.
+        rows = serializer.values(queryset, *ordering_lookups(queryset))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.many(page))
+        return Response(serializer.many(rows))
+
+
+class ContactViewSet(FastListMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows full CRUD operations on Contact instances.
 
     Features:
     - Supports filtering by `status` and `city`
-    - Supports searching by `first_name`, `last_name`, and `email`
+    - Supports searching by `first_name`, `last_name`, and `email`, ranked by relevance
     - Supports ordering by `created_at` and `last_name`
-    - Returns full contact info including nested status details
+    - Returns full contact info including nested status details, joined in the same query
     - Accepts `status_id` for creating and updating status field
+    - Paginates by cursor instead of page number when `CONTACT_PAGINATION` is "keyset"
+    - Imports contacts in bulk from an uploaded CSV, JSON or NDJSON file at `import/`
+    - Creates (POST), updates (PATCH) and deletes (DELETE) batches of contacts at `bulk/`
+    - Suggests contacts by name or email prefix from an in-memory index at `autocomplete/`
+    - Lists the contacts created, updated or deleted after a sync token at `changes/`
+    - Merges duplicates into a contact at `<id>/merge/`
+    - Sends ETags on list and detail responses and answers 304 Not Modified when they match
+    - Lists through a read-only fast path when `CONTACT_API_FAST_SERIALIZATION` is enabled
 
     Requires authentication.
     """
 
-    queryset: ClassVar[Contact.objects.all()] = Contact.objects.all()
+    # Ordered by primary key unless searched or ordered otherwise, so that pages are stable.
+    queryset: ClassVar[Contact.objects.all()] = Contact.objects.select_related("status").order_by("pk")
     serializer_class = ContactSerializer
-    filter_backends: ClassVar[list] = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends: ClassVar[list] = [DjangoFilterBackend, ContactSearchFilter, filters.OrderingFilter]
     filterset_fields: ClassVar[list] = ["status", "city"]
     search_fields: ClassVar[list] = ["first_name", "last_name", "email"]
     ordering_fields: ClassVar[list] = ["created_at", "last_name"]
 
+    @property
+    def paginator(self: "ContactViewSet") -> BasePagination | None:
+        """Return the keyset paginator in keyset mode, the configured page number paginator otherwise."""
+        if get_pagination_mode() == KEYSET and not hasattr(self, "_paginator"):
+            self._paginator = ContactKeysetPagination()
+        return super().paginator
+
+    def filter_queryset(self: "ContactViewSet", queryset: QuerySet) -> QuerySet:
+        """Filter the contacts, once per list request: the ETag and the page are read from the same queryset."""
+        if self.action != "list":
+            return super().filter_queryset(queryset)
+        if not hasattr(self, "_filtered_queryset"):
+            self._filtered_queryset = super().filter_queryset(queryset)
+        return self._filtered_queryset
+
+    def list(self: "ContactViewSet", request: Request, *args: tuple, **kwargs: dict) -> Response:
+        """Return a page of contacts, or 304 Not Modified if the client's copy is current."""
+        parts = ("list", request.accepted_renderer.format, request.user.pk, request_parts(request))
+        etag, last_modified = list_validators(self.filter_queryset(self.get_queryset()), *parts)
+        if response := not_modified(request, etag):
+            return response
+        return set_validators(super().list(request, *args, **kwargs), etag, last_modified)
+
+    def retrieve(
+        self: "ContactViewSet",
+        request: Request,
+        *args: tuple,  # noqa: ARG002
+        **kwargs: dict,  # noqa: ARG002
+    ) -> Response:
+        """Return a contact, or 304 Not Modified if the client's copy is current."""
+        instance = self.get_object()
+        parts = ("detail", request.accepted_renderer.format, request.user.pk)
+        etag, last_modified = object_validators(instance, *parts)
+        if response := not_modified(request, etag, last_modified):
+            return response
+        return set_validators(Response(self.get_serializer(instance).data), etag, last_modified)
+
+    @action(detail=False, methods=["post", "patch", "delete"], url_path="bulk")
+    def bulk(self: "ContactViewSet", request: Request) -> Response:
+        """
+        Create, update or delete a batch of contacts in one request and one transaction.
+
+        - POST: a list of contacts to create, with the same fields as a single create.
+        - PATCH: a list of partial updates, each with the `id` of the contact to update.
+        - DELETE: `{"ids": [...]}` with the ids of the contacts to delete.
+
+        Valid items are written even if others are rejected. The response holds the
+        `results` of every item in request order, each with a `status` of "created",
+        "updated", "deleted" or "error" (with `errors`), and the number of `succeeded`
+        and `failed` items.
+        """
+        if request.method == "DELETE":
+            writer = ContactBulkWriter(validate_items(request.data, key="ids"))
+            results = writer.delete()
+        else:
+            writer = ContactBulkWriter(validate_items(request.data), self.get_serializer_context())
+            results = writer.create() if request.method == "POST" else writer.update()
+
+        failed = sum(result["status"] == ERROR for result in results)
+        return Response({"succeeded": len(results) - failed, "failed": failed, "results": results})
+
+    @action(detail=False, methods=["get"], url_path="autocomplete")
+    def autocomplete(self: "ContactViewSet", request: Request) -> Response:
+        """
+        Suggest contacts whose first name, last name or email starts with the `prefix`.
+
+        Every word of the prefix must start one of them, e.g. `?prefix=jan kow`. At most `limit`
+        contacts are returned (`CONTACT_AUTOCOMPLETE_LIMIT` by default), each with its `id`,
+        `first_name`, `last_name` and `email`, from an in-memory index without a query.
+        """
+        prefix = request.query_params.get("prefix", "").strip()
+        if not prefix:
+            return Response({"prefix": ["A prefix is required."]}, status=status.HTTP_400_BAD_REQUEST)
+        if len(prefix) > MAX_AUTOCOMPLETE_PREFIX_LENGTH:
+            return Response(
+                {"prefix": [f"Prefixes are at most {MAX_AUTOCOMPLETE_PREFIX_LENGTH} characters long."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            limit = int(request.query_params.get("limit", getattr(settings, "CONTACT_AUTOCOMPLETE_LIMIT", 10)))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MAX_AUTOCOMPLETE_LIMIT:
+            return Response(
+                {"limit": [f"The limit must be a number from 1 to {MAX_AUTOCOMPLETE_LIMIT}."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response({"results": autocomplete_index.complete(prefix, limit)})
+
+    @action(detail=False, methods=["get"], url_path="changes")
+    def changes(self: "ContactViewSet", request: Request) -> Response:
+        """
+        List the contacts created, updated or deleted after the `since` token, oldest first.
+
+        Each result has the `seq` number, `action` and `id` of the latest change of a contact,
+        and the current `contact`, which is null once it is deleted. Responses read at most
+        `limit` changes (`CONTACT_CHANGES_PAGE_SIZE` by default) and return the `next` token to
+        pass as `since`, with `has_more` while changes remain. Without `since`, only the
+        latest token is returned: take it before a full download, then sync from it.
+        """
+        try:
+            limit = int(request.query_params.get("limit", getattr(settings, "CONTACT_CHANGES_PAGE_SIZE", 500)))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MAX_CHANGES_LIMIT:
+            return Response(
+                {"limit": [f"The limit must be a number from 1 to {MAX_CHANGES_LIMIT}."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if "since" not in request.query_params:
+            return Response({"results": [], "next": latest_token(), "has_more": False})
+        try:
+            since = int(request.query_params["since"])
+        except ValueError:
+            since = -1
+        if since < 0:
+            return Response({"since": ["The token must be a non-negative number."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        page = changes_since(since, limit)
+        ids = [contact_id for _, change, contact_id in page.changes if change != ContactChange.Action.DELETED]
+        # One serializer for the page, rather than one per contact, builds its fields once.
+        serializer = self.get_serializer(self.get_queryset().filter(pk__in=ids), many=True)
+        contacts = {contact["id"]: contact for contact in serializer.data}
+        results = []
+        for seq, change, contact_id in page.changes:
+            contact = contacts.get(contact_id)
+            # A contact deleted after the page's changes is reported as deleted already.
+            results.append(
+                {
+                    "seq": seq,
+                    "action": change if contact else ContactChange.Action.DELETED,
+                    "id": contact_id,
+                    "contact": contact,
+                },
+            )
+        return Response({"results": results, "next": page.token, "has_more": page.has_more})
+
+    @action(detail=False, methods=["get"], url_path="cities")
+    def cities(self: "ContactViewSet", request: Request) -> Response:
+        """
+        List the cities of the contacts with their numbers of contacts, from the most contacts.
+
+        The numbers are read from the maintained contact counters instead of counting the
+        contacts; `limit` cities are returned, 100 by default.
+        """
+        try:
+            limit = int(request.query_params.get("limit", DEFAULT_CITIES_LIMIT))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MAX_CITIES_LIMIT:
+            return Response(
+                {"limit": [f"The limit must be a number from 1 to {MAX_CITIES_LIMIT}."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response({"results": [{"city": city, "count": count} for city, count in city_counts(limit)]})
+
+    @action(detail=True, methods=["post"], url_path="merge")
+    def merge(self: "ContactViewSet", request: Request, pk: str | None = None) -> Response:  # noqa: ARG002
+        """
+        Merge the contacts listed in `duplicates` into this one, in one transaction.
+
+        The contact keeps its values, takes a status from a duplicate if it has none and the
+        earliest creation time; the duplicates are deleted. Returns the merged contact.
+        """
+        serializer = MergeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            contact = merge_contacts(self.get_object(), serializer.validated_data["duplicates"])
+        except MergeError as e:
+            raise ValidationError({"duplicates": [str(e)]}) from e
+        return Response(self.get_serializer(contact).data)
 
-class ContactStatusViewSet(viewsets.ReadOnlyModelViewSet):
+    @action(detail=False, methods=["post"], url_path="import", parser_classes=[MultiPartParser])
+    def import_file(self: "ContactViewSet", request: Request) -> Response:
+        """
+        Import contacts from the uploaded `file`.
+
+        The format is taken from the `format` field ("csv", "json" or "ndjson") or guessed from the
+        file name. Valid rows are created even if others are rejected; the response lists the
+        number of created contacts and the errors of rejected rows. Send `dry_run=true` to
+        validate the file without keeping anything.
+        """
+        upload = request.data.get("file")
+        if upload is None:
+            raise ValidationError({"file": ["An import file is required."]})
+        try:
+            fmt = request.data.get("format") or detect_format(upload.name)
+            result = import_contacts(
+                upload,
+                fmt,
+                dry_run=str(request.data.get("dry_run", "")).lower() in ("1", "true"),
+            )
+        except ImportFormatError as e:
+            raise ValidationError({"file": [str(e)]}) from e
+        return Response(result.as_dict(), status=status.HTTP_200_OK)
+
+
+class ContactStatusViewSet(FastListMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for listing all available contact statuses.
 
     This view is read-only and does not allow creating, updating, or deleting statuses.
+    Each status has its `contact_count`, read from the maintained contact counters.
+    Lists through a read-only fast path when `CONTACT_API_FAST_SERIALIZATION` is enabled.
+    """
+
+    queryset: ClassVar[ContactStatusChoices.objects.all()] = with_contact_counts(
+        ContactStatusChoices.objects.order_by("pk"),
+    )
+    serializer_class = ContactStatusCountSerializer
+
+
+class DuplicateCandidateViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    API endpoint listing the pairs of likely duplicate contacts, from the highest score.
+
+    Candidates are found by the `find_duplicates` management command. Merge a pair with
+    `POST /api/contacts/<id>/merge/`, or delete a candidate to dismiss it.
+
+    Requires authentication.
+    """
+
+    queryset: ClassVar[DuplicateCandidate.objects.all()] = DuplicateCandidate.objects.select_related(
+        "contact__status",
+        "duplicate__status",
+    ).order_by("-score", "id")
+    serializer_class = DuplicateCandidateSerializer
+    filter_backends: ClassVar[list] = []
+
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint listing the background jobs, newest first, with their status and progress.
+
+    Supports filtering by `status` and `name`. Jobs are run by the `run_workers` command.
+
+    Requires authentication.
+    """
+
+    queryset: ClassVar[Job.objects.all()] = Job.objects.order_by("-id")
+    serializer_class = JobSerializer
+    filter_backends: ClassVar[list] = [DjangoFilterBackend]
+    filterset_fields: ClassVar[list] = ["status", "name"]
+
+
+class WeatherView(APIView):
+    """
+    API endpoint returning the current weather of several cities at once.
+
+    Accepts the cities as repeated `city` query parameters, e.g. `?city=Warsaw&city=Gdańsk`,
+    and answers with the weather keyed by city name. Each entry has a `status` of "ok"
+    (with `temperature`, `windspeed` and `humidity`), "not_found" or "error".
+
+    Requires authentication.
     """
 
-    queryset: ClassVar[ContactStatusChoices.objects.all()] = ContactStatusChoices.objects.all()
-    serializer_class = ContactStatusSerializer
+    def get(self: "WeatherView", request: Request) -> Response:
+        """Return the weather of the requested cities."""
+        cities = {city.strip() for city in request.query_params.getlist("city")} - {""}
+        max_length = CityLocation._meta.get_field("name").max_length  # noqa: SLF001
+        if not cities:
+            return Response({"city": ["At least one city is required."]}, status=status.HTTP_400_BAD_REQUEST)
+        if len(cities) > MAX_WEATHER_CITIES:
+            return Response(
+                {"city": [f"At most {MAX_WEATHER_CITIES} cities can be requested at once."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if any(len(city) > max_length for city in cities):
+            return Response(
+                {"city": [f"City names are at most {max_length} characters long."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(get_weather(cities))
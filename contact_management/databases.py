@@ -0,0 +1,102 @@
+"""
+Connection settings of the databases configured in ``settings.py``.
+
+Databases are given as URLs (``DATABASE_URL``, ``DATABASE_REPLICA_URL``) parsed by
+django-environ; ``configure_connections`` then applies the connection lifetime settings
+that the URL cannot express, and ``tune_sqlite`` the SQLite profile.
+"""
+
+POSTGRESQL_ENGINE = "django.db.backends.postgresql"
+SQLITE_ENGINE = "django.db.backends.sqlite3"
+
+# Defaults of the SQLite profile: bytes of the database file mapped into memory, KiB of page cache per
+# connection and seconds a connection waits for a lock.
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+SQLITE_CACHE_SIZE_KIB = 64 * 1024
+SQLITE_BUSY_TIMEOUT = 5.0
+
+
+def configure_connections(
+    database: dict,
+    *,
+    conn_max_age: int | None,
+    pool: bool,
+    pool_min_size: int,
+    pool_max_size: int,
+) -> dict:
+    """
+    Set how long the connections of a database live.
+
+    Django opens one connection per request and closes it afterwards unless ``CONN_MAX_AGE``
+    keeps it open for the following requests of the same thread. On PostgreSQL, ``pool``
+    replaces that with a psycopg connection pool per process, shared by its threads; Django
+    rejects persistent connections together with a pool, so ``conn_max_age`` is ignored then.
+
+    :param database: Entry of ``DATABASES``, modified in place.
+    :param conn_max_age: Seconds a connection is reused for, ``None`` for ever and 0 to close it after each request.
+    :param pool: Whether to use a connection pool on PostgreSQL; ignored on other databases.
+    :param pool_min_size: Connections the pool keeps open.
+    :param pool_max_size: Connections the pool opens at most.
+
+    :return:
+        dict: The updated entry.
+    """
+    # Persistent and pooled connections are checked before reuse, so a restarted server costs no failed request.
+    database["CONN_HEALTH_CHECKS"] = True
+    if pool and database["ENGINE"] == POSTGRESQL_ENGINE:
+        database["CONN_MAX_AGE"] = 0
+        database["OPTIONS"] = {
+            **database.get("OPTIONS", {}),
+            "pool": {"min_size": pool_min_size, "max_size": pool_max_size},
+        }
+    else:
+        database["CONN_MAX_AGE"] = conn_max_age
+    return database
+
+
+def tune_sqlite(
+    database: dict,
+    *,
+    mmap_size: int = SQLITE_MMAP_SIZE,
+    cache_size_kib: int = SQLITE_CACHE_SIZE_KIB,
+    busy_timeout: float = SQLITE_BUSY_TIMEOUT,
+) -> dict:
+    """
+    Configure an SQLite database for concurrent readers and writers.
+
+    Every new connection switches the database to write-ahead logging, where readers see the
+    last committed state while a writer appends to the log instead of being locked out of the
+    file, and commits with ``synchronous=NORMAL``, which syncs the log at checkpoints only: a
+    power loss can lose the last commits, but not corrupt the database. Reads are served from
+    a memory map of the file and a larger page cache, temporary tables and indexes stay in
+    memory, and a connection waits up to ``busy_timeout`` seconds for a lock.
+
+    Write transactions start with ``BEGIN IMMEDIATE``, taking the write lock up front: a
+    transaction that reads before writing would otherwise fail with "database is locked"
+    when another connection wrote in the meantime, without waiting for the busy timeout.
+
+    :param database: Entry of ``DATABASES``, modified in place; left unchanged unless it is SQLite.
+    :param mmap_size: Bytes of the file mapped into memory, 0 to disable memory-mapped I/O.
+    :param cache_size_kib: KiB of page cache per connection.
+    :param busy_timeout: Seconds to wait for a lock held by another connection.
+
+    :return:
+        dict: The updated entry.
+    """
+    if database["ENGINE"] != SQLITE_ENGINE:
+        return database
+    pragmas = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": int(mmap_size),
+        "cache_size": -int(cache_size_kib),
+        "temp_store": "MEMORY",
+    }
+    database["OPTIONS"] = {
+        **database.get("OPTIONS", {}),
+        "init_command": ";".join(f"PRAGMA {name} = {value}" for name, value in pragmas.items()),
+        "transaction_mode": "IMMEDIATE",
+        # Passed to sqlite3.connect(), which sets the busy timeout of the connection.
+        "timeout": busy_timeout,
+    }
+    return database
@@ -1,6 +1,52 @@
 from django.apps import AppConfig
+from django.core.checks import register
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
 
 
 class ContactsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "contacts"
+
+    def ready(self: "ContactsConfig") -> None:
+        """
+        Connect the signal receivers and register the checks of the app.
+
+        - Install the database-side search index after every migration run.
+        - Drop the cached statuses whenever a status is saved or deleted.
+        - Invalidate the cached contact tables whenever a contact or status is saved or deleted.
+        - Add the words of saved contacts to the fuzzy search vocabulary.
+        - Update the autocomplete index once saved or deleted contacts are committed.
+        - Record saved and deleted contacts in the change log for delta sync.
+        - Keep the per-status and per-city contact counters up to date.
+        - Register the background tasks.
+        - Warn when the contact table cache is enabled with a per-process cache.
+        """
+        import contacts.tasks  # noqa: F401
+        from contacts.autocomplete import index_saved_contact, unindex_deleted_contact
+        from contacts.changes import record_deleted_contact, record_saved_contact
+        from contacts.counters import (
+            count_saved_contact,
+            remember_counted_values,
+            uncount_deleted_contact,
+        )
+        from contacts.fuzzy import add_contact_words
+        from contacts.list_cache import check_list_cache_backend, invalidate_list_cache
+        from contacts.models import Contact, ContactStatusChoices
+        from contacts.search import install_search_index
+        from contacts.statuses import invalidate_status_registry
+
+        register(check_list_cache_backend)
+        post_migrate.connect(install_search_index, sender=self)
+        post_save.connect(invalidate_status_registry, sender=ContactStatusChoices)
+        post_delete.connect(invalidate_status_registry, sender=ContactStatusChoices)
+        post_save.connect(add_contact_words, sender=Contact)
+        post_save.connect(index_saved_contact, sender=Contact)
+        post_delete.connect(unindex_deleted_contact, sender=Contact)
+        post_save.connect(record_saved_contact, sender=Contact)
+        post_delete.connect(record_deleted_contact, sender=Contact)
+        pre_save.connect(remember_counted_values, sender=Contact)
+        post_save.connect(count_saved_contact, sender=Contact)
+        post_delete.connect(uncount_deleted_contact, sender=Contact)
+        for model in (Contact, ContactStatusChoices):
+            post_save.connect(invalidate_list_cache, sender=model)
+            post_delete.connect(invalidate_list_cache, sender=model)
@@ -0,0 +1,232 @@
+"""
+In-process sorted prefix index of contact names and emails, for type-ahead suggestions.
+
+The search box asks for suggestions on every keystroke, so they are answered from memory
+without a query: the lowercase first names, last names and emails of every contact are
+kept in one sorted list, where the entries starting with a prefix are contiguous and
+found by binary search, next to the few fields a suggestion shows.
+
+The index is loaded on the first suggestion request of a process. Contacts saved or
+deleted afterwards update it in place once their transaction commits (see
+``ContactsConfig.ready``); bulk writes that bypass signals are picked up when the index
+is reloaded after ``CONTACT_AUTOCOMPLETE_INDEX_TTL`` seconds, while the other requests
+keep using the old one.
+"""
+
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Iterator
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+
+from contacts.models import Contact
+
+# Fields a contact is suggested by, and shown with.
+AUTOCOMPLETE_FIELDS = ("first_name", "last_name", "email")
+
+LOAD_CHUNK_SIZE = 10_000
+
+# Record of a contact in the index: its AUTOCOMPLETE_FIELDS values.
+Record = tuple[str, str, str]
+
+
+def index_keys(record: Record) -> set[str]:
+    """Return the keys a contact is found by: its lowercase names and email."""
+    # Names repeat across contacts; interning stores each distinct one once, and shares
+    # the keys that are already lowercase, like most emails, with the interned record.
+    return {sys.intern(value.lower()) for value in record if value}
+
+
+def make_record(values: Iterator[str]) -> Record:
+    """Return the record of a contact from its AUTOCOMPLETE_FIELDS values."""
+    return tuple(sys.intern(value or "") for value in values)
+
+
+class PrefixIndex:
+    """Sorted list of contact keys, each with the id of its contact."""
+
+    def __init__(self: "PrefixIndex") -> None:
+        """Initialize an empty index."""
+        self.keys: list[str] = []
+        # Contact id of each key, at the same position.
+        self.ids = array("q")
+        self.records: dict[int, Record] = {}
+
+    def __len__(self: "PrefixIndex") -> int:
+        """Return the number of indexed contacts."""
+        return len(self.records)
+
+    @classmethod
+    def build(cls: type["PrefixIndex"], records: Iterator[tuple[int, Record]]) -> "PrefixIndex":
+        """Build an index of contacts at once, sorting their keys a single time."""
+        index = cls()
+        entries = []
+        for pk, record in records:
+            index.records[pk] = record
+            entries.extend((key, pk) for key in index_keys(record))
+        entries.sort()
+        index.keys = [key for key, _ in entries]
+        index.ids = array("q", (pk for _, pk in entries))
+        return index
+
+    def add(self: "PrefixIndex", pk: int, record: Record) -> None:
+        """Index a contact, replacing its previous keys."""
+        self.remove(pk)
+        self.records[pk] = record
+        for key in index_keys(record):
+            position = bisect_right(self.keys, key)
+            self.keys.insert(position, key)
+            self.ids.insert(position, pk)
+
+    def remove(self: "PrefixIndex", pk: int) -> None:
+        """Remove a contact from the index, if it is indexed."""
+        record = self.records.pop(pk, None)
+        if record is None:
+            return
+        for key in index_keys(record):
+            position = self.ids.index(pk, bisect_left(self.keys, key), bisect_right(self.keys, key))
+            del self.keys[position]
+            del self.ids[position]
+
+    def complete(self: "PrefixIndex", prefix: str, limit: int) -> list[tuple[int, Record]]:
+        """
+        Find the contacts with a name or email starting with each word of a prefix.
+
+        The longest word is looked up in the index, and its matches are kept if every other
+        word starts one of their names or emails, so "jan kow" finds Jan Kowalski.
+
+        :param prefix: Text typed so far, compared in lowercase.
+        :param limit: Maximum number of contacts returned.
+
+        :return:
+            list[tuple[int, Record]]: Ids and records of the contacts, in the order of their matching keys.
+        """
+        terms = prefix.lower().split()
+        if not terms:
+            return []
+        probe = max(terms, key=len)
+        others = terms.copy()
+        others.remove(probe)
+
+        found = {}
+        position = bisect_left(self.keys, probe)
+        while position < len(self.keys) and len(found) < limit and self.keys[position].startswith(probe):
+            pk = self.ids[position]
+            position += 1
+            if pk in found:
+                continue
+            keys = index_keys(self.records[pk])
+            if all(any(key.startswith(term) for key in keys) for term in others):
+                found[pk] = self.records[pk]
+        return list(found.items())
+
+
+class AutocompleteIndex:
+    """Process-wide prefix index of every contact."""
+
+    def __init__(self: "AutocompleteIndex") -> None:
+        """Initialize an unloaded index."""
+        self._lock = threading.Lock()
+        self._index: PrefixIndex | None = None
+        self._expires = 0.0
+        self._loading = False
+        # Changes committed while the index was loading, applied to it once it is loaded.
+        self._pending: list[Callable[[PrefixIndex], None]] = []
+
+    def index(self: "AutocompleteIndex") -> PrefixIndex:
+        """
+        Return the index, loading it when missing or expired.
+
+        While one thread reloads an expired index, the others keep using the old one.
+        """
+        with self._lock:
+            if self._index is not None and (self._loading or time.monotonic() < self._expires):
+                return self._index
+            self._loading = True
+            self._pending = []
+
+        index = None
+        try:
+            index = self.load()
+        finally:
+            with self._lock:
+                self._loading = False
+                if index is not None:
+                    for change in self._pending:
+                        change(index)
+                    self._index = index
+                    self._expires = time.monotonic() + getattr(settings, "CONTACT_AUTOCOMPLETE_INDEX_TTL", 300)
+                self._pending = []
+        return index
+
+    @staticmethod
+    def load() -> PrefixIndex:
+        """Build an index of every contact."""
+        rows = Contact.objects.order_by().values_list("pk", *AUTOCOMPLETE_FIELDS)
+        return PrefixIndex.build((pk, make_record(values)) for pk, *values in rows.iterator(chunk_size=LOAD_CHUNK_SIZE))
+
+    def complete(self: "AutocompleteIndex", prefix: str, limit: int) -> list[dict]:
+        """
+        Return the contacts a prefix completes to.
+
+        :param prefix: Text typed so far.
+        :param limit: Maximum number of contacts returned.
+
+        :return:
+            list[dict]: The ``id``, ``first_name``, ``last_name`` and ``email`` of each contact.
+        """
+        index = self.index()
+        with self._lock:
+            matches = index.complete(prefix, limit)
+        return [{"id": pk, **dict(zip(AUTOCOMPLETE_FIELDS, record, strict=True))} for pk, record in matches]
+
+    def apply(self: "AutocompleteIndex", change: Callable[[PrefixIndex], None]) -> None:
+        """Apply a change to the loaded index, and to the one being loaded."""
+        with self._lock:
+            if self._loading:
+                self._pending.append(change)
+            if self._index is not None:
+                change(self._index)
+
+    def add(self: "AutocompleteIndex", pk: int, record: Record) -> None:
+        """Index a saved contact."""
+        self.apply(lambda index: index.add(pk, record))
+
+    def remove(self: "AutocompleteIndex", pk: int) -> None:
+        """Remove a deleted contact."""
+        self.apply(lambda index: index.remove(pk))
+
+    def clear(self: "AutocompleteIndex") -> None:
+        """Drop the index, so that the next suggestion request loads it again."""
+        with self._lock:
+            self._index = None
+            self._expires = 0.0
+
+
+autocomplete_index = AutocompleteIndex()
+
+
+def index_saved_contact(
+    sender: type[Contact],  # noqa: ARG001
+    instance: Contact,
+    using: str,
+    **kwargs: dict,  # noqa: ARG001
+) -> None:
+    """Index a saved contact once its transaction commits; connected to ``post_save``."""
+    record = make_record(getattr(instance, field) for field in AUTOCOMPLETE_FIELDS)
+    transaction.on_commit(partial(autocomplete_index.add, instance.pk, record), using=using)
+
+
+def unindex_deleted_contact(
+    sender: type[Contact],  # noqa: ARG001
+    instance: Contact,
+    using: str,
+    **kwargs: dict,  # noqa: ARG001
+) -> None:
+    """Remove a deleted contact once its transaction commits; connected to ``post_delete``."""
+    transaction.on_commit(partial(autocomplete_index.remove, instance.pk), using=using)
@@ -0,0 +1,154 @@
+"""
+Append-only log of contact changes, for clients mirroring the contacts.
+
+Every created, updated or deleted contact adds a ``ContactChange`` row in the transaction
+that writes it: ``post_save`` and ``post_delete`` receivers record single writes (see
+``ContactsConfig.ready``), and the bulk API and imports, whose ``bulk_create`` and
+``bulk_update`` send no signals, call ``record_changes`` themselves, and set-based writes
+such as status reassignment record the contacts they select with ``record_query_changes``.
+Other contacts written with ``QuerySet.update()`` or seeded by ``seed_contacts`` are not
+recorded.
+
+The ids of the rows are sequence numbers. A client keeps the last one it has read as its
+token and asks for the changes after it (``changes_since``), so a sync reads what changed
+rather than every contact. A token is only useful if no change can later appear behind
+it: SQLite serializes writers, so changes are numbered in commit order, and on PostgreSQL
+the transactions recording changes are serialized by an advisory lock.
+"""
+
+from collections.abc import Iterable
+from typing import NamedTuple
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from contacts.models import Contact, ContactChange
+
+# Key of the PostgreSQL advisory lock held by transactions recording changes.
+CHANGE_LOG_LOCK = 0x434F4E54
+
+
+class ChangePage(NamedTuple):
+    """Changes read after a token."""
+
+    # Sequence number, action and contact id of the latest change of each contact, in sequence order.
+    changes: list[tuple[int, str, int]]
+    # Token to read the next page from: the sequence number of the last change read.
+    token: int
+    has_more: bool
+
+
+def record_changes(ids: Iterable[int], action: str, using: str = DEFAULT_DB_ALIAS) -> None:
+    """
+    Record that contacts were created, updated or deleted.
+
+    :param ids: Ids of the contacts.
+    :param action: A ``ContactChange.Action``.
+    :param using: Database the contacts were written to.
+    """
+    changes = [ContactChange(contact_id=pk, action=action) for pk in ids]
+    if not changes:
+        return
+    with transaction.atomic(using=using, savepoint=False):
+        lock_change_log(using)
+        ContactChange.objects.using(using).bulk_create(changes)
+
+
+def record_query_changes(contacts: QuerySet[Contact], action: str) -> int:
+    """
+    Record that the contacts selected by a query were updated or are about to be deleted.
+
+    The changes are inserted with one ``INSERT ... SELECT``, without reading the ids into
+    Python, so call it in the transaction writing the contacts and before the write, while
+    the query still selects them.
+
+    :param contacts: Contacts to record, on the database they are written to.
+    :param action: A ``ContactChange.Action``.
+
+    :return:
+        int: Number of changes recorded.
+    """
+    using = contacts.db
+    connection = connections[using]
+    select, params = contacts.order_by("pk").values("pk").query.get_compiler(using).as_sql()
+    quote = connection.ops.quote_name
+    meta = ContactChange._meta  # noqa: SLF001
+    columns = ", ".join(quote(meta.get_field(name).column) for name in ("contact_id", "action", "changed_at"))
+    sql = (
+        f"INSERT INTO {quote(meta.db_table)} ({columns}) "  # noqa: S608
+        # The subquery selects the ids as "pk".
+        f"SELECT selected.{quote('pk')}, %s, %s FROM ({select}) selected"
+    )
+    changed_at = connection.ops.adapt_datetimefield_value(timezone.now())
+    with transaction.atomic(using=using, savepoint=False):
+        lock_change_log(using)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [action, changed_at, *params])
+            return cursor.rowcount
+
+
+def lock_change_log(using: str) -> None:
+    """On PostgreSQL, hold the change log lock until commit, so that changes numbered later also commit later."""
+    if connections[using].vendor == "postgresql":
+        with connections[using].cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [CHANGE_LOG_LOCK])
+
+
+def latest_token(using: str | None = None) -> int:
+    """Return the sequence number of the latest change, or 0 if there is none."""
+    return ContactChange.objects.using(using).order_by("-pk").values_list("pk", flat=True).first() or 0
+
+
+def changes_since(since: int, limit: int, using: str | None = None) -> ChangePage:
+    """
+    Read the changes after a token, one entry per contact.
+
+    Up to ``limit`` changes are read in sequence order and merged per contact: a contact
+    deleted in the page is reported as deleted, one created in it as created even if it
+    was updated since, and any other as updated.
+
+    :param since: Token of the last change the client has read, 0 for the first one.
+    :param limit: Maximum number of changes read.
+    :param using: Database to read from; the router's choice by default.
+
+    :return:
+        ChangePage: The merged changes, the token after them and whether more changes follow.
+    """
+    rows = ContactChange.objects.using(using).filter(pk__gt=since).order_by("pk")
+    rows = list(rows.values_list("pk", "action", "contact_id")[: limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    first_actions, latest = {}, {}
+    for seq, action, contact_id in rows:
+        first_actions.setdefault(contact_id, action)
+        latest.pop(contact_id, None)
+        latest[contact_id] = (seq, action)
+
+    changes = []
+    for contact_id, (seq, action) in latest.items():
+        created = action != ContactChange.Action.DELETED and first_actions[contact_id] == ContactChange.Action.CREATED
+        changes.append((seq, ContactChange.Action.CREATED if created else action, contact_id))
+    return ChangePage(changes, rows[-1][0] if rows else since, has_more)
+
+
+def record_saved_contact(
+    sender: type[Contact],  # noqa: ARG001
+    instance: Contact,
+    created: bool,  # noqa: FBT001
+    using: str,
+    **kwargs: dict,  # noqa: ARG001
+) -> None:
+    """Record a created or updated contact; connected to ``post_save``."""
+    record_changes([instance.pk], ContactChange.Action.CREATED if created else ContactChange.Action.UPDATED, using)
+
+
+def record_deleted_contact(
+    sender: type[Contact],  # noqa: ARG001
+    instance: Contact,
+    using: str,
+    **kwargs: dict,  # noqa: ARG001
+) -> None:
+    """Record a tombstone of a deleted contact; connected to ``post_delete``."""
+    record_changes([instance.pk], ContactChange.Action.DELETED, using)
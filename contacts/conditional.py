@@ -0,0 +1,135 @@
+"""
+Conditional GET (ETag / Last-Modified) for contact list and detail responses.
+
+Validators are computed before the page is queried or serialized:
+
+- a list's ETag covers the request parameters, ``MAX(updated_at)`` and ``COUNT(*)`` of the
+  filtered contacts, read with one aggregate query,
+- a contact's ETag covers its primary key, ``updated_at`` and status name,
+- a list's ETag also covers the registered statuses, whose names are shown on the page.
+
+When the client's ``If-None-Match`` matches, a ``304 Not Modified`` is returned instead of the
+page. A list's ``Last-Modified`` is informational only: deleting a contact does not move
+``MAX(updated_at)``, so ``If-Modified-Since`` alone never produces a 304 for lists.
+"""
+
+import hashlib
+from datetime import datetime
+
+from django.db.models import Count, Max, QuerySet
+from django.http import HttpRequest, HttpResponseBase
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from contacts.models import Contact
+from contacts.statuses import status_registry
+
+
+def make_etag(*parts: object) -> str:
+    """
+    Return a weak ETag for a representation described by ``parts``.
+
+    :param parts: Values that change whenever the representation changes.
+
+    :return:
+        str: The quoted, weak ETag.
+    """
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return f"W/{quote_etag(digest)}"
+
+
+def request_parts(request: HttpRequest) -> tuple:
+    """Return the query parameters of a request in a canonical order."""
+    return tuple(sorted((key, tuple(values)) for key, values in request.GET.lists()))
+
+
+def summary_queryset(queryset: QuerySet) -> QuerySet:
+    """Return a filtered list without its ordering and selected annotations, such as search ranks, to aggregate."""
+    return queryset.order_by().values("pk")
+
+
+def list_validators(queryset: QuerySet, *parts: object) -> tuple[str, datetime | None]:
+    """
+    Return the ETag and last modification time of a filtered list.
+
+    :param queryset: The filtered contacts, before pagination.
+    :param parts: Other values the response depends on, e.g. the query parameters.
+
+    :return:
+        tuple[str, datetime | None]: The ETag, and the latest ``updated_at`` or ``None`` for an empty list.
+    """
+    summary = summary_queryset(queryset).aggregate(last_modified=Max("updated_at"), count=Count("pk"))
+    statuses = [(status.pk, status.name) for status in status_registry.all()]
+    etag = make_etag(*parts, summary["last_modified"], summary["count"], statuses)
+    return etag, summary["last_modified"]
+
+
+async def alist_validators(queryset: QuerySet, *parts: object) -> tuple[str, datetime | None]:
+    """Return the ETag and last modification time of a filtered list like ``list_validators``, with the async ORM."""
+    summary = await summary_queryset(queryset).aaggregate(last_modified=Max("updated_at"), count=Count("pk"))
+    statuses = [(status.pk, status.name) for status in await status_registry.aall()]
+    etag = make_etag(*parts, summary["last_modified"], summary["count"], statuses)
+    return etag, summary["last_modified"]
+
+
+def object_validators(contact: Contact, *parts: object) -> tuple[str, datetime]:
+    """
+    Return the ETag and last modification time of a contact.
+
+    :param contact: The contact, with its status already joined.
+    :param parts: Other values the response depends on.
+
+    :return:
+        tuple[str, datetime]: The ETag and ``updated_at`` of the contact.
+    """
+    status = contact.status.name if contact.status else None
+    return make_etag(*parts, contact.pk, contact.updated_at, status), contact.updated_at
+
+
+def row_validators(row: dict, *parts: object) -> tuple[str, datetime]:
+    """
+    Return the validators ``object_validators`` computes, from a ``values()`` row of a contact.
+
+    :param row: Row with the ``pk``, ``updated_at`` and ``status__name`` of the contact.
+    :param parts: Other values the response depends on.
+
+    :return:
+        tuple[str, datetime]: The ETag and ``updated_at`` of the contact.
+    """
+    return make_etag(*parts, row["pk"], row["updated_at"], row["status__name"]), row["updated_at"]
+
+
+def not_modified(
+    request: HttpRequest,
+    etag: str,
+    last_modified: datetime | None = None,
+) -> HttpResponseBase | None:
+    """
+    Return a ``304 Not Modified`` response if the client's validators match.
+
+    :param request: A GET or HEAD request.
+    :param etag: ETag of the current representation.
+    :param last_modified: Modification time to compare ``If-Modified-Since`` with, if reliable.
+
+    :return:
+        HttpResponseBase | None: The 304 response, or ``None`` if the full response must be sent.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response: HttpResponseBase, etag: str, last_modified: datetime | None) -> HttpResponseBase:
+    """
+    Add the validators to a response and make clients revalidate it before every reuse.
+
+    :return:
+        HttpResponseBase: The same response.
+    """
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,237 @@
+"""
+Denormalized numbers of contacts per status and per city.
+
+Counting the contacts of every status or city is a ``GROUP BY`` over the whole table, so
+the counts are kept in ``ContactCount`` rows instead, changed by the difference each write
+makes. Differences are added with one upsert (``INSERT ... ON CONFLICT DO UPDATE SET
+count = count + excluded.count``), so that concurrent writers add up instead of
+overwriting each other's counts:
+
+- ``pre_save``, ``post_save`` and ``post_delete`` receivers count single writes (see
+  ``ContactsConfig.ready``). Contacts remember the status and city they were loaded with
+  (``Contact.from_db``), so an update only changes the counters if one of them changed.
+- The bulk API and imports call ``count_contacts`` after ``bulk_create`` and ``bulk_update``.
+- Moving the contacts of a status to another one moves the count along.
+
+Counters at zero, such as those of deleted statuses, are kept until reconciliation and
+left out of the counts read.
+
+Writes bypassing all of these, such as other ``QuerySet.update()`` calls, and saves of
+contacts loaded before a concurrent change of their status or city, make the counters
+drift; ``reconcile_counts`` (the ``reconcile_contact_counts`` command) recomputes them in
+chunks and fixes those that differ.
+"""
+
+from collections import Counter
+from collections.abc import Iterable, Mapping
+
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.db.models import CharField, Count, OuterRef, QuerySet, Subquery, Value
+from django.db.models.functions import Cast, Coalesce
+
+from contacts.models import Contact, ContactCount, ContactStatusChoices
+
+# A counter: its dimension and value.
+Key = tuple[str, str]
+
+# Fields whose update can change the counters.
+COUNTED_FIELDS = frozenset({"status", "status_id", "city"})
+
+
+def status_value(status_id: int | None) -> str:
+    """Return the counter value of a status id, "" for contacts without a status."""
+    return "" if status_id is None else str(status_id)
+
+
+def counter_keys(status_id: int | None, city: str) -> list[Key]:
+    """Return the counters a contact with a status and city is counted in."""
+    return [(ContactCount.Dimension.STATUS, status_value(status_id)), (ContactCount.Dimension.CITY, city)]
+
+
+def add_counts(deltas: Mapping[Key, int], using: str = DEFAULT_DB_ALIAS) -> None:
+    """
+    Add differences to counters with one upsert, creating the missing counters.
+
+    :param deltas: Difference of each counter; zeros are skipped.
+    :param using: Database the contacts were written to.
+    """
+    # Sorted, so that concurrent writers lock the rows in the same order.
+    rows = sorted((dimension, value, delta) for (dimension, value), delta in deltas.items() if delta)
+    if not rows:
+        return
+    quote = connections[using].ops.quote_name
+    table = quote(ContactCount._meta.db_table)  # noqa: SLF001
+    sql = (
+        f"INSERT INTO {table} ({quote('dimension')}, {quote('value')}, {quote('count')}) "  # noqa: S608
+        f"VALUES {', '.join(['(%s, %s, %s)'] * len(rows))} "
+        f"ON CONFLICT ({quote('dimension')}, {quote('value')}) "
+        f"DO UPDATE SET {quote('count')} = {table}.{quote('count')} + excluded.{quote('count')}"
+    )
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, [field for row in rows for field in row])
+
+
+def count_contacts(contacts: Iterable[Contact], using: str = DEFAULT_DB_ALIAS) -> None:
+    """
+    Count created or updated contacts.
+
+    Contacts loaded from the database leave the counters of the status and city they were
+    loaded with; new ones only enter theirs.
+
+    :param contacts: Contacts just written.
+    :param using: Database they were written to.
+    """
+    deltas = Counter()
+    for contact in contacts:
+        counted = (contact.status_id, contact.city)
+        previous = getattr(contact, "_counted", None)
+        if previous == counted:
+            continue
+        if previous is not None:
+            deltas.subtract(counter_keys(*previous))
+        deltas.update(counter_keys(*counted))
+        contact._counted = counted  # noqa: SLF001
+    add_counts(deltas, using)
+
+
+def uncount_contacts(contacts: Iterable[Contact], using: str = DEFAULT_DB_ALIAS) -> None:
+    """
+    Remove deleted contacts from their counters.
+
+    :param contacts: Contacts just deleted.
+    :param using: Database they were deleted from.
+    """
+    deltas = Counter()
+    for contact in contacts:
+        deltas.subtract(counter_keys(*getattr(contact, "_counted", (contact.status_id, contact.city))))
+    add_counts(deltas, using)
+
+
+def move_status_count(
+    status: ContactStatusChoices,
+    target: ContactStatusChoices | None,
+    moved: int,
+    using: str,
+) -> None:
+    """Move the count of contacts moved from a status to another one, or to none."""
+    dimension = ContactCount.Dimension.STATUS
+    add_counts(
+        {(dimension, status_value(status.pk)): -moved, (dimension, status_value(target and target.pk)): moved},
+        using,
+    )
+
+
+def status_counts(using: str | None = None) -> dict[int | None, int]:
+    """Return the number of contacts with each status, by status id, and without a status, under None."""
+    counters = ContactCount.objects.using(using).filter(dimension=ContactCount.Dimension.STATUS).exclude(count=0)
+    return {int(value) if value else None: count for value, count in counters.values_list("value", "count")}
+
+
+def city_counts(limit: int | None = None, using: str | None = None) -> list[tuple[str, int]]:
+    """Return the cities with contacts and their numbers of contacts, from the most contacts."""
+    counters = ContactCount.objects.using(using).filter(dimension=ContactCount.Dimension.CITY, count__gt=0)
+    return list(counters.order_by("-count", "value").values_list("value", "count")[:limit])
+
+
+def with_contact_counts(statuses: QuerySet[ContactStatusChoices]) -> QuerySet[ContactStatusChoices]:
+    """Annotate statuses with their ``contact_count``, read from their counters."""
+    counter = ContactCount.objects.filter(
+        dimension=ContactCount.Dimension.STATUS,
+        value=Cast(OuterRef("pk"), CharField()),
+    )
+    return statuses.annotate(contact_count=Coalesce(Subquery(counter.values("count")[:1]), Value(0)))
+
+
+def reconcile_counts(
+    chunk_size: int = 50_000,
+    *,
+    dry_run: bool = False,
+    using: str | None = None,
+) -> dict[Key, tuple[int, int]]:
+    """
+    Recompute the counters from the contacts and fix those that drifted.
+
+    Contacts are counted one range of primary keys at a time, so that no query scans the
+    whole table at once, and the counters that differ are then fixed in one transaction,
+    which also deletes the counters left at zero, e.g. by deleted statuses. Contacts written
+    while the ranges are read may be counted before or after their write, so run it when
+    writes are few, or run it again.
+
+    :param chunk_size: Contacts counted per query.
+    :param dry_run: Report the drift without fixing it.
+    :param using: Database; the one contacts are written to by default.
+
+    :return:
+        dict[Key, tuple[int, int]]: Stored and recomputed count of every counter that differed.
+    """
+    using = using or router.db_for_write(Contact)
+    contacts = Contact.objects.using(using).order_by()
+    actual = Counter()
+    lower = 0
+    while True:
+        chunk = contacts.filter(pk__gt=lower)
+        upper = chunk.order_by("pk").values_list("pk", flat=True)[chunk_size - 1 : chunk_size].first()
+        if upper is not None:
+            chunk = chunk.filter(pk__lte=upper)
+        for status_id, count in chunk.values_list("status").annotate(Count("pk")):
+            actual[ContactCount.Dimension.STATUS, status_value(status_id)] += count
+        for city, count in chunk.values_list("city").annotate(Count("pk")):
+            actual[ContactCount.Dimension.CITY, city] += count
+        if upper is None:
+            break
+        lower = upper
+
+    counters = ContactCount.objects.using(using)
+    stored = {
+        (dimension, value): count for dimension, value, count in counters.values_list("dimension", "value", "count")
+    }
+    drift = {
+        key: (stored.get(key, 0), actual[key])
+        for key in stored.keys() | actual.keys()
+        if stored.get(key, 0) != actual[key]
+    }
+    if not dry_run:
+        with transaction.atomic(using=using):
+            for (dimension, value), (_, count) in drift.items():
+                counters.update_or_create(dimension=dimension, value=value, defaults={"count": count})
+            counters.filter(count=0).delete()
+    return drift
+
+
+def remember_counted_values(
+    sender: type[Contact],  # noqa: ARG001
+    instance: Contact,
+    using: str,
+    **kwargs: dict,  # noqa: ARG001
+) -> None:
+    """Read the counted values of an existing contact saved without being loaded; connected to ``pre_save``."""
+    if instance.pk is not None and not hasattr(instance, "_counted"):
+        counted = Contact.objects.using(using).filter(pk=instance.pk).values_list("status_id", "city").first()
+        if counted is not None:
+            instance._counted = counted  # noqa: SLF001
+
+
+def count_saved_contact(
+    sender: type[Contact],  # noqa: ARG001
+    instance: Contact,
+    created: bool,  # noqa: FBT001
+    using: str,
+    update_fields: frozenset[str] | None,
+    **kwargs: dict,  # noqa: ARG001
+) -> None:
+    """Count a created contact, or an updated one whose status or city changed; connected to ``post_save``."""
+    if created:
+        instance.__dict__.pop("_counted", None)
+    elif update_fields is not None and not COUNTED_FIELDS & update_fields:
+        return
+    count_contacts([instance], using)
+
+
+def uncount_deleted_contact(
+    sender: type[Contact],  # noqa: ARG001
+    instance: Contact,
+    using: str,
+    **kwargs: dict,  # noqa: ARG001
+) -> None:
+    """Remove a deleted contact from its counters; connected to ``post_delete``."""
+    uncount_contacts([instance], using)
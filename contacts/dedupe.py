@@ -0,0 +1,403 @@
+"""
+Duplicate contact detection and merging.
+
+Comparing every pair of contacts is quadratic, so detection compares contacts only within
+blocks: groups of contacts sharing a blocking key, read from the indexed
+``ContactBlockingKey`` table. A contact has up to four keys:
+
+- ``name``: its first and last name, case- and accent-folded, as sorted words, so that
+  "Jan  kowalski" and "Kowalski Jan" share one,
+- ``phonetic``: the Soundex codes of its last and first name, for misspelled names,
+- ``city``: its folded city and the Soundex code of its last name,
+- ``email``: the local part of its email without tags and punctuation, for the same
+  person with several addresses.
+
+The pairs of a block are scored from 0 to 1 by the trigram similarity of their names and
+email local parts, and whether they live in the same city (see ``score``); pairs scoring
+at least ``CONTACT_DEDUPE_THRESHOLD`` are stored as ``DuplicateCandidate`` rows. Blocks
+larger than ``CONTACT_DEDUPE_MAX_BLOCK_SIZE`` contacts, such as a very common name, would
+cost a quadratic number of comparisons for little signal and are skipped.
+
+``DuplicateFinder`` runs both steps in chunks of contacts and blocks, optionally in a pool
+of worker processes; ``merge_contacts`` merges the duplicates into one contact.
+"""
+
+import re
+import time
+import unicodedata
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import combinations, groupby
+from multiprocessing import get_context
+from typing import NamedTuple
+
+import django
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+
+from contacts.fuzzy import trigrams
+from contacts.models import Contact, ContactBlockingKey, DuplicateCandidate
+
+# Contact fields detection reads, in the order of the rows passed to the worker functions.
+DEDUPE_FIELDS = ("first_name", "last_name", "email", "city")
+
+# Row of a contact: its primary key followed by its DEDUPE_FIELDS values.
+Row = tuple[int, str, str, str, str]
+
+NON_ALPHANUMERIC = re.compile(r"[\W_]+")
+
+# Letters that Unicode decomposition does not reduce to an ASCII letter.
+FOLDED_LETTERS = str.maketrans({"ł": "l", "ø": "o", "đ": "d", "æ": "ae", "œ": "oe"})
+
+# Soundex digit of each letter; "0" for vowels and the letters Soundex skips.
+SOUNDEX_DIGITS = {
+    letter: str(digit)
+    for digit, letters in enumerate(("aeiouyhw", "bfpv", "cgjkqsxz", "dt", "l", "mn", "r"))
+    for letter in letters
+}
+
+# Weights of the name, email and city similarity in the score of a pair.
+NAME_WEIGHT = 0.5
+EMAIL_WEIGHT = 0.3
+CITY_WEIGHT = 0.2
+
+# Pending chunks per worker process, bounding the rows held in memory.
+CHUNKS_PER_WORKER = 2
+
+KEY_LENGTH = ContactBlockingKey._meta.get_field("key").max_length  # noqa: SLF001
+
+# Distinct values folded per process; first names, last names and cities repeat across contacts.
+FOLD_CACHE_SIZE = 65_536
+
+
+class MergeError(ValueError):
+    """Raised when contacts cannot be merged."""
+
+
+@lru_cache(maxsize=FOLD_CACHE_SIZE)
+def fold(value: str) -> str:
+    """Return a value in lowercase, without accents and with single spaces between its alphanumeric words."""
+    value = value.casefold()
+    if not value.isascii():
+        decomposed = unicodedata.normalize("NFKD", value.translate(FOLDED_LETTERS))
+        value = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return NON_ALPHANUMERIC.sub(" ", value).strip()
+
+
+def soundex(value: str) -> str:
+    """Return the Soundex code of the letters of a value, e.g. "K420" for "Kowalski" and "Kowalsky"."""
+    letters = [char for char in fold(value) if char in SOUNDEX_DIGITS]
+    if not letters:
+        return ""
+    code = letters[0].upper()
+    previous = SOUNDEX_DIGITS[letters[0]]
+    for letter in letters[1:]:
+        digit = SOUNDEX_DIGITS[letter]
+        if digit not in ("0", previous):
+            code += digit
+        # Letters separated by "h" or "w" count as adjacent.
+        if letter not in "hw":
+            previous = digit
+    return (code + "000")[:4]
+
+
+def email_local_part(email: str) -> str:
+    """Return the alphanumeric characters of the local part of an email, without a "+tag"."""
+    local, _, _ = email.rpartition("@")
+    return fold((local or email).partition("+")[0]).replace(" ", "")
+
+
+class Features(NamedTuple):
+    """Normalized values of a contact that blocking and scoring compare."""
+
+    name: str
+    last_name_code: str
+    first_name_code: str
+    email: str
+    city: str
+
+    @classmethod
+    def of(cls: type["Features"], first_name: str, last_name: str, email: str, city: str) -> "Features":
+        """Return the features of a contact's values."""
+        return cls(
+            name=" ".join(sorted(fold(f"{first_name} {last_name}").split())),
+            last_name_code=soundex(last_name),
+            first_name_code=soundex(first_name),
+            email=email_local_part(email),
+            city=fold(city),
+        )
+
+
+def blocking_keys(features: Features) -> list[tuple[str, str]]:
+    """Return the kinds and values of the blocking keys of a contact."""
+    keys = []
+    if features.name:
+        keys.append((ContactBlockingKey.Kind.NAME, features.name))
+    if features.last_name_code:
+        keys.append((ContactBlockingKey.Kind.PHONETIC, features.last_name_code + features.first_name_code))
+        if features.city:
+            keys.append((ContactBlockingKey.Kind.CITY, f"{features.city}|{features.last_name_code}"))
+    if features.email:
+        keys.append((ContactBlockingKey.Kind.EMAIL, features.email))
+    return [(kind.value, key[:KEY_LENGTH]) for kind, key in keys]
+
+
+def word_trigrams(value: str) -> set[str]:
+    """Return the trigrams of every word of a value."""
+    return {gram for word in value.split() for gram in trigrams(word)}
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    """Return the share of the elements of two sets that they have in common."""
+    if not a or not b:
+        return 0.0
+    common = len(a & b)
+    return common / (len(a) + len(b) - common)
+
+
+class Profile(NamedTuple):
+    """Features of a contact with the trigrams that scoring compares, computed once per contact."""
+
+    name: set[str]
+    email: set[str]
+    city: str
+
+    @classmethod
+    def of(cls: type["Profile"], features: Features) -> "Profile":
+        """Return the profile of a contact's features."""
+        return cls(word_trigrams(features.name), trigrams(features.email) if features.email else set(), features.city)
+
+
+def score(a: Profile, b: Profile) -> float:
+    """
+    Score how likely two contacts are the same person.
+
+    :return:
+        float: From 0 to 1, the weighted similarity of their names and email local parts, plus the
+        city weight if they live in the same city.
+    """
+    same_city = bool(a.city) and a.city == b.city
+    return NAME_WEIGHT * jaccard(a.name, b.name) + EMAIL_WEIGHT * jaccard(a.email, b.email) + CITY_WEIGHT * same_city
+
+
+def compute_keys(rows: Sequence[Row]) -> list[tuple[int, str, str]]:
+    """
+    Compute the blocking keys of a chunk of contacts; a top-level function that worker processes can run.
+
+    :return:
+        list[tuple[int, str, str]]: Contact id, kind and value of every key.
+    """
+    return [(pk, kind, key) for pk, *values in rows for kind, key in blocking_keys(Features.of(*values))]
+
+
+def score_blocks(
+    blocks: Sequence[Sequence[int]],
+    rows: Sequence[Row],
+    threshold: float,
+) -> tuple[list[tuple[int, int, float]], int]:
+    """
+    Score the pairs of contacts within each of a chunk of blocks; a top-level function that worker processes can run.
+
+    :param blocks: Ids of the contacts of each block, in ascending order.
+    :param rows: Rows of every contact of the blocks.
+    :param threshold: Minimum score of the pairs returned.
+
+    :return:
+        tuple[list[tuple[int, int, float]], int]: Lower id, higher id and score of the pairs scoring at
+        least the threshold, and the number of pairs compared.
+    """
+    profiles = {pk: Profile.of(Features.of(*values)) for pk, *values in rows}
+    scores = {}
+    for block in blocks:
+        for pair in combinations(block, 2):
+            if pair not in scores:
+                scores[pair] = score(profiles[pair[0]], profiles[pair[1]])
+    return [(a, b, pair_score) for (a, b), pair_score in scores.items() if pair_score >= threshold], len(scores)
+
+
+@dataclass
+class DedupeStats:
+    """Counts and timings of a duplicate detection run."""
+
+    contacts: int = 0
+    keys: int = 0
+    blocks: int = 0
+    skipped_blocks: int = 0
+    pairs: int = 0
+    candidates: int = 0
+    # Seconds spent on each step.
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class DuplicateFinder:
+    """
+    Rebuild the blocking keys and the duplicate candidates of every contact.
+
+    Contacts are read in chunks of ``chunk_size`` rows, and blocks grouped into chunks of
+    about as many contacts. With more than one worker, keys and scores are computed in a
+    pool of processes while this one reads the next chunks and writes the results.
+    """
+
+    using: str = DEFAULT_DB_ALIAS
+    chunk_size: int = 5000
+    workers: int = 1
+    threshold: float | None = None
+    max_block_size: int | None = None
+    stats: DedupeStats = field(default_factory=DedupeStats)
+
+    def __post_init__(self: "DuplicateFinder") -> None:
+        """Fill the threshold and maximum block size in from the settings."""
+        if self.threshold is None:
+            self.threshold = getattr(settings, "CONTACT_DEDUPE_THRESHOLD", 0.7)
+        if self.max_block_size is None:
+            self.max_block_size = getattr(settings, "CONTACT_DEDUPE_MAX_BLOCK_SIZE", 100)
+
+    def run(self: "DuplicateFinder") -> DedupeStats:
+        """Rebuild the blocking keys, then the duplicate candidates."""
+        if self.workers > 1:
+            # Spawned workers set Django up from scratch and only compute; this process reads and writes.
+            executor = ProcessPoolExecutor(self.workers, mp_context=get_context("spawn"), initializer=django.setup)
+        else:
+            executor = nullcontext()
+        with executor as pool:
+            self.timed("keys", self.rebuild_keys, pool)
+            self.timed("candidates", self.rebuild_candidates, pool)
+        return self.stats
+
+    def timed(self: "DuplicateFinder", step: str, func: Callable, *args: object) -> None:
+        """Run a step and record how long it took."""
+        started = time.perf_counter()
+        func(*args)
+        self.stats.timings[step] = time.perf_counter() - started
+
+    def run_chunks(self: "DuplicateFinder", pool: Executor | None, func: Callable, chunks: Iterable[tuple]) -> Iterator:
+        """
+        Yield the results of a function applied to each chunk's arguments, in order.
+
+        In a pool, at most ``CHUNKS_PER_WORKER`` chunks per worker are pending at once, so
+        reading chunks never runs far ahead of processing them.
+        """
+        if pool is None:
+            for args in chunks:
+                yield func(*args)
+            return
+        pending = deque()
+        for args in chunks:
+            pending.append(pool.submit(func, *args))
+            if len(pending) >= self.workers * CHUNKS_PER_WORKER:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    def row_chunks(self: "DuplicateFinder") -> Iterator[tuple[list[Row]]]:
+        """Yield the rows of every contact in chunks, by ascending primary key."""
+        contacts = Contact.objects.using(self.using).order_by("pk").values_list("pk", *DEDUPE_FIELDS)
+        last = 0
+        while rows := list(contacts.filter(pk__gt=last)[: self.chunk_size]):
+            last = rows[-1][0]
+            self.stats.contacts += len(rows)
+            yield (rows,)
+
+    def rebuild_keys(self: "DuplicateFinder", pool: Executor | None) -> None:
+        """Replace the blocking keys with those of the current contacts."""
+        connection = connections[self.using]
+        # Keys are plain tuples, inserted with executemany rather than as model instances.
+        table = connection.ops.quote_name(ContactBlockingKey._meta.db_table)  # noqa: SLF001
+        sql = f"INSERT INTO {table} (contact_id, kind, {connection.ops.quote_name('key')}) VALUES (%s, %s, %s)"  # noqa: S608
+
+        ContactBlockingKey.objects.using(self.using).all().delete()
+        for rows in self.run_chunks(pool, compute_keys, self.row_chunks()):
+            with transaction.atomic(using=self.using), connection.cursor() as cursor:
+                cursor.executemany(sql, rows)
+            self.stats.keys += len(rows)
+
+    def blocks(self: "DuplicateFinder") -> Iterator[list[int]]:
+        """Yield the ids of the contacts of each block worth comparing, reading the keys in index order."""
+        keys = ContactBlockingKey.objects.using(self.using).order_by("kind", "key", "contact_id")
+        rows = keys.values_list("kind", "key", "contact_id").iterator(chunk_size=self.chunk_size)
+        for _, members in groupby(rows, key=lambda row: row[:2]):
+            ids = [contact_id for _, _, contact_id in members]
+            if len(ids) > self.max_block_size:
+                self.stats.skipped_blocks += 1
+            elif len(ids) > 1:
+                self.stats.blocks += 1
+                yield ids
+
+    def block_chunks(self: "DuplicateFinder") -> Iterator[tuple[list[list[int]], list[Row], float]]:
+        """Yield chunks of blocks covering about ``chunk_size`` contacts, with the rows of those contacts."""
+        contacts = Contact.objects.using(self.using).values_list("pk", *DEDUPE_FIELDS)
+        chunk, members = [], set()
+        for block in self.blocks():
+            chunk.append(block)
+            members.update(block)
+            if len(members) >= self.chunk_size:
+                yield chunk, list(contacts.filter(pk__in=members)), self.threshold
+                chunk, members = [], set()
+        if chunk:
+            yield chunk, list(contacts.filter(pk__in=members)), self.threshold
+
+    def rebuild_candidates(self: "DuplicateFinder", pool: Executor | None) -> None:
+        """Replace the duplicate candidates with the pairs of the current blocks scoring at least the threshold."""
+        scores = {}
+        for candidates, compared in self.run_chunks(pool, score_blocks, self.block_chunks()):
+            self.stats.pairs += compared
+            scores.update(((a, b), pair_score) for a, b, pair_score in candidates)
+
+        candidates = [DuplicateCandidate(contact_id=a, duplicate_id=b, score=s) for (a, b), s in scores.items()]
+        with transaction.atomic(using=self.using):
+            DuplicateCandidate.objects.using(self.using).all().delete()
+            DuplicateCandidate.objects.using(self.using).bulk_create(candidates, batch_size=self.chunk_size)
+        self.stats.candidates = len(candidates)
+
+
+def merge_contacts(survivor: Contact, duplicates: Iterable[int]) -> Contact:
+    """
+    Merge contacts into one, in a single transaction.
+
+    The survivor keeps its values, taking its status from a duplicate if it has none and the
+    earliest creation time of them all. Rows of other models referencing a duplicate are
+    repointed to the survivor, then the duplicates are deleted, with their blocking keys and
+    duplicate candidates.
+
+    :param survivor: Contact kept.
+    :param duplicates: Ids of the contacts merged into it and deleted.
+
+    :raises MergeError: If the survivor is among the duplicates, or a contact does not exist.
+
+    :return:
+        Contact: The survivor, updated.
+    """
+    ids = set(duplicates)
+    if survivor.pk in ids:
+        msg = "A contact cannot be merged into itself."
+        raise MergeError(msg)
+
+    using = router.db_for_write(Contact, instance=survivor)
+    with transaction.atomic(using=using):
+        contacts = Contact.objects.using(using).select_for_update().in_bulk([survivor.pk, *ids])
+        missing = sorted(({survivor.pk} | ids) - contacts.keys())
+        if missing:
+            msg = f"Contacts {', '.join(map(str, missing))} do not exist."
+            raise MergeError(msg)
+
+        survivor = contacts[survivor.pk]
+        merged = [contacts[pk] for pk in sorted(ids)]
+        if survivor.status_id is None:
+            survivor.status_id = next((contact.status_id for contact in merged if contact.status_id), None)
+        survivor.created_at = min(contact.created_at for contact in [survivor, *merged])
+
+        for relation in Contact._meta.get_fields(include_hidden=True):  # noqa: SLF001
+            if (relation.one_to_many or relation.one_to_one) and relation.auto_created:
+                if relation.related_model in (ContactBlockingKey, DuplicateCandidate):
+                    continue
+                related = relation.related_model._base_manager.using(using)  # noqa: SLF001
+                related.filter(**{f"{relation.field.name}__in": ids}).update(**{relation.field.name: survivor})
+
+        Contact.objects.using(using).filter(pk__in=ids).delete()
+        survivor.save()
+    return survivor
@@ -1,12 +1,98 @@
+from collections.abc import Iterator
 from typing import ClassVar
 
 from django import forms
+from django.forms.models import ModelChoiceIterator
 
 from contacts.models import Contact, ContactStatusChoices
+from contacts.statuses import status_registry
 
 POLAND_PHONE_NUMBER_LENGTH_NO_PREFIX = 9
 
 
+def validate_phone_number(phone_number: str) -> None:
+    """Ensure the phone number length is valid."""
+    if len(phone_number) != POLAND_PHONE_NUMBER_LENGTH_NO_PREFIX:
+        raise forms.ValidationError("Phone number must be 9 digits long.")
+
+
+class StatusChoiceIterator(ModelChoiceIterator):
+    """Iterate over the registered statuses instead of querying the field's queryset."""
+
+    def __iter__(self: "StatusChoiceIterator") -> Iterator[tuple]:
+        """Yield the empty choice, if any, and one choice per status."""
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for status in status_registry.all():
+            yield self.choice(status)
+
+    def __len__(self: "StatusChoiceIterator") -> int:
+        """Return the number of choices."""
+        return len(status_registry.all()) + (self.field.empty_label is not None)
+
+    def __bool__(self: "StatusChoiceIterator") -> bool:
+        """Return whether there is any choice."""
+        return self.field.empty_label is not None or bool(status_registry.all())
+
+
+class StatusChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField for contact statuses, rendered and validated from the status registry.
+
+    A status missing from the registry may have been created by another process since it
+    was loaded, so it is looked up in the database before being rejected.
+    """
+
+    iterator = StatusChoiceIterator
+
+    def to_python(self: "StatusChoiceField", value: object) -> ContactStatusChoices | None:
+        """Return the registered status with the submitted primary key."""
+        if value in self.empty_values:
+            return None
+        if isinstance(value, ContactStatusChoices):
+            value = value.pk
+        try:
+            pk = int(value)
+        except (TypeError, ValueError):
+            raise self.invalid_choice(value) from None
+        status = status_registry.get(pk)
+        if status is None:
+            status = self.queryset.filter(pk=pk).first()
+            if status is None:
+                raise self.invalid_choice(value)
+            status_registry.clear()
+        return status
+
+    def invalid_choice(self: "StatusChoiceField", value: object) -> forms.ValidationError:
+        """Return the error rejecting a value that is not the primary key of a status."""
+        return forms.ValidationError(
+            self.error_messages["invalid_choice"],
+            code="invalid_choice",
+            params={"value": value},
+        )
+
+
+def reject_deleted_status(form: forms.BaseForm, name: str) -> bool:
+    """
+    Add an error to a status field whose status was deleted, after saving the form failed on a foreign key.
+
+    Statuses are validated against the status registry, which may still hold a status that
+    another process deleted; the database only rejects it when the transaction commits.
+
+    :param form: The validated form.
+    :param name: Name of its ``StatusChoiceField``.
+
+    :return:
+        bool: Whether the status was deleted; if not, the save failed for another reason.
+    """
+    status = form.cleaned_data.get(name)
+    if status is None or ContactStatusChoices.objects.filter(pk=status.pk).exists():
+        return False
+    status_registry.clear()
+    form.add_error(name, form.fields[name].invalid_choice(status.pk))
+    return True
+
+
 class ContactForm(forms.ModelForm):
     """Form to create or update a contact."""
 
@@ -22,6 +108,7 @@ class ContactForm(forms.ModelForm):
             "city",
             "status",
         )
+        field_classes: ClassVar[dict] = {"status": StatusChoiceField}
         widgets: ClassVar[dict] = {
             "first_name": forms.TextInput(
                 attrs={"class": "w-full px-4 py-2 border rounded-md", "placeholder": "First name"},
@@ -42,9 +129,7 @@ class ContactForm(forms.ModelForm):
     def clean_phone_number(self: "ContactForm") -> str:
         """Ensure the phone number length is valid."""
         phone_number = self.cleaned_data.get("phone_number")
-
-        if len(phone_number) != POLAND_PHONE_NUMBER_LENGTH_NO_PREFIX:
-            raise forms.ValidationError("Phone number must be 9 digits long.")
+        validate_phone_number(phone_number)
         return phone_number
 
 
@@ -71,3 +156,35 @@ class StatusForm(forms.ModelForm):
                 },
             ),
         }
+
+
+class StatusDeleteForm(forms.Form):
+    """Form to delete a contact status, choosing what happens to its contacts."""
+
+    REASSIGN = "reassign"
+    DELETE = "delete"
+
+    contacts = forms.ChoiceField(
+        choices=[(REASSIGN, "Move them to another status"), (DELETE, "Delete them")],
+        initial=REASSIGN,
+        widget=forms.RadioSelect,
+    )
+    target = StatusChoiceField(
+        queryset=ContactStatusChoices.objects.all(),
+        required=False,
+        empty_label="No status",
+        label="Move them to",
+        widget=forms.Select(attrs={"class": "w-full px-4 py-2 border rounded-md"}),
+    )
+
+    def __init__(self: "StatusDeleteForm", *args: tuple, status: ContactStatusChoices, **kwargs: dict) -> None:
+        """Keep the status being deleted."""
+        super().__init__(*args, **kwargs)
+        self.status = status
+
+    def clean_target(self: "StatusDeleteForm") -> ContactStatusChoices | None:
+        """Ensure the contacts are not moved to the status being deleted."""
+        target = self.cleaned_data.get("target")
+        if target is not None and target.pk == self.status.pk:
+            raise forms.ValidationError("Choose another status than the one being deleted.")
+        return target
@@ -0,0 +1,191 @@
+"""
+In-process trigram index of the words of contacts, for typo-tolerant search.
+
+Substring search cannot find "Kowalsky" in "Kowalski". Fuzzy search first looks the
+mistyped term up in a vocabulary of every word of the contacts' names, emails and cities,
+ranking the words by trigram similarity the way ``pg_trgm`` does, and then searches the
+contacts for the most similar words with the regular, indexed search backend. Names and
+cities repeat across contacts, so the vocabulary stays far smaller than the table: with
+a million contacts it holds the distinct first names, last names, cities and email words.
+
+The vocabulary is loaded on the first fuzzy search of a process and reloaded after
+``CONTACT_FUZZY_INDEX_TTL`` seconds, while the other requests keep using the old one.
+Saved contacts add their words at once (see ``ContactsConfig.ready``); words of deleted
+contacts stay until the reload, where they only cost a search that finds nothing, and
+bulk writes that bypass signals are picked up by the reload.
+"""
+
+import re
+import threading
+import time
+from array import array
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+
+from django.conf import settings
+
+from contacts.models import Contact
+
+FUZZY_FIELDS = ("first_name", "last_name", "email", "city")
+
+# Words are runs of letters; shorter ones cannot be searched for with the trigram index.
+WORD = re.compile(r"[^\W\d_]{3,}")
+
+LOAD_CHUNK_SIZE = 10_000
+
+
+def words(value: str) -> list[str]:
+    """Return the lowercase words of a field value."""
+    return WORD.findall(value.lower())
+
+
+def trigrams(word: str) -> set[str]:
+    """Return the trigrams of a word, padded like ``pg_trgm``: two spaces before and one after."""
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Inverted index from trigrams to the words containing them."""
+
+    def __init__(self: "TrigramIndex") -> None:
+        """Initialize an empty index."""
+        self.words: list[str] = []
+        self.ids: dict[str, int] = {}
+        # Number of distinct trigrams of each word, by word id.
+        self.sizes = array("H")
+        self.postings: defaultdict[str, array] = defaultdict(lambda: array("I"))
+
+    def __len__(self: "TrigramIndex") -> int:
+        """Return the number of indexed words."""
+        return len(self.words)
+
+    def add(self: "TrigramIndex", word: str) -> None:
+        """Index a word, unless it is indexed already."""
+        if word in self.ids:
+            return
+        word_id = len(self.words)
+        self.ids[word] = word_id
+        self.words.append(word)
+        grams = trigrams(word)
+        self.sizes.append(min(len(grams), 0xFFFF))
+        for gram in grams:
+            self.postings[gram].append(word_id)
+
+    def similar(self: "TrigramIndex", term: str, threshold: float, limit: int) -> dict[str, float]:
+        """
+        Find the indexed words most similar to a term.
+
+        Similarity is the share of trigrams two words have in common, out of all the
+        trigrams of both: 1 for the same word, 0 for words sharing no trigram.
+
+        :param term: Search term, compared in lowercase.
+        :param threshold: Minimum similarity of the words returned.
+        :param limit: Maximum number of words returned.
+
+        :return:
+            dict[str, float]: Words and their similarity, most similar first.
+        """
+        grams = trigrams(term.lower())
+        shared = Counter()
+        for gram in grams:
+            if gram in self.postings:
+                shared.update(self.postings[gram])
+
+        scored = []
+        for word_id, common in shared.items():
+            similarity = common / (len(grams) + self.sizes[word_id] - common)
+            if similarity >= threshold:
+                scored.append((similarity, self.words[word_id]))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return {word: similarity for similarity, word in scored[:limit]}
+
+
+class FuzzyVocabulary:
+    """Process-wide trigram index of the words of every contact."""
+
+    def __init__(self: "FuzzyVocabulary") -> None:
+        """Initialize an unloaded vocabulary."""
+        self._lock = threading.Lock()
+        self._index: TrigramIndex | None = None
+        self._expires = 0.0
+        self._loading = False
+        # Words saved while the index was loading, added to it once it is loaded.
+        self._pending: list[str] = []
+
+    def index(self: "FuzzyVocabulary") -> TrigramIndex:
+        """
+        Return the index, loading it when missing or expired.
+
+        While one thread reloads an expired index, the others keep using the old one.
+        """
+        with self._lock:
+            if self._index is not None and (self._loading or time.monotonic() < self._expires):
+                return self._index
+            self._loading = True
+            self._pending = []
+
+        index = None
+        try:
+            index = self.load()
+        finally:
+            with self._lock:
+                self._loading = False
+                if index is not None:
+                    for word in self._pending:
+                        index.add(word)
+                    self._index = index
+                    self._expires = time.monotonic() + getattr(settings, "CONTACT_FUZZY_INDEX_TTL", 300)
+                self._pending = []
+        return index
+
+    @staticmethod
+    def load() -> TrigramIndex:
+        """Build an index of the words of every contact."""
+        index = TrigramIndex()
+        for field in FUZZY_FIELDS:
+            values = Contact.objects.order_by().values_list(field, flat=True).distinct()
+            for value in values.iterator(chunk_size=LOAD_CHUNK_SIZE):
+                for word in words(value or ""):
+                    index.add(word)
+        return index
+
+    def similar_words(self: "FuzzyVocabulary", term: str) -> dict[str, float]:
+        """
+        Return the words of contacts similar to a term, most similar first.
+
+        :param term: Possibly mistyped search term.
+
+        :return:
+            dict[str, float]: At most ``CONTACT_FUZZY_MAX_WORDS`` words with a similarity of at
+            least ``CONTACT_FUZZY_THRESHOLD``.
+        """
+        return self.index().similar(
+            term,
+            getattr(settings, "CONTACT_FUZZY_THRESHOLD", 0.3),
+            getattr(settings, "CONTACT_FUZZY_MAX_WORDS", 20),
+        )
+
+    def add(self: "FuzzyVocabulary", values: Iterable[str]) -> None:
+        """Add the words of field values to a loaded index."""
+        new_words = [word for value in values for word in words(value or "")]
+        with self._lock:
+            if self._loading:
+                self._pending.extend(new_words)
+            if self._index is not None:
+                for word in new_words:
+                    self._index.add(word)
+
+    def clear(self: "FuzzyVocabulary") -> None:
+        """Drop the index, so that the next fuzzy search loads it again."""
+        with self._lock:
+            self._index = None
+            self._expires = 0.0
+
+
+fuzzy_vocabulary = FuzzyVocabulary()
+
+
+def add_contact_words(sender: type[Contact], instance: Contact, **kwargs: dict) -> None:  # noqa: ARG001
+    """Add the words of a saved contact to the vocabulary; connected to ``post_save``."""
+    fuzzy_vocabulary.add(getattr(instance, field) for field in FUZZY_FIELDS)
@@ -0,0 +1,391 @@
+"""
+Streaming bulk import of contacts from CSV, JSON and NDJSON files.
+
+Files are parsed incrementally and handled in chunks, so memory use depends on the chunk
+size rather than on the file size. For every chunk:
+
+- rows are validated field by field, with the same rules as ``ContactForm``,
+- duplicate emails and phone numbers are found with one ``IN`` query per field instead
+  of one unique check per row, both against the database and within the chunk,
+- valid rows are inserted with ``bulk_create`` in a transaction of their own.
+
+Rows that fail are reported with their row number and the errors of each field.
+"""
+
+import codecs
+import csv
+import json
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import IO
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils.text import capfirst
+
+from contacts.changes import record_changes
+from contacts.counters import count_contacts
+from contacts.forms import validate_phone_number
+from contacts.list_cache import list_cache
+from contacts.models import Contact, ContactChange, ContactStatusChoices
+
+CSV = "csv"
+JSON = "json"
+NDJSON = "ndjson"
+FORMATS = (CSV, JSON, NDJSON)
+
+IMPORT_FIELDS = ("first_name", "last_name", "phone_number", "email", "city")
+UNIQUE_FIELDS = ("phone_number", "email")
+
+DEFAULT_CHUNK_SIZE = 2000
+# Only the first errors are kept for the report; the rest are only counted.
+DEFAULT_MAX_ERRORS = 1000
+
+READ_SIZE = 64 * 1024
+# A JSON item larger than this is treated as malformed instead of being buffered further.
+MAX_JSON_ITEM_SIZE = 1024 * 1024
+
+# Line endings of the ``newline=""`` mode of text files. ``str.splitlines`` also splits on
+# characters such as U+2028 and form feeds, which may appear inside JSON strings and CSV fields.
+LINE_END = re.compile(r"\r\n|\r|\n")
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+@dataclass
+class RowError:
+    """Errors of one rejected row."""
+
+    # Line number for CSV and NDJSON files, position in the array for JSON files.
+    row: int
+    errors: dict[str, list[str]]
+
+
+@dataclass
+class ImportResult:
+    """Summary of an import."""
+
+    created: int = 0
+    error_count: int = 0
+    errors: list[RowError] = field(default_factory=list)
+
+    def as_dict(self: "ImportResult") -> dict:
+        """Return the summary as JSON-serializable data."""
+        return {
+            "created": self.created,
+            "error_count": self.error_count,
+            "errors": [{"row": error.row, "errors": error.errors} for error in self.errors],
+        }
+
+
+def detect_format(filename: str) -> str:
+    """
+    Guess the format of a file from its extension.
+
+    :param filename: Name of the file.
+
+    :return:
+        str: One of ``FORMATS``.
+
+    :raises ImportFormatError: If the extension is not recognized.
+    """
+    suffix = Path(filename).suffix.lower().lstrip(".")
+    fmt = {"jsonl": NDJSON}.get(suffix, suffix)
+    if fmt not in FORMATS:
+        msg = f"Cannot tell the format of {filename!r}; use one of {', '.join(FORMATS)}."
+        raise ImportFormatError(msg)
+    return fmt
+
+
+def read_text(stream: IO[bytes]) -> Iterator[str]:
+    """Decode a binary stream in blocks, dropping a leading byte order mark."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    while block := stream.read(READ_SIZE):
+        yield decoder.decode(block)
+    yield decoder.decode(b"", final=True)
+
+
+def read_lines(stream: IO[bytes]) -> Iterator[str]:
+    """Yield the lines of a binary stream, keeping the line endings; see ``LINE_END``."""
+    pending = ""
+    for text in read_text(stream):
+        pending += text
+        start = 0
+        for match in LINE_END.finditer(pending):
+            # A "\r" ending the text may be the first half of a "\r\n" split across reads.
+            if match.end() == len(pending) and match.group() == "\r":
+                break
+            yield pending[start : match.end()]
+            start = match.end()
+        pending = pending[start:]
+    if pending:
+        yield pending
+
+
+def parse_csv(stream: IO[bytes]) -> Iterator[tuple[int, object]]:
+    """Yield the line number and contents of every CSV record after the header."""
+    reader = csv.DictReader(read_lines(stream))
+    for record in reader:
+        yield reader.line_num, record
+
+
+def parse_ndjson(stream: IO[bytes]) -> Iterator[tuple[int, object]]:
+    """Yield the line number and decoded value of every non-blank line."""
+    for number, line in enumerate(read_lines(stream), start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, None
+
+
+class JSONArrayReader:
+    """Decode the items of a JSON array from blocks of text, one item at a time."""
+
+    def __init__(self: "JSONArrayReader", blocks: Iterator[str]) -> None:
+        """Initialize the reader with an iterator over blocks of text."""
+        self.blocks = blocks
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+
+    def read_more(self: "JSONArrayReader") -> bool:
+        """Append the next block to the unread part of the buffer; return whether there was one."""
+        block = next(self.blocks, None)
+        if block is None:
+            return False
+        self.buffer, self.position = self.buffer[self.position :] + block, 0
+        return True
+
+    def peek(self: "JSONArrayReader") -> str | None:
+        """Skip whitespace and return the next character, ``None`` at the end of the text."""
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position].isspace():
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.read_more():
+                return None
+
+    def expect(self: "JSONArrayReader", chars: str, msg: str) -> str:
+        """Consume one of the expected characters and return it."""
+        char = self.peek()
+        if char is None or char not in chars:
+            raise ImportFormatError(msg)
+        self.position += 1
+        return char
+
+    def decode(self: "JSONArrayReader", msg: str) -> object:
+        """Decode the next value, reading more text while it is incomplete."""
+        self.peek()
+        while True:
+            try:
+                value, self.position = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError as e:
+                too_large = len(self.buffer) - self.position > MAX_JSON_ITEM_SIZE
+                if too_large or not self.read_more():
+                    raise ImportFormatError(msg) from e
+            else:
+                return value
+
+
+def parse_json(stream: IO[bytes]) -> Iterator[tuple[int, object]]:
+    """
+    Yield the position and value of every item of a top-level JSON array.
+
+    Items are decoded one at a time as the text arrives, so the array never has to fit in memory.
+
+    :raises ImportFormatError: If the document is not an array or is malformed.
+    """
+    reader = JSONArrayReader(read_text(stream))
+    reader.expect("[", "A JSON import must be an array of objects.")
+    if reader.peek() == "]":
+        return
+
+    number = 0
+    while True:
+        number += 1
+        yield number, reader.decode(f"Malformed JSON in item {number}.")
+        if reader.expect(",]", f"Malformed JSON after item {number}.") == "]":
+            return
+
+
+PARSERS = {CSV: parse_csv, JSON: parse_json, NDJSON: parse_ndjson}
+
+
+class ContactImporter:
+    """Validate and insert parsed rows in chunks."""
+
+    def __init__(
+        self: "ContactImporter",
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_errors: int = DEFAULT_MAX_ERRORS,
+        create_statuses: bool = False,
+        dry_run: bool = False,
+    ) -> None:
+        """
+        Initialize the importer.
+
+        :param chunk_size: Number of rows validated and inserted together.
+        :param max_errors: Number of row errors kept for the report.
+        :param create_statuses: Create statuses named in the file that do not exist yet.
+        :param dry_run: Validate the rows, then roll back everything the import inserted.
+        """
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self.create_statuses = create_statuses
+        self.dry_run = dry_run
+        self.statuses = {status.name: status for status in ContactStatusChoices.objects.all()}
+        self.result = ImportResult()
+
+    def run(self: "ContactImporter", rows: Iterable[tuple[int, object]]) -> ImportResult:
+        """
+        Import parsed rows.
+
+        :param rows: Row numbers and values, as yielded by the parsers.
+
+        :return:
+            ImportResult: Number of created contacts and the rejected rows.
+        """
+        rows = iter(rows)
+        if not self.dry_run:
+            while chunk := list(islice(rows, self.chunk_size)):
+                self.import_chunk(chunk)
+            return self.result
+
+        # Rows are still inserted, so duplicates across chunks are caught exactly as in a real run.
+        with transaction.atomic():
+            while chunk := list(islice(rows, self.chunk_size)):
+                self.import_chunk(chunk)
+            transaction.set_rollback(True)
+        return self.result
+
+    def reject(self: "ContactImporter", row: int, errors: dict[str, list[str]]) -> None:
+        """Record a rejected row."""
+        self.result.error_count += 1
+        if len(self.result.errors) < self.max_errors:
+            self.result.errors.append(RowError(row, errors))
+
+    def import_chunk(self: "ContactImporter", chunk: list[tuple[int, object]]) -> None:
+        """Validate a chunk of rows and insert the valid ones."""
+        candidates = []
+        for row, value in chunk:
+            contact, errors = self.build(value)
+            if errors:
+                self.reject(row, errors)
+            else:
+                candidates.append((row, contact))
+
+        candidates = self.drop_duplicates(candidates)
+        if not candidates:
+            return
+
+        try:
+            with transaction.atomic():
+                Contact.objects.bulk_create([contact for _, contact in candidates])
+                # bulk_create() sends no signals.
+                list_cache.invalidate(Contact.objects.db)
+                record_changes([contact.pk for _, contact in candidates], ContactChange.Action.CREATED)
+                count_contacts([contact for _, contact in candidates])
+        except IntegrityError:
+            # Another writer inserted a conflicting row after the duplicate check.
+            self.insert_one_by_one(candidates)
+        else:
+            self.result.created += len(candidates)
+
+    def build(self: "ContactImporter", value: object) -> tuple[Contact | None, dict[str, list[str]]]:
+        """Build an unsaved contact from a row, or return the errors of its fields."""
+        if not isinstance(value, dict):
+            return None, {"__all__": ["Row must be a JSON object with contact fields."]}
+
+        contact, errors = Contact(), {}
+        for name in IMPORT_FIELDS:
+            model_field = Contact._meta.get_field(name)  # noqa: SLF001
+            raw = value.get(name)
+            raw = "" if raw is None else str(raw).strip()
+            try:
+                cleaned = model_field.clean(raw, contact)
+                if name == "phone_number":
+                    validate_phone_number(cleaned)
+            except ValidationError as e:
+                errors[name] = list(e.messages)
+            else:
+                setattr(contact, name, cleaned)
+
+        status_name = str(value.get("status") or "").strip()
+        if status_name:
+            status = self.status(status_name)
+            if status is None:
+                errors["status"] = [f"Status {status_name!r} does not exist."]
+            contact.status = status
+        return contact, errors
+
+    def status(self: "ContactImporter", name: str) -> ContactStatusChoices | None:
+        """Return the status with a name, creating it if allowed."""
+        if name not in self.statuses and self.create_statuses:
+            self.statuses[name] = ContactStatusChoices.objects.get_or_create(name=name)[0]
+        return self.statuses.get(name)
+
+    def drop_duplicates(self: "ContactImporter", candidates: list[tuple[int, Contact]]) -> list[tuple[int, Contact]]:
+        """Reject rows whose unique fields are already taken in the database or earlier in the chunk."""
+        taken = {}
+        for name in UNIQUE_FIELDS:
+            values = {getattr(contact, name) for _, contact in candidates}
+            existing = Contact.objects.filter(**{f"{name}__in": values}).values_list(name, flat=True)
+            taken[name] = set(existing)
+
+        unique = []
+        for row, contact in candidates:
+            errors = {}
+            for name in UNIQUE_FIELDS:
+                value = getattr(contact, name)
+                if value in taken[name]:
+                    verbose_name = capfirst(Contact._meta.get_field(name).verbose_name)  # noqa: SLF001
+                    errors[name] = [f"Contact with this {verbose_name} already exists."]
+            if errors:
+                self.reject(row, errors)
+                continue
+            for name in UNIQUE_FIELDS:
+                taken[name].add(getattr(contact, name))
+            unique.append((row, contact))
+        return unique
+
+    def insert_one_by_one(self: "ContactImporter", candidates: list[tuple[int, Contact]]) -> None:
+        """Insert rows separately so that only the conflicting ones are rejected."""
+        for row, contact in candidates:
+            try:
+                with transaction.atomic():
+                    # Drop the id the rolled back bulk_create() may have set.
+                    contact.pk = None
+                    contact.save(force_insert=True)
+            except IntegrityError:
+                self.reject(row, {"__all__": ["Contact with this phone number or email already exists."]})
+            else:
+                self.result.created += 1
+
+
+def import_contacts(stream: IO[bytes], fmt: str, **options: object) -> ImportResult:
+    """
+    Import contacts from a file.
+
+    :param stream: Binary file object, read incrementally.
+    :param fmt: One of ``FORMATS``.
+    :param options: Options of ``ContactImporter``.
+
+    :return:
+        ImportResult: Number of created contacts and the rejected rows.
+
+    :raises ImportFormatError: If the format is unknown or the file cannot be parsed; the
+        chunks before the malformed part stay imported.
+    """
+    if fmt not in PARSERS:
+        msg = f"Unknown import format {fmt!r}; use one of {', '.join(FORMATS)}."
+        raise ImportFormatError(msg)
+    return ContactImporter(**options).run(PARSERS[fmt](stream))
@@ -0,0 +1,318 @@
+"""
+Per-request timing of views, SQL queries and template rendering.
+
+With ``CONTACT_INSTRUMENTATION`` enabled, ``InstrumentationMiddleware`` records for every
+request its wall time, the number and total time of its SQL queries, the queries it
+repeated and the time spent rendering templates. It reports them to the client in a
+``Server-Timing`` header, which browsers show next to the request in their developer
+tools, and adds them to process-wide totals per view, served at ``/metrics`` in the
+Prometheus text format.
+
+A query executed ``CONTACT_N_PLUS_ONE_THRESHOLD`` times or more in one request is logged as
+a possible N+1 pattern: related objects loaded row by row instead of with
+``select_related()`` or ``prefetch_related()``. Queries are told apart by their SQL with
+the parameters left out, so ``WHERE id = %s`` run for ten different ids counts ten times.
+
+Queries are recorded by an ``execute_wrapper`` added to each database connection on the
+first instrumented request, and attributed to the request through a context variable,
+so sync and async views on the same connection are told apart. Template rendering is
+timed by ``InstrumentedDjangoTemplates``, the template backend. With instrumentation
+disabled the middleware removes itself from the stack, the wrapper is never installed,
+and templates pay one context variable lookup per render.
+
+Totals are kept per process: with several worker processes, each one serves its own.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+from django.template.backends.django import DjangoTemplates, Template
+from django.utils.safestring import SafeString
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds of the request duration histogram buckets.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Runs of placeholders, e.g. of `IN (%s, %s, %s)`, collapsed so that lists of any length share a fingerprint.
+PLACEHOLDER_LIST = re.compile(r"%s(?:\s*,\s*%s)+")
+
+UNRESOLVED_VIEW = "<unresolved>"
+
+
+def fingerprint(sql: str) -> str:
+    """Return the SQL of a query with lists of placeholders collapsed, the same for every parameter value."""
+    return PLACEHOLDER_LIST.sub("%s, ...", str(sql))
+
+
+@dataclass
+class RequestMetrics:
+    """What one request spent its time on, in seconds."""
+
+    started: float = field(default_factory=time.perf_counter)
+    duration: float = 0.0
+    queries: int = 0
+    sql_time: float = 0.0
+    template_time: float = 0.0
+    fingerprints: Counter = field(default_factory=Counter)
+    # Nesting depth of template renders, so that a template rendered inside another is not counted twice.
+    rendering: int = 0
+
+    def add_query(self: "RequestMetrics", sql: str, elapsed: float) -> None:
+        """Record one executed query."""
+        self.queries += 1
+        self.sql_time += elapsed
+        self.fingerprints[fingerprint(sql)] += 1
+
+    @property
+    def duplicates(self: "RequestMetrics") -> dict[str, int]:
+        """Queries executed more than once, with their number of executions."""
+        return {sql: executions for sql, executions in self.fingerprints.items() if executions > 1}
+
+    def n_plus_one(self: "RequestMetrics", threshold: int) -> dict[str, int]:
+        """Return the queries executed at least ``threshold`` times, with their number of executions."""
+        return {sql: executions for sql, executions in self.fingerprints.items() if executions >= threshold}
+
+    def server_timing(self: "RequestMetrics") -> str:
+        """Return the metrics as a ``Server-Timing`` header value, durations in milliseconds."""
+        return (
+            f"total;dur={self.duration * 1000:.1f}, "
+            f'db;dur={self.sql_time * 1000:.1f};desc="{self.queries} queries, {len(self.duplicates)} repeated", '
+            f"tpl;dur={self.template_time * 1000:.1f}"
+        )
+
+
+current_metrics: ContextVar[RequestMetrics | None] = ContextVar("current_metrics", default=None)
+
+
+def record_query(execute: Callable, sql: str, params: object, many: bool, context: dict) -> object:  # noqa: FBT001
+    """Execute a query, timing it for the request being instrumented, if any."""
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(sql, time.perf_counter() - started)
+
+
+def install_query_recorder() -> None:
+    """Add ``record_query`` to the execute wrappers of every connection of the current thread or task."""
+    for alias in connections:
+        wrappers = connections[alias].execute_wrappers
+        if record_query not in wrappers:
+            wrappers.append(record_query)
+
+
+@dataclass
+class ViewTotals:
+    """Totals of the requests served by one view."""
+
+    requests: int = 0
+    duration: float = 0.0
+    queries: int = 0
+    sql_time: float = 0.0
+    template_time: float = 0.0
+    n_plus_one: int = 0
+    # Requests per upper bound of DURATION_BUCKETS, not cumulative.
+    buckets: list[int] = field(default_factory=lambda: [0] * len(DURATION_BUCKETS))
+
+
+class MetricsRegistry:
+    """Process-wide totals of the instrumented requests, per view."""
+
+    def __init__(self: "MetricsRegistry") -> None:
+        """Initialize empty totals."""
+        self._lock = threading.Lock()
+        self._views: dict[str, ViewTotals] = {}
+        self._statuses: Counter = Counter()
+
+    def record(self: "MetricsRegistry", view: str, status_code: int, metrics: RequestMetrics, n_plus_one: int) -> None:
+        """Add a finished request to the totals of its view."""
+        bucket = next((i for i, bound in enumerate(DURATION_BUCKETS) if metrics.duration <= bound), None)
+        with self._lock:
+            totals = self._views.setdefault(view, ViewTotals())
+            totals.requests += 1
+            totals.duration += metrics.duration
+            totals.queries += metrics.queries
+            totals.sql_time += metrics.sql_time
+            totals.template_time += metrics.template_time
+            totals.n_plus_one += n_plus_one
+            if bucket is not None:
+                totals.buckets[bucket] += 1
+            self._statuses[view, status_code] += 1
+
+    def clear(self: "MetricsRegistry") -> None:
+        """Forget every recorded request."""
+        with self._lock:
+            self._views.clear()
+            self._statuses.clear()
+
+    def export(self: "MetricsRegistry") -> str:
+        """
+        Return the totals in the Prometheus text exposition format.
+
+        :return:
+            str: One metric family per total, each sample labelled with its view.
+        """
+        with self._lock:
+            views = {
+                view: ViewTotals(**{**vars(totals), "buckets": list(totals.buckets)})
+                for view, totals in sorted(self._views.items())
+            }
+            statuses = sorted(self._statuses.items())
+        return "".join(self.export_lines(views, statuses))
+
+    @staticmethod
+    def export_lines(views: dict[str, ViewTotals], statuses: list) -> Iterator[str]:
+        """Yield the lines of ``export()``."""
+        yield "# HELP contacts_requests_total Requests served, by view and status code.\n"
+        yield "# TYPE contacts_requests_total counter\n"
+        for (view, status_code), requests in statuses:
+            yield f'contacts_requests_total{{view="{escape_label(view)}",status="{status_code}"}} {requests}\n'
+
+        yield "# HELP contacts_request_duration_seconds Wall time of requests, by view.\n"
+        yield "# TYPE contacts_request_duration_seconds histogram\n"
+        for view, totals in views.items():
+            label = escape_label(view)
+            cumulative = 0
+            for bound, requests in zip(DURATION_BUCKETS, totals.buckets, strict=True):
+                cumulative += requests
+                yield f'contacts_request_duration_seconds_bucket{{view="{label}",le="{bound}"}} {cumulative}\n'
+            yield f'contacts_request_duration_seconds_bucket{{view="{label}",le="+Inf"}} {totals.requests}\n'
+            yield f'contacts_request_duration_seconds_sum{{view="{label}"}} {totals.duration:.6f}\n'
+            yield f'contacts_request_duration_seconds_count{{view="{label}"}} {totals.requests}\n'
+
+        families = (
+            ("db_queries_total", "SQL queries executed", "queries", "d"),
+            ("db_duration_seconds_total", "Time spent executing SQL queries", "sql_time", ".6f"),
+            ("template_duration_seconds_total", "Time spent rendering templates", "template_time", ".6f"),
+            ("n_plus_one_total", "Requests that repeated a query as often as an N+1 pattern", "n_plus_one", "d"),
+        )
+        for name, description, attribute, spec in families:
+            yield f"# HELP contacts_{name} {description}, by view.\n"
+            yield f"# TYPE contacts_{name} counter\n"
+            for view, totals in views.items():
+                yield f'contacts_{name}{{view="{escape_label(view)}"}} {getattr(totals, attribute):{spec}}\n'
+
+
+def escape_label(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics_registry = MetricsRegistry()
+
+
+class InstrumentationMiddleware:
+    """
+    Time every request, its SQL queries and its template rendering.
+
+    Place it first in ``MIDDLEWARE`` so that the other middleware is timed as well. It
+    removes itself when ``CONTACT_INSTRUMENTATION`` is disabled.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self: "InstrumentationMiddleware", get_response: Callable) -> None:
+        """
+        Initialize the middleware, sync or async like the rest of the stack.
+
+        :raises MiddlewareNotUsed: If instrumentation is disabled.
+        """
+        if not getattr(settings, "CONTACT_INSTRUMENTATION", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = getattr(settings, "CONTACT_N_PLUS_ONE_THRESHOLD", 5)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self: "InstrumentationMiddleware", request: HttpRequest) -> HttpResponse:
+        """Serve the request with its queries and templates recorded."""
+        if self.async_mode:
+            return self.__acall__(request)
+        install_query_recorder()
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self: "InstrumentationMiddleware", request: HttpRequest) -> HttpResponse:
+        """Serve the request like ``__call__``, from async code."""
+        install_query_recorder()
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    def finish(
+        self: "InstrumentationMiddleware",
+        request: HttpRequest,
+        response: HttpResponse,
+        metrics: RequestMetrics,
+    ) -> HttpResponse:
+        """Add the ``Server-Timing`` header, report N+1 patterns and add the request to the totals."""
+        metrics.duration = time.perf_counter() - metrics.started
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else UNRESOLVED_VIEW
+
+        suspects = metrics.n_plus_one(self.threshold)
+        for sql, executions in suspects.items():
+            logger.warning("Possible N+1 query in %s, executed %d times: %s", view, executions, sql)
+
+        response["Server-Timing"] = metrics.server_timing()
+        metrics_registry.record(view, response.status_code, metrics, int(bool(suspects)))
+        return response
+
+
+class InstrumentedTemplate(Template):
+    """Template of ``InstrumentedDjangoTemplates``, timing its rendering for the current request."""
+
+    def render(
+        self: "InstrumentedTemplate",
+        context: dict | None = None,
+        request: HttpRequest | None = None,
+    ) -> SafeString:
+        """Render the template, adding the time taken to the request's metrics, if it is instrumented."""
+        metrics = current_metrics.get()
+        if metrics is None or metrics.rendering:
+            return super().render(context, request)
+        metrics.rendering += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - started
+            metrics.rendering -= 1
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, with rendering timed by ``InstrumentationMiddleware``."""
+
+    def from_string(self: "InstrumentedDjangoTemplates", template_code: str) -> InstrumentedTemplate:
+        """Compile a template from a string."""
+        return InstrumentedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self: "InstrumentedDjangoTemplates", template_name: str) -> InstrumentedTemplate:
+        """Load a template by name."""
+        return InstrumentedTemplate(super().get_template(template_name).template, self)
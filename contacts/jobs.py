@@ -0,0 +1,338 @@
+"""
+Database-backed queue of background jobs.
+
+Expensive operations are queued as ``Job`` rows with ``enqueue`` and run outside the
+request by the ``run_workers`` command, in as many processes and threads as configured.
+Tasks are functions registered by name with ``@task`` (see ``contacts.tasks``); they are
+called with the job and its payload as keyword arguments, may report their progress with
+``report_progress``, and return a JSON-serializable result. A job enqueued inside a
+transaction is only seen by workers once the transaction commits.
+
+Claiming must hand every job to exactly one worker:
+
+- where the database supports it (PostgreSQL), the next job is locked with
+  ``SELECT ... FOR UPDATE SKIP LOCKED``, so that concurrent workers skip each other's
+  rows instead of waiting for them,
+- elsewhere (SQLite), a worker reads the next few jobs and claims one with a conditional
+  ``UPDATE`` that only succeeds while the job is still queued, moving on to the next one
+  when another worker was faster.
+
+A claimed job is leased to its worker for ``JOB_LEASE_SECONDS``, and the lease is renewed
+by a heartbeat thread while the job runs. When a worker dies, its lease expires and the
+job is queued again, or failed once it used all its attempts. A failed attempt is retried
+after ``JOB_RETRY_DELAY`` seconds, doubled after every attempt, up to ``max_attempts``.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import OperationalError, connections, router, transaction
+from django.db.models import F, QuerySet
+from django.utils import timezone
+
+from contacts.models import Job
+
+logger = logging.getLogger(__name__)
+
+# Registered tasks by name.
+TASKS: dict[str, Callable[..., object]] = {}
+
+# Queued jobs read per claim attempt on databases without SKIP LOCKED.
+CLAIM_CANDIDATES = 5
+
+LEASE_EXPIRED_ERROR = "The worker running the job stopped before it finished."
+
+# Attempts at recording the outcome of a job while other writers lock the database, e.g. on SQLite.
+FINISH_ATTEMPTS = 5
+FINISH_RETRY_DELAY = 0.1
+
+
+class LeaseLostError(RuntimeError):
+    """Raised when a job reports progress after its lease was taken over by another worker."""
+
+
+def task(name: str) -> Callable[[Callable], Callable]:
+    """Register the decorated function as the task ``name``."""
+
+    def register(func: Callable) -> Callable:
+        TASKS[name] = func
+        return func
+
+    return register
+
+
+def queue_database() -> str:
+    """Return the database of the queue; claiming is a write, so reads go there as well."""
+    return router.db_for_write(Job)
+
+
+def lease_expiry() -> datetime:
+    """Return the end of a lease taken or renewed now."""
+    return timezone.now() + timedelta(seconds=getattr(settings, "JOB_LEASE_SECONDS", 60))
+
+
+def enqueue(
+    name: str,
+    payload: dict | None = None,
+    *,
+    priority: int = 0,
+    max_attempts: int | None = None,
+    run_after: datetime | None = None,
+) -> Job:
+    """
+    Queue a job.
+
+    :param name: Name of a registered task.
+    :param payload: Keyword arguments of the task, JSON-serializable.
+    :param priority: Jobs with a higher priority run first.
+    :param max_attempts: Runs before the job fails; ``JOB_MAX_ATTEMPTS`` by default.
+    :param run_after: Earliest start of the job; now by default.
+
+    :raises ValueError: If no task has the name.
+
+    :return:
+        Job: The queued job.
+    """
+    if name not in TASKS:
+        msg = f"Unknown task {name!r}."
+        raise ValueError(msg)
+    return Job.objects.using(queue_database()).create(
+        name=name,
+        payload=payload or {},
+        priority=priority,
+        max_attempts=max_attempts or getattr(settings, "JOB_MAX_ATTEMPTS", 3),
+        run_after=run_after or timezone.now(),
+    )
+
+
+def claim(worker: str) -> Job | None:
+    """
+    Lease the next queued job to a worker, by priority and then age.
+
+    :param worker: Name of the worker.
+
+    :return:
+        Job | None: The claimed job, or None if no job is ready.
+    """
+    using = queue_database()
+    jobs = Job.objects.using(using)
+    now = timezone.now()
+    ready = jobs.filter(status=Job.Status.QUEUED, run_after__lte=now).order_by("-priority", "run_after", "pk")
+    claimed = {
+        "status": Job.Status.RUNNING,
+        "locked_by": worker,
+        "locked_until": lease_expiry(),
+        "attempts": F("attempts") + 1,
+        "started_at": now,
+    }
+
+    if connections[using].features.has_select_for_update_skip_locked:
+        with transaction.atomic(using=using):
+            pk = ready.select_for_update(skip_locked=True).values_list("pk", flat=True).first()
+            if pk is None:
+                return None
+            jobs.filter(pk=pk).update(**claimed)
+        return jobs.get(pk=pk)
+
+    while candidates := list(ready.values_list("pk", flat=True)[:CLAIM_CANDIDATES]):
+        for pk in candidates:
+            if jobs.filter(pk=pk, status=Job.Status.QUEUED).update(**claimed):
+                return jobs.get(pk=pk)
+    return None
+
+
+def requeue_expired() -> int:
+    """
+    Queue the running jobs whose lease expired again, or fail those that used all their attempts.
+
+    :return:
+        int: Number of jobs queued or failed.
+    """
+    now = timezone.now()
+    expired = Job.objects.using(queue_database()).filter(status=Job.Status.RUNNING, locked_until__lt=now)
+    released = {"locked_by": "", "locked_until": None}
+    failed = expired.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.Status.FAILED,
+        finished_at=now,
+        error=LEASE_EXPIRED_ERROR,
+        **released,
+    )
+    return failed + expired.update(status=Job.Status.QUEUED, **released)
+
+
+def renew_leases(running: dict[str, int]) -> int:
+    """
+    Extend the leases of running jobs that are still held by their workers.
+
+    :param running: Id of the job run by each worker.
+
+    :return:
+        int: Number of leases renewed.
+    """
+    held = Job.objects.using(queue_database()).filter(
+        pk__in=running.values(),
+        locked_by__in=running.keys(),
+        status=Job.Status.RUNNING,
+    )
+    return held.update(locked_until=lease_expiry())
+
+
+def report_progress(job: Job, progress: int, total: int | None = None) -> None:
+    """
+    Record the progress of a running job, and extend its lease.
+
+    :param job: The job, as passed to its task.
+    :param progress: Units of work done.
+    :param total: Units of work in all, if known.
+
+    Call it between units of work rather than inside a long transaction, which would hide
+    the progress until it commits.
+
+    :raises LeaseLostError: If the job's lease expired and another worker may run it.
+    """
+    fields = {"progress": progress, "locked_until": lease_expiry()}
+    if total is not None:
+        fields["total"] = total
+    held = Job.objects.using(queue_database()).filter(pk=job.pk, locked_by=job.locked_by, status=Job.Status.RUNNING)
+    if not held.update(**fields):
+        msg = f"Job {job.pk} is no longer held by {job.locked_by}."
+        raise LeaseLostError(msg)
+    job.progress = progress
+    job.total = total if total is not None else job.total
+
+
+def finish(held: QuerySet, **fields: object) -> None:
+    """
+    Record the outcome of a job, retrying while the database is locked by other writers.
+
+    Without the retries, a job that ran would stay running until its lease expires, and
+    then run again.
+
+    :param held: The job, filtered on the worker holding it.
+    :param fields: Fields to update.
+
+    :raises OperationalError: If the database is still locked after ``FINISH_ATTEMPTS`` attempts.
+    """
+    for attempt in range(FINISH_ATTEMPTS):
+        try:
+            held.update(**fields)
+        except OperationalError:
+            if attempt == FINISH_ATTEMPTS - 1:
+                raise
+            time.sleep(FINISH_RETRY_DELAY * 2**attempt)
+        else:
+            return
+
+
+def run_job(job: Job) -> None:
+    """Run a claimed job and record its result, or its error and whether it is retried."""
+    held = Job.objects.using(queue_database()).filter(pk=job.pk, locked_by=job.locked_by, status=Job.Status.RUNNING)
+    func = TASKS.get(job.name)
+    try:
+        if func is None:
+            msg = f"Unknown task {job.name!r}."
+            raise LookupError(msg)  # noqa: TRY301
+        result = func(job, **job.payload)
+    except LeaseLostError:
+        logger.warning("Job %s lost its lease and may be run by another worker.", job.pk)
+        return
+    except Exception as e:  # noqa: BLE001
+        now = timezone.now()
+        error = "".join(traceback.format_exception(e))
+        if func is not None and job.attempts < job.max_attempts:
+            delay = getattr(settings, "JOB_RETRY_DELAY", 10) * 2 ** (job.attempts - 1)
+            finish(
+                held,
+                status=Job.Status.QUEUED,
+                locked_by="",
+                locked_until=None,
+                run_after=now + timedelta(seconds=delay),
+                error=error,
+            )
+        else:
+            finish(held, status=Job.Status.FAILED, locked_until=None, finished_at=now, error=error)
+        return
+    finish(held, status=Job.Status.SUCCEEDED, locked_until=None, finished_at=timezone.now(), result=result, error="")
+
+
+@dataclass
+class Worker:
+    """
+    Run jobs in threads of this process until stopped.
+
+    Each thread claims and runs one job at a time, waiting ``poll_interval`` seconds when
+    no job is ready; in ``burst`` mode, it stops instead. A heartbeat thread renews the
+    leases of the running jobs.
+    """
+
+    threads: int = 1
+    poll_interval: float = 1.0
+    burst: bool = False
+    stop: threading.Event = field(default_factory=threading.Event)
+    # Id of the job run by each worker thread, by worker name.
+    running: dict[str, int] = field(default_factory=dict)
+
+    def run(self: "Worker") -> None:
+        """Start the threads and wait for them; an interrupt lets them finish their jobs first."""
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        threads = [threading.Thread(target=self.work, args=(f"{prefix}:{index}",)) for index in range(self.threads)]
+        heartbeat = threading.Thread(target=self.heartbeat, daemon=True)
+        for thread in [*threads, heartbeat]:
+            thread.start()
+        try:
+            for thread in threads:
+                # Joined with a timeout, so that the main thread still receives KeyboardInterrupt.
+                while thread.is_alive():
+                    thread.join(0.5)
+        except KeyboardInterrupt:
+            self.stop.set()
+            for thread in threads:
+                thread.join()
+        finally:
+            self.stop.set()
+        heartbeat.join()
+
+    def work(self: "Worker", name: str) -> None:
+        """Claim and run jobs as the worker ``name``."""
+        try:
+            while not self.stop.is_set():
+                try:
+                    requeue_expired()
+                    job = claim(name)
+                    if job is None:
+                        if self.burst:
+                            return
+                        self.stop.wait(self.poll_interval)
+                        continue
+                    self.running[name] = job.pk
+                    try:
+                        run_job(job)
+                    finally:
+                        self.running.pop(name, None)
+                except Exception:
+                    logger.exception("Worker %s failed.", name)
+                    self.stop.wait(self.poll_interval)
+        finally:
+            connections.close_all()
+
+    def heartbeat(self: "Worker") -> None:
+        """Renew the leases of the running jobs a few times per lease, until the workers stop."""
+        try:
+            while not self.stop.wait(getattr(settings, "JOB_LEASE_SECONDS", 60) / 3):
+                if running := dict(self.running):
+                    renew_leases(running)
+        finally:
+            connections.close_all()
+
+
+def run_worker(threads: int, poll_interval: float, burst: bool) -> None:  # noqa: FBT001
+    """Run a worker; a top-level function that worker processes can run."""
+    Worker(threads=threads, poll_interval=poll_interval, burst=burst).run()
@@ -0,0 +1,171 @@
+"""
+Fragment cache for the contact table of ``ContactListView``.
+
+The table and its pagination links are the expensive part of the list page: the page
+query, the count and a few URL reversals and query strings per row. They are rendered
+once per user, page parameters and data version, and served from the Django cache
+afterwards.
+
+Every key embeds a version number that is bumped whenever a contact or status is
+written, so a write makes all cached tables unreachable at once instead of deleting them
+one by one; they expire after ``CONTACT_LIST_CACHE_TIMEOUT`` seconds. Inside a transaction
+the version is bumped again on commit, so tables cached from the data before the commit
+are not served afterwards.
+
+The version lives in the Django cache, so every process must share that cache: with the
+default per-process ``LocMemCache``, a write only bumps the version of the process that
+made it, and the others serve their stale tables until they expire. The cache is off by
+default, and the ``contacts.W001`` check warns when it is enabled with a per-process cache.
+
+Hits and misses are counted in the cache as well, see ``stats()`` and the
+``list_cache_stats`` command.
+"""
+
+import hashlib
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.http import HttpRequest
+
+VERSION_KEY = "contacts:list:version"
+HITS_KEY = "contacts:list:hits"
+MISSES_KEY = "contacts:list:misses"
+
+# Parameters the table depends on; anything else in the query string is ignored.
+TABLE_PARAMETERS = ("q", "fuzzy", "status", "sort", "page", "cursor")
+
+
+@dataclass
+class CacheStats:
+    """Hit and miss counts of the cache."""
+
+    hits: int
+    misses: int
+
+    @property
+    def ratio(self: "CacheStats") -> float:
+        """Share of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def increment(key: str, delta: int = 1, initial: int = 0) -> int:
+    """
+    Increment a counter in the cache, creating it if it does not exist.
+
+    :return:
+        int: The new value.
+    """
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        # add() loses to a concurrent creation, after which incr() works.
+        if cache.add(key, initial + delta, timeout=None):
+            return initial + delta
+        return cache.incr(key, delta)
+
+
+class ContactListCache:
+    """Versioned cache of rendered contact tables."""
+
+    @property
+    def timeout(self: "ContactListCache") -> int:
+        """Seconds a table is cached; 0 disables the cache."""
+        return getattr(settings, "CONTACT_LIST_CACHE_TIMEOUT", 0)
+
+    @property
+    def enabled(self: "ContactListCache") -> bool:
+        """Whether tables are cached."""
+        return self.timeout > 0
+
+    def version(self: "ContactListCache") -> int:
+        """Return the current data version."""
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            # Start from the clock so that a lost version never reuses the keys of an old one.
+            cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+            version = cache.get(VERSION_KEY)
+        return version
+
+    def key(self: "ContactListCache", request: HttpRequest, *parts: object) -> str:
+        """
+        Return the key of the table a request shows.
+
+        :param request: The list request, with its user and page parameters.
+        :param parts: Other values the table depends on, e.g. the page size.
+
+        :return:
+            str: Cache key of the table in the current version.
+        """
+        params = [(name, request.GET.get(name, "")) for name in TABLE_PARAMETERS]
+        digest = hashlib.md5(repr((params, parts)).encode(), usedforsecurity=False).hexdigest()
+        return f"contacts:list:{self.version()}:{request.user.pk}:{digest}"
+
+    def get(self: "ContactListCache", key: str) -> str | None:
+        """Return a cached table, counting the hit or miss."""
+        table = cache.get(key)
+        increment(MISSES_KEY if table is None else HITS_KEY)
+        return table
+
+    def set(self: "ContactListCache", key: str, table: str) -> None:
+        """Cache a rendered table."""
+        cache.set(key, table, timeout=self.timeout)
+
+    def bump(self: "ContactListCache") -> None:
+        """Move to a new data version, so that every cached table is missed."""
+        increment(VERSION_KEY, initial=time.time_ns())
+
+    def invalidate(self: "ContactListCache", using: str = DEFAULT_DB_ALIAS) -> None:
+        """
+        Make the cached tables unreachable after contacts or statuses were written.
+
+        :param using: Database the write went to.
+        """
+        self.bump()
+        connection = connections[using]
+        if connection.in_atomic_block:
+            # Once per transaction, however many rows it writes.
+            pending = [callback for _, callback, *_ in connection.run_on_commit]
+            if self.bump not in pending:
+                transaction.on_commit(self.bump, using=using)
+
+    def stats(self: "ContactListCache") -> CacheStats:
+        """Return the hit and miss counts."""
+        counts = cache.get_many([HITS_KEY, MISSES_KEY])
+        return CacheStats(counts.get(HITS_KEY, 0), counts.get(MISSES_KEY, 0))
+
+    def reset_stats(self: "ContactListCache") -> None:
+        """Reset the hit and miss counts."""
+        cache.delete_many([HITS_KEY, MISSES_KEY])
+
+
+list_cache = ContactListCache()
+
+
+def check_list_cache_backend(**kwargs: dict) -> list[checks.CheckMessage]:  # noqa: ARG001
+    """Warn when the list cache is enabled with a cache that other processes cannot see."""
+    if list_cache.enabled and isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache):
+        return [
+            checks.Warning(
+                "CONTACT_LIST_CACHE_TIMEOUT is set, but the default cache is local to each process.",
+                hint="Configure a cache shared by all processes in CACHES, or set CONTACT_LIST_CACHE_TIMEOUT to 0; "
+                "otherwise other processes serve stale contact tables after a write.",
+                id="contacts.W001",
+            ),
+        ]
+    return []
+
+
+def invalidate_list_cache(
+    sender: type,  # noqa: ARG001
+    instance: object,  # noqa: ARG001
+    using: str,
+    **kwargs: dict,  # noqa: ARG001
+) -> None:
+    """Signal receiver invalidating the cached tables after a contact or status is saved or deleted."""
+    list_cache.invalidate(using)
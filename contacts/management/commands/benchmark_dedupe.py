@@ -0,0 +1,120 @@
+import random
+import tempfile
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from contacts.dedupe import DuplicateFinder
+from contacts.models import Contact, DuplicateCandidate
+from testing.benchmarks import isolated_database
+from testing.bulk import CITIES, FIRST_NAMES
+
+# Syllables of the generated surnames; three of them give 32,768 surnames.
+SYLLABLES = (
+    "ba", "be", "bo", "da", "de", "di", "fa", "fi", "ga", "go", "ka", "ki", "ko", "la", "le", "li",
+    "ma", "mi", "mo", "na", "ne", "no", "pa", "pi", "ra", "re", "ro", "sa", "si", "ta", "to", "wa",
+)  # fmt: skip
+
+# Phone numbers of the injected duplicates start above those of the seeded contacts.
+DUPLICATE_PHONE_START = 900_000_000
+
+BATCH_SIZE = 5000
+
+
+def person(n: int, rng: random.Random) -> Contact:
+    """
+    Build a contact with random names and city, and the phone number ``n``.
+
+    Unlike ``contact_values``, whose few hundred names make everyone a namesake of thousands
+    at this scale, surnames are drawn from tens of thousands, and namesakes rarely share a city.
+    """
+    first_name = rng.choice(FIRST_NAMES)
+    last_name = "".join(rng.choices(SYLLABLES, k=3)).capitalize()
+    return Contact(
+        first_name=first_name,
+        last_name=last_name,
+        phone_number=f"{n:09d}",
+        email=f"{first_name}.{last_name}.{n}@example.com".lower(),
+        city=rng.choice(CITIES),
+    )
+
+
+def duplicate_of(original: Contact, i: int) -> Contact:
+    """
+    Build a near-duplicate of a contact.
+
+    The copy has the same email local part at another domain, and its surname is either
+    re-cased with extra spaces, misspelled or unchanged.
+    """
+    last_name = original.last_name
+    variants = (f"  {last_name.lower()} ", last_name[:-2] + last_name[-1] + last_name[-2], last_name)
+    return Contact(
+        first_name=original.first_name,
+        last_name=variants[i % len(variants)],
+        phone_number=f"{DUPLICATE_PHONE_START + i:09d}",
+        email=original.email.replace("@example.com", "@example.org"),
+        city=original.city,
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure duplicate detection on a throwaway database of generated contacts with injected near-duplicates, "
+        "with one or more worker process counts, and report how many of the duplicates were found."
+    )
+
+    def add_arguments(self: "Command", parser: ArgumentParser) -> None:
+        """Add the dataset size, duplicate share, chunking and parallelism options."""
+        parser.add_argument("--rows", type=int, default=100_000, help="Contacts seeded before injecting duplicates.")
+        parser.add_argument("--duplicates", type=float, default=0.01, help="Share of contacts given a duplicate.")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Contacts read and scored per chunk.")
+        parser.add_argument("--workers", type=int, nargs="+", default=[1, 4], help="Worker process counts to run.")
+
+    def handle(self: "Command", *args: tuple, **options: dict) -> None:  # noqa: ARG002
+        """Seed a database file, inject duplicates and time a detection run per worker count."""
+        if options["rows"] < 1 or not 0 < options["duplicates"] <= 1 or min(options["workers"]) < 1:
+            msg = "--rows and --workers must be positive, and --duplicates between 0 and 1."
+            raise CommandError(msg)
+
+        with tempfile.TemporaryDirectory() as directory, isolated_database(str(Path(directory) / "dedupe.sqlite3")):
+            expected = self.seed(options["rows"], options["duplicates"])
+            self.stdout.write(f"{Contact.objects.count()} contacts, {len(expected)} injected duplicates")
+            for workers in options["workers"]:
+                started = time.perf_counter()
+                stats = DuplicateFinder(chunk_size=options["chunk_size"], workers=workers).run()
+                elapsed = time.perf_counter() - started
+
+                found = set(DuplicateCandidate.objects.values_list("contact_id", "duplicate_id"))
+                recall = len(found & expected) / len(expected)
+                precision = len(found & expected) / len(found) if found else 1.0
+                self.stdout.write(self.style.MIGRATE_HEADING(f"{workers} worker(s): {elapsed:.1f}s"))
+                self.stdout.write(
+                    f"  keys {stats.keys} in {stats.timings['keys']:.1f}s, "
+                    f"{stats.blocks} blocks ({stats.skipped_blocks} skipped) and {stats.pairs} pairs "
+                    f"in {stats.timings['candidates']:.1f}s",
+                )
+                self.stdout.write(f"  {stats.candidates} candidates, recall {recall:.1%}, precision {precision:.1%}")
+
+    @staticmethod
+    def seed(rows: int, share: float) -> set[tuple[int, int]]:
+        """
+        Seed the contacts and their duplicates.
+
+        :return:
+            set[tuple[int, int]]: Ids of each seeded contact given a duplicate and of its duplicate.
+        """
+        rng = random.Random(0)  # noqa: S311
+        step = max(1, round(1 / share))
+        expected = set()
+        for start in range(0, rows, BATCH_SIZE):
+            contacts = Contact.objects.bulk_create(
+                [person(n, rng) for n in range(start, min(start + BATCH_SIZE, rows))],
+            )
+            originals = [(n // step, contact) for n, contact in enumerate(contacts, start=start) if n % step == 0]
+            duplicates = Contact.objects.bulk_create([duplicate_of(contact, i) for i, contact in originals])
+            expected.update(
+                (original.pk, duplicate.pk) for (_, original), duplicate in zip(originals, duplicates, strict=True)
+            )
+        return expected
@@ -0,0 +1,70 @@
+import time
+import tracemalloc
+from argparse import ArgumentParser
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from contacts.exporting import FORMATS
+from contacts.models import ContactStatusChoices
+from contacts.views import ContactExportView
+from testing.benchmarks import current_rss, isolated_database
+from testing.bulk import create_contacts
+
+DEFAULT_ROWS = (100_000, 1_000_000)
+
+
+class Command(BaseCommand):
+    help = "Measure the throughput and memory use of the streaming contact export."
+
+    def add_arguments(self: "Command", parser: ArgumentParser) -> None:
+        """Add the dataset size and format options."""
+        parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="Table sizes to benchmark.")
+        parser.add_argument("--formats", nargs="+", choices=FORMATS, default=FORMATS, help="Formats to export.")
+
+    def handle(self: "Command", *args: tuple, **options: dict) -> None:  # noqa: ARG002
+        """Seed a throwaway database to each size and export it in every format, plain and compressed."""
+        with isolated_database():
+            statuses = [ContactStatusChoices.objects.create(name=name) for name in ("Active", "Archived", "Lead")]
+            user = get_user_model().objects.create_user("benchmark")
+            seeded = 0
+
+            for rows in sorted(options["rows"]):
+                create_contacts(rows - seeded, statuses, start=seeded)
+                seeded = rows
+                self.stdout.write(self.style.MIGRATE_HEADING(f"{rows} contacts"))
+
+                for fmt in options["formats"]:
+                    for compress in (False, True):
+                        params = {"format": fmt, "sort": "last_name", **({"gzip": "1"} if compress else {})}
+                        stats = self.export(user, params, rows)
+                        self.stdout.write(f"  {fmt + (' gzip' if compress else ''):12} {stats}")
+
+    @staticmethod
+    def export(user: object, params: dict, rows: int) -> str:
+        """Stream one export of ``rows`` contacts through the view and describe its throughput and memory use."""
+        request = RequestFactory().get("/export/", params)
+        request.user = user
+
+        baseline = peak_rss = current_rss()
+        start = time.perf_counter()
+        response = ContactExportView.as_view()(request)
+        size = 0
+        for n, block in enumerate(response.streaming_content):
+            size += len(block)
+            if n % 100 == 0:
+                peak_rss = max(peak_rss, current_rss())
+        elapsed = time.perf_counter() - start
+
+        # A second pass under tracemalloc measures the Python memory the export holds at its peak.
+        tracemalloc.start()
+        for _ in ContactExportView.as_view()(request).streaming_content:
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return (
+            f"{rows / elapsed:10.0f} rows/s  {size / 2**20:8.1f} MiB  "
+            f"traced peak {peak / 2**20:6.1f} MiB  RSS growth {peak_rss - baseline:6.1f} MiB"
+        )
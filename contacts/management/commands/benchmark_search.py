@@ -0,0 +1,51 @@
+from argparse import ArgumentParser
+
+from django.core.management.base import BaseCommand
+
+from contacts.models import Contact, ContactStatusChoices
+from contacts.search import (
+    BaseSearchBackend,
+    IContainsSearchBackend,
+    get_search_backend,
+)
+from testing.benchmarks import isolated_database, measure
+from testing.bulk import create_contacts
+
+DEFAULT_ROWS = (10_000, 100_000, 1_000_000)
+DEFAULT_QUERIES = ("kowal", "anna", "gdańsk", "example.com", "00042", "zzz-no-match")
+
+
+class Command(BaseCommand):
+    help = "Compare contact list search latency of the icontains chain and the indexed search backend."
+
+    def add_arguments(self: "Command", parser: ArgumentParser) -> None:
+        """Add the dataset size, query and repetition options."""
+        parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="Table sizes to benchmark.")
+        parser.add_argument("--queries", nargs="+", default=DEFAULT_QUERIES, help="Search queries to run.")
+        parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query.")
+
+    def handle(self: "Command", *args: tuple, **options: dict) -> None:  # noqa: ARG002
+        """Seed a throwaway database to each size and time one list page per query and backend."""
+        with isolated_database():
+            statuses = [ContactStatusChoices.objects.create(name=name) for name in ("Active", "Archived", "Lead")]
+            backends = {"icontains": IContainsSearchBackend(), "indexed": get_search_backend()}
+            seeded = 0
+
+            for rows in sorted(options["rows"]):
+                create_contacts(rows - seeded, statuses, start=seeded)
+                seeded = rows
+                self.stdout.write(self.style.MIGRATE_HEADING(f"{rows} contacts"))
+
+                for query in options["queries"]:
+                    line = [f"  {query!r:16}"]
+                    for name, backend in backends.items():
+                        stats = measure(lambda b=backend, q=query: self.list_page(b, q), options["repeat"])
+                        line.append(f"{name} p50={stats['p50']:8.2f}ms p95={stats['p95']:8.2f}ms")
+                    self.stdout.write("  ".join(line))
+
+    @staticmethod
+    def list_page(backend: BaseSearchBackend, query: str) -> None:
+        """Run the queries ContactListView issues for a search: the count and the first page."""
+        queryset = backend.search(Contact.objects.all(), [query]).order_by("last_name")
+        queryset.count()
+        list(queryset[:5])
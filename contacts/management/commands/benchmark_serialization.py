@@ -0,0 +1,57 @@
+from argparse import ArgumentParser
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import QuerySet
+from rest_framework.renderers import JSONRenderer
+
+from api.fast_serializers import values_serializer
+from api.renderers import FastJSONRenderer, orjson
+from api.serializers import ContactSerializer
+from contacts.models import Contact, ContactStatusChoices
+from testing.benchmarks import isolated_database, measure
+from testing.bulk import create_contacts
+
+DEFAULT_PAGE_SIZES = (10, 100, 1000)
+
+
+class Command(BaseCommand):
+    help = "Compare ContactSerializer with JSONRenderer against the values() fast path with orjson per page size."
+
+    def add_arguments(self: "Command", parser: ArgumentParser) -> None:
+        """Add the page size and repetition options."""
+        parser.add_argument("--page-sizes", type=int, nargs="+", default=DEFAULT_PAGE_SIZES, help="Rows per page.")
+        parser.add_argument("--repeat", type=int, default=20, help="Timed runs per page size and path.")
+
+    def handle(self: "Command", *args: tuple, **options: dict) -> None:  # noqa: ARG002
+        """Seed a throwaway database and time reading, serializing and rendering one page per path."""
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("orjson is not installed; the fast path renders with json."))
+
+        with isolated_database():
+            statuses = [ContactStatusChoices.objects.create(name=name) for name in ("Active", "Archived", "Lead")]
+            create_contacts(max(options["page_sizes"]), [*statuses, None])
+            queryset = Contact.objects.select_related("status").order_by("last_name", "pk")
+
+            for page_size in sorted(options["page_sizes"]):
+                page = queryset[:page_size]
+                if self.regular(page) != self.fast(page):
+                    msg = f"The paths render different output for {page_size} rows."
+                    raise CommandError(msg)
+
+                regular = measure(lambda p=page: self.regular(p), options["repeat"])
+                fast = measure(lambda p=page: self.fast(p), options["repeat"])
+                self.stdout.write(
+                    f"  {page_size:5} rows  serializer p50={regular['p50']:8.2f}ms  "
+                    f"fast p50={fast['p50']:8.2f}ms  speedup {regular['p50'] / fast['p50']:5.1f}x",
+                )
+
+    @staticmethod
+    def regular(page: QuerySet) -> bytes:
+        """Render a page the way the regular list path does."""
+        return JSONRenderer().render(ContactSerializer(page, many=True).data)
+
+    @staticmethod
+    def fast(page: QuerySet) -> bytes:
+        """Render a page the way the fast list path does."""
+        serializer = values_serializer(ContactSerializer)
+        return FastJSONRenderer().render(serializer.many(serializer.values(page)))
@@ -0,0 +1,171 @@
+import tempfile
+import threading
+import time
+from argparse import ArgumentParser
+from contextvars import copy_context
+from dataclasses import dataclass, field
+from itertools import count
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, transaction
+
+from contact_management.databases import (
+    SQLITE_BUSY_TIMEOUT,
+    SQLITE_CACHE_SIZE_KIB,
+    SQLITE_MMAP_SIZE,
+    tune_sqlite,
+)
+from contacts.models import Contact, ContactStatusChoices
+from testing.benchmarks import isolated_database, summarize
+from testing.bulk import build_contacts, create_contacts
+
+# Sequence numbers, and so phone numbers, of the contacts writers create, above the seeded ones.
+WRITTEN_START = 900_000_000
+
+
+@dataclass
+class Workload:
+    """Operations of one kind completed by the threads of a run."""
+
+    name: str
+    errors: int = 0
+    # Latency in milliseconds of every completed operation.
+    latencies: list[float] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def record(self: "Workload", latency: float | None) -> None:
+        """Record a completed operation, or an error for ``None``."""
+        with self.lock:
+            if latency is None:
+                self.errors += 1
+            else:
+                self.latencies.append(latency)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the throughput of concurrent contact list reads and contact writes on an SQLite file, "
+        "with Django's default connection settings and with the tuned SQLite profile."
+    )
+
+    def add_arguments(self: "Command", parser: ArgumentParser) -> None:
+        """Add the dataset size, concurrency and duration options."""
+        parser.add_argument("--rows", type=int, default=10_000, help="Contacts seeded before measuring.")
+        parser.add_argument("--readers", type=int, default=4, help="Threads loading list pages.")
+        parser.add_argument("--writers", type=int, default=2, help="Threads creating and updating contacts.")
+        parser.add_argument("--duration", type=float, default=5, help="Seconds each profile is measured for.")
+
+    def handle(self: "Command", *args: tuple, **options: dict) -> None:  # noqa: ARG002
+        """Run the workload against a fresh database file per profile and compare their throughput."""
+        if connection.vendor != "sqlite":
+            msg = "This benchmark measures SQLite; the default database is not SQLite."
+            raise CommandError(msg)
+        if options["readers"] < 0 or options["writers"] < 0 or options["readers"] + options["writers"] == 0:
+            msg = "--readers and --writers must not be negative, and at least one thread must run."
+            raise CommandError(msg)
+
+        tuned = tune_sqlite(
+            {"ENGINE": connection.settings_dict["ENGINE"]},
+            mmap_size=getattr(settings, "DATABASE_SQLITE_MMAP_SIZE", SQLITE_MMAP_SIZE),
+            cache_size_kib=getattr(settings, "DATABASE_SQLITE_CACHE_SIZE", SQLITE_CACHE_SIZE_KIB),
+            busy_timeout=getattr(settings, "DATABASE_SQLITE_BUSY_TIMEOUT", SQLITE_BUSY_TIMEOUT),
+        )
+        profiles = {"default": {}, "tuned": tuned["OPTIONS"]}
+
+        throughput = {}
+        old_options = connection.settings_dict["OPTIONS"]
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                for name, profile_options in profiles.items():
+                    connection.close()
+                    connection.settings_dict["OPTIONS"] = profile_options
+                    with isolated_database(str(Path(directory) / f"{name}.sqlite3")):
+                        workloads = self.run_profile(options)
+                    throughput[name] = self.report(name, workloads, options["duration"])
+        finally:
+            connection.close()
+            connection.settings_dict["OPTIONS"] = old_options
+
+        if throughput["default"]:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Tuned profile: {throughput['tuned'] / throughput['default']:.2f}x the operations per second.",
+                ),
+            )
+
+    def run_profile(self: "Command", options: dict) -> dict[str, Workload]:
+        """Seed the current database and run the reader and writer threads against it."""
+        statuses = [ContactStatusChoices.objects.create(name=name) for name in ("Active", "Archived", "Lead")]
+        create_contacts(options["rows"], [*statuses, None])
+        # Threads open their own connections; close this one so that it holds no lock.
+        connection.close()
+
+        workloads = {"read": Workload("read"), "write": Workload("write")}
+        sequence = count(WRITTEN_START)
+        deadline = time.monotonic() + options["duration"]
+        threads = [
+            threading.Thread(target=copy_context().run, args=(self.read, workloads["read"], deadline))
+            for _ in range(options["readers"])
+        ]
+        threads.extend(
+            threading.Thread(target=copy_context().run, args=(self.write, workloads["write"], deadline, sequence))
+            for _ in range(options["writers"])
+        )
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return workloads
+
+    @staticmethod
+    def read(workload: Workload, deadline: float) -> None:
+        """Load the first list page, with its count, until the deadline."""
+        try:
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    queryset = Contact.objects.select_related("status").order_by("last_name")
+                    queryset.count()
+                    list(queryset[:10])
+                except OperationalError:
+                    workload.record(None)
+                    continue
+                workload.record((time.perf_counter() - started) * 1000)
+        finally:
+            connection.close()
+
+    @staticmethod
+    def write(workload: Workload, deadline: float, sequence: count) -> None:
+        """Create a contact and update it in a transaction, like a create then an edit, until the deadline."""
+        try:
+            while time.monotonic() < deadline:
+                contact = next(build_contacts(1, start=next(sequence)))
+                started = time.perf_counter()
+                try:
+                    with transaction.atomic():
+                        contact.save()
+                        Contact.objects.filter(pk=contact.pk).update(city="Kraków")
+                except OperationalError:
+                    workload.record(None)
+                    continue
+                workload.record((time.perf_counter() - started) * 1000)
+        finally:
+            connection.close()
+
+    def report(self: "Command", name: str, workloads: dict[str, Workload], duration: float) -> float:
+        """
+        Write the throughput and latency of each workload of a profile.
+
+        :return:
+            float: Completed operations per second, reads and writes together.
+        """
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{name} profile"))
+        for workload in workloads.values():
+            line = f"  {workload.name:6} {len(workload.latencies) / duration:9.1f} ops/s  errors={workload.errors}"
+            if len(workload.latencies) >= 2:  # noqa: PLR2004
+                stats = summarize(workload.latencies)
+                line += f"  p50={stats['p50']:8.2f}ms  p95={stats['p95']:8.2f}ms  p99={stats['p99']:8.2f}ms"
+            self.stdout.write(line)
+        return sum(len(workload.latencies) for workload in workloads.values()) / duration
@@ -0,0 +1,173 @@
+import json
+import platform
+import subprocess
+from argparse import ArgumentParser
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+
+from contacts.models import Contact, ContactStatusChoices
+from testing.benchmarks import isolated_database
+from testing.bulk import create_contacts
+from testing.scenarios import (
+    ScenarioError,
+    compare_results,
+    contact_scenarios,
+    remove_scenario_contacts,
+    run_scenario,
+)
+
+DEFAULT_ROWS = (10_000,)
+
+# Settings that change what the scenarios measure, recorded with the results.
+RECORDED_SETTINGS = (
+    "CONTACT_PAGINATION",
+    "CONTACT_APPROXIMATE_COUNT",
+    "CONTACT_LIST_CACHE_TIMEOUT",
+    "CONTACT_API_FAST_SERIALIZATION",
+    "CONTACT_SEARCH_BACKEND",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure latency percentiles and queries per request of the contact pages and API on seeded "
+        "data, optionally storing the results as JSON and comparing them with a previous run."
+    )
+
+    def add_arguments(self: "Command", parser: ArgumentParser) -> None:
+        """Add the dataset size, scenario, repetition, output and comparison options."""
+        parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="Table sizes to benchmark.")
+        parser.add_argument("--scenarios", nargs="+", help="Names of the scenarios to run; all by default.")
+        parser.add_argument("--repeat", type=int, default=20, help="Measured requests per scenario.")
+        parser.add_argument("--warmup", type=int, default=2, help="Unmeasured requests sent first per scenario.")
+        parser.add_argument("--output", type=Path, help="JSON file to store the results in.")
+        parser.add_argument("--compare", type=Path, help="JSON file of a previous run to compare the results with.")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Relative p50 increase reported as a regression by --compare.",
+        )
+
+    def handle(self: "Command", *args: tuple, **options: dict) -> None:  # noqa: ARG002
+        """Seed a throwaway database to each size, run every scenario and report or store the results."""
+        if options["repeat"] < 2:  # noqa: PLR2004
+            msg = "--repeat must be at least 2."
+            raise CommandError(msg)
+        baseline = json.loads(options["compare"].read_text()) if options["compare"] else None
+
+        results = {}
+        with isolated_database():
+            statuses = [ContactStatusChoices.objects.create(name=name) for name in ("Active", "Archived", "Lead")]
+            user = get_user_model().objects.create_user("benchmark", password=None)
+            client = Client(SERVER_NAME="localhost")
+            client.force_login(user)
+            seeded = 0
+
+            for rows in sorted(options["rows"]):
+                create_contacts(rows - seeded, [*statuses, None], start=seeded)
+                seeded = rows
+                self.stdout.write(self.style.MIGRATE_HEADING(f"{rows} contacts"))
+                results[str(rows)] = self.run_scenarios(client, statuses[0], options)
+                remove_scenario_contacts()
+
+        report = self.build_report(results, options)
+        if options["output"]:
+            options["output"].write_text(json.dumps(report, indent=2) + "\n")
+            self.stdout.write(f"Results written to {options['output']}.")
+        if baseline is not None:
+            self.compare(baseline, report, options["threshold"])
+
+    def run_scenarios(
+        self: "Command",
+        client: Client,
+        status: ContactStatusChoices,
+        options: dict,
+    ) -> dict[str, dict[str, float]]:
+        """Run the selected scenarios on the current data and write one line per scenario."""
+        detail_pk = Contact.objects.filter(status=status).order_by("pk").values_list("pk", flat=True).first()
+        scenarios = contact_scenarios(status, detail_pk, options["warmup"] + options["repeat"])
+        if options["scenarios"]:
+            unknown = set(options["scenarios"]) - {scenario.name for scenario in scenarios}
+            if unknown:
+                msg = f"Unknown scenarios: {', '.join(sorted(unknown))}."
+                raise CommandError(msg)
+            scenarios = [scenario for scenario in scenarios if scenario.name in options["scenarios"]]
+
+        results = {}
+        for scenario in scenarios:
+            try:
+                stats = run_scenario(client, scenario, options["repeat"], options["warmup"])
+            except ScenarioError as e:
+                raise CommandError(e) from e
+            results[scenario.name] = stats
+            self.stdout.write(
+                f"  {scenario.name:18} p50={stats['p50']:8.2f}ms  p95={stats['p95']:8.2f}ms  "
+                f"p99={stats['p99']:8.2f}ms  queries={stats['queries']:5.1f}",
+            )
+        return results
+
+    @staticmethod
+    def build_report(results: dict, options: dict) -> dict:
+        """Return the results with what is needed to tell whether two runs are comparable."""
+        return {
+            "created_at": timezone.now().isoformat(),
+            "commit": current_commit(),
+            "repeat": options["repeat"],
+            "warmup": options["warmup"],
+            "environment": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": f"{connection.vendor} {'.'.join(map(str, connection.get_database_version()))}",
+            },
+            "settings": {name: getattr(settings, name, None) for name in RECORDED_SETTINGS},
+            "results": results,
+        }
+
+    def compare(self: "Command", baseline: dict, report: dict, threshold: float) -> None:
+        """
+        Report the regressions of a run against a baseline run.
+
+        :raises CommandError: If any scenario regressed, so that CI jobs fail.
+        """
+        if baseline.get("settings") != report["settings"]:
+            self.stdout.write(self.style.WARNING("The baseline was measured with different settings."))
+
+        regressions = []
+        for rows, results in report["results"].items():
+            if rows not in baseline.get("results", {}):
+                self.stdout.write(self.style.WARNING(f"The baseline has no results for {rows} contacts."))
+                continue
+            regressions.extend(
+                f"{rows} contacts, {regression}"
+                for regression in compare_results(baseline["results"][rows], results, threshold)
+            )
+
+        if regressions:
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(regression))
+            msg = f"{len(regressions)} regressions against {baseline.get('commit') or 'the baseline'}."
+            raise CommandError(msg)
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
+
+
+def current_commit() -> str | None:
+    """Return the git commit of the working tree, ``None`` outside a git checkout."""
+    try:
+        completed = subprocess.run(  # noqa: S603
+            ["git", "rev-parse", "HEAD"],  # noqa: S607
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=settings.BASE_DIR,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
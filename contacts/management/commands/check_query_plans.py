@@ -0,0 +1,174 @@
+import re
+import uuid
+from argparse import ArgumentParser
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import QuerySet
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+from rest_framework.settings import api_settings
+
+from api.views import ContactViewSet
+from contacts.models import ContactStatusChoices
+from contacts.pagination import KEYSET, OFFSET, KeysetPaginator
+from contacts.search import CONTACT_TABLE
+from contacts.views import ContactListView
+
+# Sample values standing in for a keyset cursor position.
+SAMPLE_POSITION = {"last_name": "M", "created_at": timezone.now, "pk": 0, "id": 0, "search_rank": 0.0}
+
+# Plan lines revealing that a query reads the whole table or sorts the whole result.
+FULL_SCAN_PATTERNS = {
+    "sqlite": re.compile(rf"\bSCAN {CONTACT_TABLE}\b(?! USING)"),
+    "postgresql": re.compile(rf"\bSeq Scan on {CONTACT_TABLE}\b"),
+}
+SORT_PATTERNS = {
+    "sqlite": re.compile(r"\bUSE TEMP B-TREE FOR (RIGHT PART OF )?ORDER BY\b"),
+    "postgresql": re.compile(r"(^|->)\s*Sort\b", re.MULTILINE),
+}
+
+
+@dataclass
+class QueryShape:
+    """A query issued by a contact list endpoint and the plan properties it must keep."""
+
+    name: str
+    queryset: QuerySet
+    # Searches narrow the result through the search index, so sorting the matches is fine.
+    allow_sort: bool = False
+
+    @property
+    def allow_scan(self: "QueryShape") -> bool:
+        """Unfiltered queries in primary key order stop scanning once the page is full."""
+        query = self.queryset.query
+        return not query.where and all(str(field).lstrip("-") in ("pk", "id") for field in query.order_by)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN for every query shape produced by ContactListView and ContactViewSet "
+        "and fail if any of them scans the whole contacts table or sorts a whole filtered result."
+    )
+
+    def add_arguments(self: "Command", parser: ArgumentParser) -> None:
+        """Add the database and verbosity options."""
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database to explain the queries on.")
+        parser.add_argument("--show-plans", action="store_true", help="Print the plan of every shape.")
+
+    def handle(self: "Command", *args: tuple, **options: dict) -> None:  # noqa: ARG002
+        """Explain every shape and report the ones that degrade."""
+        connection = connections[options["database"]]
+        if connection.vendor not in FULL_SCAN_PATTERNS:
+            msg = f"Query plans cannot be checked on {connection.vendor}."
+            raise CommandError(msg)
+
+        failures = []
+        with self.planner(connection) as status_id:
+            for shape in self.shapes(status_id):
+                plan = shape.queryset.using(options["database"]).explain()
+                problems = self.problems(connection.vendor, shape, plan)
+                if problems:
+                    failures.append(shape.name)
+                    self.stdout.write(self.style.ERROR(f"FAIL {shape.name}: {', '.join(problems)}"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"ok   {shape.name}"))
+                if problems or options["show_plans"]:
+                    self.stdout.write("\n".join(f"       {line}" for line in plan.splitlines()))
+
+        if failures:
+            msg = f"{len(failures)} query shape(s) degrade to a full scan or sort."
+            raise CommandError(msg)
+
+    @staticmethod
+    @contextmanager
+    def planner(connection: BaseDatabaseWrapper) -> Iterator[int]:
+        """
+        Configure the planner so that plans do not depend on the current table size.
+
+        PostgreSQL prefers sequential scans on small tables, so they are disabled for the
+        duration of the check: a sequential scan in the plan then means no index can serve
+        the query. SQLite plans from heuristics when the tables have not been analyzed.
+
+        :return:
+            Iterator[int]: Id of a sample status the status filters can refer to; it is
+            rolled back with everything else when the check ends.
+        """
+        with transaction.atomic(using=connection.alias):
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+            status = ContactStatusChoices.objects.using(connection.alias).create(name=f"check-{uuid.uuid4()}")
+            yield status.id
+            transaction.set_rollback(True, using=connection.alias)
+
+    @staticmethod
+    def problems(vendor: str, shape: QueryShape, plan: str) -> list[str]:
+        """Return the reasons a plan is rejected."""
+        problems = []
+        if not shape.allow_scan and FULL_SCAN_PATTERNS[vendor].search(plan):
+            problems.append("full table scan")
+        if not shape.allow_sort and SORT_PATTERNS[vendor].search(plan):
+            problems.append("sort of the whole result")
+        return problems
+
+    def shapes(self: "Command", status_id: int) -> Iterator[QueryShape]:
+        """Yield the page queries of the list view and the API for each pagination mode."""
+        for mode in (OFFSET, KEYSET):
+            with override_settings(CONTACT_PAGINATION=mode):
+                for params in self.list_view_params(str(status_id)):
+                    view = ContactListView()
+                    view.setup(RequestFactory().get("/", params))
+                    queryset = view.get_queryset()
+                    yield self.page_shape(
+                        f"list {mode} {params}",
+                        queryset,
+                        view.paginate_by,
+                        mode,
+                        search="q" in params,
+                    )
+
+                for params in self.api_params(str(status_id)):
+                    view = ContactViewSet(action_map={"get": "list"}, format_kwarg=None)
+                    view.setup(RequestFactory().get("/", params))
+                    view.request = view.initialize_request(view.request)
+                    queryset = view.filter_queryset(view.get_queryset())
+                    page_size = api_settings.PAGE_SIZE
+                    yield self.page_shape(f"api {mode} {params}", queryset, page_size, mode, search="search" in params)
+
+    @staticmethod
+    def page_shape(name: str, queryset: QuerySet, page_size: int, mode: str, *, search: bool) -> QueryShape:
+        """Build the shape of a page query, reading past a sample position in keyset mode."""
+        if mode == KEYSET:
+            paginator = KeysetPaginator(queryset, page_size)
+            position = [value() if callable(value := SAMPLE_POSITION[field]) else value for field in paginator.fields]
+            queryset = paginator.get_queryset(position)
+        return QueryShape(name, queryset[:page_size], allow_sort=search)
+
+    @staticmethod
+    def list_view_params(status: str) -> Iterator[dict]:
+        """Yield the GET parameters of every list view query shape."""
+        for sort in ("last_name", "-last_name", "created_at", "-created_at"):
+            yield {"sort": sort}
+            yield {"sort": sort, "status": status}
+            yield {"sort": sort, "q": "kowalski"}
+            yield {"sort": sort, "q": "kowalski", "status": status}
+        yield {"sort": "relevance", "q": "kowalski"}
+
+    @staticmethod
+    def api_params(status: str) -> Iterator[dict]:
+        """Yield the query parameters of every API list query shape."""
+        yield {}
+        yield {"search": "kowalski"}
+        for ordering in ("last_name", "-last_name", "created_at", "-created_at"):
+            yield {"ordering": ordering}
+            yield {"ordering": ordering, "status": status}
+            yield {"ordering": ordering, "search": "kowalski"}
+        yield {"status": status}
+        yield {"city": "Warsaw"}
+        yield {"city": "Warsaw", "ordering": "last_name"}
+        yield {"city": "Warsaw", "ordering": "-last_name"}
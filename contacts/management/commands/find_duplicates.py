@@ -0,0 +1,74 @@
+from argparse import ArgumentParser
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from contacts.dedupe import DedupeStats, DuplicateFinder
+from contacts.jobs import enqueue
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the blocking keys of every contact and store the pairs of likely duplicates found within "
+        "blocks as duplicate candidates, in chunks and optionally in several processes."
+    )
+
+    def add_arguments(self: "Command", parser: ArgumentParser) -> None:
+        """Add the chunking, parallelism and scoring options."""
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Contacts read and scored per chunk.")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Processes computing keys and scores while this one reads and writes.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            help="Minimum score of a candidate, from 0 to 1; CONTACT_DEDUPE_THRESHOLD by default.",
+        )
+        parser.add_argument(
+            "--max-block-size",
+            type=int,
+            help="Largest block compared pairwise; CONTACT_DEDUPE_MAX_BLOCK_SIZE by default.",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database to deduplicate.")
+        parser.add_argument(
+            "--enqueue",
+            action="store_true",
+            help="Queue the run as a background job for run_workers instead of running it now.",
+        )
+
+    def handle(self: "Command", *args: tuple, **options: dict) -> None:  # noqa: ARG002
+        """Run the detection and report its counts and timings."""
+        if options["chunk_size"] < 1 or options["workers"] < 1:
+            msg = "--chunk-size and --workers must be positive."
+            raise CommandError(msg)
+        if options["threshold"] is not None and not 0 <= options["threshold"] <= 1:
+            msg = "--threshold must be between 0 and 1."
+            raise CommandError(msg)
+        if options["max_block_size"] is not None and options["max_block_size"] < 2:  # noqa: PLR2004
+            msg = "--max-block-size must be at least 2."
+            raise CommandError(msg)
+
+        finder_options = {
+            "using": options["database"],
+            "chunk_size": options["chunk_size"],
+            "workers": options["workers"],
+            "threshold": options["threshold"],
+            "max_block_size": options["max_block_size"],
+        }
+        if options["enqueue"]:
+            job = enqueue("find_duplicates", finder_options)
+            self.stdout.write(self.style.SUCCESS(f"Queued job {job.pk}."))
+            return
+        self.report(DuplicateFinder(**finder_options).run())
+
+    def report(self: "Command", stats: DedupeStats) -> None:
+        """Write the counts and timings of a run."""
+        self.stdout.write(
+            f"Keys: {stats.keys} for {stats.contacts} contacts in {stats.timings['keys']:.1f}s.\n"
+            f"Blocks: {stats.blocks} compared, {stats.skipped_blocks} skipped as too large; "
+            f"{stats.pairs} pairs scored in {stats.timings['candidates']:.1f}s.",
+        )
+        self.stdout.write(self.style.SUCCESS(f"Found {stats.candidates} duplicate candidates."))
@@ -0,0 +1,48 @@
+from argparse import ArgumentParser
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from contacts.importing import (
+    DEFAULT_CHUNK_SIZE,
+    FORMATS,
+    ImportFormatError,
+    detect_format,
+    import_contacts,
+)
+
+
+class Command(BaseCommand):
+    help = "Import contacts from a CSV, JSON or NDJSON file, validating and inserting them in chunks."
+
+    def add_arguments(self: "Command", parser: ArgumentParser) -> None:
+        """Add the file, format and chunking options."""
+        parser.add_argument("path", type=Path, help="File to import.")
+        parser.add_argument("--format", choices=FORMATS, help="File format; guessed from the extension by default.")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per insert transaction.")
+        parser.add_argument("--create-statuses", action="store_true", help="Create statuses that do not exist yet.")
+        parser.add_argument("--dry-run", action="store_true", help="Validate the file without keeping any contact.")
+
+    def handle(self: "Command", *args: tuple, **options: dict) -> None:  # noqa: ARG002
+        """Import the file and report the rejected rows."""
+        try:
+            fmt = options["format"] or detect_format(options["path"].name)
+            with options["path"].open("rb") as stream:
+                result = import_contacts(
+                    stream,
+                    fmt,
+                    chunk_size=options["chunk_size"],
+                    create_statuses=options["create_statuses"],
+                    dry_run=options["dry_run"],
+                )
+        except (ImportFormatError, OSError) as e:
+            raise CommandError(e) from e
+
+        for error in result.errors:
+            messages = "; ".join(f"{name}: {' '.join(errors)}" for name, errors in error.errors.items())
+            self.stderr.write(f"row {error.row}: {messages}")
+        if result.error_count > len(result.errors):
+            self.stderr.write(f"... and {result.error_count - len(result.errors)} more rejected rows")
+
+        verb = "Would import" if options["dry_run"] else "Imported"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {result.created} contacts, rejected {result.error_count} rows."))
@@ -0,0 +1,21 @@
+from argparse import ArgumentParser
+
+from django.core.management.base import BaseCommand
+
+from contacts.list_cache import list_cache
+
+
+class Command(BaseCommand):
+    help = "Show the hit ratio of the contact list table cache."
+
+    def add_arguments(self: "Command", parser: ArgumentParser) -> None:
+        """Add the reset option."""
+        parser.add_argument("--reset", action="store_true", help="Reset the counts after showing them.")
+
+    def handle(self: "Command", *args: tuple, **options: dict) -> None:  # noqa: ARG002
+        """Show the hit and miss counts and the hit ratio."""
+        stats = list_cache.stats()
+        self.stdout.write(f"hits: {stats.hits}  misses: {stats.misses}  hit ratio: {stats.ratio:.1%}")
+        if options["reset"]:
+            list_cache.reset_stats()
+            self.stdout.write("Counts reset.")
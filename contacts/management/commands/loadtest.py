@@ -0,0 +1,117 @@
+import asyncio
+from argparse import ArgumentParser
+from importlib import import_module
+from pathlib import Path
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY,
+    HASH_SESSION_KEY,
+    SESSION_KEY,
+    get_user_model,
+)
+from django.core.management.base import BaseCommand, CommandError
+
+from testing.loadtest import LoadTestError, LoadTestResult, run_load_test
+
+
+class Command(BaseCommand):
+    help = (
+        "Load running servers with concurrent clients and compare their throughput, e.g. the WSGI "
+        "/api/contacts/ against the ASGI /api/async/contacts/. Targets are URLs or label=URL pairs; "
+        "with --replay they are base URLs the replayed paths are resolved against."
+    )
+
+    def add_arguments(self: "Command", parser: ArgumentParser) -> None:
+        """Add the target, concurrency, duration, slow client and login options."""
+        parser.add_argument("targets", nargs="+", help="URLs to load, one after the other, as URL or label=URL.")
+        parser.add_argument("--concurrency", type=int, default=50, help="Clients sending requests back to back.")
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds to load each target for.")
+        parser.add_argument(
+            "--slow-clients",
+            type=int,
+            default=0,
+            help="Extra clients holding connections open by sending a header line a second.",
+        )
+        parser.add_argument(
+            "--replay",
+            type=Path,
+            help="File of paths to request in turn, one per line; blank lines and # comments are skipped.",
+        )
+        parser.add_argument("--user", help="Username to send the requests as, with a new session of this database.")
+
+    def handle(self: "Command", *args: tuple, **options: dict) -> None:  # noqa: ARG002
+        """Load every target in turn and report its throughput and latency."""
+        headers = {"Accept": "application/json"}
+        if options["user"]:
+            headers["Cookie"] = self.session_cookie(options["user"])
+
+        paths = self.read_replay(options["replay"]) if options["replay"] else None
+        results = []
+        for target in options["targets"]:
+            label, _, url = target.partition("=") if "=" in target.split("?", 1)[0] else ("", "", target)
+            try:
+                result = asyncio.run(
+                    run_load_test(
+                        [urljoin(url, path) for path in paths] if paths else url,
+                        concurrency=options["concurrency"],
+                        duration=options["duration"],
+                        headers=headers,
+                        slow_clients=options["slow_clients"],
+                    ),
+                )
+            except LoadTestError as e:
+                raise CommandError(e) from e
+            results.append((label or url, result))
+            self.report(label or url, result)
+
+        if len(results) > 1:
+            (base_label, base), *others = results
+            for label, result in others:
+                ratio = result.throughput / base.throughput if base.throughput else float("inf")
+                self.stdout.write(f"{label}: {ratio:.2f}x the throughput of {base_label}")
+
+    def report(self: "Command", label: str, result: LoadTestResult) -> None:
+        """Write the throughput, latency percentiles and errors of one target."""
+        self.stdout.write(
+            f"{label}: {result.throughput:8.1f} req/s  {result.requests} ok  {result.errors} errors  "
+            f"p50={result.percentile(50):.1f}ms  p95={result.percentile(95):.1f}ms  p99={result.percentile(99):.1f}ms",
+        )
+        if result.errors:
+            self.stdout.write(self.style.WARNING(f"{label}: {result.errors} requests failed."))
+
+    @staticmethod
+    def read_replay(path: Path) -> list[str]:
+        """
+        Read the paths of a replay file.
+
+        :raises CommandError: If the file lists no paths.
+        """
+        lines = [line.strip() for line in path.read_text().splitlines()]
+        paths = [line for line in lines if line and not line.startswith("#")]
+        if not paths:
+            msg = f"{path} lists no paths to replay."
+            raise CommandError(msg)
+        return paths
+
+    @staticmethod
+    def session_cookie(username: str) -> str:
+        """
+        Create a session logged in as a user and return its cookie.
+
+        :raises CommandError: If there is no such user.
+        """
+        user_model = get_user_model()
+        try:
+            user = user_model._default_manager.get_by_natural_key(username)  # noqa: SLF001
+        except user_model.DoesNotExist as e:
+            msg = f"User {username!r} does not exist."
+            raise CommandError(msg) from e
+
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        session[SESSION_KEY] = user._meta.pk.value_to_string(user)  # noqa: SLF001
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.save()
+        return f"{settings.SESSION_COOKIE_NAME}={session.session_key}"
@@ -0,0 +1,31 @@
+from argparse import ArgumentParser
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from contacts.counters import reconcile_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the per-status and per-city contact counters from the contacts, one range of primary keys "
+        "at a time, and fix the counters that drifted."
+    )
+
+    def add_arguments(self: "Command", parser: ArgumentParser) -> None:
+        """Add the chunking and dry run options."""
+        parser.add_argument("--chunk-size", type=int, default=50_000, help="Contacts counted per query.")
+        parser.add_argument("--dry-run", action="store_true", help="Report the drifted counters without fixing them.")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database to reconcile.")
+
+    def handle(self: "Command", *args: tuple, **options: dict) -> None:  # noqa: ARG002
+        """Reconcile the counters and report those that differed."""
+        if options["chunk_size"] < 1:
+            msg = "--chunk-size must be positive."
+            raise CommandError(msg)
+
+        drift = reconcile_counts(options["chunk_size"], dry_run=options["dry_run"], using=options["database"])
+        for (dimension, value), (stored, actual) in sorted(drift.items()):
+            self.stdout.write(f"{dimension} {value!r}: {stored} -> {actual}")
+        verb = "would be fixed" if options["dry_run"] else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"{len(drift)} counter(s) {verb}."))
@@ -0,0 +1,54 @@
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import get_context
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+
+from contacts.jobs import TASKS, Worker, run_worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the background jobs queued in the database, in a pool of worker threads and optionally "
+        "several processes, until interrupted."
+    )
+
+    def add_arguments(self: "Command", parser: ArgumentParser) -> None:
+        """Add the pool size, polling and burst options."""
+        parser.add_argument("--processes", type=int, default=1, help="Worker processes.")
+        parser.add_argument("--threads", type=int, default=1, help="Jobs run at once by each process.")
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds a worker waits before looking for jobs again when none is ready.",
+        )
+        parser.add_argument("--burst", action="store_true", help="Stop once no job is ready instead of waiting.")
+
+    def handle(self: "Command", *args: tuple, **options: dict) -> None:  # noqa: ARG002
+        """Run the workers in this process, or in spawned ones."""
+        processes, threads = options["processes"], options["threads"]
+        if processes < 1 or threads < 1 or options["poll_interval"] <= 0:
+            msg = "--processes, --threads and --poll-interval must be positive."
+            raise CommandError(msg)
+
+        self.stdout.write(
+            f"Running {processes * threads} worker(s) in {processes} process(es) for tasks: {', '.join(sorted(TASKS))}",
+        )
+        arguments = (threads, options["poll_interval"], options["burst"])
+        if processes == 1:
+            Worker(*arguments).run()
+        else:
+            # Spawned processes set Django up from scratch, which also registers the tasks.
+            context = get_context("spawn")
+            with ProcessPoolExecutor(processes, mp_context=context, initializer=django.setup) as pool:
+                futures = [pool.submit(run_worker, *arguments) for _ in range(processes)]
+                try:
+                    wait(futures)
+                except KeyboardInterrupt:
+                    # The interrupt reaches the worker processes too, which finish their jobs and stop.
+                    wait(futures)
+                for future in futures:
+                    future.result()
+        self.stdout.write(self.style.SUCCESS("Workers stopped."))
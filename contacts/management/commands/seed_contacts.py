@@ -0,0 +1,184 @@
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from datetime import timedelta
+from itertools import repeat
+from multiprocessing import get_context
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Max
+from django.utils import timezone
+
+from contacts.counters import reconcile_counts
+from contacts.list_cache import list_cache
+from contacts.models import Contact, ContactStatusChoices
+from testing.bulk import (
+    DEFAULT_BATCH_SIZE,
+    ContactSeed,
+    deferred_indexes,
+    insert_seed,
+    reset_contact_sequence,
+)
+
+# Phone numbers have 9 digits, so sequence numbers must stay below this.
+MAX_SEQUENCE_NUMBER = 10**9
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert large numbers of unique synthetic contacts with executemany, in one transaction per batch "
+        "and optionally from several processes writing disjoint primary key ranges."
+    )
+
+    def add_arguments(self: "Command", parser: ArgumentParser) -> None:
+        """Add the count, status distribution, batching, parallelism and index options."""
+        parser.add_argument("count", type=int, help="Number of contacts to insert.")
+        parser.add_argument(
+            "--status",
+            action="append",
+            metavar="NAME=WEIGHT",
+            help="Status and its relative weight, repeatable; missing statuses are created. "
+            "Defaults to every existing status with equal weights.",
+        )
+        parser.add_argument(
+            "--without-status",
+            type=float,
+            default=0,
+            help="Relative weight of contacts without status.",
+        )
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per transaction.")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Processes inserting disjoint ranges; SQLite serializes their writes.",
+        )
+        parser.add_argument(
+            "--start",
+            type=int,
+            help="Sequence number of the first contact; after the last by default.",
+        )
+        parser.add_argument("--days", type=float, default=365, help="Days the creation times are spread over.")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the status distribution.")
+        parser.add_argument(
+            "--keep-indexes",
+            action="store_true",
+            help="Update the secondary and search indexes row by row instead of building them at the end.",
+        )
+        parser.add_argument(
+            "--durable",
+            action="store_true",
+            help="Wait for the disk on every commit; faster loads risk corrupting SQLite databases on power loss.",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="Database to seed.")
+
+    def handle(self: "Command", *args: tuple, **options: dict) -> None:  # noqa: ARG002
+        """Insert the contacts and report the insert and index build rates."""
+        using = options["database"]
+        count = options["count"]
+        if count < 1 or options["workers"] < 1 or options["batch_size"] < 1:
+            msg = "count, --workers and --batch-size must be positive."
+            raise CommandError(msg)
+        if options["workers"] > 1 and connections[using].vendor == "sqlite" and connections[using].is_in_memory_db():
+            msg = "Worker processes cannot share an in-memory SQLite database."
+            raise CommandError(msg)
+
+        start = self.next_sequence_number(using) if options["start"] is None else options["start"]
+        if start < 0 or start + count > MAX_SEQUENCE_NUMBER:
+            msg = f"Sequence numbers {start}-{start + count - 1} do not fit 9-digit phone numbers."
+            raise CommandError(msg)
+
+        status_ids, weights = self.status_distribution(options, using)
+        interval = timedelta(days=options["days"]) / count
+        seed = ContactSeed(
+            start=start,
+            count=count,
+            first_id=(Contact.objects.using(using).aggregate(last=Max("id"))["last"] or 0) + 1,
+            origin=timezone.now() - interval * count,
+            interval=interval,
+            status_ids=status_ids,
+            weights=weights,
+            seed=options["seed"],
+        )
+
+        started = time.perf_counter()
+        with nullcontext() if options["keep_indexes"] else deferred_indexes(using):
+            inserted = self.insert(seed, options)
+            insert_time = time.perf_counter() - started
+        reset_contact_sequence(using)
+        # The rows are inserted without signals, so the counters are recomputed once.
+        reconcile_counts(using=using)
+        list_cache.invalidate(using)
+        total_time = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Inserted {inserted} contacts in {insert_time:.1f}s ({inserted / insert_time:,.0f} rows/s), "
+                f"{total_time:.1f}s with indexes ({inserted / total_time:,.0f} rows/s).",
+            ),
+        )
+
+    @staticmethod
+    def insert(seed: ContactSeed, options: dict) -> int:
+        """Insert the contacts in this process, or split them among worker processes."""
+        using, batch_size, durable = options["database"], options["batch_size"], options["durable"]
+        if options["workers"] == 1:
+            return insert_seed(seed, using, batch_size, durable)
+
+        # Workers open their own connections; spawned processes set Django up from scratch.
+        connections.close_all()
+        parts = seed.split(options["workers"])
+        with ProcessPoolExecutor(len(parts), mp_context=get_context("spawn"), initializer=django.setup) as pool:
+            return sum(pool.map(insert_seed, parts, repeat(using), repeat(batch_size), repeat(durable)))
+
+    @staticmethod
+    def next_sequence_number(using: str) -> int:
+        """
+        Return the sequence number following the highest phone number.
+
+        :raises CommandError: If phone numbers are not all numeric.
+        """
+        last = Contact.objects.using(using).aggregate(last=Max("phone_number"))["last"]
+        if last is None:
+            return 0
+        if not last.isdigit():
+            msg = f"Cannot continue after phone number {last!r}; pass --start."
+            raise CommandError(msg)
+        return int(last) + 1
+
+    @staticmethod
+    def status_distribution(options: dict, using: str) -> tuple[list[int | None], list[float]]:
+        """
+        Return the status ids to draw from and their weights.
+
+        :raises CommandError: If a ``--status`` option is malformed or every weight is zero.
+        """
+        if options["status"]:
+            distribution = {}
+            for option in options["status"]:
+                name, _, weight = option.rpartition("=")
+                try:
+                    distribution[name] = float(weight) if name else None
+                except ValueError:
+                    distribution[name] = None
+                if distribution[name] is None:
+                    msg = f"Invalid --status {option!r}; expected NAME=WEIGHT."
+                    raise CommandError(msg)
+            statuses = {
+                name: ContactStatusChoices.objects.using(using).get_or_create(name=name)[0].pk for name in distribution
+            }
+            status_ids, weights = list(statuses.values()), list(distribution.values())
+        else:
+            status_ids = list(ContactStatusChoices.objects.using(using).order_by("pk").values_list("pk", flat=True))
+            weights = [1.0] * len(status_ids)
+
+        if options["without_status"] > 0 or not status_ids:
+            status_ids.append(None)
+            weights.append(options["without_status"] or 1.0)
+        if min(weights) < 0 or sum(weights) <= 0:
+            msg = "Status weights must not be negative and must not all be zero."
+            raise CommandError(msg)
+        return status_ids, weights
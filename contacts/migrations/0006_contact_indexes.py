@@ -0,0 +1,50 @@
+# Generated by Django 5.2 on 2026-10-18 10:34
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contacts", "0005_alter_contact_status"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(fields=["last_name", "id"], name="contact_last_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(fields=["created_at", "id"], name="contact_created_at_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(fields=["status", "last_name", "id"], name="contact_status_last_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(fields=["status", "created_at", "id"], name="contact_status_created_at_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(fields=["city", "id"], name="contact_city_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(fields=["city", "last_name", "id"], name="contact_city_last_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(django.db.models.functions.text.Upper("email"), name="contact_email_upper_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(
+                django.db.models.functions.text.Upper("last_name"),
+                django.db.models.functions.text.Upper("first_name"),
+                name="contact_name_upper_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2 on 2026-10-18 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contacts", "0007_citylocation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="contact",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(fields=["updated_at"], name="contact_updated_at_idx"),
+        ),
+    ]
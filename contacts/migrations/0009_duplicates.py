@@ -0,0 +1,73 @@
+# Generated by Django 5.2 on 2026-10-18 12:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contacts", "0008_contact_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContactBlockingKey",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("name", "Normalized name"),
+                            ("phonetic", "Phonetic name"),
+                            ("city", "City and phonetic last name"),
+                            ("email", "Email local part"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("key", models.CharField(max_length=100)),
+                (
+                    "contact",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="blocking_keys", to="contacts.contact"
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("kind", "key", "contact"), name="contact_blocking_key_unique")
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="DuplicateCandidate",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("score", models.FloatField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "contact",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="+", to="contacts.contact"
+                    ),
+                ),
+                (
+                    "duplicate",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="+", to="contacts.contact"
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [models.Index(fields=["-score", "id"], name="duplicate_candidate_score_idx")],
+                "constraints": [
+                    models.UniqueConstraint(fields=("contact", "duplicate"), name="duplicate_candidate_unique"),
+                    models.CheckConstraint(
+                        condition=models.Q(("contact__lt", models.F("duplicate"))), name="duplicate_candidate_ordered"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2 on 2026-10-18 13:23
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_contacts(apps, schema_editor):
+    """Fill the counters from the existing contacts."""
+    Contact = apps.get_model("contacts", "Contact")
+    ContactCount = apps.get_model("contacts", "ContactCount")
+    using = schema_editor.connection.alias
+    contacts = Contact.objects.using(using).order_by()
+    counts = [
+        ContactCount(dimension="status", value="" if status is None else str(status), count=count)
+        for status, count in contacts.values_list("status").annotate(Count("id"))
+    ]
+    counts += [
+        ContactCount(dimension="city", value=city, count=count)
+        for city, count in contacts.values_list("city").annotate(Count("id"))
+    ]
+    ContactCount.objects.using(using).bulk_create(counts, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contacts", "0011_jobs"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContactCount",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("dimension", models.CharField(choices=[("status", "Status"), ("city", "City")], max_length=10)),
+                ("value", models.CharField(blank=True, max_length=50)),
+                ("count", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "constraints": [models.UniqueConstraint(fields=("dimension", "value"), name="contact_count_unique")],
+            },
+        ),
+        migrations.RunPython(count_contacts, migrations.RunPython.noop),
+    ]
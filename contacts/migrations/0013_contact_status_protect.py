@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-18 14:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contacts", "0012_contact_counts"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="contact",
+            name="status",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Optional status selected from predefined choices.",
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                to="contacts.contactstatuschoices",
+            ),
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.functions import Upper
+from django.utils import timezone
 
 
 class ContactStatusChoices(models.Model):
@@ -30,13 +32,239 @@ class Contact(models.Model):
     city = models.CharField(max_length=50)
     status = models.ForeignKey(
         ContactStatusChoices,
-        on_delete=models.CASCADE,
+        on_delete=models.PROTECT,
         blank=True,
         null=True,
         help_text="Optional status selected from predefined choices.",
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        """
+        Metadata for Contact.
+
+        The composite indexes match the list view and API access paths: an optional
+        `status` or `city` filter followed by an ordering on `last_name` or `created_at`,
+        with `id` as the tiebreaker used by keyset pagination. The `Upper` indexes serve
+        case-insensitive equality lookups on emails and names, and the `updated_at` index
+        the `MAX(updated_at)` read by conditional GET.
+        """
+
+        indexes = [  # noqa: RUF012
+            models.Index(fields=["last_name", "id"], name="contact_last_name_idx"),
+            models.Index(fields=["created_at", "id"], name="contact_created_at_idx"),
+            models.Index(fields=["status", "last_name", "id"], name="contact_status_last_name_idx"),
+            models.Index(fields=["status", "created_at", "id"], name="contact_status_created_at_idx"),
+            models.Index(fields=["city", "id"], name="contact_city_idx"),
+            models.Index(fields=["city", "last_name", "id"], name="contact_city_last_name_idx"),
+            models.Index(Upper("email"), name="contact_email_upper_idx"),
+            models.Index(Upper("last_name"), Upper("first_name"), name="contact_name_upper_idx"),
+            models.Index(fields=["updated_at"], name="contact_updated_at_idx"),
+        ]
 
     def __str__(self: "Contact") -> str:
         """:return: name combined of the first name and last name of the contact"""
         return f"{self.first_name} {self.last_name}"
+
+    @classmethod
+    def from_db(cls: type["Contact"], db: str, field_names: list[str], values: list) -> "Contact":
+        """Load a contact, remembering the status and city it is counted under (see `contacts.counters`)."""
+        instance = super().from_db(db, field_names, values)
+        if "status_id" in field_names and "city" in field_names:
+            instance._counted = (instance.status_id, instance.city)  # noqa: SLF001
+        return instance
+
+
+class CityLocation(models.Model):
+    """
+    Model caching the geocoded coordinates of a city.
+
+    Names are stored normalized (see `contacts.weather.normalize_city`). Cities the
+    geocoding service does not know are stored without coordinates, so they are not
+    looked up again either.
+    """
+
+    name = models.CharField(max_length=50, unique=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self: "CityLocation") -> str:
+        """:return: normalized name of the city"""
+        return self.name
+
+
+class ContactBlockingKey(models.Model):
+    """
+    Model indexing contacts by the keys duplicate detection compares them within.
+
+    Contacts sharing a key form a block, and only the contacts of a block are compared
+    (see `contacts.dedupe`). The rows are derived from the contacts and rebuilt by the
+    `find_duplicates` command.
+    """
+
+    class Kind(models.TextChoices):
+        """Kinds of blocking keys."""
+
+        NAME = "name", "Normalized name"
+        PHONETIC = "phonetic", "Phonetic name"
+        CITY = "city", "City and phonetic last name"
+        EMAIL = "email", "Email local part"
+
+    contact = models.ForeignKey(Contact, on_delete=models.CASCADE, related_name="blocking_keys")
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    key = models.CharField(max_length=100)
+
+    class Meta:
+        """Metadata for ContactBlockingKey; the unique constraint's index serves reading the blocks in key order."""
+
+        constraints = [  # noqa: RUF012
+            models.UniqueConstraint(fields=["kind", "key", "contact"], name="contact_blocking_key_unique"),
+        ]
+
+    def __str__(self: "ContactBlockingKey") -> str:
+        """:return: kind and value of the key"""
+        return f"{self.kind}:{self.key}"
+
+
+class DuplicateCandidate(models.Model):
+    """
+    Model representing two contacts that are likely the same person.
+
+    Pairs are stored once, with the lower id as `contact`, and scored from 0 to 1 by
+    `contacts.dedupe.score`. Merging either contact deletes the pair.
+    """
+
+    contact = models.ForeignKey(Contact, on_delete=models.CASCADE, related_name="+")
+    duplicate = models.ForeignKey(Contact, on_delete=models.CASCADE, related_name="+")
+    score = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        """Metadata for DuplicateCandidate; candidates are listed from the highest score."""
+
+        constraints = [  # noqa: RUF012
+            models.UniqueConstraint(fields=["contact", "duplicate"], name="duplicate_candidate_unique"),
+            models.CheckConstraint(
+                condition=models.Q(contact__lt=models.F("duplicate")),
+                name="duplicate_candidate_ordered",
+            ),
+        ]
+        indexes = [  # noqa: RUF012
+            models.Index(fields=["-score", "id"], name="duplicate_candidate_score_idx"),
+        ]
+
+    def __str__(self: "DuplicateCandidate") -> str:
+        """:return: ids of the two contacts and their score"""
+        return f"{self.contact_id} ~ {self.duplicate_id} ({self.score:.2f})"
+
+
+class ContactChange(models.Model):
+    """
+    Model recording that a contact was created, updated or deleted, for delta sync.
+
+    The log is append-only: its ids are the sequence numbers clients sync from (see
+    `contacts.changes`). It stores the contact's id rather than a foreign key, so that
+    deletions stay as tombstones after the contact is gone.
+    """
+
+    class Action(models.TextChoices):
+        """Kinds of changes."""
+
+        CREATED = "created", "Created"
+        UPDATED = "updated", "Updated"
+        DELETED = "deleted", "Deleted"
+
+    contact_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=Action.choices)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self: "ContactChange") -> str:
+        """:return: sequence number, action and contact id of the change"""
+        return f"#{self.pk} {self.action} {self.contact_id}"
+
+
+class ContactCount(models.Model):
+    """
+    Model holding the number of contacts per status and per city.
+
+    The counters are denormalized from `Contact` and updated in place as contacts are
+    written (see `contacts.counters`), so that the counts are read without a `GROUP BY`
+    over the contacts. `value` is the status id, or "" for contacts without a status, or
+    the city.
+    """
+
+    class Dimension(models.TextChoices):
+        """What the contacts are counted by."""
+
+        STATUS = "status", "Status"
+        CITY = "city", "City"
+
+    dimension = models.CharField(max_length=10, choices=Dimension.choices)
+    value = models.CharField(max_length=50, blank=True)
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        """Metadata for ContactCount."""
+
+        constraints = [  # noqa: RUF012
+            models.UniqueConstraint(fields=["dimension", "value"], name="contact_count_unique"),
+        ]
+
+    def __str__(self: "ContactCount") -> str:
+        """:return: dimension, value and count"""
+        return f"{self.dimension} {self.value!r}: {self.count}"
+
+
+class Job(models.Model):
+    """
+    Model representing a background job, queued in the database and run by `run_workers`.
+
+    A worker claims a queued job by setting its `status` to running and leasing it until
+    `locked_until`, which it extends while the job runs; a job whose lease expires is
+    queued again (see `contacts.jobs`). Failed attempts are retried after `run_after`
+    until `max_attempts` is reached.
+    """
+
+    class Status(models.TextChoices):
+        """States of a job."""
+
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        SUCCEEDED = "succeeded", "Succeeded"
+        FAILED = "failed", "Failed"
+
+    name = models.CharField(max_length=100, help_text="Name of the registered task the job runs.")
+    payload = models.JSONField(default=dict, blank=True, help_text="Keyword arguments of the task.")
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    priority = models.SmallIntegerField(default=0, help_text="Jobs with a higher priority run first.")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        """
+        Metadata for Job.
+
+        The queue index serves claiming the next queued job in priority order, and the
+        lease index finding the running jobs whose lease expired.
+        """
+
+        indexes = [  # noqa: RUF012
+            models.Index(fields=["status", "-priority", "run_after", "id"], name="job_queue_idx"),
+            models.Index(fields=["status", "locked_until"], name="job_lease_idx"),
+        ]
+
+    def __str__(self: "Job") -> str:
+        """:return: id, task name and status of the job"""
+        return f"#{self.pk} {self.name} ({self.status})"
@@ -0,0 +1,306 @@
+"""
+Keyset (cursor) pagination shared by the contact list view and the API.
+
+Offset pagination runs ``COUNT(*)`` and ``OFFSET n`` for every page, so its cost grows with
+the page number. Keyset pagination instead remembers the ordering values of the last row
+shown and asks for the rows after it, which an index on the ordering columns answers in
+constant time however deep the page is. The position is handed to clients as an opaque
+cursor; filters such as ``q`` and ``status`` stay in the query string next to it.
+"""
+
+import base64
+import binascii
+import json
+import math
+from collections.abc import Iterator, Sequence
+from datetime import datetime
+from functools import cached_property
+
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.db import connections
+from django.db.models import Model, Q, QuerySet
+
+OFFSET = "offset"
+KEYSET = "keyset"
+
+# Capped counts stop at this many rows when the database cannot estimate row counts.
+APPROXIMATE_COUNT_CAP = 10_000
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def encode_cursor(position: Sequence | None, *, reverse: bool = False, number: int = 1) -> str:
+    """
+    Encode a page position as an opaque, URL-safe cursor.
+
+    :param position: Ordering values of the row the page starts after, ``None`` for an edge.
+    :param reverse: Whether the page is read backwards from the position.
+    :param number: Page number displayed for the page.
+
+    :return:
+        str: Base64-encoded cursor.
+    """
+    values = None if position is None else [v.isoformat() if isinstance(v, datetime) else v for v in position]
+    payload = json.dumps({"p": values, "r": reverse, "n": number}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[list | None, bool, int]:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    :param cursor: Base64-encoded cursor.
+
+    :return:
+        tuple: The position, reverse flag and page number.
+
+    :raises InvalidCursor: If the cursor is malformed.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        position, reverse, number = payload["p"], bool(payload["r"]), int(payload["n"])
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise InvalidCursor("Invalid cursor.") from e
+    if position is not None and not isinstance(position, list):
+        raise InvalidCursor("Invalid cursor.")
+    return position, reverse, max(number, 1)
+
+
+def approximate_count(queryset: QuerySet) -> tuple[int, bool]:
+    """
+    Count the rows of a queryset without necessarily visiting all of them.
+
+    PostgreSQL answers with the planner's row estimate for large results. Other databases
+    count at most ``APPROXIMATE_COUNT_CAP`` rows.
+
+    :param queryset: Queryset to count.
+
+    :return:
+        tuple: The count and whether it is exact.
+    """
+    queryset = queryset.order_by()
+    if connections[queryset.db].vendor == "postgresql":
+        plan = json.loads(queryset.explain(format="json"))
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate >= APPROXIMATE_COUNT_CAP:
+            return estimate, False
+
+    count = queryset.values("pk")[:APPROXIMATE_COUNT_CAP].count()
+    return count, count < APPROXIMATE_COUNT_CAP
+
+
+class KeysetPaginator:
+    """
+    Paginate an ordered queryset by cursor instead of by page number.
+
+    The queryset's ordering is extended with the primary key as a tiebreaker, so every row
+    has a unique position. Ordering fields must be plain, non-null model fields or
+    annotations.
+    """
+
+    def __init__(
+        self: "KeysetPaginator",
+        queryset: QuerySet,
+        per_page: int,
+        *,
+        approximate: bool = False,
+    ) -> None:
+        """
+        Initialize the paginator.
+
+        :param queryset: Queryset to paginate; unordered querysets are ordered by primary key.
+        :param per_page: Number of rows per page.
+        :param approximate: Count rows with ``approximate_count`` instead of ``COUNT(*)``.
+        """
+        ordering = [str(field) for field in queryset.query.order_by]
+        if not any(field.lstrip("-") in ("pk", "id") for field in ordering):
+            ordering.append("-pk" if ordering and ordering[-1].startswith("-") else "pk")
+        self.ordering = ordering
+        self.fields = [field.lstrip("-") for field in ordering]
+        self.queryset = queryset.order_by(*ordering)
+        self.per_page = per_page
+        self.approximate = approximate
+
+    @cached_property
+    def counted(self: "KeysetPaginator") -> tuple[int, bool]:
+        """Return the number of rows and whether that number is exact."""
+        if self.approximate:
+            return approximate_count(self.queryset)
+        return self.queryset.count(), True
+
+    @property
+    def count(self: "KeysetPaginator") -> int:
+        """Return the (possibly approximate) total number of rows."""
+        return self.counted[0]
+
+    @property
+    def count_is_exact(self: "KeysetPaginator") -> bool:
+        """Return whether ``count`` is exact."""
+        return self.counted[1]
+
+    @property
+    def num_pages(self: "KeysetPaginator") -> int:
+        """Return the (possibly approximate) total number of pages."""
+        return max(math.ceil(self.count / self.per_page), 1)
+
+    def page(self: "KeysetPaginator", cursor: str | None) -> "KeysetPage":
+        """
+        Return the page a cursor points to.
+
+        :param cursor: Cursor from a previous page, or ``None`` for the first page.
+
+        :return:
+            KeysetPage: The requested page.
+
+        :raises InvalidCursor: If the cursor is malformed or does not fit the ordering.
+        """
+        position, reverse, number = self.decode(cursor)
+        rows = list(self.get_queryset(position, reverse=reverse)[: self.per_page + 1])
+        return self.make_page(rows, position, number, reverse=reverse)
+
+    async def apage(self: "KeysetPaginator", cursor: str | None) -> "KeysetPage":
+        """Return the page a cursor points to, reading it with the async ORM; see ``page()``."""
+        position, reverse, number = self.decode(cursor)
+        rows = [row async for row in self.get_queryset(position, reverse=reverse)[: self.per_page + 1]]
+        return self.make_page(rows, position, number, reverse=reverse)
+
+    def decode(self: "KeysetPaginator", cursor: str | None) -> tuple[list | None, bool, int]:
+        """Decode a cursor, checking that it fits the ordering; ``None`` is the first page."""
+        position, reverse, number = decode_cursor(cursor) if cursor else (None, False, 1)
+        if position is not None and len(position) != len(self.ordering):
+            raise InvalidCursor("Cursor does not match the current ordering.")
+        return position, reverse, number
+
+    def make_page(
+        self: "KeysetPaginator",
+        rows: list,
+        position: Sequence | None,
+        number: int,
+        *,
+        reverse: bool,
+    ) -> "KeysetPage":
+        """Build the page from the rows read after a position, including one extra row if there are more."""
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if reverse:
+            rows.reverse()
+            return KeysetPage(self, rows, number, has_next=position is not None, has_previous=has_more)
+        return KeysetPage(self, rows, number, has_next=has_more, has_previous=position is not None)
+
+    def get_queryset(self: "KeysetPaginator", position: Sequence | None, *, reverse: bool = False) -> QuerySet:
+        """
+        Return the rows sorting after a position, in the order they are read.
+
+        :param position: Ordering values of the row to start after, ``None`` to start at an edge.
+        :param reverse: Whether to read backwards.
+
+        :return:
+            QuerySet: Ordered, unsliced queryset.
+        """
+        ordering = [self.flip(field) for field in self.ordering] if reverse else self.ordering
+        queryset = self.queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(ordering, position))
+        return queryset
+
+    def position(self: "KeysetPaginator", obj: Model | dict) -> list:
+        """Return the ordering values of a row, read from a model instance or a ``values()`` dict."""
+        if isinstance(obj, dict):
+            return [obj[field] for field in self.fields]
+        return [getattr(obj, field) for field in self.fields]
+
+    @staticmethod
+    def flip(field: str) -> str:
+        """Return the ordering expression sorting a field in the opposite direction."""
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    def after(self: "KeysetPaginator", ordering: Sequence[str], position: Sequence) -> Q:
+        """
+        Build the condition selecting rows that sort after a position.
+
+        For ``(a, b, pk)`` this is ``a > x OR (a = x AND b > y) OR (a = x AND b = y AND pk > z)``
+        with ``<`` used for descending fields. The redundant ``a >= x`` conjunct gives the
+        database a range to seek to in an index on ``a`` instead of scanning it from the start.
+        """
+        condition = Q()
+        for index, field in enumerate(ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            equal = {self.fields[i]: position[i] for i in range(index)}
+            condition |= Q(**equal, **{f"{name}__{lookup}": position[index]})
+
+        first = ordering[0]
+        seek = Q(**{f"{first.lstrip('-')}__{'lte' if first.startswith('-') else 'gte'}": position[0]})
+        return seek & condition
+
+
+class KeysetPage:
+    """
+    A page of a ``KeysetPaginator``.
+
+    Mirrors the parts of Django's ``Page`` used by templates, and adds the cursors of the
+    neighbouring, first and last pages.
+    """
+
+    def __init__(
+        self: "KeysetPage",
+        paginator: KeysetPaginator,
+        object_list: list,
+        number: int,
+        *,
+        has_next: bool,
+        has_previous: bool,
+    ) -> None:
+        """Initialize the page with its rows and neighbour flags."""
+        self.paginator = paginator
+        self.object_list = object_list
+        self.number = number
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self: "KeysetPage") -> Iterator:
+        """Iterate over the rows of the page."""
+        return iter(self.object_list)
+
+    def __len__(self: "KeysetPage") -> int:
+        """Return the number of rows on the page."""
+        return len(self.object_list)
+
+    def has_next(self: "KeysetPage") -> bool:
+        """Return whether a page follows this one."""
+        return self._has_next and bool(self.object_list)
+
+    def has_previous(self: "KeysetPage") -> bool:
+        """Return whether a page precedes this one."""
+        return self._has_previous and bool(self.object_list)
+
+    def has_other_pages(self: "KeysetPage") -> bool:
+        """Return whether there is a next or previous page."""
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self: "KeysetPage") -> str | None:
+        """Return the cursor of the next page."""
+        if not self.has_next():
+            return None
+        return encode_cursor(self.paginator.position(self.object_list[-1]), number=self.number + 1)
+
+    @property
+    def previous_cursor(self: "KeysetPage") -> str | None:
+        """Return the cursor of the previous page."""
+        if not self.has_previous():
+            return None
+        return encode_cursor(self.paginator.position(self.object_list[0]), reverse=True, number=self.number - 1)
+
+    @property
+    def last_cursor(self: "KeysetPage") -> str:
+        """Return the cursor of the last page, read backwards from the end."""
+        return encode_cursor(None, reverse=True, number=self.paginator.num_pages)
+
+
+def get_pagination_mode() -> str:
+    """Return the configured ``CONTACT_PAGINATION`` mode, ``"offset"`` or ``"keyset"``."""
+    return getattr(settings, "CONTACT_PAGINATION", OFFSET)
@@ -0,0 +1,89 @@
+"""
+Read replica routing for the contacts app.
+
+With a ``replica`` database configured (``DATABASE_REPLICA_URL``), ``ReplicaRouter`` sends
+reads of contacts and statuses, i.e. the list, search and detail queries of the pages
+and the API, to the replica, and every write to the primary ``default`` database. Other
+apps, such as sessions and authentication, stay on the primary.
+
+A replica lags behind its primary, so reads stay on the primary:
+
+- inside a transaction on the primary, which must see its own writes,
+- for ``CONTACT_REPLICA_PIN_SECONDS`` after a client's write request, so that the page it
+  is redirected to shows its change. ``ReplicaPinningMiddleware`` remembers the write in
+  a cookie and pins the client's following requests to the primary.
+"""
+
+from collections.abc import Callable
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Model
+from django.http import HttpRequest, HttpResponse
+
+REPLICA_DATABASE = "replica"
+
+# Apps whose reads may be served by the replica.
+REPLICA_APPS = frozenset({"contacts"})
+
+PIN_COOKIE = "primary_pin"
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "TRACE"})
+
+# Whether reads of the current request must stay on the primary.
+pinned_to_primary: ContextVar[bool] = ContextVar("pinned_to_primary", default=False)
+
+
+class ReplicaRouter:
+    """Route contact reads to the replica and writes to the primary."""
+
+    def db_for_read(self: "ReplicaRouter", model: type[Model], **hints: dict) -> str | None:  # noqa: ARG002
+        """Return the replica for reads of the contacts app, unless they must see the primary's latest writes."""
+        if model._meta.app_label not in REPLICA_APPS or pinned_to_primary.get():  # noqa: SLF001
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return REPLICA_DATABASE
+
+    def db_for_write(self: "ReplicaRouter", model: type[Model], **hints: dict) -> str:  # noqa: ARG002
+        """Return the primary, also for objects read from the replica."""
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self: "ReplicaRouter", obj1: Model, obj2: Model, **hints: dict) -> bool | None:  # noqa: ARG002
+        """Allow relations between objects of the primary and the replica, which hold the same rows."""
+        databases = {DEFAULT_DB_ALIAS, REPLICA_DATABASE}
+        if obj1._state.db in databases and obj2._state.db in databases:  # noqa: SLF001
+            return True
+        return None
+
+
+class ReplicaPinningMiddleware:
+    """
+    Keep a client's reads on the primary for a while after its writes.
+
+    Removes itself when no replica is configured.
+    """
+
+    def __init__(self: "ReplicaPinningMiddleware", get_response: Callable) -> None:
+        """
+        Initialize the middleware.
+
+        :raises MiddlewareNotUsed: If there is no replica.
+        """
+        if REPLICA_DATABASE not in settings.DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.pin_seconds = getattr(settings, "CONTACT_REPLICA_PIN_SECONDS", 5)
+
+    def __call__(self: "ReplicaPinningMiddleware", request: HttpRequest) -> HttpResponse:
+        """Serve the request from the primary if the client wrote recently, and pin it after a write."""
+        token = pinned_to_primary.set(PIN_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            pinned_to_primary.reset(token)
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(PIN_COOKIE, "1", max_age=self.pin_seconds, httponly=True, samesite="Lax")
+        return response
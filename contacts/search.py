@@ -0,0 +1,446 @@
+"""
+Pluggable search backends for Contact lookups.
+
+Every backend narrows a Contact queryset to the rows matching a list of search terms.
+A term matches a contact when it is a case-insensitive substring of any of the searched
+fields, and every term has to match, which mirrors both the HTML list search and DRF's
+``SearchFilter`` semantics. Indexed backends keep their index in the database itself:
+
+- ``SQLiteFTSSearchBackend`` uses an FTS5 virtual table with the trigram tokenizer,
+  kept in sync with ``contacts_contact`` by triggers, and ranks matches with ``bm25``.
+- ``PostgresTrigramSearchBackend`` relies on ``pg_trgm`` GIN indexes, which serve
+  ``icontains`` lookups directly, and ranks matches by trigram word similarity.
+- ``IContainsSearchBackend`` is the unindexed ``LIKE '%term%'`` fallback.
+
+Fuzzy search (``fuzzy_search``) tolerates typos: a term matches a contact when one of its
+words is similar enough to the term. On PostgreSQL ``pg_trgm`` compares the words itself;
+elsewhere the most similar words are found in the in-process trigram index of
+``contacts.fuzzy`` and then searched for like exact terms, with the index of the backend.
+
+The backend is chosen per database vendor unless ``CONTACT_SEARCH_BACKEND`` names one.
+"""
+
+from abc import ABC, abstractmethod
+from collections.abc import Mapping, Sequence
+from functools import reduce
+from operator import add
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import Case, Expression, FloatField, Q, QuerySet, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest, Upper
+from django.http import QueryDict
+from django.utils.module_loading import import_string
+
+from contacts.fuzzy import FUZZY_FIELDS, fuzzy_vocabulary
+from contacts.models import Contact
+
+SEARCH_FIELDS = ("first_name", "last_name", "email", "phone_number", "city")
+
+CONTACT_TABLE = Contact._meta.db_table  # noqa: SLF001
+
+# The trigram tokenizer cannot match anything shorter than a single trigram.
+MIN_TRIGRAM_TERM_LENGTH = 3
+
+# First SQLite release shipping the FTS5 trigram tokenizer.
+MIN_SQLITE_TRIGRAM_VERSION = (3, 34, 0)
+
+# Query parameter turning on fuzzy search, and the values that do.
+FUZZY_PARAM = "fuzzy"
+FUZZY_VALUES = frozenset({"1", "true", "yes", "on"})
+
+
+def fuzzy_requested(params: QueryDict) -> bool:
+    """Return whether the query parameters ask for fuzzy search."""
+    return params.get(FUZZY_PARAM, "").lower() in FUZZY_VALUES
+
+
+def contains_any_field(word: str, fields: Sequence[str]) -> Q:
+    """Return the condition of a word being a case-insensitive substring of any of the fields."""
+    condition = Q()
+    for field in fields:
+        condition |= Q(**{f"{field}__icontains": word})
+    return condition
+
+
+def similarity_rank(alternatives: Sequence[Mapping[str, float]], fields: Sequence[str]) -> Expression:
+    """
+    Build the rank of fuzzy matches: for each term, the similarity of its most similar word the contact contains.
+
+    :param alternatives: Words similar to each term with their similarity, most similar first.
+    :param fields: Contact fields searched for the words.
+
+    :return:
+        Expression: Sum over the terms, higher is more relevant.
+    """
+    ranks = [
+        Case(
+            *(When(contains_any_field(word, fields), then=Value(similarity)) for word, similarity in words.items()),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+        for words in alternatives
+    ]
+    return reduce(add, ranks)
+
+
+class BaseSearchBackend(ABC):
+    """Interface implemented by every contact search backend."""
+
+    @abstractmethod
+    def search(
+        self: "BaseSearchBackend",
+        queryset: QuerySet,
+        terms: Sequence[str],
+        fields: Sequence[str] = SEARCH_FIELDS,
+        *,
+        ranked: bool = False,
+    ) -> QuerySet:
+        """
+        Narrow the queryset to contacts matching every search term.
+
+        :param queryset: Contact queryset to filter.
+        :param terms: Search terms, each of which must match at least one field.
+        :param fields: Contact fields searched for each term.
+        :param ranked: Annotate ``search_rank`` (higher is more relevant) on each row.
+
+        :return:
+            QuerySet: Filtered queryset.
+        """
+
+    def fuzzy_search(
+        self: "BaseSearchBackend",
+        queryset: QuerySet,
+        terms: Sequence[str],
+        fields: Sequence[str] = FUZZY_FIELDS,
+        *,
+        ranked: bool = False,
+    ) -> QuerySet:
+        """
+        Narrow the queryset to contacts with a word similar to every search term.
+
+        Each term is replaced with the words of ``fuzzy_vocabulary`` most similar to it, and
+        a contact matches the term when it contains one of those words. Terms shorter than
+        a trigram are searched for exactly.
+
+        :param queryset: Contact queryset to filter.
+        :param terms: Possibly mistyped search terms, each of which must match.
+        :param fields: Contact fields searched; the words of ``FUZZY_FIELDS`` are indexed.
+        :param ranked: Annotate ``search_rank``, the summed similarity of the best word found for each term.
+
+        :return:
+            QuerySet: Filtered queryset.
+        """
+        short_terms = [term for term in terms if len(term) < MIN_TRIGRAM_TERM_LENGTH]
+        queryset = IContainsSearchBackend().search(queryset, short_terms, fields)
+
+        alternatives = [fuzzy_vocabulary.similar_words(term) for term in terms if term not in short_terms]
+        if all(alternatives):
+            queryset = self.filter_any(queryset, [list(words) for words in alternatives], fields)
+        else:
+            queryset = queryset.none()
+
+        if ranked:
+            rank = similarity_rank(alternatives, fields) if alternatives and all(alternatives) else Value(0.0)
+            queryset = queryset.annotate(search_rank=rank)
+        return queryset
+
+    def filter_any(
+        self: "BaseSearchBackend",
+        queryset: QuerySet,
+        alternatives: Sequence[Sequence[str]],
+        fields: Sequence[str],
+    ) -> QuerySet:
+        """
+        Narrow the queryset to contacts containing, for every list of words, one of them.
+
+        :param queryset: Contact queryset to filter.
+        :param alternatives: Lists of words; a contact must contain a word of each list in one of the fields.
+        :param fields: Contact fields searched.
+
+        :return:
+            QuerySet: Filtered queryset.
+        """
+        for words in alternatives:
+            condition = Q()
+            for word in words:
+                condition |= contains_any_field(word, fields)
+            queryset = queryset.filter(condition)
+        return queryset
+
+    def install(self: "BaseSearchBackend", connection: BaseDatabaseWrapper) -> None:  # noqa: B027
+        """
+        Create the database structures backing the search index if they are missing.
+
+        Does nothing by default, for backends without an index of their own.
+
+        :param connection: Database connection to install the index on.
+        """
+
+    def suspend(self: "BaseSearchBackend", connection: BaseDatabaseWrapper) -> None:  # noqa: B027
+        """
+        Stop maintaining the search index on writes, e.g. during a bulk load.
+
+        Searches may miss rows written while suspended; ``install()`` resumes maintenance
+        and brings the index up to date.
+
+        :param connection: Database connection to suspend the index on.
+        """
+
+
+class IContainsSearchBackend(BaseSearchBackend):
+    """Unindexed backend OR-ing ``icontains`` lookups over the searched fields."""
+
+    def search(
+        self: "IContainsSearchBackend",
+        queryset: QuerySet,
+        terms: Sequence[str],
+        fields: Sequence[str] = SEARCH_FIELDS,
+        *,
+        ranked: bool = False,
+    ) -> QuerySet:
+        """Filter with one ``Q(field__icontains=term) | ...`` chain per term."""
+        for term in terms:
+            queryset = queryset.filter(contains_any_field(term, fields))
+
+        if ranked:
+            queryset = queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+        return queryset
+
+
+class SQLiteFTSSearchBackend(BaseSearchBackend):
+    """
+    Backend using an FTS5 trigram index on SQLite.
+
+    The index is an external-content FTS5 table, so it only stores the trigram postings
+    and reads column values from ``contacts_contact``. Triggers keep it in sync with every
+    write, including ``bulk_create`` and ``QuerySet.update`` which bypass model signals.
+    Terms shorter than a trigram fall back to ``icontains``.
+    """
+
+    table = f"{CONTACT_TABLE}_fts"
+
+    def search(
+        self: "SQLiteFTSSearchBackend",
+        queryset: QuerySet,
+        terms: Sequence[str],
+        fields: Sequence[str] = SEARCH_FIELDS,
+        *,
+        ranked: bool = False,
+    ) -> QuerySet:
+        """Filter with a single FTS5 ``MATCH`` for all terms long enough to be indexed."""
+        indexed_terms = [term for term in terms if len(term) >= MIN_TRIGRAM_TERM_LENGTH]
+        short_terms = [term for term in terms if len(term) < MIN_TRIGRAM_TERM_LENGTH]
+        queryset = IContainsSearchBackend().search(queryset, short_terms, fields)
+
+        if not indexed_terms:
+            if ranked:
+                queryset = queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+            return queryset
+
+        match = self.build_match_expression(indexed_terms, fields)
+        queryset = queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s", (match,)),  # noqa: S608, S611
+        )
+        if ranked:
+            # bm25() is negative, with the best match being the most negative value.
+            queryset = queryset.annotate(
+                search_rank=RawSQL(  # noqa: S611
+                    f"SELECT -bm25({self.table}) FROM {self.table} "  # noqa: S608
+                    f"WHERE {self.table} MATCH %s AND rowid = {CONTACT_TABLE}.id",
+                    (match,),
+                    output_field=FloatField(),
+                ),
+            )
+        return queryset
+
+    def filter_any(
+        self: "SQLiteFTSSearchBackend",
+        queryset: QuerySet,
+        alternatives: Sequence[Sequence[str]],
+        fields: Sequence[str],
+    ) -> QuerySet:
+        """Filter with a single FTS5 ``MATCH`` OR-ing the words of each list, all of them a trigram long or more."""
+        if not alternatives:
+            return queryset
+        columns = " ".join(fields)
+        groups = [" OR ".join(self.quote(word) for word in words) for words in alternatives]
+        match = " AND ".join(f"{{{columns}}} : ({group})" for group in groups)
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s", (match,)),  # noqa: S608, S611
+        )
+
+    @staticmethod
+    def quote(term: str) -> str:
+        """Return a term as an FTS5 phrase, matching it as a substring."""
+        return '"{}"'.format(term.replace('"', '""'))
+
+    @classmethod
+    def build_match_expression(cls: type["SQLiteFTSSearchBackend"], terms: Sequence[str], fields: Sequence[str]) -> str:
+        """
+        Build an FTS5 query matching every term as a substring of any of the fields.
+
+        :param terms: Search terms, each at least one trigram long.
+        :param fields: Indexed columns the terms are restricted to.
+
+        :return:
+            str: FTS5 query, e.g. ``{first_name email} : "jan" AND {first_name email} : "kow"``.
+        """
+        columns = " ".join(fields)
+        return " AND ".join(f"{{{columns}}} : {cls.quote(term)}" for term in terms)
+
+    def install(self: "SQLiteFTSSearchBackend", connection: BaseDatabaseWrapper) -> None:
+        """
+        Create the FTS5 table and its sync triggers.
+
+        Rebuilding SQLite tables during migrations drops their triggers, so this runs
+        after every ``migrate`` and rebuilds the index whenever a trigger was missing.
+        """
+        source = CONTACT_TABLE
+        columns = ", ".join(SEARCH_FIELDS)
+        new_values = ", ".join(f"new.{field}" for field in SEARCH_FIELDS)
+        old_values = ", ".join(f"old.{field}" for field in SEARCH_FIELDS)
+        insert = f"INSERT INTO {self.table}(rowid, {columns}) VALUES (new.id, {new_values});"  # noqa: S608
+        delete = f"INSERT INTO {self.table}({self.table}, rowid, {columns}) VALUES ('delete', old.id, {old_values});"  # noqa: S608
+        triggers = {
+            f"{self.table}_ai": f"AFTER INSERT ON {source} BEGIN {insert} END",
+            f"{self.table}_ad": f"AFTER DELETE ON {source} BEGIN {delete} END",
+            # Only updates of the indexed columns, so that e.g. moving contacts to another status does not reindex them.
+            f"{self.table}_au": f"AFTER UPDATE OF {columns} ON {source} BEGIN {delete} {insert} END",
+        }
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s",
+                (source,),
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+                f"{columns}, content='{source}', content_rowid='id', tokenize='trigram')",
+            )
+            # Recreated in case an earlier version fired on updates of any column; the index is unaffected.
+            cursor.execute(f"DROP TRIGGER IF EXISTS {self.table}_au")
+            for name, body in triggers.items():
+                cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+            if not existing.issuperset(triggers):
+                cursor.execute(f"INSERT INTO {self.table}({self.table}) VALUES ('rebuild')")  # noqa: S608
+
+    def suspend(self: "SQLiteFTSSearchBackend", connection: BaseDatabaseWrapper) -> None:
+        """Drop the sync triggers; ``install()`` recreates them and rebuilds the index in one pass."""
+        with connection.cursor() as cursor:
+            for suffix in ("ai", "ad", "au"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {self.table}_{suffix}")
+
+
+class PostgresTrigramSearchBackend(BaseSearchBackend):
+    """
+    Backend using ``pg_trgm`` GIN indexes on PostgreSQL.
+
+    Django compiles ``icontains`` to ``UPPER(field::text) LIKE UPPER(%s)``, so expression
+    indexes over ``UPPER(field::text)`` let the planner answer the existing lookups with a
+    bitmap index scan instead of a sequential scan.
+    """
+
+    def search(
+        self: "PostgresTrigramSearchBackend",
+        queryset: QuerySet,
+        terms: Sequence[str],
+        fields: Sequence[str] = SEARCH_FIELDS,
+        *,
+        ranked: bool = False,
+    ) -> QuerySet:
+        """Filter with index-backed ``icontains`` lookups, ranking by trigram word similarity."""
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        queryset = IContainsSearchBackend().search(queryset, terms, fields)
+        if ranked:
+            query = " ".join(terms)
+            similarities = [TrigramWordSimilarity(query, field) for field in fields]
+            rank = Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+            queryset = queryset.annotate(search_rank=rank)
+        return queryset
+
+    def fuzzy_search(
+        self: "PostgresTrigramSearchBackend",
+        queryset: QuerySet,
+        terms: Sequence[str],
+        fields: Sequence[str] = FUZZY_FIELDS,
+        *,
+        ranked: bool = False,
+    ) -> QuerySet:
+        """
+        Filter with ``pg_trgm``'s word similarity operator, served by the trigram indexes.
+
+        ``UPPER(field) %> TERM`` holds when a word of the field is at least
+        ``pg_trgm.word_similarity_threshold`` (0.6 by default) similar to the term; lower it
+        in the connection options for more tolerant matches.
+        """
+        from django.contrib.postgres.lookups import TrigramWordSimilar
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        for term in terms:
+            condition = Q()
+            for field in fields:
+                condition |= Q(TrigramWordSimilar(Upper(field), Value(term.upper())))
+            queryset = queryset.filter(condition)
+        if ranked:
+            ranks = []
+            for term in terms:
+                similarities = [TrigramWordSimilarity(term, field) for field in fields]
+                ranks.append(Greatest(*similarities) if len(similarities) > 1 else similarities[0])
+            queryset = queryset.annotate(search_rank=reduce(add, ranks) if ranks else Value(0.0))
+        return queryset
+
+    def install(self: "PostgresTrigramSearchBackend", connection: BaseDatabaseWrapper) -> None:
+        """Create the ``pg_trgm`` extension and one trigram index per searched field."""
+        source = CONTACT_TABLE
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for field in SEARCH_FIELDS:
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {source}_{field}_trgm "
+                    f"ON {source} USING gin (UPPER({field}::text) gin_trgm_ops)",
+                )
+
+    def suspend(self: "PostgresTrigramSearchBackend", connection: BaseDatabaseWrapper) -> None:
+        """Drop the trigram indexes; ``install()`` builds them again."""
+        with connection.cursor() as cursor:
+            for field in SEARCH_FIELDS:
+                cursor.execute(f"DROP INDEX IF EXISTS {CONTACT_TABLE}_{field}_trgm")
+
+
+def get_search_backend(using: str = DEFAULT_DB_ALIAS) -> BaseSearchBackend:
+    """
+    Return the search backend for a database connection.
+
+    :param using: Alias of the database the searched queryset reads from.
+
+    :return:
+        BaseSearchBackend: The ``CONTACT_SEARCH_BACKEND`` class if configured, otherwise
+        the indexed backend matching the database vendor.
+    """
+    backend_path = getattr(settings, "CONTACT_SEARCH_BACKEND", None)
+    if backend_path:
+        return import_string(backend_path)()
+
+    connection = connections[using]
+    if connection.vendor == "sqlite" and connection.Database.sqlite_version_info >= MIN_SQLITE_TRIGRAM_VERSION:
+        return SQLiteFTSSearchBackend()
+    if connection.vendor == "postgresql":
+        return PostgresTrigramSearchBackend()
+    return IContainsSearchBackend()
+
+
+def install_search_index(using: str = DEFAULT_DB_ALIAS, **kwargs: dict) -> None:  # noqa: ARG001
+    """
+    Install the search index on a database; connected to ``post_migrate``.
+
+    :param using: Alias of the migrated database.
+    :param kwargs: Remaining ``post_migrate`` signal arguments.
+    """
+    connection = connections[using]
+    if CONTACT_TABLE in connection.introspection.table_names():
+        get_search_backend(using).install(connection)
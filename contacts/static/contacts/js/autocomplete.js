@@ -0,0 +1,52 @@
+document.addEventListener("DOMContentLoaded", () => {
+  const input = document.getElementById("search");
+  const suggestions = document.getElementById("search-suggestions");
+  if (!input || !suggestions) {
+    return;
+  }
+
+  // Wait for a pause in typing, and drop the answer to a request a newer keystroke replaced
+  const DELAY_MS = 150;
+  let timer = null;
+  let controller = null;
+
+  const suggest = async (prefix) => {
+    controller?.abort();
+    controller = new AbortController();
+    try {
+      const res = await fetch(`/api/contacts/autocomplete/?prefix=${encodeURIComponent(prefix)}`, {
+        credentials: "same-origin",
+        signal: controller.signal,
+      });
+      if (!res.ok) {
+        throw new Error(`HTTP ${res.status}`);
+      }
+      const { results } = await res.json();
+
+      // Picking a suggestion searches for the contact's email, which is unique
+      suggestions.replaceChildren(
+        ...results.map((contact) => {
+          const option = document.createElement("option");
+          option.value = contact.email;
+          option.textContent = `${contact.first_name} ${contact.last_name}`;
+          return option;
+        }),
+      );
+    } catch (err) {
+      if (err.name !== "AbortError") {
+        console.error("Autocomplete failed:", err);
+      }
+    }
+  };
+
+  input.addEventListener("input", () => {
+    clearTimeout(timer);
+    const prefix = input.value.trim();
+    if (!prefix) {
+      controller?.abort();
+      suggestions.replaceChildren();
+      return;
+    }
+    timer = setTimeout(() => suggest(prefix), DELAY_MS);
+  });
+});
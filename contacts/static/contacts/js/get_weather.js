@@ -1,44 +1,38 @@
 document.addEventListener("DOMContentLoaded", async () => {
   const weatherCells = document.querySelectorAll(".weather-data");
+  if (!weatherCells.length) {
+    return;
+  }
 
-  for (const cell of weatherCells) {
-    const city = cell.dataset.city;
-
-    try {
-      // 1. Fetch geolocation(latitude, longitude) data from OpenStreetMap Nominatim API
-      const geoRes = await fetch(`https://nominatim.openstreetmap.org/search?q=${city}&format=json&limit=1`);
-      const geoData = await geoRes.json();
-
-      if (!geoData.length) {
-        cell.innerHTML = `<span class="text-red-500">City not found</span>`;
-        continue;
-      }
-
-      const { lat, lon } = geoData[0];
-
-      // 2. Fetch weather data from Open Meteo API
-      const weatherRes = await fetch(
-        `https://api.open-meteo.com/v1/forecast?latitude=${lat}&longitude=${lon}&current_weather=true&hourly=relative_humidity_2m&timezone=auto`
-      );
-      const weatherData = await weatherRes.json();
-
-      const temperature = weatherData.current_weather.temperature;
-      const windspeed = weatherData.current_weather.windspeed;
+  // Cities are URL-encoded in the markup; ask once for every distinct one on the page
+  const cityOf = (cell) => decodeURIComponent(cell.dataset.city);
+  const cities = [...new Set(Array.from(weatherCells, cityOf))];
+  const query = cities.map((city) => `city=${encodeURIComponent(city)}`).join("&");
 
-      // Humidity for this hour, rounded down to the full hour
-      const currentTime = weatherData.current_weather.time;
-      const hourOnlyTime = currentTime.slice(0, 13) + ':00';
+  let weatherByCity = {};
+  try {
+    const res = await fetch(`/api/weather/?${query}`, { credentials: "same-origin" });
+    if (!res.ok) {
+      throw new Error(`HTTP ${res.status}`);
+    }
+    weatherByCity = await res.json();
+  } catch (err) {
+    console.error("Weather fetch failed:", err);
+  }
 
-      const timeIndex = weatherData.hourly.time.findIndex(t => t === hourOnlyTime);
-      const humidity = timeIndex !== -1 ? weatherData.hourly.relative_humidity_2m[timeIndex] : "–";
+  for (const cell of weatherCells) {
+    const weather = weatherByCity[cityOf(cell)];
 
+    if (weather && weather.status === "ok") {
+      const humidity = weather.humidity ?? "–";
       cell.innerHTML = `
-        🌡️ ${temperature}°C<br>
+        🌡️ ${weather.temperature}°C<br>
         💧 ${humidity}% RH(Relative Humidity)<br>
-        💨 ${windspeed} km/h
+        💨 ${weather.windspeed} km/h
       `;
-    } catch (err) {
-      console.error("Weather fetch failed:", err);
+    } else if (weather && weather.status === "not_found") {
+      cell.innerHTML = `<span class="text-red-500">City not found</span>`;
+    } else {
       cell.innerHTML = `<span class="text-red-500">Error</span>`;
     }
   }
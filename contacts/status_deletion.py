@@ -0,0 +1,116 @@
+"""
+Deleting statuses without loading their contacts in the request.
+
+A cascade from the status would make Django's collector load every contact of the status
+and delete them one by one, in one transaction holding the write lock for as long as that
+takes. Contacts therefore reference their status with ``on_delete=PROTECT``: deleting a
+status that still has contacts, e.g. from the admin, raises ``ProtectedError``. Before a
+status is deleted, its contacts are either:
+
+- moved to another status, or to none, with one set-based ``UPDATE``
+  (``reassign_contacts``), fast enough for the request,
+- or deleted by the ``delete_status`` background job (``schedule_status_deletion``), in
+  chunks of ``CONTACT_STATUS_DELETE_CHUNK_SIZE`` contacts, each in its own transaction and
+  followed by a progress report (``delete_status_contacts``).
+
+The status itself is deleted once it has no contacts left.
+"""
+
+from collections.abc import Callable
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import ProtectedError
+from django.utils import timezone
+
+from contacts.changes import record_query_changes
+from contacts.counters import move_status_count
+from contacts.jobs import enqueue
+from contacts.list_cache import list_cache
+from contacts.models import Contact, ContactChange, ContactStatusChoices, Job
+
+DELETE_STATUS_TASK = "delete_status"
+
+
+def reassign_contacts(status: ContactStatusChoices, target: ContactStatusChoices | None) -> int:
+    """
+    Move the contacts of a status to another status, or to none, with one ``UPDATE``.
+
+    ``QuerySet.update()`` sends no signals, so the moved contacts are recorded in the change
+    log, their count is moved and the cached contact tables are invalidated here. The search
+    and autocomplete indexes hold no statuses and are left as they are.
+
+    :param status: Status the contacts have.
+    :param target: Status they are given, None to leave them without one.
+
+    :return:
+        int: Number of contacts moved.
+    """
+    using = router.db_for_write(Contact)
+    contacts = Contact.objects.using(using).filter(status=status)
+    with transaction.atomic(using=using):
+        record_query_changes(contacts, ContactChange.Action.UPDATED)
+        moved = contacts.update(status=target, updated_at=timezone.now())
+        if moved:
+            move_status_count(status, target, moved, using)
+            list_cache.invalidate(using)
+    return moved
+
+
+def delete_status_contacts(
+    status: ContactStatusChoices,
+    chunk_size: int | None = None,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> int:
+    """
+    Delete the contacts of a status in chunks, then the status.
+
+    Each chunk is deleted in its own transaction with the usual signals, so the change log,
+    caches and indexes follow as they do for single deletions, and writers are only held
+    back for one chunk at a time. Contacts given the status meanwhile, even after the last
+    chunk, are deleted as well.
+
+    :param status: Status to delete.
+    :param chunk_size: Contacts deleted per transaction; ``CONTACT_STATUS_DELETE_CHUNK_SIZE`` by default.
+    :param on_progress: Called with the contacts deleted so far and in all, before the first chunk and after each.
+
+    :return:
+        int: Number of contacts deleted.
+    """
+    chunk_size = chunk_size or getattr(settings, "CONTACT_STATUS_DELETE_CHUNK_SIZE", 1000)
+    using = router.db_for_write(Contact)
+    contacts = Contact.objects.using(using).filter(status=status)
+    total, deleted = contacts.count(), 0
+    if on_progress:
+        on_progress(deleted, total)
+    while True:
+        while ids := list(contacts.order_by("pk").values_list("pk", flat=True)[:chunk_size]):
+            with transaction.atomic(using=using):
+                # Contacts moved to another status since the ids were read are kept.
+                _, counts = contacts.filter(pk__in=ids).delete()
+            deleted += counts.get(Contact._meta.label, 0)  # noqa: SLF001
+            total = max(total, deleted)
+            if on_progress:
+                on_progress(deleted, total)
+        try:
+            status.delete(using=using)
+        except ProtectedError:
+            continue
+        return deleted
+
+
+def schedule_status_deletion(status: ContactStatusChoices) -> Job:
+    """
+    Queue the deletion of a status with its contacts, unless it is already queued or running.
+
+    :param status: Status to delete.
+
+    :return:
+        Job: The job deleting the status.
+    """
+    pending = Job.objects.using(router.db_for_write(Job)).filter(
+        name=DELETE_STATUS_TASK,
+        payload__status_id=status.pk,
+        status__in=[Job.Status.QUEUED, Job.Status.RUNNING],
+    )
+    return pending.first() or enqueue(DELETE_STATUS_TASK, {"status_id": status.pk})
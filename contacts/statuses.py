@@ -0,0 +1,167 @@
+"""
+Process-wide registry of contact statuses.
+
+Statuses change rarely but are read on every contact list render, form render and API
+write. The registry keeps them in memory and drops them whenever a status is saved or
+deleted (see ``ContactsConfig.ready``), so those hot paths do not query the database.
+
+- Other processes notice a change within ``CONTACT_STATUS_CACHE_TTL`` seconds.
+- With ``CONTACT_STATUS_CACHE_SHARED`` enabled, processes reload the statuses from the
+  Django cache instead of the database, and a change is published there immediately.
+- Inside a transaction, the statuses are loaded once per transaction: uncommitted
+  statuses are never shared with other transactions, and are dropped on rollback.
+
+Statuses changed with ``QuerySet.update()`` do not send signals; call ``clear()`` after such updates.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router, transaction
+
+from contacts.models import ContactStatusChoices
+
+SHARED_CACHE_KEY = "contacts:statuses"
+
+
+@dataclass
+class TransactionSnapshot:
+    """Statuses loaded inside a transaction, valid while the transaction is open."""
+
+    generation: int
+    marker: object
+    statuses: list[ContactStatusChoices]
+
+
+class StatusRegistry:
+    """In-memory copy of every ContactStatusChoices row."""
+
+    def __init__(self: "StatusRegistry") -> None:
+        """Initialize an empty registry."""
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._generation = 0
+        self._statuses: list[ContactStatusChoices] | None = None
+        self._by_id: dict[int, ContactStatusChoices] = {}
+        self._expires = 0.0
+
+    def all(self: "StatusRegistry") -> list[ContactStatusChoices]:
+        """
+        Return every status, ordered by primary key.
+
+        :return:
+            list[ContactStatusChoices]: Shared instances; do not modify them.
+        """
+        connection = connections[router.db_for_read(ContactStatusChoices)]
+        if connection.in_atomic_block:
+            return self.transaction_statuses(connection.alias)
+
+        with self._lock:
+            if self._statuses is not None and time.monotonic() < self._expires:
+                return self._statuses
+            generation = self._generation
+
+        statuses = self.load_shared()
+        with self._lock:
+            # Keep the statuses only if no status was written while they were loading.
+            if generation == self._generation:
+                self._statuses = statuses
+                self._by_id = {status.pk: status for status in statuses}
+                self._expires = time.monotonic() + getattr(settings, "CONTACT_STATUS_CACHE_TTL", 300)
+        return statuses
+
+    async def aall(self: "StatusRegistry") -> list[ContactStatusChoices]:
+        """
+        Return every status like ``all()``, from async code.
+
+        Statuses held in memory are returned without leaving the event loop; loading them runs
+        ``all()`` in the thread the async ORM uses, inside its transaction if one is open.
+        """
+        with self._lock:
+            if self._statuses is not None and time.monotonic() < self._expires:
+                return self._statuses
+        return await sync_to_async(self.all)()
+
+    def get(self: "StatusRegistry", pk: int) -> ContactStatusChoices | None:
+        """
+        Return the status with a primary key.
+
+        :param pk: Primary key of the status.
+
+        :return:
+            ContactStatusChoices | None: The status, or ``None`` if there is none with that key.
+        """
+        statuses = self.all()
+        if statuses is self._statuses:
+            return self._by_id.get(pk)
+        return next((status for status in statuses if status.pk == pk), None)
+
+    def clear(self: "StatusRegistry") -> None:
+        """Drop the statuses held by this process and, if enabled, by the shared cache."""
+        with self._lock:
+            self._generation += 1
+            self._statuses = None
+            self._by_id = {}
+        if getattr(settings, "CONTACT_STATUS_CACHE_SHARED", False):
+            cache.delete(SHARED_CACHE_KEY)
+
+    def status_written(self: "StatusRegistry", using: str) -> None:
+        """Drop the statuses now, and again once the write is committed for everyone to see."""
+        self.clear()
+        transaction.on_commit(self.clear, using=using)
+
+    def transaction_statuses(self: "StatusRegistry", using: str) -> list[ContactStatusChoices]:
+        """
+        Return the statuses as seen by the current transaction.
+
+        The snapshot registers a no-op ``on_commit`` marker. Django discards the marker when the
+        transaction (or the savepoint it was registered in) ends, which invalidates the snapshot.
+        """
+        snapshot = getattr(self._local, "snapshot", None)
+        pending = [callback for _, callback, *_ in connections[using].run_on_commit]
+        if snapshot is not None and snapshot.generation == self._generation and snapshot.marker in pending:
+            return snapshot.statuses
+
+        generation = self._generation
+        statuses = self.load()
+
+        def marker() -> None:
+            """Mark the transaction the snapshot belongs to."""
+
+        transaction.on_commit(marker, using=using)
+        self._local.snapshot = TransactionSnapshot(generation, marker, statuses)
+        return statuses
+
+    def load_shared(self: "StatusRegistry") -> list[ContactStatusChoices]:
+        """Load the statuses from the shared cache if enabled, from the database otherwise."""
+        if not getattr(settings, "CONTACT_STATUS_CACHE_SHARED", False):
+            return self.load()
+
+        rows = cache.get(SHARED_CACHE_KEY)
+        if rows is None:
+            statuses = self.load()
+            cache.set(SHARED_CACHE_KEY, [(status.pk, status.name) for status in statuses], timeout=None)
+            return statuses
+        return [ContactStatusChoices(pk=pk, name=name) for pk, name in rows]
+
+    @staticmethod
+    def load() -> list[ContactStatusChoices]:
+        """Load the statuses from the database."""
+        return list(ContactStatusChoices.objects.order_by("pk"))
+
+
+status_registry = StatusRegistry()
+
+
+def invalidate_status_registry(
+    sender: type,  # noqa: ARG001
+    instance: ContactStatusChoices,  # noqa: ARG001
+    using: str,
+    **kwargs: dict,  # noqa: ARG001
+) -> None:
+    """Signal receiver dropping the registered statuses after a status is saved or deleted."""
+    status_registry.status_written(using)
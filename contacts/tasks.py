@@ -0,0 +1,32 @@
+"""
+Background tasks run by ``run_workers``.
+
+Importing the module registers them (see ``contacts.jobs``); ``ContactsConfig.ready`` does.
+"""
+
+from dataclasses import asdict
+
+from django.db import router
+
+from contacts.dedupe import DuplicateFinder
+from contacts.jobs import report_progress, task
+from contacts.models import ContactStatusChoices, Job
+from contacts.status_deletion import DELETE_STATUS_TASK, delete_status_contacts
+
+
+@task("find_duplicates")
+def find_duplicates(job: Job, **options: dict) -> dict:  # noqa: ARG001
+    """Rebuild the duplicate candidates, with the options of ``DuplicateFinder``; returns its counts and timings."""
+    return asdict(DuplicateFinder(**options).run())
+
+
+@task(DELETE_STATUS_TASK)
+def delete_status(job: Job, status_id: int) -> dict:
+    """Delete a status with its contacts, reporting the contacts deleted; returns their number."""
+    status = ContactStatusChoices.objects.using(router.db_for_write(ContactStatusChoices)).filter(pk=status_id).first()
+    if status is None:
+        # Deleted by an earlier attempt, or by someone else.
+        return {"deleted": 0}
+    return {
+        "deleted": delete_status_contacts(status, on_progress=lambda done, total: report_progress(job, done, total)),
+    }
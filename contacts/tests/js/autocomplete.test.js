@@ -0,0 +1,98 @@
+/**
+ * Tests for autocomplete.js
+ */
+
+describe('Search Autocomplete', () => {
+  // Load the script once; it registers a DOMContentLoaded listener
+  beforeAll(() => {
+    require('../../../contacts/static/contacts/js/autocomplete.js');
+  });
+
+  // Mock a successful response of the autocomplete endpoint
+  const respondWith = (results) => Promise.resolve({
+    ok: true,
+    json: () => Promise.resolve({ results })
+  });
+
+  // Type into the search box and let the debounce timer and the fetch promises run
+  const type = async (value) => {
+    const input = document.getElementById('search');
+    input.value = value;
+    input.dispatchEvent(new Event('input'));
+    jest.advanceTimersByTime(200);
+    await Promise.resolve();
+    await Promise.resolve();
+    await Promise.resolve();
+  };
+
+  beforeEach(() => {
+    jest.useFakeTimers();
+    document.body.innerHTML = `
+      <input type="text" id="search" name="q" list="search-suggestions">
+      <datalist id="search-suggestions"></datalist>
+    `;
+    global.fetch = jest.fn();
+    document.dispatchEvent(new Event('DOMContentLoaded'));
+  });
+
+  afterEach(() => {
+    document.body.innerHTML = '';
+    jest.useRealTimers();
+    jest.restoreAllMocks();
+    delete global.fetch;
+  });
+
+  test('should suggest the contacts matching the typed prefix', async () => {
+    global.fetch.mockImplementation(() => respondWith([
+      { id: 1, first_name: 'Jan', last_name: 'Kowalski', email: 'jan@example.com' },
+      { id: 2, first_name: 'Janina', last_name: 'Nowak', email: 'janina@example.com' }
+    ]));
+
+    await type('jan k');
+
+    expect(global.fetch).toHaveBeenCalledTimes(1);
+    expect(global.fetch.mock.calls[0][0]).toBe('/api/contacts/autocomplete/?prefix=jan%20k');
+
+    const options = document.querySelectorAll('#search-suggestions option');
+    expect(options).toHaveLength(2);
+    expect(options[0].value).toBe('jan@example.com');
+    expect(options[0].textContent).toBe('Jan Kowalski');
+  });
+
+  test('should ask once after a pause in typing', async () => {
+    global.fetch.mockImplementation(() => respondWith([]));
+
+    const input = document.getElementById('search');
+    for (const value of ['k', 'ko', 'kow']) {
+      input.value = value;
+      input.dispatchEvent(new Event('input'));
+      jest.advanceTimersByTime(50);
+    }
+    await type('kowa');
+
+    expect(global.fetch).toHaveBeenCalledTimes(1);
+    expect(global.fetch.mock.calls[0][0]).toContain('prefix=kowa');
+  });
+
+  test('should clear the suggestions when the search box is emptied', async () => {
+    global.fetch.mockImplementation(() => respondWith([
+      { id: 1, first_name: 'Jan', last_name: 'Kowalski', email: 'jan@example.com' }
+    ]));
+    await type('jan');
+
+    await type('  ');
+
+    expect(global.fetch).toHaveBeenCalledTimes(1);
+    expect(document.querySelectorAll('#search-suggestions option')).toHaveLength(0);
+  });
+
+  test('should handle API fetch error', async () => {
+    global.fetch.mockImplementation(() => Promise.reject(new Error('Network error')));
+    const consoleError = jest.spyOn(console, 'error').mockImplementation(() => {});
+
+    await type('jan');
+
+    expect(consoleError).toHaveBeenCalled();
+    expect(document.querySelectorAll('#search-suggestions option')).toHaveLength(0);
+  });
+});
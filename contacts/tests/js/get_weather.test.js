@@ -3,167 +3,70 @@
  */
 
 describe('Weather Data Fetching', () => {
+  // Load the script once; it registers a DOMContentLoaded listener
+  beforeAll(() => {
+    require('../../../contacts/static/contacts/js/get_weather.js');
+  });
+
+  // Run the script against the current DOM
+  const runScript = async () => {
+    document.dispatchEvent(new Event('DOMContentLoaded'));
+
+    // Wait for the fetch and JSON promises to resolve
+    await new Promise(process.nextTick);
+    await new Promise(process.nextTick);
+  };
+
+  // Mock a successful response of the weather endpoint
+  const respondWith = (payload) => Promise.resolve({
+    ok: true,
+    json: () => Promise.resolve(payload)
+  });
+
   // Setup DOM elements before each test
   beforeEach(() => {
-    // Create a mock DOM structure with weather-data cells
+    // Create a mock DOM structure with weather-data cells; cities are URL-encoded like in the template
     document.body.innerHTML = `
-      <div class="weather-data" data-city="New York"></div>
+      <div class="weather-data" data-city="New%20York"></div>
       <div class="weather-data" data-city="London"></div>
+      <div class="weather-data" data-city="New%20York"></div>
     `;
 
     // Mock the global fetch function
     global.fetch = jest.fn();
-
-    // Mock successful geolocation response for New York
-    const mockGeoResponseNY = Promise.resolve({
-      json: () => Promise.resolve([
-        { lat: 40.7128, lon: -74.0060 }
-      ])
-    });
-
-    // Mock successful weather response for New York
-    const mockWeatherResponseNY = Promise.resolve({
-      json: () => Promise.resolve({
-        current_weather: {
-          temperature: 22.5,
-          windspeed: 10.2,
-          time: '2025-04-19T15:00:00'
-        },
-        hourly: {
-          time: ['2025-04-19T15:00:00'],
-          relative_humidity_2m: [65]
-        }
-      })
-    });
-
-    // Mock successful geolocation response for London
-    const mockGeoResponseLondon = Promise.resolve({
-      json: () => Promise.resolve([
-        { lat: 51.5074, lon: -0.1278 }
-      ])
-    });
-
-    // Mock successful weather response for London
-    const mockWeatherResponseLondon = Promise.resolve({
-      json: () => Promise.resolve({
-        current_weather: {
-          temperature: 18.3,
-          windspeed: 8.7,
-          time: '2025-04-19T15:00:00'
-        },
-        hourly: {
-          time: ['2025-04-19T15:00:00'],
-          relative_humidity_2m: [70]
-        }
-      })
-    });
-
-    // Set up fetch mock to return different responses based on URL
-    global.fetch.mockImplementation((url) => {
-      if (url.includes('nominatim.openstreetmap.org')) {
-        if (url.includes('New%20York')) {
-          return mockGeoResponseNY;
-        } else if (url.includes('London')) {
-          return mockGeoResponseLondon;
-        }
-      } else if (url.includes('api.open-meteo.com')) {
-        if (url.includes('latitude=40.7128')) {
-          return mockWeatherResponseNY;
-        } else if (url.includes('latitude=51.5074')) {
-          return mockWeatherResponseLondon;
-        }
-      }
-      return Promise.reject(new Error('Unhandled URL in mock'));
-    });
   });
 
   // Clean up after each test
   afterEach(() => {
     document.body.innerHTML = '';
     jest.restoreAllMocks();
-    global.fetch.mockClear();
     delete global.fetch;
   });
 
-  test('should fetch and display weather data for cities', async () => {
-    // Clear previous mock implementation
-    global.fetch.mockReset();
-
-    // Set up a more specific mock for this test
-    global.fetch.mockImplementation((url) => {
-      // Handle New York geolocation request
-      if (url.includes('nominatim.openstreetmap.org') && url.includes('New York')) {
-        return Promise.resolve({
-          json: () => Promise.resolve([
-            { lat: 40.7128, lon: -74.0060 }
-          ])
-        });
-      }
-      // Handle London geolocation request
-      else if (url.includes('nominatim.openstreetmap.org') && url.includes('London')) {
-        return Promise.resolve({
-          json: () => Promise.resolve([
-            { lat: 51.5074, lon: -0.1278 }
-          ])
-        });
-      }
-      // Handle New York weather request
-      else if (url.includes('api.open-meteo.com') && url.includes('latitude=40.7128')) {
-        return Promise.resolve({
-          json: () => Promise.resolve({
-            current_weather: {
-              temperature: 22.5,
-              windspeed: 10.2,
-              time: '2025-04-19T15:00:00'
-            },
-            hourly: {
-              time: ['2025-04-19T15:00'],
-              relative_humidity_2m: [65]
-            }
-          })
-        });
-      }
-      // Handle London weather request
-      else if (url.includes('api.open-meteo.com') && url.includes('latitude=51.5074')) {
-        return Promise.resolve({
-          json: () => Promise.resolve({
-            current_weather: {
-              temperature: 18.3,
-              windspeed: 8.7,
-              time: '2025-04-19T15:00:00'
-            },
-            hourly: {
-              time: ['2025-04-19T15:00'],
-              relative_humidity_2m: [70]
-            }
-          })
-        });
-      }
-      return Promise.reject(new Error('Unhandled URL in mock'));
-    });
-
-    // Load the script
-    require('../../../contacts/static/contacts/js/get_weather.js');
+  test('should fetch the weather of all distinct cities at once', async () => {
+    global.fetch.mockImplementation(() => respondWith({
+      'New York': { status: 'ok', temperature: 22.5, windspeed: 10.2, humidity: 65 },
+      'London': { status: 'ok', temperature: 18.3, windspeed: 8.7, humidity: 70 }
+    }));
 
-    // Trigger DOMContentLoaded event to initialize the script
-    document.dispatchEvent(new Event('DOMContentLoaded'));
+    await runScript();
 
-    // Wait for all promises to resolve
-    await new Promise(process.nextTick);
+    // Assert that a single request asked for each city once
+    expect(global.fetch).toHaveBeenCalledTimes(1);
+    const url = global.fetch.mock.calls[0][0];
+    expect(url).toContain('/api/weather/');
+    expect(url.match(/city=New%20York/g)).toHaveLength(1);
+    expect(url).toContain('city=London');
 
-    // Get the weather cells
-    const nyWeatherCell = document.querySelector('.weather-data[data-city="New York"]');
+    // Assert that the weather data was displayed in every cell
+    const nyWeatherCells = document.querySelectorAll('.weather-data[data-city="New%20York"]');
     const londonWeatherCell = document.querySelector('.weather-data[data-city="London"]');
 
-    // Assert that fetch was called
-    expect(global.fetch).toHaveBeenCalled();
-
-    // Check that the weather data was displayed correctly based on our mock responses
-
-    // Assert that the weather data was displayed correctly
-    expect(nyWeatherCell.innerHTML).toContain('22.5°C');
-    expect(nyWeatherCell.innerHTML).toContain('65% RH');
-    expect(nyWeatherCell.innerHTML).toContain('10.2 km/h');
+    for (const cell of nyWeatherCells) {
+      expect(cell.innerHTML).toContain('22.5°C');
+      expect(cell.innerHTML).toContain('65% RH');
+      expect(cell.innerHTML).toContain('10.2 km/h');
+    }
 
     expect(londonWeatherCell.innerHTML).toContain('18.3°C');
     expect(londonWeatherCell.innerHTML).toContain('70% RH');
@@ -171,70 +74,45 @@ describe('Weather Data Fetching', () => {
   });
 
   test('should handle city not found error', async () => {
-    // Clear previous mock implementation
-    global.fetch.mockReset();
-
-    // Mock fetch to return empty array for geolocation of NonExistentCity
-    global.fetch.mockImplementation((url) => {
-      if (url.includes('nominatim.openstreetmap.org') && url.includes('NonExistentCity')) {
-        return Promise.resolve({
-          json: () => Promise.resolve([])
-        });
-      }
-      return Promise.reject(new Error('Unhandled URL in mock'));
-    });
-
-    // Update DOM to include a non-existent city
-    document.body.innerHTML += `<div class="weather-data" data-city="NonExistentCity"></div>`;
-
-    // Load the script
-    require('../../../contacts/static/contacts/js/get_weather.js');
+    document.body.innerHTML = `<div class="weather-data" data-city="NonExistentCity"></div>`;
+    global.fetch.mockImplementation(() => respondWith({
+      'NonExistentCity': { status: 'not_found' }
+    }));
 
-    // Trigger DOMContentLoaded event to initialize the script
-    document.dispatchEvent(new Event('DOMContentLoaded'));
-
-    // Wait for all promises to resolve
-    await new Promise(process.nextTick);
-
-    // Get the weather cell for the non-existent city
-    const nonExistentCityCell = document.querySelector('.weather-data[data-city="NonExistentCity"]');
+    await runScript();
 
     // Assert that the error message was displayed
+    const nonExistentCityCell = document.querySelector('.weather-data[data-city="NonExistentCity"]');
     expect(nonExistentCityCell.innerHTML).toContain('City not found');
   });
 
-  test('should handle API fetch error', async () => {
-    // Clear previous mock implementation
-    global.fetch.mockReset();
+  test('should handle upstream error for a single city', async () => {
+    global.fetch.mockImplementation(() => respondWith({
+      'New York': { status: 'error' },
+      'London': { status: 'ok', temperature: 18.3, windspeed: 8.7, humidity: null }
+    }));
 
-    // Mock fetch to throw an error for ErrorCity
-    global.fetch.mockImplementation((url) => {
-      if (url.includes('nominatim.openstreetmap.org') && url.includes('ErrorCity')) {
-        return Promise.reject(new Error('Network error'));
-      }
-      return Promise.reject(new Error('Unhandled URL in mock'));
-    });
+    await runScript();
+
+    const nyWeatherCell = document.querySelector('.weather-data[data-city="New%20York"]');
+    const londonWeatherCell = document.querySelector('.weather-data[data-city="London"]');
+    expect(nyWeatherCell.innerHTML).toContain('Error');
+    expect(londonWeatherCell.innerHTML).toContain('18.3°C');
+    expect(londonWeatherCell.innerHTML).toContain('–% RH');
+  });
 
-    // Update DOM to include a city that will trigger an error
-    document.body.innerHTML += `<div class="weather-data" data-city="ErrorCity"></div>`;
+  test('should handle API fetch error', async () => {
+    document.body.innerHTML = `<div class="weather-data" data-city="ErrorCity"></div>`;
+    global.fetch.mockImplementation(() => Promise.reject(new Error('Network error')));
 
     // Mock console.error to prevent test output pollution
     const originalConsoleError = console.error;
     console.error = jest.fn();
 
-    // Load the script
-    require('../../../contacts/static/contacts/js/get_weather.js');
-
-    // Trigger DOMContentLoaded event to initialize the script
-    document.dispatchEvent(new Event('DOMContentLoaded'));
-
-    // Wait for all promises to resolve
-    await new Promise(process.nextTick);
-
-    // Get the weather cell for the error city
-    const errorCityCell = document.querySelector('.weather-data[data-city="ErrorCity"]');
+    await runScript();
 
     // Assert that the error message was displayed
+    const errorCityCell = document.querySelector('.weather-data[data-city="ErrorCity"]');
     expect(errorCityCell.innerHTML).toContain('Error');
 
     // Assert that console.error was called
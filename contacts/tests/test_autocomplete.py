@@ -0,0 +1,109 @@
+"""
+Tests for the autocomplete prefix index.
+"""
+
+from django.test import TestCase, override_settings
+
+from contacts.autocomplete import PrefixIndex, autocomplete_index
+from contacts.models import Contact
+from testing.factories import ContactFactory
+
+
+class PrefixIndexTest(TestCase):
+    """Test suite for the sorted prefix index."""
+
+    def setUp(self):
+        """Build an index of a few contacts."""
+        self.index = PrefixIndex.build(
+            [
+                (1, ("Jan", "Kowalski", "jan@example.com")),
+                (2, ("Janina", "Nowak", "janina@example.com")),
+                (3, ("Adam", "Jankowski", "adam@example.com")),
+            ],
+        )
+
+    def ids(self, prefix, limit=10):
+        """Return the ids a prefix completes to."""
+        return [pk for pk, _ in self.index.complete(prefix, limit)]
+
+    def test_complete(self):
+        """Test that names and emails are matched by prefix, case-insensitively, in key order."""
+        self.assertEqual(self.ids("JAN"), [1, 2, 3])
+        self.assertEqual(self.ids("jank"), [3])
+        self.assertEqual(self.ids("kowal"), [1])
+        self.assertEqual(self.ids("adam@"), [3])
+        self.assertEqual(self.ids("jan", limit=1), [1])
+        self.assertEqual(self.ids("zzz"), [])
+        self.assertEqual(self.ids("   "), [])
+
+    def test_every_word_must_match(self):
+        """Test that every word of the prefix must start a name or email of the contact."""
+        self.assertEqual(self.ids("jan now"), [2])
+        self.assertEqual(self.ids("now jan"), [2])
+        self.assertEqual(self.ids("jan smith"), [])
+
+    def test_add_and_remove(self):
+        """Test that contacts are added, re-indexed under their new keys and removed in place."""
+        self.index.add(4, ("Zofia", "Jankowska", "zofia@example.com"))
+        self.assertEqual(self.ids("jankowsk"), [4, 3])
+
+        self.index.add(1, ("Jan", "Zieliński", "jan@example.com"))
+        self.assertEqual(self.ids("kowal"), [])
+        self.assertEqual(self.ids("ziel"), [1])
+
+        self.index.remove(2)
+        self.index.remove(99)
+        self.assertEqual(self.ids("jan"), [1, 4, 3])
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.keys, sorted(self.index.keys))
+
+
+class AutocompleteIndexTest(TestCase):
+    """Test suite for the process-wide autocomplete index."""
+
+    def setUp(self):
+        """Start every test with an unloaded index."""
+        autocomplete_index.clear()
+        self.addCleanup(autocomplete_index.clear)
+        self.jan = ContactFactory(first_name="Jan", last_name="Kowalski", email="jan@example.com")
+
+    def test_loads_contacts(self):
+        """Test that the index is loaded from the database, then answers without queries."""
+        with self.assertNumQueries(1):
+            autocomplete_index.complete("kow", 10)
+        with self.assertNumQueries(0):
+            results = autocomplete_index.complete("kow", 10)
+        self.assertEqual(
+            results,
+            [{"id": self.jan.pk, "first_name": "Jan", "last_name": "Kowalski", "email": "jan@example.com"}],
+        )
+
+    def test_follows_committed_saves_and_deletes(self):
+        """Test that saves and deletes update a loaded index once committed."""
+        autocomplete_index.index()
+        with self.captureOnCommitCallbacks(execute=True):
+            anna = ContactFactory(first_name="Anna", last_name="Nowak")
+        self.assertEqual([contact["id"] for contact in autocomplete_index.complete("nowak", 10)], [anna.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.jan.last_name = "Zieliński"
+            self.jan.save()
+        self.assertEqual(autocomplete_index.complete("kow", 10), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            anna.delete()
+        self.assertEqual(autocomplete_index.complete("nowak", 10), [])
+
+    def test_uncommitted_writes_are_ignored(self):
+        """Test that writes are not indexed before their transaction commits."""
+        autocomplete_index.index()
+        with self.captureOnCommitCallbacks(execute=False):
+            ContactFactory(first_name="Anna", last_name="Nowak")
+        self.assertEqual(autocomplete_index.complete("nowak", 10), [])
+
+    @override_settings(CONTACT_AUTOCOMPLETE_INDEX_TTL=0)
+    def test_reloads_after_ttl(self):
+        """Test that an expired index is reloaded, picking up writes that bypass signals."""
+        autocomplete_index.index()
+        Contact.objects.update(last_name="Wiśniewski")
+        self.assertEqual(autocomplete_index.complete("wiś", 10)[0]["id"], self.jan.pk)
@@ -0,0 +1,69 @@
+"""Tests for the scenarios of the benchmark_suite command."""
+
+from django.test import Client, SimpleTestCase, TestCase
+
+from contacts.models import Contact
+from testing.factories import ContactFactory, ContactStatusFactory, UserFactory
+from testing.scenarios import (
+    ScenarioError,
+    compare_results,
+    contact_scenarios,
+    remove_scenario_contacts,
+    run_scenario,
+)
+
+
+class ScenarioTests(TestCase):
+    """Test suite running every scenario against a few contacts."""
+
+    def setUp(self):
+        """Set up a logged in client, a status and contacts."""
+        self.client = Client()
+        self.client.force_login(UserFactory())
+        self.status = ContactStatusFactory(name="Active")
+        self.contact = ContactFactory(phone_number="111111111", status=self.status)
+        ContactFactory(phone_number="222222222", last_name="Kowalski")
+
+    def test_scenarios_succeed(self):
+        """Test that every scenario is answered as expected and its queries are counted."""
+        scenarios = contact_scenarios(self.status, self.contact.pk, deletions=3)
+        self.assertEqual(len({scenario.name for scenario in scenarios}), len(scenarios))
+        for scenario in scenarios:
+            with self.subTest(scenario=scenario.name):
+                stats = run_scenario(self.client, scenario, repeat=2, warmup=1)
+                self.assertGreater(stats["p50"], 0)
+                self.assertGreaterEqual(stats["max_queries"], stats["queries"])
+                self.assertGreater(stats["queries"], 0)
+
+    def test_remove_scenario_contacts(self):
+        """Test that contacts created by scenarios are removed and seeded ones kept."""
+        scenarios = {scenario.name: scenario for scenario in contact_scenarios(self.status, self.contact.pk, 2)}
+        run_scenario(self.client, scenarios["api_create"], repeat=2, warmup=0)
+        self.assertEqual(remove_scenario_contacts(), 6)
+        self.assertEqual(Contact.objects.count(), 2)
+
+    def test_unexpected_status(self):
+        """Test that a scenario answered with another status fails."""
+        scenario = contact_scenarios(self.status, self.contact.pk, 0)[0]
+        self.client.logout()
+        with self.assertRaises(ScenarioError):
+            run_scenario(self.client, scenario, repeat=2)
+
+
+class CompareResultsTests(SimpleTestCase):
+    """Test suite for comparing runs."""
+
+    baseline = {"list": {"p50": 10.0, "max_queries": 3}, "detail": {"p50": 5.0, "max_queries": 2}}  # noqa: RUF012
+
+    def test_no_regressions(self):
+        """Test that changes within the threshold and new scenarios are accepted."""
+        current = {"list": {"p50": 11.0, "max_queries": 3}, "create": {"p50": 50.0, "max_queries": 9}}
+        self.assertEqual(compare_results(self.baseline, current, 0.2), [])
+
+    def test_regressions(self):
+        """Test that slower scenarios and extra queries are reported."""
+        current = {"list": {"p50": 13.0, "max_queries": 3}, "detail": {"p50": 5.0, "max_queries": 3}}
+        self.assertEqual(
+            compare_results(self.baseline, current, 0.2),
+            ["list: p50 10.00ms -> 13.00ms", "detail: queries 2 -> 3"],
+        )
@@ -0,0 +1,98 @@
+"""
+Tests for the contact change log.
+"""
+
+from django.db import transaction
+from django.test import TestCase
+
+from contacts.changes import changes_since, latest_token, record_changes
+from contacts.models import Contact, ContactChange
+from contacts.status_deletion import delete_status_contacts
+from testing.factories import ContactFactory, ContactStatusFactory
+
+CREATED = ContactChange.Action.CREATED
+UPDATED = ContactChange.Action.UPDATED
+DELETED = ContactChange.Action.DELETED
+
+
+def logged():
+    """Return the action and contact id of every recorded change, in sequence order."""
+    return list(ContactChange.objects.order_by("pk").values_list("action", "contact_id"))
+
+
+class ChangeRecordingTest(TestCase):
+    """Test suite for recording contact changes."""
+
+    def test_signals(self):
+        """Test that creating, updating and deleting a contact each record a change."""
+        contact = ContactFactory()
+        contact.city = "Gdańsk"
+        contact.save()
+        pk = contact.pk
+        contact.delete()
+        self.assertEqual(logged(), [(CREATED, pk), (UPDATED, pk), (DELETED, pk)])
+
+    def test_status_deletion(self):
+        """Test that contacts deleted with their status leave tombstones."""
+        status = ContactStatusFactory()
+        contacts = ContactFactory.create_batch(2, status=status)
+        ContactChange.objects.all().delete()
+        delete_status_contacts(status)
+        self.assertCountEqual(logged(), [(DELETED, contact.pk) for contact in contacts])
+
+    def test_rollback(self):
+        """Test that changes are recorded in the transaction of the write."""
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            ContactFactory()
+            raise RuntimeError
+        self.assertEqual(logged(), [])
+        self.assertFalse(Contact.objects.exists())
+
+    def test_record_changes(self):
+        """Test that bulk writes are recorded explicitly, and empty ones not at all."""
+        record_changes([], UPDATED)
+        record_changes([3, 5], UPDATED)
+        self.assertEqual(logged(), [(UPDATED, 3), (UPDATED, 5)])
+
+
+class ChangesSinceTest(TestCase):
+    """Test suite for reading the changes after a token."""
+
+    def setUp(self):
+        """Set up a created, an updated and a deleted contact."""
+        self.kept = ContactFactory()
+        self.start = latest_token()
+        self.created = ContactFactory()
+        self.kept.save()
+        self.created.save()
+        self.deleted = ContactFactory()
+        self.deleted_pk = self.deleted.pk
+        self.deleted.delete()
+
+    def test_changes_are_merged_per_contact(self):
+        """Test that every contact appears once, with its net change, in the order of its latest change."""
+        page = changes_since(self.start, 100)
+        self.assertEqual(
+            [(action, contact_id) for _, action, contact_id in page.changes],
+            [(UPDATED, self.kept.pk), (CREATED, self.created.pk), (DELETED, self.deleted_pk)],
+        )
+        self.assertEqual(page.token, latest_token())
+        self.assertFalse(page.has_more)
+
+    def test_pages(self):
+        """Test that tokens page through the changes, and that a current token reads nothing."""
+        page = changes_since(self.start, 2)
+        self.assertEqual([contact_id for _, _, contact_id in page.changes], [self.created.pk, self.kept.pk])
+        self.assertTrue(page.has_more)
+
+        page = changes_since(page.token, 2)
+        self.assertEqual(
+            [(action, pk) for _, action, pk in page.changes], [(UPDATED, self.created.pk), (CREATED, self.deleted_pk)]
+        )
+        self.assertTrue(page.has_more)
+
+        page = changes_since(page.token, 2)
+        self.assertEqual([(action, pk) for _, action, pk in page.changes], [(DELETED, self.deleted_pk)])
+        self.assertFalse(page.has_more)
+
+        self.assertEqual(changes_since(page.token, 2), ([], page.token, False))
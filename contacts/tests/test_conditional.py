@@ -0,0 +1,63 @@
+"""
+Tests for conditional GET on the contact list and detail pages.
+"""
+
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from contacts.fuzzy import fuzzy_vocabulary
+from testing.factories import ContactFactory, UserFactory
+
+
+class ContactConditionalGetTest(TestCase):
+    """Test suite for ETags and 304 responses of the contact pages."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = UserFactory()
+        self.client.force_login(self.user)
+        self.contact = ContactFactory(phone_number="111111111")
+        self.list_url = reverse("contacts:contact-list")
+        self.detail_url = reverse("contacts:contact-detail", kwargs={"pk": self.contact.pk})
+
+    def test_list_not_modified(self):
+        """Test that an unchanged list page is answered with 304 until a contact changes."""
+        etag = self.client.get(self.list_url)["ETag"]
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        ContactFactory(phone_number="222222222")
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["contacts"]), 2)
+
+    def test_list_etag_depends_on_parameters_and_user(self):
+        """Test that pages with other parameters or for another user have their own ETag."""
+        etag = self.client.get(self.list_url)["ETag"]
+        self.assertNotEqual(etag, self.client.get(self.list_url, {"sort": "-created_at"})["ETag"])
+
+        self.client.force_login(UserFactory())
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_searches_once(self):
+        """Test that the ETag and the page read the same search, expanded once."""
+        with mock.patch.object(fuzzy_vocabulary, "similar_words", wraps=fuzzy_vocabulary.similar_words) as similar:
+            response = self.client.get(self.list_url, {"q": self.contact.last_name, "fuzzy": "1"})
+        self.assertEqual(similar.call_count, 1)
+        self.assertIn(self.contact, response.context["contacts"])
+
+    def test_detail_not_modified(self):
+        """Test that an unchanged contact page is answered with 304 until the contact changes."""
+        response = self.client.get(self.detail_url)
+        self.assertIn("Last-Modified", response)
+        etag = response["ETag"]
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.contact.city = "Kraków"
+        self.contact.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Kraków")
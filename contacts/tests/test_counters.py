@@ -0,0 +1,137 @@
+"""
+Tests for the per-status and per-city contact counters.
+"""
+
+import json
+from io import BytesIO, StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from contacts.counters import city_counts, reconcile_counts, status_counts
+from contacts.importing import NDJSON, import_contacts
+from contacts.models import Contact, ContactCount
+from contacts.status_deletion import delete_status_contacts, reassign_contacts
+from testing.factories import ContactFactory, ContactStatusFactory, UserFactory
+
+
+class ContactCountersTest(TestCase):
+    """Test suite for maintaining and reconciling the counters."""
+
+    def setUp(self):
+        """Set up two statuses and contacts in two cities."""
+        self.lead = ContactStatusFactory(name="Lead")
+        self.client_status = ContactStatusFactory(name="Client")
+        self.jan = ContactFactory(status=self.lead, city="Kraków")
+        ContactFactory(status=self.lead, city="Gdańsk")
+        ContactFactory(status=None, city="Kraków")
+
+    def assert_counts_match(self):
+        """Assert that no counter differs from the counts of the contacts."""
+        self.assertEqual(reconcile_counts(dry_run=True), {})
+
+    def test_created_contacts(self):
+        """Test that created contacts are counted."""
+        self.assertEqual(status_counts(), {self.lead.pk: 2, None: 1})
+        self.assertEqual(city_counts(), [("Kraków", 2), ("Gdańsk", 1)])
+        self.assert_counts_match()
+
+    def test_updated_contacts(self):
+        """Test that a changed status or city moves a contact between counters, and other changes do not."""
+        contact = Contact.objects.get(pk=self.jan.pk)
+        contact.status, contact.city = self.client_status, "Gdańsk"
+        contact.save()
+        self.assertEqual(status_counts(), {self.lead.pk: 1, self.client_status.pk: 1, None: 1})
+        self.assertEqual(city_counts(), [("Gdańsk", 2), ("Kraków", 1)])
+
+        contact.first_name = "Janek"
+        # The update and its change log entry, without touching the counters.
+        with self.assertNumQueries(2):
+            contact.save()
+        contact.city = "Kraków"
+        contact.save(update_fields=["first_name"])
+        self.assert_counts_match()
+
+    def test_contact_saved_without_loading(self):
+        """Test that saving an unloaded contact over an existing one reads its previous values first."""
+        values = Contact.objects.filter(pk=self.jan.pk).values(
+            "first_name",
+            "last_name",
+            "phone_number",
+            "email",
+            "created_at",
+        )
+        Contact(pk=self.jan.pk, city="Gdańsk", status=None, **values.get()).save()
+        self.assertEqual(city_counts(), [("Gdańsk", 2), ("Kraków", 1)])
+        self.assert_counts_match()
+
+    def test_deleted_contacts_and_statuses(self):
+        """Test that deleted contacts leave their counters, whether deleted alone or with their status."""
+        self.jan.delete()
+        self.assertEqual(status_counts(), {self.lead.pk: 1, None: 1})
+        delete_status_contacts(self.lead)
+        self.assertEqual(status_counts(), {None: 1})
+        self.assertEqual(city_counts(), [("Kraków", 1)])
+        self.assert_counts_match()
+
+    def test_bulk_paths(self):
+        """Test that imports and status reassignment keep the counters."""
+        row = {
+            "first_name": "Anna",
+            "last_name": "Nowak",
+            "phone_number": "111222333",
+            "email": "anna@example.com",
+            "city": "Poznań",
+            "status": "Client",
+        }
+        result = import_contacts(BytesIO(json.dumps(row).encode()), NDJSON)
+        self.assertEqual(result.created, 1)
+        reassign_contacts(self.lead, self.client_status)
+        self.assertEqual(status_counts(), {self.client_status.pk: 3, None: 1})
+        self.assert_counts_match()
+
+    def test_reconcile(self):
+        """Test that drifted counters are reported, then fixed, in chunks."""
+        Contact.objects.filter(pk=self.jan.pk).update(city="Gdańsk")
+        ContactCount.objects.filter(dimension=ContactCount.Dimension.STATUS, value="").delete()
+
+        drift = reconcile_counts(chunk_size=2, dry_run=True)
+        self.assertEqual(
+            drift,
+            {("city", "Kraków"): (2, 1), ("city", "Gdańsk"): (1, 2), ("status", ""): (0, 1)},
+        )
+        out = StringIO()
+        call_command("reconcile_contact_counts", "--chunk-size", "2", stdout=out)
+        self.assertIn("3 counter(s) fixed.", out.getvalue())
+        self.assert_counts_match()
+        with self.assertRaises(CommandError):
+            call_command("reconcile_contact_counts", "--chunk-size", "0")
+
+    def test_seeded_contacts(self):
+        """Test that seeding, which bypasses the ORM, recomputes the counters."""
+        call_command("seed_contacts", "20", "--keep-indexes", stdout=StringIO())
+        self.assertEqual(sum(status_counts().values()), 23)
+        self.assert_counts_match()
+
+
+class StatusPageCountsTest(TestCase):
+    """Test suite for the counts on the status pages."""
+
+    def setUp(self):
+        """Log in and set up a status with two contacts and a contact without status."""
+        self.client.force_login(UserFactory())
+        self.lead = ContactStatusFactory(name="Lead")
+        ContactFactory.create_batch(2, status=self.lead)
+        ContactFactory(status=None)
+
+    def test_list(self):
+        """Test that the list shows the counts of the statuses and of contacts without one."""
+        response = self.client.get(reverse("contacts:status-list"))
+        self.assertContains(response, "(2 contacts)")
+        self.assertContains(response, "1 contact without a status.")
+
+    def test_detail(self):
+        """Test that the detail page shows the count with a link to the contacts."""
+        response = self.client.get(reverse("contacts:status-detail", kwargs={"pk": self.lead.pk}))
+        self.assertContains(response, f'?status={self.lead.pk}" class="text-blue-600 hover:underline">2 contacts</a>')
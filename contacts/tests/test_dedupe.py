@@ -0,0 +1,162 @@
+"""
+Tests for duplicate contact detection and merging.
+"""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from contacts.dedupe import (
+    DuplicateFinder,
+    Features,
+    MergeError,
+    Profile,
+    blocking_keys,
+    email_local_part,
+    fold,
+    merge_contacts,
+    score,
+    soundex,
+)
+from contacts.models import Contact, ContactBlockingKey, DuplicateCandidate
+from testing.factories import ContactFactory, ContactStatusFactory
+
+
+def profile(first_name, last_name, email, city):
+    """Return the profile of a contact's values."""
+    return Profile.of(Features.of(first_name, last_name, email, city))
+
+
+class NormalizationTest(TestCase):
+    """Test suite for the normalization, blocking keys and scores of contacts."""
+
+    def test_fold(self):
+        """Test that values are case- and accent-folded with single spaces between words."""
+        self.assertEqual(fold("  Łukasz  WÓJCIK-Nowak "), "lukasz wojcik nowak")
+        self.assertEqual(fold("Straße"), "strasse")
+
+    def test_soundex(self):
+        """Test that Soundex codes match the reference algorithm and group misspellings."""
+        self.assertEqual(soundex("Kowalski"), "K420")
+        self.assertEqual(soundex("Kowalsky"), "K420")
+        self.assertEqual(soundex("Ashcraft"), "A261")
+        self.assertEqual(soundex("Tymczak"), "T522")
+        self.assertEqual(soundex("Pfister"), "P236")
+        self.assertEqual(soundex("123"), "")
+
+    def test_email_local_part(self):
+        """Test that tags, punctuation and the domain are dropped from emails."""
+        self.assertEqual(email_local_part("Jan.Kowalski+work@example.com"), "jankowalski")
+        self.assertEqual(email_local_part("jan_kowalski@other.org"), "jankowalski")
+
+    def test_blocking_keys(self):
+        """Test that every kind of key is derived, with the name words sorted."""
+        keys = blocking_keys(Features.of("Jan", "Kowalski", "jan.k@example.com", "Kraków"))
+        self.assertEqual(
+            keys,
+            [("name", "jan kowalski"), ("phonetic", "K420J500"), ("city", "krakow|K420"), ("email", "jank")],
+        )
+        self.assertEqual(blocking_keys(Features.of("Kowalski", "Jan", "", ""))[0], ("name", "jan kowalski"))
+
+    def test_score(self):
+        """Test that scores rank the same person above namesakes and relatives."""
+        jan = profile("Jan", "Kowalski", "jan.kowalski@example.com", "Kraków")
+        self.assertAlmostEqual(score(jan, jan), 1.0)
+        typo = score(jan, profile("Jan ", "kowalsky", "jkowalski@other.org", "Krakow"))
+        namesake = score(jan, profile("Jan", "Kowalski", "jk1980@example.com", "Berlin"))
+        relative = score(jan, profile("Janina", "Kowalska", "janina@example.com", "Kraków"))
+        self.assertGreater(typo, 0.7)
+        self.assertLess(namesake, 0.7)
+        self.assertLess(relative, 0.7)
+
+
+class DuplicateFinderTest(TestCase):
+    """Test suite for detecting duplicates with blocking."""
+
+    def setUp(self):
+        """Set up two pairs of duplicates and unrelated contacts."""
+        self.jan = ContactFactory(first_name="Jan", last_name="Kowalski", email="jan.kowalski@a.com", city="Kraków")
+        self.jan_copy = ContactFactory(first_name="Jan", last_name="kowalski", email="jkowalski@b.com", city="Krakow")
+        self.anna = ContactFactory(first_name="Anna", last_name="Nowak", email="anna.nowak@a.com", city="Gdańsk")
+        self.anna_typo = ContactFactory(first_name="Ana", last_name="Nowak", email="anna.nowak@b.com", city="Gdansk")
+        ContactFactory(first_name="Piotr", last_name="Zieliński", email="pz@a.com", city="Warsaw")
+        ContactFactory(first_name="Jan", last_name="Kowalski", email="jk1980@c.com", city="Berlin")
+
+    def pairs(self):
+        """Return the stored candidate pairs."""
+        return set(DuplicateCandidate.objects.values_list("contact_id", "duplicate_id"))
+
+    def test_finds_duplicates(self):
+        """Test that duplicates are found in small chunks, and that runs replace earlier results."""
+        stats = DuplicateFinder(chunk_size=2).run()
+        expected = {(self.jan.pk, self.jan_copy.pk), (self.anna.pk, self.anna_typo.pk)}
+        self.assertEqual(self.pairs(), expected)
+        self.assertEqual(stats.contacts, 6)
+        self.assertEqual(stats.keys, ContactBlockingKey.objects.count())
+        self.assertEqual(stats.candidates, 2)
+        self.assertEqual(set(stats.timings), {"keys", "candidates"})
+
+        self.anna_typo.delete()
+        DuplicateFinder().run()
+        self.assertEqual(self.pairs(), {(self.jan.pk, self.jan_copy.pk)})
+
+    def test_large_blocks_are_skipped(self):
+        """Test that blocks above the maximum size are not compared, while smaller blocks still pair their contacts."""
+        stats = DuplicateFinder(max_block_size=2).run()
+        # The three Jan Kowalskis share a name and a phonetic key; only the two in Kraków share a city key.
+        self.assertEqual(stats.skipped_blocks, 2)
+        self.assertIn((self.jan.pk, self.jan_copy.pk), self.pairs())
+
+    def test_threshold(self):
+        """Test that the threshold filters the stored pairs."""
+        DuplicateFinder(threshold=1.0).run()
+        self.assertEqual(self.pairs(), set())
+
+    def test_process_pool(self):
+        """Test that worker processes find the same pairs."""
+        DuplicateFinder(chunk_size=2, workers=2).run()
+        self.assertEqual(self.pairs(), {(self.jan.pk, self.jan_copy.pk), (self.anna.pk, self.anna_typo.pk)})
+
+    def test_command(self):
+        """Test that the command reports the candidates and validates its options."""
+        out = StringIO()
+        call_command("find_duplicates", "--chunk-size", "3", stdout=out)
+        self.assertIn("Found 2 duplicate candidates.", out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command("find_duplicates", "--threshold", "2")
+
+
+class MergeContactsTest(TestCase):
+    """Test suite for merging duplicates."""
+
+    def setUp(self):
+        """Set up a contact and two duplicates."""
+        self.status = ContactStatusFactory(name="Active")
+        self.survivor = ContactFactory(first_name="Jan", last_name="Kowalski", status=None)
+        self.first = ContactFactory(first_name="Jan", last_name="Kowalsky", status=self.status)
+        self.second = ContactFactory(first_name="J.", last_name="Kowalski", status=None)
+        Contact.objects.filter(pk=self.second.pk).update(created_at=self.survivor.created_at - timedelta(days=3))
+        DuplicateFinder(threshold=0).run()
+
+    def test_merge(self):
+        """Test that duplicates are deleted with their candidates and the survivor is updated."""
+        created_at = Contact.objects.get(pk=self.second.pk).created_at
+        with self.captureOnCommitCallbacks(execute=True):
+            contact = merge_contacts(self.survivor, [self.first.pk, self.second.pk])
+
+        self.assertEqual(list(Contact.objects.values_list("pk", flat=True)), [self.survivor.pk])
+        self.assertEqual(contact.last_name, "Kowalski")
+        self.assertEqual(contact.status, self.status)
+        self.assertEqual(contact.created_at, created_at)
+        self.assertFalse(DuplicateCandidate.objects.exists())
+        self.assertFalse(ContactBlockingKey.objects.exclude(contact=self.survivor).exists())
+
+    def test_invalid_merges(self):
+        """Test that merges into the contact itself or with missing contacts are rejected and change nothing."""
+        with self.assertRaisesMessage(MergeError, "itself"):
+            merge_contacts(self.survivor, [self.survivor.pk])
+        with self.assertRaisesMessage(MergeError, "do not exist"):
+            merge_contacts(self.survivor, [self.first.pk, 0])
+        self.assertEqual(Contact.objects.count(), 3)
@@ -0,0 +1,105 @@
+"""
+Tests for the streaming contact export.
+"""
+
+import csv
+import gzip
+import io
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from contacts.exporting import EXPORT_FIELDS
+from testing.factories import ContactFactory, ContactStatusFactory, UserFactory
+
+
+class ContactExportViewTest(TestCase):
+    """Test suite for exporting the contacts selected by the list view filters."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = UserFactory()
+        self.client.force_login(self.user)
+        self.active = ContactStatusFactory(name="Active")
+        self.john = ContactFactory(
+            first_name="John",
+            last_name="Kowalski",
+            phone_number="123456789",
+            email="john@example.com",
+            city="Warsaw",
+            status=self.active,
+        )
+        self.jane = ContactFactory(
+            first_name="Jane",
+            last_name="Adams",
+            phone_number="987654321",
+            email="jane@example.com",
+            city="Kraków",
+            status=None,
+        )
+        self.url = reverse("contacts:contact-export")
+
+    def export(self, **params):
+        """Return the response and the decoded body of an export."""
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        body = b"".join(response.streaming_content)
+        if params.get("gzip"):
+            body = gzip.decompress(body)
+        return response, body.decode()
+
+    def test_csv_export(self):
+        """Test that the CSV export has a header and one line per contact in the list order."""
+        response, body = self.export()
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn('filename="contacts.csv"', response["Content-Disposition"])
+
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(list(rows[0]), list(EXPORT_FIELDS))
+        self.assertEqual([row["last_name"] for row in rows], ["Adams", "Kowalski"])
+        self.assertEqual(rows[1]["status"], "Active")
+        self.assertEqual(rows[0]["status"], "")
+
+    def test_ndjson_export(self):
+        """Test that the NDJSON export has one object per line."""
+        response, body = self.export(format="ndjson", sort="-last_name")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row["email"] for row in rows], ["john@example.com", "jane@example.com"])
+        self.assertEqual(rows[0]["city"], "Warsaw")
+        self.assertIsNone(rows[1]["status"])
+
+    def test_gzip_export(self):
+        """Test that exports can be compressed."""
+        response, body = self.export(format="ndjson", gzip="1")
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertIn('filename="contacts.ndjson.gz"', response["Content-Disposition"])
+        self.assertEqual(len(body.splitlines()), 2)
+
+    def test_filters_apply(self):
+        """Test that the list view's search and status filters select the exported contacts."""
+        _, body = self.export(q="kowal")
+        self.assertEqual(len(list(csv.DictReader(io.StringIO(body)))), 1)
+
+        _, body = self.export(status=self.active.id, format="ndjson")
+        self.assertEqual([json.loads(line)["id"] for line in body.splitlines()], [self.john.id])
+
+        _, body = self.export(q="kowal", sort="relevance", format="ndjson")
+        self.assertEqual([json.loads(line)["id"] for line in body.splitlines()], [self.john.id])
+
+    def test_many_contacts_in_one_query(self):
+        """Test that exporting does not issue a query per row or per status."""
+        for n in range(20):
+            ContactFactory(phone_number=f"{n:09d}", status=ContactStatusFactory(name=f"Status {n}"))
+        response = self.client.get(self.url)
+        with self.assertNumQueries(1):
+            body = b"".join(response.streaming_content)
+        self.assertEqual(len(body.decode().splitlines()), 23)
+
+    def test_requires_login(self):
+        """Test that anonymous users are redirected to the login page."""
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
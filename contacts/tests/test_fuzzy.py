@@ -0,0 +1,139 @@
+"""
+Tests for the typo-tolerant fuzzy search.
+"""
+
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from contacts.fuzzy import TrigramIndex, fuzzy_vocabulary, trigrams, words
+from contacts.models import Contact
+from contacts.search import IContainsSearchBackend, fuzzy_requested, get_search_backend
+from testing.factories import ContactFactory, UserFactory
+
+
+class TrigramIndexTest(TestCase):
+    """Test suite for the trigram index of words."""
+
+    def test_words_and_trigrams(self):
+        """Test that values are split into lowercase words of letters, padded like pg_trgm."""
+        self.assertEqual(words("Jan.Kowalski-2@example.com"), ["jan", "kowalski", "example", "com"])
+        self.assertEqual(words("Łódź"), ["łódź"])
+        self.assertEqual(trigrams("cat"), {"  c", " ca", "cat", "at "})
+
+    def test_similar_words(self):
+        """Test that words are ranked by trigram similarity and filtered by the threshold."""
+        index = TrigramIndex()
+        for word in ("kowalski", "kowalczyk", "nowak", "kowalski"):
+            index.add(word)
+        self.assertEqual(len(index), 3)
+
+        similar = index.similar("Kowalsky", threshold=0.3, limit=10)
+        self.assertEqual(list(similar), ["kowalski", "kowalczyk"])
+        self.assertGreater(similar["kowalski"], similar["kowalczyk"])
+        self.assertEqual(index.similar("kowalski", threshold=0.3, limit=10)["kowalski"], 1.0)
+        self.assertEqual(list(index.similar("kowalsky", threshold=0.3, limit=1)), ["kowalski"])
+        self.assertEqual(index.similar("xyz", threshold=0.3, limit=10), {})
+
+
+class FuzzyVocabularyTest(TestCase):
+    """Test suite for the process-wide vocabulary of contact words."""
+
+    def setUp(self):
+        """Start every test with an unloaded vocabulary."""
+        fuzzy_vocabulary.clear()
+        self.addCleanup(fuzzy_vocabulary.clear)
+        ContactFactory(first_name="John", last_name="Kowalski", city="Warsaw")
+
+    def test_loads_contact_words(self):
+        """Test that the vocabulary holds the words of every fuzzy field."""
+        self.assertIn("kowalski", fuzzy_vocabulary.similar_words("kowalsky"))
+        self.assertIn("warsaw", fuzzy_vocabulary.similar_words("warsow"))
+
+    def test_saved_contacts_are_added(self):
+        """Test that saving a contact adds its words to a loaded vocabulary without reloading it."""
+        fuzzy_vocabulary.index()
+        with mock.patch.object(fuzzy_vocabulary, "load") as load:
+            ContactFactory(last_name="Nowak")
+            self.assertIn("nowak", fuzzy_vocabulary.similar_words("nowack"))
+        load.assert_not_called()
+
+    @override_settings(CONTACT_FUZZY_INDEX_TTL=0)
+    def test_reloads_after_ttl(self):
+        """Test that an expired vocabulary is reloaded, picking up writes that bypass signals."""
+        fuzzy_vocabulary.index()
+        Contact.objects.update(last_name="Wiśniewski")
+        self.assertIn("wiśniewski", fuzzy_vocabulary.similar_words("wisniewski"))
+
+
+class FuzzySearchBackendTest(TestCase):
+    """Test suite for fuzzy search with the configured and the icontains backends."""
+
+    def setUp(self):
+        """Set up test data."""
+        fuzzy_vocabulary.clear()
+        self.addCleanup(fuzzy_vocabulary.clear)
+        self.john = ContactFactory(first_name="John", last_name="Kowalski", email="jk@example.com", city="Warsaw")
+        self.jane = ContactFactory(first_name="Jane", last_name="Kowalczyk", email="jane@example.com", city="Kraków")
+        self.bob = ContactFactory(first_name="Bob", last_name="Johnson", email="bob@sample.org", city="Gdańsk")
+
+    def search(self, backend, terms, **kwargs):
+        """Return the contacts matched by a fuzzy search."""
+        return list(backend.fuzzy_search(Contact.objects.all(), terms, **kwargs))
+
+    def test_tolerates_typos(self):
+        """Test that misspelled terms find the contacts, the closest ones first when ranked."""
+        for backend in (get_search_backend(), IContainsSearchBackend()):
+            with self.subTest(backend=type(backend).__name__):
+                self.assertEqual(set(self.search(backend, ["kowalsky"])), {self.john, self.jane})
+                ranked = self.search(backend, ["kowalsky"], ranked=True)
+                self.assertEqual(sorted(ranked, key=lambda contact: -contact.search_rank)[0], self.john)
+
+    def test_every_term_must_match(self):
+        """Test that every term, fuzzy or shorter than a trigram, must match."""
+        backend = get_search_backend()
+        self.assertEqual(self.search(backend, ["kowalsky", "warsw"]), [self.john])
+        self.assertEqual(self.search(backend, ["kowalsky", "ja"]), [self.jane])
+
+    def test_no_similar_word(self):
+        """Test that a term without similar words matches nothing."""
+        self.assertEqual(self.search(get_search_backend(), ["kowalsky", "qqqqqq"], ranked=True), [])
+
+
+class FuzzyListSearchTest(TestCase):
+    """Test suite for fuzzy search from the contact list view."""
+
+    def setUp(self):
+        """Set up test data."""
+        fuzzy_vocabulary.clear()
+        self.addCleanup(fuzzy_vocabulary.clear)
+        self.client.force_login(UserFactory())
+        ContactFactory(first_name="John", last_name="Kowalski")
+        ContactFactory(first_name="Bob", last_name="Johnson")
+        self.list_url = reverse("contacts:contact-list")
+
+    def test_fuzzy_parameter(self):
+        """Test that the fuzzy values are recognized."""
+        self.assertTrue(fuzzy_requested({"fuzzy": "1"}))
+        self.assertTrue(fuzzy_requested({"fuzzy": "on"}))
+        self.assertFalse(fuzzy_requested({"fuzzy": "0"}))
+        self.assertFalse(fuzzy_requested({}))
+
+    def test_fuzzy_list_search(self):
+        """Test that fuzzy list searches tolerate typos and sort by relevance by default."""
+        response = self.client.get(f"{self.list_url}?q=kowalsky")
+        self.assertNotContains(response, "Kowalski")
+
+        response = self.client.get(f"{self.list_url}?q=kowalsky&fuzzy=1")
+        self.assertContains(response, "Kowalski")
+        self.assertNotContains(response, "Johnson")
+        self.assertEqual(response.context["view"].get_ordering(), "relevance")
+        self.assertTrue(response.context["fuzzy"])
+        self.assertContains(response, "fuzzy=1")
+
+    def test_explicit_sort(self):
+        """Test that an explicit sort overrides the relevance default."""
+        response = self.client.get(f"{self.list_url}?q=kowalsky&fuzzy=1&sort=-last_name")
+        self.assertEqual(response.context["view"].get_ordering(), "-last_name")
+        self.assertContains(response, "Kowalski")
@@ -0,0 +1,227 @@
+"""
+Tests for the bulk contact import.
+"""
+
+import io
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError
+from django.test import TestCase
+
+from contacts.importing import (
+    CSV,
+    JSON,
+    NDJSON,
+    ContactImporter,
+    ImportFormatError,
+    detect_format,
+    import_contacts,
+    parse_json,
+    parse_ndjson,
+    read_lines,
+)
+from contacts.models import Contact, ContactStatusChoices
+from testing.factories import ContactFactory, ContactStatusFactory
+
+
+def row(n, **overrides):
+    """Return the fields of a valid contact row."""
+    return {
+        "first_name": "Anna",
+        "last_name": f"Nowak{n}",
+        "phone_number": f"{n:09d}",
+        "email": f"anna.{n}@example.com",
+        "city": "Warsaw",
+        "status": "",
+        **overrides,
+    }
+
+
+def to_csv(rows):
+    """Encode rows as a CSV file."""
+    header = ",".join(row(0))
+    lines = [",".join(str(value) for value in r.values()) for r in rows]
+    return io.BytesIO("\n".join([header, *lines]).encode())
+
+
+def to_ndjson(rows):
+    """Encode rows as an NDJSON file."""
+    return io.BytesIO("\n".join(json.dumps(r) for r in rows).encode())
+
+
+class ImportTest(TestCase):
+    """Test suite for importing contacts from files."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.status = ContactStatusFactory(name="Active")
+
+    def test_import_every_format(self):
+        """Test that CSV, JSON and NDJSON files create the same contacts."""
+        encoders = {CSV: to_csv, JSON: lambda rows: io.BytesIO(json.dumps(rows).encode()), NDJSON: to_ndjson}
+        for offset, (fmt, encode) in enumerate(encoders.items()):
+            with self.subTest(fmt=fmt):
+                rows = [row(offset * 10 + n, status="Active") for n in range(3)]
+                result = import_contacts(encode(rows), fmt)
+                self.assertEqual((result.created, result.error_count), (3, 0))
+                contact = Contact.objects.get(phone_number=rows[0]["phone_number"])
+                self.assertEqual(contact.status, self.status)
+                self.assertEqual(contact.last_name, rows[0]["last_name"])
+
+    def test_invalid_rows_are_reported(self):
+        """Test that invalid rows are rejected with their row number and field errors."""
+        rows = [row(1), row(2, email="not-an-email"), row(3, phone_number="12345"), row(4, status="Unknown")]
+        result = import_contacts(to_csv(rows), CSV)
+
+        self.assertEqual((result.created, result.error_count), (1, 3))
+        self.assertEqual([error.row for error in result.errors], [3, 4, 5])
+        self.assertIn("email", result.errors[0].errors)
+        self.assertEqual(result.errors[1].errors["phone_number"], ["Phone number must be 9 digits long."])
+        self.assertIn("status", result.errors[2].errors)
+
+    def test_duplicates_are_rejected(self):
+        """Test that emails and phones taken in the database or earlier in the file are rejected."""
+        ContactFactory(phone_number="000000001", email="taken@example.com")
+        rows = [
+            row(1),
+            row(2, email="taken@example.com"),
+            row(3),
+            row(4, phone_number="000000003"),
+            row(5),
+        ]
+        result = import_contacts(to_ndjson(rows), NDJSON, chunk_size=2)
+
+        self.assertEqual((result.created, result.error_count), (2, 3))
+        self.assertEqual([error.row for error in result.errors], [1, 2, 4])
+        self.assertEqual(result.errors[1].errors, {"email": ["Contact with this Email already exists."]})
+
+    def test_conflicting_chunk_is_inserted_row_by_row(self):
+        """Test that rows of a chunk rolled back by a concurrent write are inserted again with new ids."""
+        insert_one_by_one = ContactImporter.insert_one_by_one
+
+        def take_rolled_back_id(importer, candidates):
+            # Another writer inserts a contact with an id the rolled back bulk_create() returned.
+            ContactFactory(pk=candidates[0][1].pk)
+            insert_one_by_one(importer, candidates)
+
+        with (
+            mock.patch("contacts.importing.record_changes", side_effect=IntegrityError),
+            mock.patch.object(ContactImporter, "insert_one_by_one", take_rolled_back_id),
+        ):
+            result = import_contacts(to_ndjson([row(1), row(2)]), NDJSON)
+
+        self.assertEqual((result.created, result.error_count), (2, 0))
+        self.assertEqual(Contact.objects.count(), 3)
+
+    def test_queries_per_chunk(self):
+        """Test that the number of queries depends on the number of chunks, not rows."""
+        # The statuses, then per chunk two duplicate lookups, and the insert, its changes and counts in a savepoint.
+        with self.assertNumQueries(1 + 2 * 7):
+            result = import_contacts(to_ndjson([row(n) for n in range(40)]), NDJSON, chunk_size=20)
+        self.assertEqual(result.created, 40)
+
+    def test_create_statuses(self):
+        """Test that missing statuses can be created on the fly."""
+        result = import_contacts(to_csv([row(1, status="Lead"), row(2, status="Lead")]), CSV, create_statuses=True)
+        self.assertEqual(result.created, 2)
+        self.assertEqual(ContactStatusChoices.objects.get(name="Lead").contact_set.count(), 2)
+
+    def test_dry_run(self):
+        """Test that a dry run reports the results of an import without keeping anything."""
+        rows = [row(1, status="Lead"), row(1), row(2)]
+        result = import_contacts(to_ndjson(rows), NDJSON, chunk_size=1, dry_run=True, create_statuses=True)
+        self.assertEqual((result.created, result.error_count), (2, 1))
+        self.assertFalse(Contact.objects.exists())
+        self.assertFalse(ContactStatusChoices.objects.filter(name="Lead").exists())
+
+    def test_error_report_is_capped(self):
+        """Test that only the first errors are kept while all of them are counted."""
+        result = import_contacts(to_ndjson([row(n, email="bad") for n in range(10)]), NDJSON, max_errors=3)
+        self.assertEqual(result.error_count, 10)
+        self.assertEqual(len(result.errors), 3)
+
+    def test_malformed_rows(self):
+        """Test that rows which are not objects are rejected without stopping the import."""
+        stream = io.BytesIO(b'[1]\n{"first_name": \n' + json.dumps(row(1)).encode())
+        result = import_contacts(stream, NDJSON)
+        self.assertEqual((result.created, result.error_count), (1, 2))
+
+    def test_detect_format(self):
+        """Test that formats are guessed from file extensions."""
+        self.assertEqual(detect_format("contacts.CSV"), CSV)
+        self.assertEqual(detect_format("contacts.jsonl"), NDJSON)
+        with self.assertRaises(ImportFormatError):
+            detect_format("contacts.xlsx")
+
+
+class ParseJSONTest(TestCase):
+    """Test suite for the incremental JSON array parser."""
+
+    def parse(self, text, read_size=None):
+        """Return the items parsed from a document."""
+        stream = io.BytesIO(text.encode())
+        if read_size:
+            stream.read = lambda n=-1, read=stream.read: read(read_size)
+        return list(parse_json(stream))
+
+    def test_items_split_across_reads(self):
+        """Test that items spanning several reads are reassembled."""
+        items = [row(n, city="Gdańsk") for n in range(5)]
+        self.assertEqual(self.parse(json.dumps(items, indent=2), read_size=7), list(enumerate(items, start=1)))
+
+    def test_empty_array(self):
+        """Test that an empty array has no items."""
+        self.assertEqual(self.parse(" [ ] "), [])
+
+    def test_malformed_documents(self):
+        """Test that documents other than a well-formed array are rejected."""
+        for text in ('{"a": 1}', "[1, 2", "[1 2]", '[{"a": }]', ""):
+            with self.subTest(text=text), self.assertRaises(ImportFormatError):
+                self.parse(text)
+
+
+class ReadLinesTest(TestCase):
+    """Test suite for splitting files into lines."""
+
+    def test_line_endings(self):
+        """Test that lines end at every newline sequence, also when it is split across reads."""
+        for read_size in (1, 2, 3, 64):
+            with self.subTest(read_size=read_size):
+                stream = io.BytesIO(b"a\r\nb\rc\n\nd")
+                stream.read = lambda n=-1, read=stream.read, size=read_size: read(size)
+                self.assertEqual(list(read_lines(stream)), ["a\r\n", "b\r", "c\n", "\n", "d"])
+
+    def test_unicode_line_separators(self):
+        """Test that U+2028, U+2029, form feeds and other separators inside values do not end lines."""
+        value = "Kra\u2028k\u2029\x0b\x0c\x1c\x85ów"
+        stream = io.BytesIO(json.dumps(row(1, city=value), ensure_ascii=False).encode())
+        self.assertEqual(list(parse_ndjson(stream)), [(1, row(1, city=value))])
+
+        result = import_contacts(to_csv([row(1, city=f'"{value}"'), row(2, email="bad")]), CSV)
+        self.assertEqual((result.created, [error.row for error in result.errors]), (1, [3]))
+        self.assertEqual(Contact.objects.get().city, value)
+
+
+class ImportCommandTest(TestCase):
+    """Test suite for the import_contacts management command."""
+
+    def test_import_file(self):
+        """Test that the command imports a file and reports rejected rows."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "contacts.csv"
+            path.write_bytes(to_csv([row(1), row(2, email="bad")]).getvalue())
+            stdout, stderr = io.StringIO(), io.StringIO()
+            call_command("import_contacts", str(path), stdout=stdout, stderr=stderr)
+
+        self.assertIn("Imported 1 contacts, rejected 1 rows.", stdout.getvalue())
+        self.assertIn("row 3: email:", stderr.getvalue())
+        self.assertTrue(Contact.objects.filter(phone_number="000000001").exists())
+
+    def test_unknown_format(self):
+        """Test that unknown file types fail with a command error."""
+        with self.assertRaises(CommandError):
+            call_command("import_contacts", "contacts.xlsx")
@@ -0,0 +1,132 @@
+"""Tests for the request, SQL and template instrumentation."""
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from contacts.instrumentation import (
+    InstrumentationMiddleware,
+    RequestMetrics,
+    current_metrics,
+    fingerprint,
+    metrics_registry,
+)
+from contacts.models import Contact
+from testing.factories import ContactFactory, ContactStatusFactory, UserFactory
+
+
+def timings(response):
+    """Return the Server-Timing entries of a response by name, with their parameters."""
+    entries = {}
+    for entry in response["Server-Timing"].split(", "):
+        name, *params = entry.split(";")
+        entries[name] = dict(param.split("=", 1) for param in params)
+    return entries
+
+
+@override_settings(CONTACT_INSTRUMENTATION=True)
+class InstrumentationMiddlewareTests(TestCase):
+    """Test suite for the timings reported per request and per view."""
+
+    def setUp(self):
+        """Set up a logged in user, contacts and empty totals."""
+        metrics_registry.clear()
+        self.user = UserFactory()
+        self.client.force_login(self.user)
+        status = ContactStatusFactory(name="Active")
+        for n in range(3):
+            ContactFactory(phone_number=f"{n:09d}", status=status)
+
+    def test_server_timing(self):
+        """Test that pages report their queries and template rendering, and API responses no rendering."""
+        with CaptureQueriesContext(connection) as queries:
+            entries = timings(self.client.get(reverse("contacts:contact-list")))
+        self.assertEqual(entries["db"]["desc"].split()[0], f'"{len(queries)}')
+        self.assertGreater(float(entries["tpl"]["dur"]), 0)
+        self.assertGreaterEqual(float(entries["total"]["dur"]), float(entries["db"]["dur"]))
+
+        entries = timings(self.client.get(reverse("contact-list"), HTTP_ACCEPT="application/json"))
+        self.assertEqual(float(entries["tpl"]["dur"]), 0)
+
+    async def test_async_views(self):
+        """Test that queries of async views are recorded."""
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("async-contact-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(timings(response)["db"]["desc"], '"0 queries, 0 repeated"')
+
+    def test_metrics(self):
+        """Test that /metrics serves the totals per view to staff users and internal addresses."""
+        self.client.get(reverse("contacts:contact-list"))
+        self.client.get(reverse("contacts:contact-list"))
+        response = self.client.get(reverse("contacts:metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        body = response.content.decode()
+        self.assertIn('contacts_requests_total{view="contacts:contact-list",status="200"} 2', body)
+        self.assertIn('contacts_request_duration_seconds_count{view="contacts:contact-list"} 2', body)
+        self.assertIn('contacts_request_duration_seconds_bucket{view="contacts:contact-list",le="+Inf"} 2', body)
+        self.assertIn('contacts_n_plus_one_total{view="contacts:contact-list"} 0', body)
+
+        with self.settings(INTERNAL_IPS=[]):
+            self.assertEqual(self.client.get(reverse("contacts:metrics")).status_code, 403)
+            self.client.force_login(UserFactory(is_staff=True))
+            self.assertEqual(self.client.get(reverse("contacts:metrics")).status_code, 200)
+
+    @override_settings(CONTACT_N_PLUS_ONE_THRESHOLD=3)
+    def test_n_plus_one(self):
+        """Test that a query repeated per row is logged and counted, and a few repetitions are not."""
+
+        def view(request):  # noqa: ARG001
+            for contact in Contact.objects.all():
+                str(contact.status)
+            return HttpResponse()
+
+        request = RequestFactory().get("/")
+        with self.assertLogs("contacts.instrumentation", "WARNING") as logs:
+            response = InstrumentationMiddleware(view)(request)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("executed 3 times", logs.output[0])
+        self.assertIn('1 repeated"', response["Server-Timing"])
+        self.assertIn('contacts_n_plus_one_total{view="<unresolved>"} 1', metrics_registry.export())
+
+        with self.settings(CONTACT_N_PLUS_ONE_THRESHOLD=4), self.assertNoLogs("contacts.instrumentation"):
+            InstrumentationMiddleware(view)(request)
+
+
+class InstrumentationDisabledTests(TestCase):
+    """Test suite for running without instrumentation."""
+
+    def test_disabled(self):
+        """Test that the middleware removes itself, and /metrics does not exist."""
+        with self.assertRaises(MiddlewareNotUsed):
+            InstrumentationMiddleware(HttpResponse)
+        self.client.force_login(UserFactory(is_staff=True))
+        self.assertNotIn("Server-Timing", self.client.get(reverse("contacts:contact-list")))
+        self.assertEqual(self.client.get(reverse("contacts:metrics")).status_code, 404)
+
+
+class RequestMetricsTests(TestCase):
+    """Test suite for the metrics of one request."""
+
+    def test_fingerprint(self):
+        """Test that lists of parameters of any length share a fingerprint."""
+        self.assertEqual(
+            fingerprint('SELECT * FROM "t" WHERE "id" IN (%s, %s, %s)'),
+            fingerprint('SELECT * FROM "t" WHERE "id" IN (%s,%s)'),
+        )
+
+    def test_nested_templates(self):
+        """Test that a template rendered while rendering another is not counted twice."""
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            metrics.rendering = 1
+            render_to_string("contacts/contact_confirm_delete.html", {"contact": ContactFactory()})
+        finally:
+            current_metrics.reset(token)
+        self.assertEqual(metrics.template_time, 0)
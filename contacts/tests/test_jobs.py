@@ -0,0 +1,210 @@
+"""
+Tests for the background job queue.
+"""
+
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipIf
+
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection
+from django.db.models import QuerySet
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from contacts.jobs import (
+    LEASE_EXPIRED_ERROR,
+    LeaseLostError,
+    Worker,
+    claim,
+    enqueue,
+    renew_leases,
+    report_progress,
+    requeue_expired,
+    run_job,
+    task,
+)
+from contacts.models import Job
+from testing.factories import ContactFactory
+
+
+@task("test.add")
+def add(job, a, b):
+    """Add two numbers, reporting progress."""
+    report_progress(job, 1, total=1)
+    return a + b
+
+
+@task("test.fail")
+def fail(job):
+    """Fail every time."""
+    msg = "Boom"
+    raise RuntimeError(msg)
+
+
+class QueueTest(TestCase):
+    """Test suite for enqueuing and claiming jobs."""
+
+    def test_enqueue(self):
+        """Test that jobs are queued with the default attempts, and unknown tasks rejected."""
+        job = enqueue("test.add", {"a": 1, "b": 2})
+        self.assertEqual((job.status, job.attempts, job.max_attempts), (Job.Status.QUEUED, 0, 3))
+        with self.assertRaisesMessage(ValueError, "Unknown task"):
+            enqueue("test.missing")
+
+    def test_claim_order(self):
+        """Test that jobs are claimed by priority, then age, and delayed jobs wait."""
+        old = enqueue("test.add", {"a": 1, "b": 2})
+        urgent = enqueue("test.add", {"a": 1, "b": 2}, priority=5)
+        enqueue("test.add", {"a": 1, "b": 2}, priority=9, run_after=timezone.now() + timedelta(hours=1))
+
+        job = claim("worker-1")
+        self.assertEqual(job.pk, urgent.pk)
+        self.assertEqual((job.status, job.locked_by, job.attempts), (Job.Status.RUNNING, "worker-1", 1))
+        self.assertGreater(job.locked_until, timezone.now())
+        self.assertEqual(claim("worker-2").pk, old.pk)
+        self.assertIsNone(claim("worker-3"))
+
+    def test_expired_leases(self):
+        """Test that jobs of dead workers are queued again, or failed after their last attempt."""
+        retried = enqueue("test.add", {"a": 1, "b": 2})
+        exhausted = enqueue("test.add", {"a": 1, "b": 2}, max_attempts=1)
+        claim("worker-1")
+        claim("worker-2")
+        self.assertEqual(requeue_expired(), 0)
+
+        Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(requeue_expired(), 2)
+        retried.refresh_from_db()
+        exhausted.refresh_from_db()
+        self.assertEqual((retried.status, retried.locked_by), (Job.Status.QUEUED, ""))
+        self.assertEqual((exhausted.status, exhausted.error), (Job.Status.FAILED, LEASE_EXPIRED_ERROR))
+
+    def test_renew_leases(self):
+        """Test that only leases still held by their workers are renewed."""
+        enqueue("test.add", {"a": 1, "b": 2})
+        job = claim("worker-1")
+        Job.objects.update(locked_until=timezone.now())
+        self.assertEqual(renew_leases({"worker-2": job.pk}), 0)
+        self.assertEqual(renew_leases({"worker-1": job.pk}), 1)
+        job.refresh_from_db()
+        self.assertGreater(job.locked_until, timezone.now() + timedelta(seconds=30))
+
+
+class RunJobTest(TestCase):
+    """Test suite for running claimed jobs."""
+
+    def test_success(self):
+        """Test that the result and progress of a job are recorded."""
+        enqueue("test.add", {"a": 1, "b": 2})
+        job = claim("worker-1")
+        run_job(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result, job.progress, job.total), (Job.Status.SUCCEEDED, 3, 1, 1))
+        self.assertIsNotNone(job.finished_at)
+
+    @override_settings(JOB_RETRY_DELAY=30)
+    def test_retries(self):
+        """Test that failed attempts are retried with a growing delay, then the job fails."""
+        enqueue("test.fail", max_attempts=2)
+        run_job(claim("worker-1"))
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.Status.QUEUED, 1))
+        self.assertIn("RuntimeError: Boom", job.error)
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=25))
+        self.assertIsNone(claim("worker-1"))
+
+        Job.objects.update(run_after=timezone.now())
+        run_job(claim("worker-1"))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.FAILED, 2))
+
+    def test_unknown_task(self):
+        """Test that a job whose task is no longer registered fails without retries."""
+        Job.objects.create(name="test.removed")
+        run_job(claim("worker-1"))
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.Status.FAILED, 1))
+        self.assertIn("Unknown task", job.error)
+
+    def test_lost_lease(self):
+        """Test that a job whose lease was taken over cannot report progress or record a result."""
+        enqueue("test.add", {"a": 1, "b": 2})
+        job = claim("worker-1")
+        Job.objects.update(locked_by="worker-2")
+        with self.assertRaises(LeaseLostError):
+            report_progress(job, 1)
+        with self.assertLogs("contacts.jobs", "WARNING"):
+            run_job(job)
+        self.assertEqual(Job.objects.get().status, Job.Status.RUNNING)
+
+    def test_outcome_is_retried_while_locked(self):
+        """Test that the outcome of a job is recorded once the database is no longer locked."""
+        enqueue("test.add", {"a": 1, "b": 2})
+        job = claim("worker-1")
+        update = QuerySet.update
+        calls = []
+
+        def locked_once(queryset, **fields):
+            calls.append(fields)
+            if "finished_at" in fields and len([call for call in calls if "finished_at" in call]) == 1:
+                msg = "database table is locked: contacts_job"
+                raise OperationalError(msg)
+            return update(queryset, **fields)
+
+        with mock.patch("contacts.jobs.FINISH_RETRY_DELAY", 0), mock.patch.object(QuerySet, "update", locked_once):
+            run_job(job)
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.result), (Job.Status.SUCCEEDED, 3))
+
+    def test_find_duplicates_task(self):
+        """Test that duplicate detection runs as a job and returns its counts."""
+        ContactFactory(first_name="Jan", last_name="Kowalski", email="jan.kowalski@a.com")
+        ContactFactory(first_name="Jan", last_name="Kowalski", email="jan.kowalski@b.com")
+        out = StringIO()
+        call_command("find_duplicates", "--enqueue", stdout=out)
+        self.assertIn("Queued job", out.getvalue())
+
+        run_job(claim("worker-1"))
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.Status.SUCCEEDED, job.error)
+        self.assertEqual(job.result["candidates"], 1)
+
+
+class WorkerTest(TransactionTestCase):
+    """Test suite for running jobs in worker threads, which need committed data."""
+
+    def assert_burst(self, threads):
+        """Assert that worker threads run every ready job once and stop when the queue is empty."""
+        for n in range(10):
+            enqueue("test.add", {"a": n, "b": 1})
+        Worker(threads=threads, burst=True).run()
+        self.assertEqual(
+            sorted(Job.objects.values_list("result", flat=True)),
+            list(range(1, 11)),
+        )
+        self.assertEqual(set(Job.objects.values_list("attempts", flat=True)), {1})
+
+    def test_burst(self):
+        """Test that a worker thread runs every ready job once and stops when the queue is empty."""
+        self.assert_burst(threads=1)
+
+    # Threads share an in-memory SQLite database through its shared cache, whose table locks
+    # fail concurrent writers at once instead of waiting for them.
+    @skipIf(
+        connection.vendor == "sqlite" and connection.is_in_memory_db(),
+        "Concurrent writers need a database file or server.",
+    )
+    def test_concurrent_burst(self):
+        """Test that concurrent worker threads run every ready job once."""
+        self.assert_burst(threads=3)
+
+    def test_command(self):
+        """Test that the command runs the queued jobs and validates its options."""
+        enqueue("test.add", {"a": 1, "b": 2})
+        out = StringIO()
+        call_command("run_workers", "--burst", stdout=out)
+        self.assertIn("Workers stopped.", out.getvalue())
+        self.assertEqual(Job.objects.get().status, Job.Status.SUCCEEDED)
+        with self.assertRaises(CommandError):
+            call_command("run_workers", "--threads", "0")
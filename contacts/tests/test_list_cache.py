@@ -0,0 +1,120 @@
+"""
+Tests for the contact list table cache.
+"""
+
+import io
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from contacts.importing import CSV, import_contacts
+from contacts.list_cache import check_list_cache_backend, list_cache
+from contacts.status_deletion import delete_status_contacts
+from testing.factories import ContactFactory, ContactStatusFactory, UserFactory
+
+
+@override_settings(CONTACT_LIST_CACHE_TIMEOUT=300)
+class ContactListCacheTest(TestCase):
+    """Test suite for caching the rendered contact table."""
+
+    def setUp(self):
+        """Set up a logged in user, contacts and empty counts."""
+        cache.clear()
+        self.user = UserFactory()
+        self.client.force_login(self.user)
+        self.status = ContactStatusFactory(name="Active")
+        ContactFactory(first_name="Anna", last_name="Nowak", phone_number="111111111", status=self.status)
+        self.url = reverse("contacts:contact-list")
+
+    def contact_queries(self, params=None):
+        """Return the response and the number of contact queries issued to render the list."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params or {})
+        return response, sum("contacts_contact" in query["sql"] for query in queries)
+
+    def test_repeated_views_are_served_from_the_cache(self):
+        """Test that the second view of a page renders the same table without the page queries."""
+        first, first_queries = self.contact_queries()
+        second, second_queries = self.contact_queries()
+        self.assertEqual(first.context["contact_table"], second.context["contact_table"])
+        self.assertContains(second, "Anna")
+        # Only the ETag aggregate is left.
+        self.assertEqual(second_queries, 1)
+        self.assertLess(second_queries, first_queries)
+        stats = list_cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.ratio), (1, 1, 0.5))
+
+    def test_pages_and_users_have_their_own_table(self):
+        """Test that other parameters and other users miss the cache."""
+        self.contact_queries()
+        self.contact_queries({"sort": "-last_name"})
+        self.contact_queries({"sort": "-last_name", "unrelated": "1"})
+        self.client.force_login(UserFactory())
+        self.contact_queries()
+        stats = list_cache.stats()
+        self.assertEqual((stats.hits, stats.misses), (1, 3))
+
+    def test_writes_invalidate_the_tables(self):
+        """Test that every kind of contact or status write is shown on the next view."""
+        self.contact_queries()
+
+        contact = ContactFactory(first_name="Beata", phone_number="222222222")
+        self.assertContains(self.client.get(self.url), "Beata")
+
+        contact.first_name = "Celina"
+        contact.save()
+        self.assertContains(self.client.get(self.url), "Celina")
+
+        contact.delete()
+        self.assertNotContains(self.client.get(self.url), "Celina")
+
+        import_contacts(
+            io.BytesIO(b"first_name,last_name,phone_number,email,city\nDorota,Lis,333333333,d@x.pl,Opole\n"), CSV
+        )
+        self.assertContains(self.client.get(self.url), "Dorota")
+
+        delete_status_contacts(self.status)
+        self.assertNotContains(self.client.get(self.url), "Anna")
+        self.assertEqual(list_cache.stats().hits, 0)
+
+    def test_transaction_bumps_the_version_once_on_commit(self):
+        """Test that a transaction writing many contacts bumps the version once more on commit."""
+        version = list_cache.version()
+        for n in range(3):
+            ContactFactory(phone_number=f"90000000{n}")
+        self.assertGreater(list_cache.version(), version)
+
+        pending = [callback for _, callback, *_ in connection.run_on_commit if callback == list_cache.bump]
+        self.assertEqual(len(pending), 1)
+
+    @override_settings(CONTACT_LIST_CACHE_TIMEOUT=0)
+    def test_cache_can_be_disabled(self):
+        """Test that no table is cached when the timeout is 0."""
+        self.contact_queries()
+        response, queries = self.contact_queries()
+        self.assertGreater(queries, 1)
+        self.assertEqual(len(response.context["contacts"]), 1)
+        self.assertEqual(list_cache.stats().hits + list_cache.stats().misses, 0)
+
+    def test_per_process_cache_check(self):
+        """Test that enabling the cache with a per-process cache backend is warned about."""
+        self.assertEqual([message.id for message in check_list_cache_backend()], ["contacts.W001"])
+        shared = {"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": "/tmp/x"}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_list_cache_backend(), [])
+        with override_settings(CONTACT_LIST_CACHE_TIMEOUT=0):
+            self.assertEqual(check_list_cache_backend(), [])
+
+    def test_stats_command(self):
+        """Test that the command shows and resets the hit ratio."""
+        self.contact_queries()
+        self.contact_queries()
+        out = StringIO()
+        call_command("list_cache_stats", "--reset", stdout=out)
+        self.assertIn("hits: 1  misses: 1  hit ratio: 50.0%", out.getvalue())
+        self.assertEqual(list_cache.stats().hits, 0)
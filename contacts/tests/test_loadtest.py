@@ -0,0 +1,89 @@
+"""Tests for the load test client and the ``loadtest`` command."""
+
+import asyncio
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import LiveServerTestCase, SimpleTestCase
+from django.urls import reverse
+
+from testing.factories import ContactFactory, UserFactory
+from testing.loadtest import LoadTestError, run_load_test, split_url
+
+
+class LoadTestClientTests(SimpleTestCase):
+    """Test suite for URL handling of the load test client."""
+
+    def test_split_url(self):
+        """Test that URLs are split into host, port and request target."""
+        self.assertEqual(split_url("http://localhost:8001/api/?page=2"), ("localhost", 8001, "/api/?page=2"))
+        self.assertEqual(split_url("http://example.com"), ("example.com", 80, "/"))
+
+    def test_rejects_other_schemes(self):
+        """Test that only plain HTTP URLs are accepted."""
+        with self.assertRaises(LoadTestError):
+            split_url("https://example.com/")
+
+
+class LoadTestCommandTests(LiveServerTestCase):
+    """Test suite running the load test against the live test server."""
+
+    def setUp(self):
+        """Set up a user and a contact."""
+        self.user = UserFactory()
+        ContactFactory(phone_number="111111111")
+
+    def test_compares_targets(self):
+        """Test that the sync and async endpoints are loaded as the user and compared."""
+        out = StringIO()
+        call_command(
+            "loadtest",
+            f"wsgi={self.live_server_url}{reverse('contact-list')}",
+            f"async={self.live_server_url}{reverse('async-contact-list')}?page=1",
+            "--concurrency=2",
+            "--duration=0.3",
+            f"--user={self.user.username}",
+            stdout=out,
+        )
+        lines = out.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith("wsgi:"))
+        self.assertTrue(lines[1].startswith("async:"))
+        self.assertIn(" 0 errors", lines[0])
+        self.assertIn(" 0 errors", lines[1])
+        self.assertIn("the throughput of wsgi", lines[2])
+
+    def test_counts_errors(self):
+        """Test that error responses are counted, not measured."""
+        result = asyncio.run(run_load_test(f"{self.live_server_url}/api/contacts/", concurrency=1, duration=0.2))
+        self.assertEqual(result.requests, 0)
+        self.assertGreater(result.errors, 0)
+
+    def test_replays_paths(self):
+        """Test that the paths of a replay file are requested against the target."""
+        with tempfile.TemporaryDirectory() as directory:
+            replay = Path(directory) / "paths.txt"
+            replay.write_text(f"# contacts\n{reverse('contact-list')}\n\n{reverse('async-contact-list')}?page=1\n")
+            out = StringIO()
+            call_command(
+                "loadtest",
+                self.live_server_url,
+                f"--replay={replay}",
+                "--concurrency=2",
+                "--duration=0.3",
+                f"--user={self.user.username}",
+                stdout=out,
+            )
+        self.assertIn(" 0 errors", out.getvalue())
+
+    def test_rejects_several_servers(self):
+        """Test that replayed URLs must point to one server."""
+        urls = ["http://localhost:8000/", "http://localhost:8001/"]
+        with self.assertRaises(LoadTestError):
+            asyncio.run(run_load_test(urls, concurrency=1, duration=0.1))
+
+    def test_unknown_user(self):
+        """Test that an unknown user is rejected."""
+        with self.assertRaises(CommandError):
+            call_command("loadtest", self.live_server_url, "--user=nobody", stdout=StringIO())
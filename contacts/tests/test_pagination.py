@@ -0,0 +1,152 @@
+"""
+Tests for the contacts keyset pagination.
+"""
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from contacts.models import Contact
+from contacts.pagination import (
+    APPROXIMATE_COUNT_CAP,
+    InvalidCursor,
+    KeysetPaginator,
+    approximate_count,
+    decode_cursor,
+    encode_cursor,
+)
+from testing.factories import ContactFactory, ContactStatusFactory, UserFactory
+
+
+class KeysetPaginatorTest(TestCase):
+    """Test suite for the KeysetPaginator."""
+
+    def setUp(self):
+        """Set up contacts sharing last names so the primary key tiebreaker matters."""
+        self.status = ContactStatusFactory(name="Active")
+        for n in range(12):
+            ContactFactory(
+                first_name=f"Contact{n}",
+                last_name=["Nowak", "Kowalski", "Zieliński"][n % 3],
+                phone_number=f"{n:09d}",
+                email=f"contact{n}@example.com",
+                status=self.status,
+            )
+
+    def walk(self, queryset, per_page=5):
+        """Follow next cursors from the first page and return the pages' rows."""
+        paginator = KeysetPaginator(queryset, per_page)
+        page = paginator.page(None)
+        pages = [list(page)]
+        while page.has_next():
+            page = paginator.page(page.next_cursor)
+            pages.append(list(page))
+        return paginator, page, pages
+
+    def test_forward_pages_match_offset_pagination(self):
+        """Test that walking the cursors yields the same rows as ordering the whole table."""
+        for ordering in ("last_name", "-last_name", "created_at", "-created_at"):
+            with self.subTest(ordering=ordering):
+                queryset = Contact.objects.order_by(ordering)
+                _, page, pages = self.walk(queryset)
+                tiebreaker = "-pk" if ordering.startswith("-") else "pk"
+                expected = list(queryset.order_by(ordering, tiebreaker))
+                self.assertEqual([c for rows in pages for c in rows], expected)
+                self.assertEqual([len(rows) for rows in pages], [5, 5, 2])
+                self.assertEqual(page.number, 3)
+                self.assertFalse(page.has_next())
+
+    def test_backward_pages(self):
+        """Test that previous cursors lead back to the same pages."""
+        paginator, page, pages = self.walk(Contact.objects.order_by("last_name"))
+        page = paginator.page(page.previous_cursor)
+        self.assertEqual(list(page), pages[1])
+        self.assertEqual(page.number, 2)
+        page = paginator.page(page.previous_cursor)
+        self.assertEqual(list(page), pages[0])
+        self.assertFalse(page.has_previous())
+
+    def test_last_page(self):
+        """Test that the last cursor reads the final rows of the ordering."""
+        queryset = Contact.objects.order_by("last_name")
+        paginator = KeysetPaginator(queryset, 5)
+        page = paginator.page(paginator.page(None).last_cursor)
+        self.assertEqual(list(page), list(queryset.order_by("last_name", "pk"))[-5:])
+        self.assertEqual(page.number, 3)
+        self.assertFalse(page.has_next())
+        self.assertTrue(page.has_previous())
+
+    def test_filtered_queryset(self):
+        """Test that pagination stays within a filtered queryset."""
+        _, _, pages = self.walk(Contact.objects.filter(last_name="Nowak").order_by("created_at"), per_page=3)
+        self.assertEqual([len(rows) for rows in pages], [3, 1])
+
+    def test_invalid_cursor(self):
+        """Test that malformed cursors are rejected."""
+        paginator = KeysetPaginator(Contact.objects.order_by("last_name"), 5)
+        for cursor in ("not-a-cursor", encode_cursor(["Nowak"])):
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                paginator.page(cursor)
+
+    def test_cursor_round_trip(self):
+        """Test that cursors decode to the encoded position."""
+        contact = Contact.objects.first()
+        position, reverse, number = decode_cursor(encode_cursor([contact.created_at, contact.pk], number=4))
+        self.assertEqual(position, [contact.created_at.isoformat(), contact.pk])
+        self.assertFalse(reverse)
+        self.assertEqual(number, 4)
+
+    def test_approximate_count(self):
+        """Test that small results are counted exactly."""
+        self.assertEqual(approximate_count(Contact.objects.all()), (12, True))
+        self.assertLess(12, APPROXIMATE_COUNT_CAP)
+
+
+@override_settings(CONTACT_PAGINATION="keyset")
+class ContactListKeysetTest(TestCase):
+    """Test suite for the contact list view in keyset mode."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = UserFactory()
+        self.client.force_login(self.user)
+        status = ContactStatusFactory(name="Active")
+        for n in range(7):
+            ContactFactory(last_name=f"Last{n}", phone_number=f"{n:09d}", status=status)
+        self.list_url = reverse("contacts:contact-list")
+
+    def test_next_page(self):
+        """Test that the list links to the next page by cursor and keeps the filters."""
+        response = self.client.get(f"{self.list_url}?q=Last&sort=-last_name")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c.last_name for c in response.context["contacts"]], [f"Last{n}" for n in (6, 5, 4, 3, 2)])
+        page = response.context["page_obj"]
+        self.assertContains(response, f"?cursor={page.next_cursor}&amp;q=Last&amp;sort=-last_name")
+        self.assertContains(response, "Page 1 of 2")
+
+        response = self.client.get(f"{self.list_url}?cursor={page.next_cursor}&q=Last&sort=-last_name")
+        self.assertEqual([c.last_name for c in response.context["contacts"]], ["Last1", "Last0"])
+        self.assertContains(response, "Page 2 of 2")
+
+    def test_invalid_cursor(self):
+        """Test that an invalid cursor returns 404."""
+        response = self.client.get(f"{self.list_url}?cursor=bogus")
+        self.assertEqual(response.status_code, 404)
+
+    def test_links_encode_the_filters(self):
+        """Test that searches with reserved characters are kept intact by the page links."""
+        Contact.objects.update(city="R&D #1+")
+        response = self.client.get(self.list_url, {"q": "R&D #1+", "sort": "-last_name"})
+        page = response.context["page_obj"]
+        query = "q=R%26D+%231%2B&amp;sort=-last_name"
+        self.assertContains(response, f'href="?cursor={page.next_cursor}&amp;{query}"')
+
+        response = self.client.get(self.list_url, {"cursor": page.next_cursor, "q": "R&D #1+", "sort": "-last_name"})
+        self.assertEqual([c.last_name for c in response.context["contacts"]], ["Last1", "Last0"])
+        self.assertContains(response, f'href="?{query}"')
+
+    @override_settings(CONTACT_PAGINATION="offset")
+    def test_offset_links_encode_the_filters(self):
+        """Test that numbered page links encode the filters too."""
+        Contact.objects.update(city="R&D #1+")
+        response = self.client.get(self.list_url, {"q": "R&D #1+", "page": 2})
+        self.assertContains(response, 'href="?page=1&amp;q=R%26D+%231%2B&amp;sort=last_name"')
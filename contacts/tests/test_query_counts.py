@@ -0,0 +1,52 @@
+"""
+Query count regression tests for the contacts app views.
+"""
+
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from contacts.statuses import status_registry
+from contacts.views import ContactListView
+from testing.factories import ContactFactory, ContactStatusFactory, UserFactory
+
+
+class ContactViewsQueryCountTest(TestCase):
+    """Test suite keeping the number of queries per page independent of the page size."""
+
+    def setUp(self):
+        """Set up contacts that each have their own status."""
+        self.user = UserFactory()
+        self.client.force_login(self.user)
+        self.contacts = [
+            ContactFactory(phone_number=f"{n:09d}", status=ContactStatusFactory(name=f"Status {n}")) for n in range(30)
+        ]
+        self.list_url = reverse("contacts:contact-list")
+        # Load the statuses up front so that every measured request reads them from the registry.
+        status_registry.all()
+
+    def count_queries(self, url, page_size):
+        """Return the number of queries issued to render a list page of the given size."""
+        with mock.patch.object(ContactListView, "paginate_by", page_size), CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+            statuses = [str(contact.status) for contact in response.context["contacts"]]
+        self.assertEqual(len(statuses), page_size)
+        return len(queries)
+
+    def test_list_queries_do_not_grow_with_page_size(self):
+        """Test that the list page joins statuses instead of querying each one."""
+        for url in (self.list_url, f"{self.list_url}?sort=-created_at", f"{self.list_url}?q=example"):
+            with self.subTest(url=url):
+                self.assertEqual(self.count_queries(url, 5), self.count_queries(url, 25))
+
+    def test_detail_query_count(self):
+        """Test that the detail page loads the contact and its status with one query besides the session."""
+        detail_url = reverse("contacts:contact-detail", kwargs={"pk": self.contacts[0].pk})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(detail_url)
+        self.assertContains(response, "Status 0")
+        contact_queries = [q["sql"] for q in queries if "contacts_" in q["sql"]]
+        self.assertEqual(len(contact_queries), 1)
@@ -0,0 +1,32 @@
+"""
+Tests for the check_query_plans management command.
+"""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from contacts.management.commands.check_query_plans import Command, QueryShape
+from contacts.models import Contact
+
+
+class CheckQueryPlansTest(TestCase):
+    """Test suite for the check_query_plans command."""
+
+    def test_all_shapes_use_indexes(self):
+        """Test that no list view or API query shape degrades to a full scan."""
+        out = StringIO()
+        call_command("check_query_plans", stdout=out)
+        self.assertNotIn("FAIL", out.getvalue())
+
+    def test_rejects_full_scans(self):
+        """Test that table scans and whole-result sorts are reported."""
+        shape = QueryShape("unindexed", Contact.objects.filter(email__contains="x").order_by("city"))
+        plan = "SCAN contacts_contact\nUSE TEMP B-TREE FOR ORDER BY"
+        self.assertEqual(Command.problems("sqlite", shape, plan), ["full table scan", "sort of the whole result"])
+
+    def test_accepts_primary_key_scans(self):
+        """Test that unfiltered primary key scans are accepted as they stop at the page limit."""
+        shape = QueryShape("unordered", Contact.objects.all()[:10])
+        self.assertEqual(Command.problems("sqlite", shape, "SCAN contacts_contact"), [])
@@ -0,0 +1,174 @@
+"""Tests for the read replica router and the database connection settings."""
+
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+
+from contact_management.databases import configure_connections, tune_sqlite
+from contacts.models import Contact, ContactStatusChoices
+from contacts.routers import (
+    PIN_COOKIE,
+    ReplicaPinningMiddleware,
+    ReplicaRouter,
+    pinned_to_primary,
+)
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    """Test suite for routing reads and writes outside transactions."""
+
+    def setUp(self):
+        """Set up the router."""
+        self.router = ReplicaRouter()
+
+    def test_contact_reads_go_to_the_replica(self):
+        """Test that contacts and statuses are read from the replica and other apps from the default database."""
+        self.assertEqual(self.router.db_for_read(Contact), "replica")
+        self.assertEqual(self.router.db_for_read(ContactStatusChoices), "replica")
+        self.assertIsNone(self.router.db_for_read(get_user_model()))
+
+    def test_writes_go_to_the_primary(self):
+        """Test that writes go to the primary, also for objects read from the replica."""
+        contact = Contact()
+        contact._state.db = "replica"  # noqa: SLF001
+        self.assertEqual(self.router.db_for_write(Contact, instance=contact), "default")
+        status = ContactStatusChoices()
+        status._state.db = "default"  # noqa: SLF001
+        self.assertTrue(self.router.allow_relation(contact, status))
+
+    def test_pinned_reads_go_to_the_primary(self):
+        """Test that reads stay on the primary while pinned."""
+        token = pinned_to_primary.set(True)
+        try:
+            self.assertIsNone(self.router.db_for_read(Contact))
+        finally:
+            pinned_to_primary.reset(token)
+
+
+class ReplicaRouterTransactionTests(TestCase):
+    """Test suite for routing reads inside transactions."""
+
+    def test_reads_in_transactions_go_to_the_primary(self):
+        """Test that reads inside a transaction see its writes."""
+        self.assertEqual(ReplicaRouter().db_for_read(Contact), "default")
+
+
+class ReplicaPinningMiddlewareTests(SimpleTestCase):
+    """Test suite for pinning clients to the primary after their writes."""
+
+    def setUp(self):
+        """Set up a view recording whether it was pinned, behind the middleware."""
+        self.pinned = []
+
+        def view(request):  # noqa: ARG001
+            self.pinned.append(pinned_to_primary.get())
+            return HttpResponse()
+
+        with mock.patch.dict(settings.DATABASES, {"replica": settings.DATABASES["default"]}):
+            self.middleware = ReplicaPinningMiddleware(view)
+        self.factory = RequestFactory()
+
+    def test_pins_after_writes(self):
+        """Test that writes set the pin cookie and requests carrying it are served from the primary."""
+        self.assertNotIn(PIN_COOKIE, self.middleware(self.factory.get("/")).cookies)
+        response = self.middleware(self.factory.post("/"))
+        self.assertEqual(response.cookies[PIN_COOKIE]["max-age"], 5)
+
+        request = self.factory.get("/")
+        request.COOKIES[PIN_COOKIE] = "1"
+        self.middleware(request)
+        self.assertEqual(self.pinned, [False, False, True])
+        self.assertFalse(pinned_to_primary.get())
+
+    def test_unused_without_replica(self):
+        """Test that the middleware removes itself without a replica."""
+        with mock.patch.dict(settings.DATABASES), self.assertRaises(MiddlewareNotUsed):
+            settings.DATABASES.pop("replica", None)
+            ReplicaPinningMiddleware(HttpResponse)
+
+
+class ConfigureConnectionsTests(SimpleTestCase):
+    """Test suite for the connection lifetime settings."""
+
+    def test_persistent_connections(self):
+        """Test that connections are reused and health checked without a pool."""
+        database = configure_connections(
+            {"ENGINE": "django.db.backends.sqlite3"},
+            conn_max_age=60,
+            pool=True,
+            pool_min_size=1,
+            pool_max_size=4,
+        )
+        self.assertEqual(database["CONN_MAX_AGE"], 60)
+        self.assertTrue(database["CONN_HEALTH_CHECKS"])
+        self.assertNotIn("OPTIONS", database)
+
+    def test_pool(self):
+        """Test that PostgreSQL uses a pool instead of persistent connections."""
+        database = configure_connections(
+            {"ENGINE": "django.db.backends.postgresql", "OPTIONS": {"sslmode": "require"}},
+            conn_max_age=60,
+            pool=True,
+            pool_min_size=1,
+            pool_max_size=4,
+        )
+        self.assertEqual(database["CONN_MAX_AGE"], 0)
+        self.assertEqual(database["OPTIONS"], {"sslmode": "require", "pool": {"min_size": 1, "max_size": 4}})
+
+
+class TuneSqliteTests(SimpleTestCase):
+    """Test suite for the SQLite profile."""
+
+    def test_connections_are_tuned(self):
+        """Test that new connections apply every setting of the profile."""
+        if connection.vendor != "sqlite":
+            self.skipTest("The profile only applies to SQLite.")
+        database = tune_sqlite(
+            {**connection.settings_dict, "OPTIONS": {}},
+            mmap_size=1024 * 1024,
+            cache_size_kib=2048,
+            busy_timeout=1.5,
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            tuned = type(connections[DEFAULT_DB_ALIAS])(
+                {**database, "NAME": str(Path(directory) / "tuned.sqlite3")}, "tuned"
+            )
+            try:
+                with tuned.cursor() as cursor:
+                    pragmas = {
+                        name: cursor.execute(f"PRAGMA {name}").fetchone()[0]
+                        for name in (
+                            "journal_mode",
+                            "synchronous",
+                            "mmap_size",
+                            "cache_size",
+                            "temp_store",
+                            "busy_timeout",
+                        )
+                    }
+                self.assertEqual(tuned.transaction_mode, "IMMEDIATE")
+            finally:
+                tuned.close()
+        self.assertEqual(
+            pragmas,
+            {
+                "journal_mode": "wal",
+                "synchronous": 1,
+                "mmap_size": 1024 * 1024,
+                "cache_size": -2048,
+                "temp_store": 2,
+                "busy_timeout": 1500,
+            },
+        )
+
+    def test_other_databases_unchanged(self):
+        """Test that other databases are left alone."""
+        database = {"ENGINE": "django.db.backends.postgresql"}
+        self.assertEqual(tune_sqlite(database), {"ENGINE": "django.db.backends.postgresql"})
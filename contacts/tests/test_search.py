@@ -0,0 +1,143 @@
+"""
+Tests for the contacts search backends.
+"""
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from contacts.models import Contact
+from contacts.search import (
+    BaseSearchBackend,
+    IContainsSearchBackend,
+    SQLiteFTSSearchBackend,
+    get_search_backend,
+)
+from testing.factories import ContactFactory, ContactStatusFactory, UserFactory
+
+
+class SearchBackendTest(TestCase):
+    """Test suite checking the indexed backend against the icontains backend."""
+
+    def setUp(self):
+        """Set up test data."""
+        status = ContactStatusFactory(name="Active")
+        self.john = ContactFactory(
+            first_name="John",
+            last_name="Kowalski",
+            phone_number="123456789",
+            email="john.k@example.com",
+            city="Warsaw",
+            status=status,
+        )
+        self.jane = ContactFactory(
+            first_name="Jane",
+            last_name="Kowalczyk",
+            phone_number="987654321",
+            email="jane.k@example.com",
+            city="Kraków",
+            status=status,
+        )
+        self.bob = ContactFactory(
+            first_name="Bob",
+            last_name="Johnson",
+            phone_number="111222333",
+            email="bob@sample.org",
+            city="Gdańsk",
+            status=status,
+        )
+
+    def search(self, backend, terms, fields=None, **kwargs):
+        """Return the ids matched by a backend."""
+        queryset = Contact.objects.all()
+        if fields is None:
+            queryset = backend.search(queryset, terms, **kwargs)
+        else:
+            queryset = backend.search(queryset, terms, fields, **kwargs)
+        return set(queryset.values_list("id", flat=True))
+
+    def test_default_backend_for_sqlite(self):
+        """Test that SQLite databases use the FTS5 backend."""
+        if connection.vendor != "sqlite":
+            self.skipTest("SQLite only")
+        self.assertIsInstance(get_search_backend(), SQLiteFTSSearchBackend)
+
+    def test_base_backend_is_abstract(self):
+        """Test that backends must implement search."""
+        with self.assertRaises(TypeError):
+            BaseSearchBackend()
+
+    @override_settings(CONTACT_SEARCH_BACKEND="contacts.search.IContainsSearchBackend")
+    def test_configured_backend(self):
+        """Test that CONTACT_SEARCH_BACKEND overrides the vendor default."""
+        self.assertIsInstance(get_search_backend(), IContainsSearchBackend)
+
+    def test_matches_icontains_semantics(self):
+        """Test that the indexed backend returns the same rows as the icontains chain."""
+        backend = get_search_backend()
+        queries = [["kowal"], ["KOWAL"], ["ohn"], ["john"], ["456"], ["example.com"], ["gdańsk"], ["jo"], ["nomatch"]]
+        for terms in queries:
+            with self.subTest(terms=terms):
+                self.assertEqual(self.search(backend, terms), self.search(IContainsSearchBackend(), terms))
+
+    def test_every_term_must_match(self):
+        """Test that multiple terms are combined with AND across any of the fields."""
+        backend = get_search_backend()
+        self.assertEqual(self.search(backend, ["kowal", "warsaw"]), {self.john.id})
+        self.assertEqual(self.search(backend, ["kowal", "ja"]), {self.jane.id})
+
+    def test_restricted_fields(self):
+        """Test that only the requested fields are searched."""
+        backend = get_search_backend()
+        self.assertEqual(self.search(backend, ["john"], ["first_name"]), {self.john.id})
+        self.assertEqual(self.search(backend, ["john"], ["first_name", "last_name"]), {self.john.id, self.bob.id})
+
+    def test_quotes_in_terms(self):
+        """Test that FTS5 syntax characters in terms are matched literally."""
+        backend = get_search_backend()
+        self.assertEqual(self.search(backend, ['"kowal" OR *']), set())
+
+    def test_index_follows_updates_and_deletes(self):
+        """Test that the index is kept in sync with writes, including queryset updates."""
+        backend = get_search_backend()
+        Contact.objects.filter(pk=self.bob.pk).update(last_name="Nowak")
+        self.assertEqual(self.search(backend, ["nowak"]), {self.bob.id})
+        self.assertEqual(self.search(backend, ["johnson"]), set())
+
+        self.john.delete()
+        self.assertEqual(self.search(backend, ["kowal"]), {self.jane.id})
+
+    def test_ranked_search(self):
+        """Test that ranked searches annotate a relevance score."""
+        queryset = get_search_backend().search(Contact.objects.all(), ["kowal"], ranked=True)
+        ranks = list(queryset.values_list("search_rank", flat=True))
+        self.assertEqual(len(ranks), 2)
+        self.assertTrue(all(rank is not None for rank in ranks))
+
+
+class ContactListSearchTest(TestCase):
+    """Test suite for searching from the contact list view."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = UserFactory()
+        self.client.force_login(self.user)
+        ContactFactory(first_name="Anna", last_name="Annanowicz", email="anna@example.com", phone_number="100000001")
+        ContactFactory(first_name="Bartosz", last_name="Annan", email="b@example.com", phone_number="100000002")
+        self.list_url = reverse("contacts:contact-list")
+
+    def test_search_by_phone_substring(self):
+        """Test that phone numbers are searchable by any substring."""
+        response = self.client.get(f"{self.list_url}?q=0000002")
+        self.assertContains(response, "Bartosz")
+        self.assertNotContains(response, "Annanowicz")
+
+    def test_relevance_sort(self):
+        """Test that the relevance sort is accepted only together with a query."""
+        response = self.client.get(f"{self.list_url}?q=anna&sort=relevance")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["view"].get_ordering(), "relevance")
+        self.assertEqual(len(response.context["contacts"]), 2)
+
+        response = self.client.get(f"{self.list_url}?sort=relevance")
+        self.assertEqual(response.context["view"].get_ordering(), "last_name")
@@ -0,0 +1,116 @@
+"""Tests for the seed_contacts command and the row generators behind it."""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from contacts.models import Contact, ContactStatusChoices
+from contacts.search import get_search_backend
+from testing.bulk import ContactSeed, build_contacts, contact_constraint_names
+from testing.factories import ContactFactory, ContactStatusFactory
+
+
+class ContactSeedTests(TestCase):
+    """Test suite for generated contact rows."""
+
+    def setUp(self):
+        """Set up a range of contacts."""
+        self.seed = ContactSeed(
+            start=10,
+            count=250,
+            first_id=1000,
+            origin=timezone.now(),
+            interval=timedelta(seconds=1),
+            status_ids=[1, 2],
+            weights=[3, 1],
+        )
+
+    def test_rows_match_built_contacts(self):
+        """Test that rows carry the values of the contacts build_contacts makes for the same sequence numbers."""
+        rows = list(self.seed.rows())
+        built = list(build_contacts(250, start=10))
+        self.assertEqual([row[0] for row in rows], list(range(1000, 1250)))
+        self.assertEqual([row[3] for row in rows], [contact.phone_number for contact in built])
+        self.assertEqual([row[4] for row in rows], [contact.email for contact in built])
+
+    def test_statuses_follow_weights(self):
+        """Test that statuses are drawn reproducibly with their weights."""
+        statuses = [row[6] for row in self.seed.rows()]
+        self.assertEqual(statuses, [row[6] for row in self.seed.rows()])
+        self.assertGreater(statuses.count(1), statuses.count(2))
+
+    def test_split_is_disjoint(self):
+        """Test that split ranges cover the range without overlapping."""
+        parts = self.seed.split(3)
+        self.assertEqual([part.count for part in parts], [84, 84, 82])
+        ids = [row[0] for part in parts for row in part.rows()]
+        self.assertEqual(ids, list(range(1000, 1250)))
+        self.assertEqual(parts[1].origin, self.seed.origin + timedelta(seconds=84))
+
+
+class SeedContactsCommandTests(TestCase):
+    """Test suite for the seed_contacts command keeping indexes in place."""
+
+    def setUp(self):
+        """Set up an existing contact."""
+        self.active = ContactStatusFactory(name="Active")
+        ContactFactory(phone_number="000000041", status=self.active)
+
+    def seed(self, *args):
+        """Run the command and return its output."""
+        out = StringIO()
+        call_command("seed_contacts", *args, "--keep-indexes", stdout=out)
+        return out.getvalue()
+
+    def test_seeds_after_existing_contacts(self):
+        """Test that contacts continue after the highest phone number and primary key."""
+        self.assertIn("Inserted 100 contacts", self.seed("100", "--status", "Active=3", "--without-status", "1"))
+        self.assertEqual(Contact.objects.count(), 101)
+        self.assertEqual(Contact.objects.order_by("phone_number").last().phone_number, "000000141")
+        self.assertTrue(Contact.objects.filter(status=self.active).exists())
+        self.assertTrue(Contact.objects.filter(status=None).exists())
+        self.assertEqual(ContactFactory(phone_number="999999999").pk, Contact.objects.count())
+
+    def test_creates_missing_statuses(self):
+        """Test that statuses named in the distribution are created."""
+        self.seed("10", "--status", "Lead=1")
+        lead = ContactStatusChoices.objects.get(name="Lead")
+        self.assertEqual(Contact.objects.filter(status=lead).count(), 10)
+
+    def test_searchable(self):
+        """Test that seeded contacts are found by the search backend."""
+        self.seed("50")
+        found = get_search_backend().search(Contact.objects.all(), ["kowal"])
+        self.assertEqual(found.count(), Contact.objects.filter(last_name__icontains="kowal").count())
+
+    def test_rejects_invalid_options(self):
+        """Test that invalid counts, distributions and sequence ranges are rejected."""
+        for args in (["0"], ["10", "--status", "Active"], ["10", "--status", "=1"], ["10", "--start", "999999995"]):
+            with self.subTest(args=args), self.assertRaises(CommandError):
+                self.seed(*args)
+
+    def test_rejects_workers_on_memory_database(self):
+        """Test that worker processes are refused for an in-memory SQLite database."""
+        if connection.vendor != "sqlite" or not connection.is_in_memory_db():
+            self.skipTest("Only in-memory SQLite databases cannot be shared.")
+        with self.assertRaises(CommandError):
+            self.seed("10", "--workers", "2")
+
+
+class DeferredIndexesTests(TransactionTestCase):
+    """Test suite for seeding with indexes built at the end."""
+
+    def test_indexes_restored(self):
+        """Test that indexes and the search index are back and up to date after seeding."""
+        call_command("seed_contacts", "200", stdout=StringIO())
+        names = contact_constraint_names()
+        self.assertTrue(all(index.name in names for index in Contact._meta.indexes))
+        found = get_search_backend().search(Contact.objects.all(), ["kowal"])
+        self.assertEqual(found.count(), Contact.objects.filter(last_name__icontains="kowal").count())
+
+        contact = ContactFactory(phone_number="999999999", last_name="Zzyzx")
+        self.assertEqual(list(get_search_backend().search(Contact.objects.all(), ["zzyzx"])), [contact])
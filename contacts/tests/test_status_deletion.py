@@ -0,0 +1,156 @@
+"""
+Tests for deleting statuses with their contacts reassigned or deleted in the background.
+"""
+
+from unittest import mock
+
+from django.db import connection
+from django.db.models import ProtectedError
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from contacts.jobs import claim, run_job
+from contacts.list_cache import list_cache
+from contacts.models import Contact, ContactChange, ContactStatusChoices, Job
+from contacts.status_deletion import (
+    delete_status_contacts,
+    reassign_contacts,
+    schedule_status_deletion,
+)
+from testing.factories import ContactFactory, ContactStatusFactory, UserFactory
+
+
+class StatusDeletionTest(TestCase):
+    """Test suite for reassigning and deleting the contacts of a status."""
+
+    def setUp(self):
+        """Set up two statuses, five contacts with the first and one with the second."""
+        self.lead = ContactStatusFactory(name="Lead")
+        self.client_status = ContactStatusFactory(name="Client")
+        self.leads = ContactFactory.create_batch(5, status=self.lead)
+        self.other = ContactFactory(status=self.client_status)
+
+    def test_reassign(self):
+        """Test that contacts are moved with one UPDATE and recorded in the change log."""
+        version = list_cache.version()
+        updated_at = Contact.objects.get(pk=self.leads[0].pk).updated_at
+        # The change log insert, the update and the status counts, in a savepoint.
+        with self.assertNumQueries(5):
+            moved = reassign_contacts(self.lead, self.client_status)
+
+        self.assertEqual(moved, 5)
+        self.assertEqual(Contact.objects.filter(status=self.client_status).count(), 6)
+        self.assertGreater(Contact.objects.get(pk=self.leads[0].pk).updated_at, updated_at)
+        self.assertNotEqual(list_cache.version(), version)
+        changes = ContactChange.objects.filter(action=ContactChange.Action.UPDATED)
+        self.assertEqual(sorted(changes.values_list("contact_id", flat=True)), [contact.pk for contact in self.leads])
+
+    def test_reassign_to_no_status(self):
+        """Test that contacts can be left without a status."""
+        self.assertEqual(reassign_contacts(self.lead, None), 5)
+        self.assertEqual(Contact.objects.filter(status=None).count(), 5)
+
+    def test_delete_in_chunks(self):
+        """Test that contacts are deleted chunk by chunk with progress, then the status."""
+        progress = []
+        deleted = delete_status_contacts(self.lead, chunk_size=2, on_progress=lambda *report: progress.append(report))
+
+        self.assertEqual(deleted, 5)
+        self.assertEqual(progress, [(0, 5), (2, 5), (4, 5), (5, 5)])
+        self.assertFalse(ContactStatusChoices.objects.filter(pk=self.lead.pk).exists())
+        self.assertEqual(list(Contact.objects.values_list("pk", flat=True)), [self.other.pk])
+        self.assertEqual(ContactChange.objects.filter(action=ContactChange.Action.DELETED).count(), 5)
+
+    def test_contacts_given_the_status_after_the_last_chunk(self):
+        """Test that contacts given the status just before it is deleted are deleted with it."""
+        late = []
+        delete = self.lead.delete
+
+        def add_contact_then_delete(**kwargs):
+            if not late:
+                late.append(ContactFactory(status=self.lead))
+            return delete(**kwargs)
+
+        with mock.patch.object(self.lead, "delete", side_effect=add_contact_then_delete):
+            self.assertEqual(delete_status_contacts(self.lead), 6)
+        self.assertFalse(ContactStatusChoices.objects.filter(pk=self.lead.pk).exists())
+        self.assertFalse(Contact.objects.filter(pk=late[0].pk).exists())
+
+    def test_status_with_contacts_is_protected(self):
+        """Test that a status cannot be deleted while contacts have it."""
+        with self.assertRaises(ProtectedError):
+            self.lead.delete()
+        self.assertEqual(Contact.objects.filter(status=self.lead).count(), 5)
+
+    def test_job(self):
+        """Test that a deletion is queued once and run by a worker, reporting its progress."""
+        job = schedule_status_deletion(self.lead)
+        self.assertEqual(schedule_status_deletion(self.lead), job)
+
+        run_job(claim("worker"))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.SUCCEEDED)
+        self.assertEqual(job.result, {"deleted": 5})
+        self.assertEqual((job.progress, job.total), (5, 5))
+        self.assertFalse(ContactStatusChoices.objects.filter(pk=self.lead.pk).exists())
+
+        # A finished deletion is not reused, and a status deleted meanwhile is skipped.
+        retry = schedule_status_deletion(self.lead)
+        self.assertNotEqual(retry, job)
+        run_job(claim("worker"))
+        retry.refresh_from_db()
+        self.assertEqual(retry.result, {"deleted": 0})
+
+
+class StatusDeleteViewTest(TestCase):
+    """Test suite for the status deletion page and the job progress page."""
+
+    def setUp(self):
+        """Log in and set up two statuses and contacts with the first."""
+        self.client.force_login(UserFactory())
+        self.lead = ContactStatusFactory(name="Lead")
+        self.client_status = ContactStatusFactory(name="Client")
+        ContactFactory.create_batch(3, status=self.lead)
+        self.url = reverse("contacts:status-delete", kwargs={"pk": self.lead.pk})
+
+    def test_confirmation_page(self):
+        """Test that the page tells how many contacts have the status."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertContains(response, "3 contacts have this status.")
+        self.assertContains(response, "Move them to another status")
+        # Read from the status counters, without counting the contacts.
+        self.assertFalse([query for query in queries if 'FROM "contacts_contact"' in query["sql"]])
+
+    def test_reassign(self):
+        """Test that contacts are moved and the status deleted in the request."""
+        response = self.client.post(self.url, {"contacts": "reassign", "target": self.client_status.pk})
+        self.assertRedirects(response, reverse("contacts:status-list"))
+        self.assertFalse(ContactStatusChoices.objects.filter(pk=self.lead.pk).exists())
+        self.assertEqual(Contact.objects.filter(status=self.client_status).count(), 3)
+
+    def test_reassign_to_same_status(self):
+        """Test that contacts cannot be moved to the status being deleted."""
+        response = self.client.post(self.url, {"contacts": "reassign", "target": self.lead.pk})
+        self.assertContains(response, "Choose another status")
+        self.assertTrue(ContactStatusChoices.objects.filter(pk=self.lead.pk).exists())
+
+    def test_delete(self):
+        """Test that deleting the contacts is queued and its progress shown until the job finishes."""
+        response = self.client.post(self.url, {"contacts": "delete"})
+        job = Job.objects.get()
+        job_url = reverse("contacts:job-detail", kwargs={"pk": job.pk})
+        self.assertRedirects(response, job_url)
+        self.assertEqual(Contact.objects.count(), 3)
+
+        response = self.client.get(job_url)
+        self.assertContains(response, "Queued")
+        self.assertContains(response, 'http-equiv="refresh"')
+
+        run_job(claim("worker"))
+        response = self.client.get(job_url)
+        self.assertContains(response, "Succeeded")
+        self.assertContains(response, "3 of 3 done")
+        self.assertNotContains(response, 'http-equiv="refresh"')
+        self.assertFalse(Contact.objects.exists())
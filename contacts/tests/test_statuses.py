@@ -0,0 +1,222 @@
+"""
+Tests for the contact status registry.
+"""
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from api.serializers import ContactSerializer
+from contacts.forms import ContactForm, StatusDeleteForm
+from contacts.models import Contact, ContactStatusChoices
+from contacts.statuses import SHARED_CACHE_KEY, status_registry
+from testing.factories import ContactFactory, ContactStatusFactory, UserFactory
+
+
+class StatusRegistryTest(TestCase):
+    """Test suite for the status registry inside a transaction."""
+
+    def setUp(self):
+        """Set up statuses."""
+        self.active = ContactStatusFactory(name="Active")
+        self.archived = ContactStatusFactory(name="Archived")
+
+    def test_statuses_are_loaded_once(self):
+        """Test that the statuses are queried on the first lookup only."""
+        self.assertEqual(status_registry.all(), [self.active, self.archived])
+        with self.assertNumQueries(0):
+            self.assertEqual(status_registry.all(), [self.active, self.archived])
+            self.assertEqual(status_registry.get(self.archived.pk).name, "Archived")
+            self.assertIsNone(status_registry.get(0))
+
+    def test_save_and_delete_invalidate_the_statuses(self):
+        """Test that saving or deleting a status is seen by the next lookup."""
+        status_registry.all()
+        lead = ContactStatusFactory(name="Lead")
+        self.assertEqual(status_registry.get(lead.pk), lead)
+
+        self.active.name = "Current"
+        self.active.save()
+        self.assertEqual(status_registry.get(self.active.pk).name, "Current")
+
+        self.archived.delete()
+        self.assertEqual(status_registry.all(), [self.active, lead])
+
+    def test_rolled_back_statuses_are_dropped(self):
+        """Test that statuses created in a rolled back savepoint are not served afterwards."""
+        status_registry.all()
+        with transaction.atomic():
+            lead = ContactStatusFactory(name="Lead")
+            self.assertIn(lead, status_registry.all())
+            transaction.set_rollback(True)
+        self.assertEqual(status_registry.all(), [self.active, self.archived])
+
+    def test_form_uses_the_registry(self):
+        """Test that the contact form renders and validates statuses without querying them."""
+        status_registry.all()
+        data = {
+            "first_name": "John",
+            "last_name": "Doe",
+            "phone_number": "123456789",
+            "email": "john.doe@example.com",
+            "city": "New York",
+            "status": self.archived.pk,
+        }
+        with self.assertNumQueries(0):
+            form = ContactForm()
+            self.assertEqual([label for _, label in form.fields["status"].choices], ["---------", "Active", "Archived"])
+            self.assertIn("Archived", str(form["status"]))
+            self.assertEqual(ContactForm(data={**data, "status": ""}).fields["status"].clean(""), None)
+        with self.assertNumQueries(3):
+            # Model validation still checks the foreign key and the unique phone number and email.
+            form = ContactForm(data=data)
+            self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data["status"], self.archived)
+
+        form = ContactForm(data={**data, "status": 0})
+        self.assertFalse(form.is_valid())
+        self.assertIn("status", form.errors)
+
+    def test_serializer_uses_the_registry(self):
+        """Test that the serializer validates statuses without querying them."""
+        status_registry.all()
+        serializer = ContactSerializer()
+        with self.assertNumQueries(0):
+            self.assertEqual(serializer.fields["status_id"].to_internal_value(self.active.pk), self.active)
+
+        for value in (0, "abc", True, 1.7, "1.7"):
+            serializer = ContactSerializer(data={"status_id": value}, partial=True)
+            self.assertFalse(serializer.is_valid())
+            self.assertIn("status_id", serializer.errors)
+
+    def test_serializer_reads_missing_statuses_from_the_database(self):
+        """Test that a status created without invalidating the registry, e.g. by another process, is accepted."""
+        status_registry.all()
+        (lead,) = ContactStatusChoices.objects.bulk_create([ContactStatusChoices(name="Lead")])
+        field = ContactSerializer().fields["status_id"]
+        self.assertEqual(field.to_internal_value(lead.pk), lead)
+        # The stale registry is dropped, so that it is reloaded with the status.
+        self.assertEqual(status_registry.get(lead.pk), lead)
+        self.assertEqual(field.to_internal_value(float(lead.pk)), lead)
+
+    def test_form_reads_missing_statuses_from_the_database(self):
+        """Test that the status fields of the forms accept a status created without invalidating the registry."""
+        status_registry.all()
+        (lead,) = ContactStatusChoices.objects.bulk_create([ContactStatusChoices(name="Lead")])
+        field = ContactForm().fields["status"]
+        self.assertEqual(field.clean(str(lead.pk)), lead)
+        self.assertEqual(status_registry.get(lead.pk), lead)
+
+        form = StatusDeleteForm(data={"contacts": "reassign", "target": lead.pk}, status=self.active)
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data["target"], lead)
+        for value in ("0", "abc", "1.7"):
+            with self.assertRaises(ValidationError):
+                field.clean(value)
+
+
+class StatusRegistryProcessCacheTest(TransactionTestCase):
+    """Test suite for the status registry outside of transactions."""
+
+    def setUp(self):
+        """Set up a status and an empty cache."""
+        cache.clear()
+        status_registry.clear()
+        self.active = ContactStatusFactory(name="Active")
+
+    def test_statuses_are_cached_across_requests(self):
+        """Test that the statuses are kept in the process until a status is written."""
+        status_registry.all()
+        with self.assertNumQueries(0):
+            status_registry.all()
+
+        lead = ContactStatusFactory(name="Lead")
+        self.assertEqual(status_registry.all(), [self.active, lead])
+
+    def test_statuses_are_not_cached_before_commit(self):
+        """Test that a status is not shared with other requests before its transaction commits."""
+        with transaction.atomic():
+            ContactStatusFactory(name="Lead")
+            status_registry.all()
+            transaction.set_rollback(True)
+        self.assertEqual(status_registry.all(), [self.active])
+
+    def test_status_deleted_by_another_process(self):
+        """Test that saving a contact with a status deleted since the registry loaded it is a validation error."""
+        self.client.force_login(UserFactory())
+        status_registry.all()
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {ContactStatusChoices._meta.db_table} WHERE id = %s", [self.active.pk])
+
+        data = {
+            "first_name": "Anna",
+            "last_name": "Nowak",
+            "phone_number": "111222333",
+            "email": "a@example.com",
+            "city": "Gdańsk",
+        }
+        response = self.client.post(reverse("contact-list"), {**data, "status_id": self.active.pk})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("status_id", response.json())
+        self.assertFalse(Contact.objects.exists())
+        self.assertEqual(status_registry.all(), [])
+
+    def test_form_status_deleted_by_another_process(self):
+        """Test that the contact and status forms show a status deleted since the registry loaded it as an error."""
+        self.client.force_login(UserFactory())
+        archived = ContactStatusFactory(name="Archived")
+        contact = ContactFactory(status=archived)
+        status_registry.all()
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {ContactStatusChoices._meta.db_table} WHERE id = %s", [self.active.pk])
+
+        data = {
+            "first_name": "Anna",
+            "last_name": "Nowak",
+            "phone_number": "111222333",
+            "email": "a@example.com",
+            "city": "Gdańsk",
+            "status": self.active.pk,
+        }
+        response = self.client.post(reverse("contacts:contact-create"), data)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("status", response.context["form"].errors)
+        self.assertIsNone(response.context["form"].instance.pk)
+        self.assertEqual(Contact.objects.count(), 1)
+
+        status_registry.all()
+        response = self.client.post(reverse("contacts:contact-update", kwargs={"pk": contact.pk}), data)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("status", response.context["form"].errors)
+        contact.refresh_from_db()
+        self.assertEqual(contact.status, archived)
+
+        status_registry.all()
+        response = self.client.post(
+            reverse("contacts:status-delete", kwargs={"pk": archived.pk}),
+            {"contacts": "reassign", "target": self.active.pk},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("target", response.context["form"].errors)
+        self.assertTrue(ContactStatusChoices.objects.filter(pk=archived.pk).exists())
+
+    @override_settings(CONTACT_STATUS_CACHE_TTL=0)
+    def test_statuses_expire(self):
+        """Test that the statuses are reloaded once their time to live has passed."""
+        status_registry.all()
+        ContactStatusChoices.objects.filter(pk=self.active.pk).update(name="Current")
+        self.assertEqual(status_registry.get(self.active.pk).name, "Current")
+
+    @override_settings(CONTACT_STATUS_CACHE_SHARED=True, CONTACT_STATUS_CACHE_TTL=0)
+    def test_shared_cache(self):
+        """Test that processes read the statuses from the shared cache, updated by every write."""
+        status_registry.all()
+        self.assertEqual(cache.get(SHARED_CACHE_KEY), [(self.active.pk, "Active")])
+        with self.assertNumQueries(0):
+            self.assertEqual(status_registry.all(), [self.active])
+
+        lead = ContactStatusFactory(name="Lead")
+        self.assertIsNone(cache.get(SHARED_CACHE_KEY))
+        self.assertEqual(status_registry.all(), [self.active, lead])
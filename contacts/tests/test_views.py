@@ -274,7 +274,7 @@ class ContactStatusViewsTest(TestCase):
         self.assertTemplateUsed(response, "statuses/contact_status_choices_confirm_delete.html")
 
         # Test POST request (actual deletion)
-        response = self.client.post(self.delete_url)
+        response = self.client.post(self.delete_url, {"contacts": "reassign"})
         self.assertEqual(response.status_code, 302)  # Redirect after successful deletion
         self.assertRedirects(response, self.list_url)
 
@@ -0,0 +1,164 @@
+"""
+Tests for the server-side weather lookups.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from contacts.models import CityLocation
+from contacts.weather import RateLimiter, RequestCoalescer, get_weather, normalize_city
+from testing.weather_stub import WeatherStub
+
+CITIES = {"warsaw": (52.23, 21.01), "gdańsk": (54.35, 18.65), "new york": (40.71, -74.01)}
+
+
+class WeatherTest(TestCase):
+    """Test suite for fetching the weather of several cities through a local stub."""
+
+    def setUp(self):
+        """Start the stub services and point the settings at them."""
+        cache.clear()
+        self.stub = WeatherStub(CITIES, failing=("errorcity",))
+        self.stub.__enter__()
+        self.addCleanup(self.stub.__exit__, None, None, None)
+        settings_override = override_settings(**self.stub.settings)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_normalize_city(self):
+        """Test that case and whitespace variants share a normalized name."""
+        self.assertEqual(normalize_city("  New   York "), "new york")
+        self.assertEqual(normalize_city("GDAŃSK"), "gdańsk")
+
+    def test_weather_of_several_cities(self):
+        """Test that every city gets its weather, keyed by the name it was asked for."""
+        weather = get_weather(["Warsaw", "New York"])
+        self.assertEqual(
+            weather["Warsaw"],
+            {"status": "ok", "temperature": 52.23, "windspeed": 10.0, "humidity": 65},
+        )
+        self.assertEqual(weather["New York"]["temperature"], 40.71)
+
+    def test_variants_are_looked_up_once(self):
+        """Test that spelling variants of a city cost one geocoding and one forecast request."""
+        weather = get_weather(["Warsaw", "WARSAW", " warsaw "])
+        self.assertEqual(len(weather), 3)
+        self.assertEqual(self.stub.requests, {"/search": 1, "/forecast": 1})
+
+    def test_coordinates_are_stored(self):
+        """Test that geocoded coordinates are stored and reused once forecasts expire."""
+        get_weather(["Warsaw", "Atlantis"])
+        self.assertEqual(CityLocation.objects.get(name="warsaw").latitude, 52.23)
+        self.assertIsNone(CityLocation.objects.get(name="atlantis").latitude)
+
+        cache.clear()
+        get_weather(["Warsaw", "Atlantis"])
+        self.assertEqual(self.stub.requests, {"/search": 2, "/forecast": 2})
+
+    def test_forecasts_are_cached(self):
+        """Test that a cached forecast is served without upstream requests or queries."""
+        get_weather(["Warsaw"])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_weather(["warsaw"])["warsaw"]["status"], "ok")
+        self.assertEqual(self.stub.requests, {"/search": 1, "/forecast": 1})
+
+    def test_unknown_city(self):
+        """Test that cities the geocoder does not know are reported as not found."""
+        self.assertEqual(get_weather(["Atlantis"]), {"Atlantis": {"status": "not_found"}})
+
+    def test_upstream_errors_are_not_cached(self):
+        """Test that a failing lookup is reported as an error and retried on the next request."""
+        self.assertEqual(get_weather(["ErrorCity"]), {"ErrorCity": {"status": "error"}})
+        self.assertFalse(CityLocation.objects.filter(name="errorcity").exists())
+
+        get_weather(["ErrorCity"])
+        self.assertEqual(self.stub.requests["/search"], 2)
+
+    def test_unreachable_upstream(self):
+        """Test that connection failures are reported as errors."""
+        with override_settings(WEATHER_GEOCODING_URL="http://127.0.0.1:9/search", WEATHER_TIMEOUT=1):
+            self.assertEqual(get_weather(["Warsaw"]), {"Warsaw": {"status": "error"}})
+
+    def test_forecasts_are_fetched_in_parallel(self):
+        """Test that slow forecast requests for different cities overlap."""
+        CityLocation.objects.bulk_create(
+            CityLocation(name=name, latitude=latitude, longitude=longitude)
+            for name, (latitude, longitude) in CITIES.items()
+        )
+        self.stub.delay = 0.3
+        start = time.monotonic()
+        with self.assertNumQueries(1):
+            weather = get_weather(["Warsaw", "Gdańsk", "New York"])
+        # Three sequential requests would take at least 0.9s.
+        self.assertLess(time.monotonic() - start, 0.8)
+        self.assertTrue(all(w["status"] == "ok" for w in weather.values()))
+        self.assertEqual(self.stub.requests, {"/forecast": 3})
+
+    def test_geocoding_is_rate_limited(self):
+        """Test that unknown cities are geocoded one at a time, spaced by the geocoding interval."""
+        with override_settings(WEATHER_GEOCODING_INTERVAL=0.2):
+            start = time.monotonic()
+            weather = get_weather(["Warsaw", "Gdańsk", "New York"])
+            # The first request starts at once, the next two 0.2s after the one before.
+            self.assertGreaterEqual(time.monotonic() - start, 0.4)
+        self.assertTrue(all(w["status"] == "ok" for w in weather.values()))
+        self.assertEqual(self.stub.requests, {"/search": 3, "/forecast": 3})
+
+
+class RateLimiterTest(TestCase):
+    """Test suite for spacing out calls from several threads."""
+
+    def test_calls_are_spaced_across_threads(self):
+        """Test that calls from concurrent threads start at least one interval apart."""
+        limiter = RateLimiter()
+        starts = []
+
+        def call():
+            limiter.wait(0.1)
+            starts.append(time.monotonic())
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            for _ in range(4):
+                executor.submit(call)
+        starts.sort()
+        self.assertTrue(all(later - earlier >= 0.09 for earlier, later in zip(starts, starts[1:])))
+
+
+class RequestCoalescerTest(TestCase):
+    """Test suite for sharing in-flight computations."""
+
+    def test_concurrent_callers_share_one_call(self):
+        """Test that callers arriving while a computation runs get its result."""
+        coalescer = RequestCoalescer()
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return 42
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            first = executor.submit(coalescer.run, "key", compute)
+            started.wait(5)
+            others = [executor.submit(coalescer.run, "key", compute) for _ in range(3)]
+            # Let the other callers reach the in-flight computation before it finishes.
+            time.sleep(0.1)
+            release.set()
+            results = [first.result(), *(future.result() for future in others)]
+
+        self.assertEqual(results, [42, 42, 42, 42])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(coalescer.run("key", lambda: 7), 7)
+
+    def test_exceptions_reach_every_caller(self):
+        """Test that a failed computation is not remembered."""
+        coalescer = RequestCoalescer()
+        with self.assertRaises(ValueError):
+            coalescer.run("key", lambda: int("x"))
+        self.assertEqual(coalescer.run("key", lambda: 1), 1)
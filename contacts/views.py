@@ -1,6 +1,15 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q
+from django.core.exceptions import PermissionDenied
+from django.db import IntegrityError, router, transaction
+from django.db.models import QuerySet
+from django.http import Http404, HttpRequest, HttpResponse, StreamingHttpResponse
+from django.shortcuts import redirect
+from django.template.loader import render_to_string
 from django.urls import reverse_lazy
+from django.utils.http import urlencode
+from django.utils.safestring import mark_safe
+from django.views import View
 from django.views.generic import (
     CreateView,
     DeleteView,
@@ -8,55 +17,178 @@ from django.views.generic import (
     ListView,
     UpdateView,
 )
+from django.views.generic.list import MultipleObjectMixin
+
+from contacts.conditional import (
+    list_validators,
+    not_modified,
+    object_validators,
+    request_parts,
+    set_validators,
+)
+from contacts.counters import status_counts, with_contact_counts
+from contacts.exporting import CONTENT_TYPES, CSV, FORMATS, stream_export
+from contacts.forms import (
+    ContactForm,
+    StatusDeleteForm,
+    StatusForm,
+    reject_deleted_status,
+)
+from contacts.instrumentation import metrics_registry
+from contacts.list_cache import list_cache
+from contacts.models import Contact, ContactStatusChoices, Job
+from contacts.pagination import (
+    KEYSET,
+    InvalidCursor,
+    KeysetPaginator,
+    get_pagination_mode,
+)
+from contacts.search import fuzzy_requested, get_search_backend
+from contacts.status_deletion import reassign_contacts, schedule_status_deletion
+from contacts.statuses import status_registry
 
-from contacts.forms import ContactForm, StatusForm
-from contacts.models import Contact, ContactStatusChoices
+RELEVANCE_SORT = "relevance"
 
 
 class ContactListView(LoginRequiredMixin, ListView):
-    """Displays a paginated list of Contact objects with optional filtering, sorting and searching."""
+    """
+    Displays a paginated list of Contact objects with optional filtering, sorting and searching.
+
+    Responses carry an ETag, so unchanged pages are answered with 304 Not Modified. The
+    table and pagination are rendered from `table_template_name` and cached per user and
+    page parameters until a contact or status is written (see `contacts.list_cache`).
+    """
 
     model = Contact
     template_name = "contacts/contact_list.html"
+    table_template_name = "contacts/contact_list_table.html"
     context_object_name = "contacts"
     paginate_by = 5
 
+    def get(self: "ContactListView", request: HttpRequest, *args: tuple, **kwargs: dict) -> HttpResponse:
+        """
+        Render the page, or answer 304 Not Modified if the client's copy is current.
+
+        :param request: The request with the filter, sort and page parameters.
+
+        :return:
+            HttpResponse: The rendered page or the 304 response.
+        """
+        etag, last_modified = list_validators(self.get_queryset(), "list", request.user.pk, request_parts(request))
+        if response := not_modified(request, etag):
+            return response
+        return set_validators(super().get(request, *args, **kwargs), etag, last_modified)
+
     def get_ordering(self: "ContactListView") -> str:
         """
         Determine the ordering of the queryset based on the request GET parameters.
 
+        Sorting by relevance is only allowed together with a search query, and is the default
+        for fuzzy searches.
+
         :return:
             str: A string indicating the field to order by defaults to "last_name".
         """
-        ordering = self.request.GET.get("sort", "last_name")
-        if ordering not in ["last_name", "-last_name", "created_at", "-created_at"]:
+        ordering = self.request.GET.get("sort", self.default_sort())
+        allowed = ["last_name", "-last_name", "created_at", "-created_at"]
+        if self.request.GET.get("q"):
+            allowed.append(RELEVANCE_SORT)
+        if ordering not in allowed:
             ordering = "last_name"
         return ordering
 
-    def get_queryset(self: "ContactListView"):
+    def default_sort(self: "ContactListView") -> str:
+        """Return the ordering used without a `sort` parameter: relevance for fuzzy searches, else "last_name"."""
+        if self.request.GET.get("q") and fuzzy_requested(self.request.GET):
+            return RELEVANCE_SORT
+        return "last_name"
+
+    def get_queryset(self: "ContactListView") -> QuerySet:
+        """
+        Return the filtered and ordered contacts, built once per request.
+
+        The ETag and the page are read from the same queryset, so a search and its fuzzy
+        expansion are only built once.
+
+        :return:
+            QuerySet: Filtered and ordered queryset.
+        """
+        if not hasattr(self, "_queryset"):
+            self._queryset = self.filter_contacts()
+        return self._queryset
+
+    def filter_contacts(self: "ContactListView") -> QuerySet:
         """
         Return a filtered queryset based on the search query and ordering.
 
         :return:
             QuerySet: Filtered and ordered queryset.
         """
-        queryset = super().get_queryset()
+        queryset = self.model.objects.select_related("status")
         query = self.request.GET.get("q")
         status = self.request.GET.get("status")
+        ordering = self.get_ordering()
 
-        if query:
-            queryset = queryset.filter(
-                Q(first_name__icontains=query)
-                | Q(last_name__icontains=query)
-                | Q(email__icontains=query)
-                | Q(phone_number__icontains=query)
-                | Q(city__icontains=query),
+        if query and fuzzy_requested(self.request.GET):
+            queryset = get_search_backend(queryset.db).fuzzy_search(
+                queryset,
+                query.split(),
+                ranked=ordering == RELEVANCE_SORT,
+            )
+        elif query:
+            queryset = get_search_backend(queryset.db).search(
+                queryset,
+                [query],
+                ranked=ordering == RELEVANCE_SORT,
             )
 
         if status and status.isdigit():
             queryset = queryset.filter(status_id=int(status))
 
-        return queryset.order_by(self.get_ordering())
+        if ordering == RELEVANCE_SORT:
+            return queryset.order_by("-search_rank", "last_name")
+        return queryset.order_by(ordering)
+
+    def paginate_queryset(self: "ContactListView", queryset: QuerySet, page_size: int) -> tuple:
+        """
+        Paginate the queryset by page number, or by cursor when ``CONTACT_PAGINATION`` is "keyset".
+
+        :param queryset: Filtered and ordered queryset.
+        :param page_size: Number of contacts per page.
+
+        :return:
+            tuple: The paginator, the page, the page's contacts and whether there are other pages.
+        """
+        if get_pagination_mode() != KEYSET:
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = KeysetPaginator(
+            queryset,
+            page_size,
+            approximate=getattr(settings, "CONTACT_APPROXIMATE_COUNT", False),
+        )
+        try:
+            page = paginator.page(self.request.GET.get("cursor"))
+        except InvalidCursor as e:
+            raise Http404(str(e)) from e
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def page_query(self: "ContactListView", filters: dict) -> str:
+        """
+        Return the query string the pagination links keep, without the page or cursor.
+
+        :param filters: The search, sort and status filters of the list.
+
+        :return:
+            str: URL-encoded parameters, empty without filters.
+        """
+        params = {
+            "q": filters["query"],
+            "sort": filters["current_sort"],
+            "status": filters["current_status"],
+            "fuzzy": "1" if filters["fuzzy"] else "",
+        }
+        return urlencode({name: value for name, value in params.items() if value})
 
     def get_context_data(self: "ContactListView", **kwargs: dict) -> dict:
         """
@@ -65,25 +197,125 @@ class ContactListView(LoginRequiredMixin, ListView):
         :param kwargs: Keyword arguments passed to the context.
 
         :return:
-            dict: The context dictionary with the current sort order and search query.
+            dict: The context dictionary with the current sort order and search query, and the
+            rendered `contact_table`, from the cache when possible.
         """
-        context = super().get_context_data(**kwargs)
-        context["current_sort"] = self.request.GET.get("sort", "last_name")
-        context["query"] = self.request.GET.get("q", "")
-        context["current_status"] = self.request.GET.get("status", "")
-        context["statuses"] = ContactStatusChoices.objects.all()
+        filters = {
+            "current_sort": self.request.GET.get("sort", self.default_sort()),
+            "query": self.request.GET.get("q", ""),
+            "fuzzy": fuzzy_requested(self.request.GET),
+            "current_status": self.request.GET.get("status", ""),
+            "statuses": status_registry.all(),
+            "keyset_pagination": get_pagination_mode() == KEYSET,
+        }
+        filters["page_query"] = self.page_query(filters)
+        key = None
+        if list_cache.enabled:
+            key = list_cache.key(self.request, get_pagination_mode(), self.get_paginate_by(self.object_list))
+            if (table := list_cache.get(key)) is not None:
+                # Skip MultipleObjectMixin, whose context would query the page for nothing.
+                context = super(MultipleObjectMixin, self).get_context_data(**kwargs) | filters
+                context["contact_table"] = mark_safe(table)  # noqa: S308
+                return context
+
+        context = super().get_context_data(**kwargs) | filters
+        context["contact_table"] = render_to_string(self.table_template_name, context, self.request)
+        if key is not None:
+            list_cache.set(key, str(context["contact_table"]))
         return context
 
 
+class ContactExportView(ContactListView):
+    """
+    Streams every contact the list view's filters select as a CSV or NDJSON file.
+
+    Accepts the list view's `q`, `status` and `sort` parameters, `format` ("csv" or "ndjson")
+    and `gzip=1` to compress the file.
+    """
+
+    def get(
+        self: "ContactExportView",
+        request: HttpRequest,
+        *args: tuple,  # noqa: ARG002
+        **kwargs: dict,  # noqa: ARG002
+    ) -> StreamingHttpResponse:
+        """
+        Stream the export file.
+
+        :param request: The request with the filter and format parameters.
+
+        :return:
+            StreamingHttpResponse: The file, sent as an attachment.
+        """
+        fmt = request.GET.get("format", CSV)
+        if fmt not in FORMATS:
+            fmt = CSV
+        compress = request.GET.get("gzip") in ("1", "true")
+
+        filename = f"contacts.{fmt}.gz" if compress else f"contacts.{fmt}"
+        response = StreamingHttpResponse(
+            stream_export(self.get_queryset(), fmt, compress=compress),
+            content_type="application/gzip" if compress else CONTENT_TYPES[fmt],
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
 class ContactDetailView(LoginRequiredMixin, DetailView):
-    """Displays detailed information about a specific contact."""
+    """
+    Displays detailed information about a specific contact.
+
+    Responses carry an ETag and Last-Modified, so an unchanged contact is answered with 304 Not Modified.
+    """
 
     model = Contact
+    queryset = Contact.objects.select_related("status")
     template_name = "contacts/contact_detail.html"
     context_object_name = "contact"
 
+    def get(
+        self: "ContactDetailView",
+        request: HttpRequest,
+        *args: tuple,  # noqa: ARG002
+        **kwargs: dict,  # noqa: ARG002
+    ) -> HttpResponse:
+        """
+        Render the contact, or answer 304 Not Modified if the client's copy is current.
+
+        :param request: The request for the contact.
 
-class ContactCreateView(LoginRequiredMixin, CreateView):
+        :return:
+            HttpResponse: The rendered page or the 304 response.
+        """
+        self.object = self.get_object()
+        etag, last_modified = object_validators(self.object, "detail", request.user.pk)
+        if response := not_modified(request, etag, last_modified):
+            return response
+        response = self.render_to_response(self.get_context_data(object=self.object))
+        return set_validators(response, etag, last_modified)
+
+
+class ContactFormMixin:
+    """Saves contacts, reporting a status deleted by another process as an error of the form."""
+
+    def form_valid(self: "ContactFormMixin", form: ContactForm) -> HttpResponse:
+        """Save the contact, or show the form again if its status no longer exists."""
+        adding = form.instance._state.adding  # noqa: SLF001
+        try:
+            with transaction.atomic(using=router.db_for_write(Contact)):
+                return super().form_valid(form)
+        except IntegrityError:
+            if not reject_deleted_status(form, "status"):
+                raise
+        if adding:
+            # The rolled back insert left its primary key on the new contact.
+            form.instance.pk = None
+            form.instance._state.adding = True  # noqa: SLF001
+            self.object = None
+        return self.form_invalid(form)
+
+
+class ContactCreateView(LoginRequiredMixin, ContactFormMixin, CreateView):
     """Provides a form for creating a new contact."""
 
     model = Contact
@@ -92,7 +324,7 @@ class ContactCreateView(LoginRequiredMixin, CreateView):
     success_url = reverse_lazy("contacts:contact-list")
 
 
-class ContactUpdateView(LoginRequiredMixin, UpdateView):
+class ContactUpdateView(LoginRequiredMixin, ContactFormMixin, UpdateView):
     """Provides a form for editing an existing contact."""
 
     model = Contact
@@ -110,20 +342,32 @@ class ContactDeleteView(LoginRequiredMixin, DeleteView):
 
 
 class ContactStatusListView(LoginRequiredMixin, ListView):
-    """Displays a list of all contact status choices."""
+    """Displays a list of all contact status choices with their numbers of contacts, read from the counters."""
 
     model = ContactStatusChoices
     template_name = "statuses/contact_status_choices_list.html"
     context_object_name = "statuses"
 
+    def get_queryset(self: "ContactStatusListView") -> QuerySet[ContactStatusChoices]:
+        """Annotate the statuses with their numbers of contacts."""
+        return with_contact_counts(super().get_queryset())
+
+    def get_context_data(self: "ContactStatusListView", **kwargs: dict) -> dict:
+        """Add the number of contacts without a status."""
+        return super().get_context_data(without_status_count=status_counts().get(None, 0), **kwargs)
+
 
 class ContactStatusDetailView(LoginRequiredMixin, DetailView):
-    """Displays details of a specific contact status."""
+    """Displays details of a specific contact status, with its number of contacts read from the counters."""
 
     model = ContactStatusChoices
     template_name = "statuses/contact_status_choices_detail.html"
     context_object_name = "status"
 
+    def get_queryset(self: "ContactStatusDetailView") -> QuerySet[ContactStatusChoices]:
+        """Annotate the status with its number of contacts."""
+        return with_contact_counts(super().get_queryset())
+
 
 class ContactStatusCreateView(LoginRequiredMixin, CreateView):
     """Provides a form for creating a new contact status."""
@@ -144,8 +388,76 @@ class ContactStatusUpdateView(LoginRequiredMixin, UpdateView):
 
 
 class ContactStatusDeleteView(LoginRequiredMixin, DeleteView):
-    """Asks for confirmation and deletes a contact status."""
+    """
+    Asks what happens to the contacts of a contact status, and deletes it.
+
+    Moved contacts are reassigned with one ``UPDATE`` before the status is deleted. Deleting
+    the contacts is queued as a background job instead, and the user is sent to its
+    progress page; see ``contacts.status_deletion``.
+    """
 
     model = ContactStatusChoices
+    form_class = StatusDeleteForm
     template_name = "statuses/contact_status_choices_confirm_delete.html"
     success_url = reverse_lazy("contacts:status-list")
+
+    def get_form_kwargs(self: "ContactStatusDeleteView") -> dict:
+        """Pass the status being deleted to the form."""
+        return {**super().get_form_kwargs(), "status": self.object}
+
+    def get_context_data(self: "ContactStatusDeleteView", **kwargs: dict) -> dict:
+        """Add the number of contacts with the status, read from its counter."""
+        return super().get_context_data(contact_count=status_counts().get(self.object.pk, 0), **kwargs)
+
+    def form_valid(self: "ContactStatusDeleteView", form: StatusDeleteForm) -> HttpResponse:
+        """Queue the deletion of the status with its contacts, or move them and delete it now."""
+        using = router.db_for_write(Contact)
+        status = self.object
+        if form.cleaned_data["contacts"] == StatusDeleteForm.DELETE:
+            if Contact.objects.using(using).filter(status=status).exists():
+                job = schedule_status_deletion(status)
+                return redirect("contacts:job-detail", pk=job.pk)
+            target = None
+        else:
+            target = form.cleaned_data["target"]
+        try:
+            with transaction.atomic(using=using):
+                reassign_contacts(status, target)
+                status.delete(using=using)
+        except IntegrityError:
+            if not reject_deleted_status(form, "target"):
+                raise
+            return self.form_invalid(form)
+        return redirect(self.get_success_url())
+
+
+class JobDetailView(LoginRequiredMixin, DetailView):
+    """Displays the progress of a background job, refreshed until it finishes."""
+
+    model = Job
+    template_name = "jobs/job_detail.html"
+    context_object_name = "job"
+
+
+class MetricsView(View):
+    """
+    Serves the request totals of ``contacts.instrumentation`` in the Prometheus text format.
+
+    Available with ``CONTACT_INSTRUMENTATION`` enabled, to staff users and to the addresses in ``INTERNAL_IPS``,
+    where the scraper is expected to run.
+    """
+
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def get(self: "MetricsView", request: HttpRequest, *args: tuple, **kwargs: dict) -> HttpResponse:  # noqa: ARG002
+        """
+        Return the totals of this process.
+
+        :raises Http404: If instrumentation is disabled.
+        :raises PermissionDenied: If the client is neither staff nor an internal address.
+        """
+        if not getattr(settings, "CONTACT_INSTRUMENTATION", False):
+            raise Http404
+        if not request.user.is_staff and request.META.get("REMOTE_ADDR") not in settings.INTERNAL_IPS:
+            raise PermissionDenied
+        return HttpResponse(metrics_registry.export(), content_type=self.content_type)
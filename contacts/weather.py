@@ -0,0 +1,260 @@
+"""
+Server-side weather lookups for the cities shown on the contact list.
+
+The browser asks once for every distinct city on the page instead of calling the
+geocoding and forecast services itself, row by row. Here:
+
+- coordinates come from the ``CityLocation`` table, and only unknown cities are geocoded,
+  one at a time and at most one request per ``WEATHER_GEOCODING_INTERVAL`` seconds from
+  the whole process, as Nominatim's usage policy requires,
+- forecasts are cached per city for ``WEATHER_CACHE_TTL`` seconds,
+- missing forecasts are fetched concurrently in a thread pool,
+- concurrent requests for the same city share a single upstream call.
+
+The upstream endpoints are configured with ``WEATHER_GEOCODING_URL`` and
+``WEATHER_FORECAST_URL`` so tests and development can point them at a local stub.
+"""
+
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import quote
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+from contacts.models import CityLocation
+
+USER_AGENT = "ContactManagement/0.1"
+CACHE_KEY_PREFIX = "weather:"
+
+DEFAULT_GEOCODING_URL = "https://nominatim.openstreetmap.org/search"
+DEFAULT_FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+
+FOUND = "ok"
+NOT_FOUND = "not_found"
+ERROR = "error"
+
+
+def normalize_city(name: str) -> str:
+    """
+    Normalize a city name so spelling variants share cache entries.
+
+    :param name: City name as displayed.
+
+    :return:
+        str: Case-folded name with collapsed whitespace.
+    """
+    return " ".join(name.split()).casefold()
+
+
+class RequestCoalescer:
+    """Run a computation once for concurrent callers asking for the same key."""
+
+    def __init__(self: "RequestCoalescer") -> None:
+        """Initialize the registry of in-flight computations."""
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, Future] = {}
+
+    def run(self: "RequestCoalescer", key: str, func: Callable[[], object]) -> object:
+        """
+        Return the result of ``func``, sharing it with callers that ask for the same key meanwhile.
+
+        :param key: Identifier of the computation.
+        :param func: Computation run by the first caller.
+
+        :return:
+            object: Result of the computation; exceptions are re-raised in every caller.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = func()
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+
+coalescer = RequestCoalescer()
+
+
+class RateLimiter:
+    """Space out calls made from any thread of the process by a minimum interval."""
+
+    def __init__(self: "RateLimiter") -> None:
+        """Initialize the time the next call may start at."""
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self: "RateLimiter", interval: float) -> None:
+        """
+        Block until the caller's turn, ``interval`` seconds after the previous caller's.
+
+        :param interval: Minimum seconds between the starts of two calls.
+        """
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + interval
+        if start > now:
+            time.sleep(start - now)
+
+
+geocoding_limiter = RateLimiter()
+
+
+def fetch_json(url: str, params: dict) -> object:
+    """Fetch and decode a JSON document from an upstream service."""
+    timeout = getattr(settings, "WEATHER_TIMEOUT", 5)
+    response = requests.get(url, params=params, headers={"User-Agent": USER_AGENT}, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def geocode(city: str) -> tuple[float, float] | None:
+    """
+    Look up the coordinates of a city.
+
+    :param city: Normalized city name.
+
+    :return:
+        tuple | None: Latitude and longitude, or ``None`` if the city is unknown.
+    """
+    url = getattr(settings, "WEATHER_GEOCODING_URL", DEFAULT_GEOCODING_URL)
+    geocoding_limiter.wait(getattr(settings, "WEATHER_GEOCODING_INTERVAL", 1))
+    places = fetch_json(url, {"q": city, "format": "json", "limit": 1})
+    if not places:
+        return None
+    return float(places[0]["lat"]), float(places[0]["lon"])
+
+
+def fetch_forecast(latitude: float, longitude: float) -> dict:
+    """
+    Fetch the current weather at a location.
+
+    :return:
+        dict: Temperature (°C), wind speed (km/h) and relative humidity (%) of the current hour.
+    """
+    data = fetch_json(
+        getattr(settings, "WEATHER_FORECAST_URL", DEFAULT_FORECAST_URL),
+        {
+            "latitude": latitude,
+            "longitude": longitude,
+            "current_weather": "true",
+            "hourly": "relative_humidity_2m",
+            "timezone": "auto",
+        },
+    )
+    current = data["current_weather"]
+    # Humidity is hourly, so use the value of the current hour.
+    hour = current["time"][:13] + ":00"
+    hourly = data.get("hourly", {})
+    times = hourly.get("time", [])
+    humidity = hourly["relative_humidity_2m"][times.index(hour)] if hour in times else None
+    return {
+        "status": FOUND,
+        "temperature": current["temperature"],
+        "windspeed": current["windspeed"],
+        "humidity": humidity,
+    }
+
+
+def resolve_locations(cities: Iterable[str]) -> dict[str, CityLocation]:
+    """
+    Return the locations of cities, geocoding and storing the ones not looked up before.
+
+    Unknown cities are geocoded one after the other, rate limited by ``geocode``.
+
+    :param cities: Normalized city names.
+
+    :return:
+        dict: Locations by normalized name; cities that failed to geocode are left out.
+    """
+    cities = set(cities)
+    locations = {location.name: location for location in CityLocation.objects.filter(name__in=cities)}
+
+    created = []
+    for city in sorted(cities - locations.keys()):
+        try:
+            coordinates = coalescer.run(f"geocode:{city}", lambda c=city: geocode(c))
+        except (requests.RequestException, KeyError, ValueError):
+            continue
+        latitude, longitude = coordinates or (None, None)
+        created.append(CityLocation(name=city, latitude=latitude, longitude=longitude))
+
+    CityLocation.objects.bulk_create(created, ignore_conflicts=True)
+    locations.update((location.name, location) for location in created)
+    return locations
+
+
+def get_weather(cities: Iterable[str]) -> dict[str, dict]:
+    """
+    Return the current weather of every city.
+
+    :param cities: City names as displayed; duplicates and spelling variants are looked up once.
+
+    :return:
+        dict: Weather by city name as given, each with a ``status`` of "ok" (plus the
+        weather fields), "not_found" or "error".
+    """
+    names = {name: normalize_city(name) for name in cities}
+    keys = set(names.values())
+    cache_keys = {cache_key(city): city for city in keys}
+    results = {cache_keys[key]: weather for key, weather in cache.get_many(cache_keys).items()}
+
+    missing = keys - results.keys()
+    if missing:
+        locations = resolve_locations(missing)
+        found = {}
+        for city in missing:
+            location = locations.get(city)
+            if location is None:
+                results[city] = {"status": ERROR}
+            elif location.latitude is None:
+                results[city] = {"status": NOT_FOUND}
+            else:
+                found[city] = location
+
+        max_workers = min(len(found), getattr(settings, "WEATHER_MAX_WORKERS", 8)) or 1
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                city: executor.submit(
+                    coalescer.run,
+                    f"forecast:{city}",
+                    lambda loc=location: fetch_forecast(loc.latitude, loc.longitude),
+                )
+                for city, location in found.items()
+            }
+            for city, future in futures.items():
+                try:
+                    results[city] = future.result()
+                except (requests.RequestException, KeyError, ValueError, TypeError):
+                    results[city] = {"status": ERROR}
+
+        fresh = {city: results[city] for city in missing if results[city]["status"] != ERROR}
+        cache.set_many(
+            {cache_key(city): weather for city, weather in fresh.items()},
+            timeout=getattr(settings, "WEATHER_CACHE_TTL", 600),
+        )
+
+    return {name: results[key] for name, key in names.items()}
+
+
+def cache_key(city: str) -> str:
+    """Return the cache key of a normalized city name, quoted to be safe for every cache backend."""
+    return f"{CACHE_KEY_PREFIX}{quote(city)}"
@@ -0,0 +1,99 @@
+"""
+Helpers shared by the benchmark management commands.
+
+Benchmarks run against a throwaway test database, so they never touch the data of the
+configured database, and report latency percentiles over repeated runs.
+"""
+
+import os
+import resource
+import statistics
+import sys
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.db import connection
+
+from contacts.routers import pinned_to_primary
+
+
+@contextmanager
+def isolated_database(name: str | None = None) -> Iterator[None]:
+    """
+    Create and migrate a test database for the duration of the block, reading from it even with a replica.
+
+    :param name: Name of the test database, e.g. a file for SQLite, whose test databases are in memory by default.
+    """
+    test_settings = connection.settings_dict["TEST"]
+    old_test_name = test_settings["NAME"]
+    if name is not None:
+        test_settings["NAME"] = name
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    token = pinned_to_primary.set(True)
+    try:
+        yield
+    finally:
+        pinned_to_primary.reset(token)
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        test_settings["NAME"] = old_test_name
+
+
+def measure(func: Callable[[], object], repeat: int = 20, warmup: int = 2) -> dict[str, float]:
+    """
+    Time repeated calls of a function.
+
+    :param func: Function to call.
+    :param repeat: Number of timed calls.
+    :param warmup: Number of untimed calls made first to warm up caches.
+
+    :return:
+        dict: Latency in milliseconds as ``p50``, ``p95``, ``p99`` and ``mean``.
+    """
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return summarize(timings)
+
+
+def summarize(timings: list[float]) -> dict[str, float]:
+    """
+    Summarize latencies.
+
+    :param timings: At least two latencies in milliseconds.
+
+    :return:
+        dict: Latency in milliseconds as ``p50``, ``p95``, ``p99`` and ``mean``.
+    """
+    percentiles = statistics.quantiles(timings, n=100, method="inclusive")
+    return {
+        "p50": statistics.median(timings),
+        "p95": percentiles[94],
+        "p99": percentiles[98],
+        "mean": statistics.fmean(timings),
+    }
+
+
+def current_rss() -> float:
+    """
+    Return the resident set size of the process.
+
+    Reads ``/proc/self/statm`` where available; elsewhere falls back to the peak size
+    reported by ``getrusage``, which never decreases.
+
+    :return:
+        float: Resident memory in MiB.
+    """
+    try:
+        with Path("/proc/self/statm").open() as statm:
+            pages = int(statm.read().split()[1])
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
@@ -0,0 +1,299 @@
+"""
+Bulk generators for large synthetic datasets.
+
+Unlike the factories, these build unsaved model instances in memory and insert them
+with ``bulk_create``, which makes seeding hundreds of thousands of rows practical.
+Generated values follow the same shapes as ``ContactFactory`` (9-digit phone numbers,
+unique emails), so data from both sources can be mixed in one database.
+
+For millions of rows, ``ContactSeed`` skips model instances altogether: it generates
+database-ready row tuples and inserts them with ``executemany``, one transaction per
+batch, while ``deferred_indexes`` builds the secondary and search indexes once at the
+end instead of updating them for every row.
+"""
+
+import random
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from itertools import islice
+
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from contacts.models import Contact, ContactStatusChoices
+from contacts.search import get_search_backend
+
+FIRST_NAMES = (
+    "Anna", "Jan", "Maria", "Piotr", "Katarzyna", "Andrzej", "Magdalena", "Tomasz", "Agnieszka", "Krzysztof",
+    "Joanna", "Marcin", "Ewa", "Michał", "Aleksandra", "Paweł", "Monika", "Łukasz", "Barbara", "Adam",
+    "John", "Jane", "Alice", "Robert", "Emily", "David", "Sophie", "Daniel", "Olivia", "Thomas",
+)  # fmt: skip
+LAST_NAMES = (
+    "Nowak", "Kowalski", "Wiśniewski", "Wójcik", "Kowalczyk", "Kamiński", "Lewandowski", "Zieliński", "Szymański",
+    "Woźniak", "Dąbrowski", "Kozłowski", "Jankowski", "Mazur", "Kwiatkowski", "Krawczyk", "Piotrowski", "Grabowski",
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Miller", "Davis", "Wilson", "Taylor", "Anderson",
+)  # fmt: skip
+CITIES = (
+    "Warsaw", "Kraków", "Łódź", "Wrocław", "Poznań", "Gdańsk", "Szczecin", "Bydgoszcz", "Lublin", "Białystok",
+    "Katowice", "Gdynia", "Toruń", "Rzeszów", "Olsztyn", "Berlin", "Prague", "Vienna", "London", "New York",
+)  # fmt: skip
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def build_contacts(
+    count: int,
+    statuses: Sequence[ContactStatusChoices | None] = (None,),
+    start: int = 0,
+) -> Iterator[Contact]:
+    """
+    Yield unsaved contacts with unique phone numbers and emails.
+
+    :param count: Number of contacts to build.
+    :param statuses: Statuses assigned round-robin to the generated contacts.
+    :param start: Sequence number of the first contact; disjoint ranges never collide.
+
+    :return:
+        Iterator[Contact]: Unsaved Contact instances.
+    """
+    for n in range(start, start + count):
+        first_name, last_name, phone_number, email, city = contact_values(n)
+        yield Contact(
+            first_name=first_name,
+            last_name=last_name,
+            phone_number=phone_number,
+            email=email,
+            city=city,
+            status=statuses[n % len(statuses)],
+        )
+
+
+def contact_values(n: int) -> tuple[str, str, str, str, str]:
+    """Return the first name, last name, phone number, email and city of the contact with sequence number ``n``."""
+    first_name = FIRST_NAMES[n % len(FIRST_NAMES)]
+    last_name = LAST_NAMES[(n // len(FIRST_NAMES)) % len(LAST_NAMES)]
+    email = f"{first_name.lower()}.{last_name.lower()}.{n}@example.com"
+    return first_name, last_name, f"{n:09d}", email, CITIES[(n * 7) % len(CITIES)]
+
+
+def create_contacts(
+    count: int,
+    statuses: Sequence[ContactStatusChoices | None] = (None,),
+    start: int = 0,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """
+    Insert generated contacts in batches of ``bulk_create``.
+
+    :param count: Number of contacts to insert.
+    :param statuses: Statuses assigned round-robin to the generated contacts.
+    :param start: Sequence number of the first contact.
+    :param batch_size: Number of rows per INSERT statement.
+
+    :return:
+        int: Number of contacts inserted.
+    """
+    contacts = build_contacts(count, statuses, start)
+    inserted = 0
+    while batch := list(islice(contacts, batch_size)):
+        Contact.objects.bulk_create(batch, batch_size=batch_size)
+        inserted += len(batch)
+    return inserted
+
+
+# Columns written by ContactSeed, in the order of its row tuples.
+SEED_COLUMNS = (
+    "id",
+    "first_name",
+    "last_name",
+    "phone_number",
+    "email",
+    "city",
+    "status_id",
+    "created_at",
+    "updated_at",
+)
+
+# Statuses are drawn for this many rows at a time.
+STATUS_CHUNK_SIZE = 10_000
+
+# Page cache of SQLite connections loading contacts, and how long they wait for other writers.
+SQLITE_LOAD_CACHE_KIB = 256 * 1024
+SQLITE_LOAD_BUSY_TIMEOUT_MS = 60_000
+
+# Consecutive contacts share a creation time in groups of this size, which is adapted to the database once per group.
+TIMESTAMP_GROUP_SIZE = 100
+
+
+@dataclass
+class ContactSeed:
+    """
+    A range of generated contacts with explicit primary keys.
+
+    Contact ``i`` of the range has sequence number ``start + i``, which determines its values
+    as in ``build_contacts``, and primary key ``first_id + i``. Creation times grow by
+    ``interval`` per contact from ``origin``, in steps of ``TIMESTAMP_GROUP_SIZE`` contacts.
+    Statuses are drawn from ``status_ids`` with ``weights``, reproducibly for a given ``seed``.
+    """
+
+    start: int
+    count: int
+    first_id: int
+    origin: datetime
+    interval: timedelta = timedelta(0)
+    status_ids: Sequence[int | None] = (None,)
+    weights: Sequence[float] | None = None
+    seed: int = 0
+
+    def split(self: "ContactSeed", parts: int) -> list["ContactSeed"]:
+        """
+        Split the range into consecutive, disjoint ranges, e.g. one per worker process.
+
+        :param parts: Number of ranges; empty ones are left out.
+
+        :return:
+            list[ContactSeed]: Ranges covering this one.
+        """
+        size = -(-self.count // parts)
+        return [
+            replace(
+                self,
+                start=self.start + offset,
+                count=min(size, self.count - offset),
+                first_id=self.first_id + offset,
+                origin=self.origin + self.interval * offset,
+                seed=self.seed + offset,
+            )
+            for offset in range(0, self.count, size)
+        ]
+
+    def rows(self: "ContactSeed", using: str = DEFAULT_DB_ALIAS) -> Iterator[tuple]:
+        """Yield the rows of the range as tuples of ``SEED_COLUMNS`` values, adapted to a database."""
+        adapt = connections[using].ops.adapt_datetimefield_value
+        rng = random.Random(self.seed)  # noqa: S311
+        for chunk in range(0, self.count, STATUS_CHUNK_SIZE):
+            statuses = rng.choices(self.status_ids, self.weights, k=min(STATUS_CHUNK_SIZE, self.count - chunk))
+            for i, status_id in enumerate(statuses, start=chunk):
+                if i % TIMESTAMP_GROUP_SIZE == 0:
+                    created_at = adapt(self.origin + self.interval * i)
+                yield (self.first_id + i, *contact_values(self.start + i), status_id, created_at, created_at)
+
+    def insert(self: "ContactSeed", using: str = DEFAULT_DB_ALIAS, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """
+        Insert the range with ``executemany``, committing every batch.
+
+        Primary keys are explicit, so ranges inserted concurrently never collide. Call
+        ``reset_contact_sequence`` afterwards on databases with sequences.
+
+        :param using: Database to insert into.
+        :param batch_size: Number of rows per transaction.
+
+        :return:
+            int: Number of contacts inserted.
+        """
+        table = connections[using].ops.quote_name(Contact._meta.db_table)  # noqa: SLF001
+        placeholders = ", ".join(["%s"] * len(SEED_COLUMNS))
+        sql = f"INSERT INTO {table} ({', '.join(SEED_COLUMNS)}) VALUES ({placeholders})"  # noqa: S608
+
+        rows = self.rows(using)
+        inserted = 0
+        while batch := list(islice(rows, batch_size)):
+            with transaction.atomic(using=using), connections[using].cursor() as cursor:
+                cursor.executemany(sql, batch)
+            inserted += len(batch)
+        return inserted
+
+
+def insert_seed(seed: ContactSeed, using: str, batch_size: int, durable: bool) -> int:  # noqa: FBT001
+    """Insert a range within ``bulk_load_session``; a top-level function that worker processes can run."""
+    with bulk_load_session(using, durable=durable):
+        return seed.insert(using, batch_size)
+
+
+@contextmanager
+def bulk_load_session(using: str = DEFAULT_DB_ALIAS, *, durable: bool = False) -> Iterator[None]:
+    """
+    Tune the connection for a bulk load for the duration of the block.
+
+    On SQLite, the page cache is enlarged for the index updates, writers wait up to a minute
+    for each other's batches, and unless ``durable``, commits do not wait for the disk: a
+    power loss during the load can corrupt the database. SQLite cannot change that inside a
+    transaction, so loads in an atomic block keep durable commits. On PostgreSQL, unless
+    ``durable``, commits do not wait for the WAL to be flushed, which can only lose the last batches.
+    """
+    connection = connections[using]
+    if connection.vendor == "sqlite":
+        pragmas = {"cache_size": -SQLITE_LOAD_CACHE_KIB, "busy_timeout": SQLITE_LOAD_BUSY_TIMEOUT_MS}
+        if not durable and not connection.in_atomic_block:
+            pragmas["synchronous"] = 0
+        with connection.cursor() as cursor:
+            previous = {name: cursor.execute(f"PRAGMA {name}").fetchone()[0] for name in pragmas}
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {int(value)}")
+        try:
+            yield
+        finally:
+            with connection.cursor() as cursor:
+                for name, value in previous.items():
+                    cursor.execute(f"PRAGMA {name} = {int(value)}")
+    elif connection.vendor == "postgresql" and not durable:
+        with connection.cursor() as cursor:
+            cursor.execute("SET synchronous_commit TO off")
+        try:
+            yield
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("RESET synchronous_commit")
+    else:
+        yield
+
+
+def reset_contact_sequence(using: str = DEFAULT_DB_ALIAS) -> None:
+    """Move the primary key sequence of contacts past rows inserted with explicit keys."""
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), [Contact])
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+@contextmanager
+def deferred_indexes(using: str = DEFAULT_DB_ALIAS) -> Iterator[None]:
+    """
+    Drop the secondary indexes of contacts and suspend the search index for the block.
+
+    Unique constraints stay, so duplicates are still rejected. On exit, even after an error,
+    every index of ``Contact.Meta.indexes`` that is missing is created and the search index
+    is reinstalled, which also repairs a load that was killed inside the block.
+    """
+    connection = connections[using]
+    backend = get_search_backend(using)
+    existing = contact_constraint_names(using)
+    with connection.schema_editor() as editor:
+        for index in Contact._meta.indexes:  # noqa: SLF001
+            if index.name in existing:
+                editor.remove_index(Contact, index)
+    backend.suspend(connection)
+    try:
+        yield
+    finally:
+        create_missing_indexes(using)
+        backend.install(connection)
+
+
+def create_missing_indexes(using: str = DEFAULT_DB_ALIAS) -> None:
+    """Create the indexes of ``Contact.Meta.indexes`` that do not exist."""
+    existing = contact_constraint_names(using)
+    with connections[using].schema_editor() as editor:
+        for index in Contact._meta.indexes:  # noqa: SLF001
+            if index.name not in existing:
+                editor.add_index(Contact, index)
+
+
+def contact_constraint_names(using: str = DEFAULT_DB_ALIAS) -> set[str]:
+    """Return the names of the indexes and constraints of the contact table."""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        return set(connection.introspection.get_constraints(cursor, Contact._meta.db_table))  # noqa: SLF001
@@ -0,0 +1,205 @@
+"""
+Minimal HTTP load generator used by the ``loadtest`` management command.
+
+It drives a running server over keep-alive HTTP/1.1 connections from one event loop, so
+hundreds of concurrent clients cost no threads on the client side, and reports throughput
+and latency percentiles. Clients either repeat one URL or replay a list of them, e.g. the
+paths of an access log, each starting at a different one. Slow clients can be added next to them: each one holds a
+connection open by trickling its request headers, the way clients on slow networks tie up
+a server's workers or threads while the measured clients compete for what is left.
+"""
+
+import asyncio
+import statistics
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from itertools import cycle
+from urllib.parse import urlsplit
+
+# Seconds between the header lines a slow client sends.
+SLOW_CLIENT_DELAY = 1.0
+
+
+class LoadTestError(Exception):
+    pass
+
+
+@dataclass
+class LoadTestResult:
+    """Outcome of a load test against one URL."""
+
+    url: str
+    elapsed: float
+    errors: int = 0
+    # Latency in milliseconds of every successful request.
+    latencies: list[float] = field(default_factory=list)
+
+    @property
+    def requests(self: "LoadTestResult") -> int:
+        """Number of successful requests."""
+        return len(self.latencies)
+
+    @property
+    def throughput(self: "LoadTestResult") -> float:
+        """Successful requests per second."""
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self: "LoadTestResult", percent: int) -> float:
+        """Return a latency percentile in milliseconds, 0 without successful requests."""
+        if len(self.latencies) < 2:  # noqa: PLR2004
+            return self.latencies[0] if self.latencies else 0.0
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[percent - 1]
+
+
+def split_url(url: str) -> tuple[str, int, str]:
+    """
+    Split an HTTP URL into host, port and request target.
+
+    :raises LoadTestError: If the URL is not a plain ``http://`` URL.
+    """
+    parts = urlsplit(url)
+    if parts.scheme != "http" or not parts.hostname:
+        msg = f"Only http:// URLs can be load tested, not {url!r}."
+        raise LoadTestError(msg)
+    target = parts.path or "/"
+    if parts.query:
+        target = f"{target}?{parts.query}"
+    return parts.hostname, parts.port or 80, target
+
+
+def build_request(host: str, port: int, target: str, headers: dict[str, str]) -> bytes:
+    """Return the bytes of a keep-alive GET request."""
+    lines = [f"GET {target} HTTP/1.1", f"Host: {host}:{port}", "Connection: keep-alive"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def read_response(reader: asyncio.StreamReader) -> tuple[int, bool]:
+    """
+    Read one response, discarding its body.
+
+    :return:
+        tuple[int, bool]: The status code and whether the connection can be reused.
+    """
+    head = await reader.readuntil(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    status_code = int(status_line.split(" ", 2)[1])
+    headers = {}
+    for line in filter(None, header_lines):
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip().lower()
+
+    if "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    elif headers.get("transfer-encoding") == "chunked":
+        while size := int((await reader.readline()).split(b";")[0], 16):
+            await reader.readexactly(size + 2)
+        await reader.readuntil(b"\r\n")
+    elif status_code not in (204, 304):
+        await reader.read()
+        return status_code, False
+    return status_code, headers.get("connection") != "close"
+
+
+async def client(
+    address: tuple[str, int],
+    requests: Sequence[bytes],
+    deadline: float,
+    result: LoadTestResult,
+) -> None:
+    """Send requests one after the other over a keep-alive connection until the deadline, cycling through them."""
+    host, port = address
+    connection = None
+    for request in cycle(requests):
+        if time.monotonic() >= deadline:
+            break
+        started = time.perf_counter()
+        try:
+            if connection is None:
+                connection = await asyncio.open_connection(host, port)
+            reader, writer = connection
+            writer.write(request)
+            await writer.drain()
+            status_code, reusable = await read_response(reader)
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            result.errors += 1
+            if connection is not None:
+                connection[1].close()
+            connection = None
+            # Do not spin while the server refuses connections.
+            await asyncio.sleep(0.01)
+            continue
+
+        if 200 <= status_code < 400:  # noqa: PLR2004
+            result.latencies.append((time.perf_counter() - started) * 1000)
+        else:
+            result.errors += 1
+        if not reusable:
+            writer.close()
+            connection = None
+    if connection is not None:
+        connection[1].close()
+
+
+async def slow_client(url: str, deadline: float, delay: float) -> None:
+    """Hold a connection open until the deadline by sending a request one header line per ``delay`` seconds."""
+    host, port, target = split_url(url)
+    try:
+        _, writer = await asyncio.open_connection(host, port)
+        writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}:{port}\r\n".encode("latin-1"))
+        line = 0
+        while time.monotonic() + delay < deadline:
+            await asyncio.sleep(delay)
+            line += 1
+            writer.write(f"X-Slow-{line}: 1\r\n".encode("latin-1"))
+            await writer.drain()
+        writer.close()
+    except OSError:
+        pass
+
+
+async def run_load_test(
+    url: str | Sequence[str],
+    *,
+    concurrency: int,
+    duration: float,
+    headers: dict[str, str] | None = None,
+    slow_clients: int = 0,
+) -> LoadTestResult:
+    """
+    Load a URL, or replay a list of URLs, with concurrent clients for a while.
+
+    :param url: ``http://`` URL requested with GET, or URLs of one server requested in turn,
+        each client starting at a different one.
+    :param concurrency: Number of clients sending requests back to back.
+    :param duration: Seconds to send requests for.
+    :param headers: Headers sent with every request, e.g. a session cookie.
+    :param slow_clients: Number of extra clients holding connections open without completing a request.
+
+    :return:
+        LoadTestResult: Requests, errors and latencies of the measured clients.
+
+    :raises LoadTestError: If there is no URL, or the URLs point to different servers.
+    """
+    urls = [url] if isinstance(url, str) else list(url)
+    targets = [split_url(target) for target in urls]
+    addresses = {(host, port) for host, port, _ in targets}
+    if len(addresses) != 1:
+        msg = "Load tests need URLs of exactly one server."
+        raise LoadTestError(msg)
+    address = addresses.pop()
+    requests = [build_request(host, port, target, headers or {}) for host, port, target in targets]
+
+    result = LoadTestResult(urls[0], duration)
+    deadline = time.monotonic() + duration
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(slow_client(urls[0], deadline, SLOW_CLIENT_DELAY) for _ in range(slow_clients)),
+        *(
+            client(address, requests[n % len(requests) :] + requests[: n % len(requests)], deadline, result)
+            for n in range(concurrency)
+        ),
+    )
+    result.elapsed = time.perf_counter() - started
+    return result
@@ -0,0 +1,200 @@
+"""
+Request scenarios of the ``benchmark_suite`` command.
+
+Each scenario is one kind of request to the HTML views or the API, sent through the whole
+middleware stack with the test client. Running a scenario times every request and counts
+its queries; results are plain dicts so that runs can be stored as JSON and compared
+across commits with ``compare_results``.
+"""
+
+import statistics
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from itertools import count
+
+from django.db import connection
+from django.http import HttpResponse
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from contacts.models import Contact, ContactStatusChoices
+from testing.benchmarks import summarize
+from testing.bulk import build_contacts
+
+# Sequence numbers, and so phone numbers, of contacts created or deleted by scenarios, above any seeded ones.
+CREATED_START = 900_000_000
+DELETABLE_START = 800_000_000
+
+SEARCH_QUERY = "kowal"
+
+
+class ScenarioError(Exception):
+    pass
+
+
+@dataclass
+class Scenario:
+    """One kind of request, with a fresh path and body built for every call."""
+
+    name: str
+    method: str
+    path: Callable[[], str]
+    expected_status: int
+    data: Callable[[], dict] | None = None
+    # Send the body as JSON instead of form data.
+    json: bool = False
+
+    def send(self: "Scenario", client: Client) -> HttpResponse:
+        """Send one request of the scenario."""
+        data = self.data() if self.data else None
+        if self.json:
+            return getattr(client, self.method)(self.path(), data, content_type="application/json")
+        return getattr(client, self.method)(self.path(), data)
+
+
+def contact_scenarios(status: ContactStatusChoices, detail_pk: int, deletions: int) -> list[Scenario]:
+    """
+    Build the scenarios of the contact pages and their API equivalents.
+
+    :param status: Status the filter and write scenarios use.
+    :param detail_pk: Contact shown and updated by the detail and update scenarios.
+    :param deletions: Number of contacts to create for each delete scenario to delete.
+
+    :return:
+        list[Scenario]: Read scenarios first, then writes.
+    """
+    created = count(CREATED_START)
+    updates = count()
+    html_deletable = deletable_contacts(deletions, DELETABLE_START)
+    api_deletable = deletable_contacts(deletions, DELETABLE_START + deletions)
+
+    def new_contact() -> dict:
+        """Return the fields of a contact to create."""
+        n = next(created)
+        return {
+            "first_name": "Bench",
+            "last_name": f"Mark{n}",
+            "phone_number": f"{n:09d}",
+            "email": f"bench.{n}@example.com",
+            "city": "Warsaw",
+        }
+
+    def changed_city() -> str:
+        """Return a city that differs from the previous update's."""
+        return f"City{next(updates) % 2}"
+
+    detail = Contact.objects.values("first_name", "last_name", "phone_number", "email").get(pk=detail_pk)
+    html_list = reverse("contacts:contact-list")
+    api_list = reverse("contact-list")
+
+    def fixed(path: str) -> Callable[[], str]:
+        """Return a path builder always returning the same path."""
+        return lambda: path
+
+    return [
+        Scenario("list", "get", fixed(html_list), 200),
+        Scenario("search", "get", fixed(f"{html_list}?q={SEARCH_QUERY}"), 200),
+        Scenario("filter_status", "get", fixed(f"{html_list}?status={status.pk}"), 200),
+        Scenario("sort", "get", fixed(f"{html_list}?sort=-created_at"), 200),
+        Scenario("detail", "get", fixed(reverse("contacts:contact-detail", args=[detail_pk])), 200),
+        Scenario("create", "post", fixed(reverse("contacts:contact-create")), 302, data=new_contact),
+        Scenario(
+            "update",
+            "post",
+            fixed(reverse("contacts:contact-update", args=[detail_pk])),
+            302,
+            data=lambda: {**detail, "city": changed_city(), "status": status.pk},
+        ),
+        Scenario("delete", "post", lambda: reverse("contacts:contact-delete", args=[next(html_deletable)]), 302),
+        Scenario("api_list", "get", fixed(api_list), 200),
+        Scenario("api_search", "get", fixed(f"{api_list}?search={SEARCH_QUERY}"), 200),
+        Scenario("api_filter_status", "get", fixed(f"{api_list}?status={status.pk}"), 200),
+        Scenario("api_sort", "get", fixed(f"{api_list}?ordering=-created_at"), 200),
+        Scenario("api_detail", "get", fixed(reverse("contact-detail", args=[detail_pk])), 200),
+        Scenario("api_async_list", "get", fixed(reverse("async-contact-list")), 200),
+        Scenario("api_create", "post", fixed(api_list), 201, data=new_contact, json=True),
+        Scenario(
+            "api_update",
+            "patch",
+            fixed(reverse("contact-detail", args=[detail_pk])),
+            200,
+            data=lambda: {"city": changed_city()},
+            json=True,
+        ),
+        Scenario("api_delete", "delete", lambda: reverse("contact-detail", args=[next(api_deletable)]), 204),
+    ]
+
+
+def deletable_contacts(number: int, start: int) -> Iterator[int]:
+    """Create contacts for a delete scenario and return an iterator over their primary keys."""
+    contacts = Contact.objects.bulk_create(build_contacts(number, start=start))
+    return iter([contact.pk for contact in contacts])
+
+
+def remove_scenario_contacts() -> int:
+    """
+    Delete the contacts scenarios created, leaving the seeded ones.
+
+    :return:
+        int: Number of deleted contacts.
+    """
+    return Contact.objects.filter(phone_number__gte=f"{DELETABLE_START:09d}").delete()[0]
+
+
+def run_scenario(client: Client, scenario: Scenario, repeat: int = 20, warmup: int = 2) -> dict[str, float]:
+    """
+    Time the requests of a scenario and count their queries.
+
+    :param client: Client logged in as the user sending the requests.
+    :param scenario: Scenario to run.
+    :param repeat: Number of measured requests.
+    :param warmup: Number of requests sent first and not measured.
+
+    :return:
+        dict: Latency percentiles in milliseconds as returned by ``summarize``, plus the mean
+        and maximum number of ``queries`` per request.
+
+    :raises ScenarioError: If a request is not answered with the expected status.
+    """
+    timings, queries = [], []
+    for attempt in range(warmup + repeat):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = scenario.send(client)
+            elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code != scenario.expected_status:
+            msg = f"{scenario.name} answered {response.status_code} instead of {scenario.expected_status}."
+            raise ScenarioError(msg)
+        if attempt >= warmup:
+            timings.append(elapsed)
+            queries.append(len(captured))
+    return {**summarize(timings), "queries": statistics.fmean(queries), "max_queries": max(queries)}
+
+
+def compare_results(
+    baseline: dict[str, dict[str, float]],
+    current: dict[str, dict[str, float]],
+    threshold: float,
+) -> list[str]:
+    """
+    Find the scenarios that got slower or issue more queries than in a baseline run.
+
+    :param baseline: Results of the baseline run, keyed by scenario name.
+    :param current: Results of the current run, keyed by scenario name.
+    :param threshold: Relative p50 increase tolerated, e.g. 0.2 for 20%.
+
+    :return:
+        list[str]: One description per regression; scenarios missing from either run are skipped.
+    """
+    regressions = []
+    for name, result in current.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]
+        if result["p50"] > before["p50"] * (1 + threshold):
+            regressions.append(f"{name}: p50 {before['p50']:.2f}ms -> {result['p50']:.2f}ms")
+        if result["max_queries"] > before["max_queries"]:
+            regressions.append(f"{name}: queries {before['max_queries']} -> {result['max_queries']}")
+    return regressions
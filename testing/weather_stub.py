@@ -0,0 +1,124 @@
+"""
+Local stand-in for the geocoding and forecast services used by ``contacts.weather``.
+
+Tests point ``WEATHER_GEOCODING_URL`` and ``WEATHER_FORECAST_URL`` at the stub, so no
+request leaves the machine, and inspect the requests it received.
+"""
+
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+from urllib.parse import parse_qs, urlparse
+
+FORECAST_TIME = "2025-04-19T15:15"
+
+
+class WeatherStub:
+    """
+    HTTP server answering geocoding requests from a table of known cities.
+
+    A city's forecast uses its latitude as the temperature, so responses can be told apart.
+    Cities listed in ``failing`` answer with a server error.
+    """
+
+    def __init__(
+        self: "WeatherStub",
+        cities: dict[str, tuple[float, float]],
+        *,
+        failing: tuple[str, ...] = (),
+        delay: float = 0,
+    ) -> None:
+        """
+        Initialize the stub.
+
+        :param cities: Coordinates by normalized city name.
+        :param failing: Normalized names of cities whose geocoding fails.
+        :param delay: Seconds every response is delayed by.
+        """
+        self.cities = cities
+        self.failing = failing
+        self.delay = delay
+        self.requests: Counter = Counter()
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler())
+
+    @property
+    def url(self: "WeatherStub") -> str:
+        """Return the base URL of the stub."""
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    @property
+    def settings(self: "WeatherStub") -> dict[str, object]:
+        """Return the settings pointing ``contacts.weather`` at the stub, which needs no geocoding rate limit."""
+        return {
+            "WEATHER_GEOCODING_URL": f"{self.url}/search",
+            "WEATHER_FORECAST_URL": f"{self.url}/forecast",
+            "WEATHER_GEOCODING_INTERVAL": 0,
+        }
+
+    def __enter__(self: "WeatherStub") -> "WeatherStub":
+        """Start serving in a background thread."""
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        return self
+
+    def __exit__(
+        self: "WeatherStub",
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop serving."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def record(self: "WeatherStub", path: str) -> None:
+        """Count a request to a path."""
+        with self._lock:
+            self.requests[path] += 1
+
+    def respond(self: "WeatherStub", path: str, params: dict[str, list[str]]) -> tuple[int, object]:
+        """Return the status and JSON body answering a request."""
+        if path == "/search":
+            city = params["q"][0]
+            if city in self.failing:
+                return 500, {"error": "unavailable"}
+            if city not in self.cities:
+                return 200, []
+            lat, lon = self.cities[city]
+            return 200, [{"lat": str(lat), "lon": str(lon)}]
+
+        if path == "/forecast":
+            latitude = float(params["latitude"][0])
+            return 200, {
+                "current_weather": {"temperature": latitude, "windspeed": 10.0, "time": FORECAST_TIME},
+                "hourly": {"time": ["2025-04-19T14:00", "2025-04-19T15:00"], "relative_humidity_2m": [60, 65]},
+            }
+
+        return 404, {}
+
+    def handler(self: "WeatherStub") -> type[BaseHTTPRequestHandler]:
+        """Build the request handler class bound to this stub."""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self: "Handler") -> None:  # noqa: N802
+                """Answer a geocoding or forecast request."""
+                url = urlparse(self.path)
+                stub.record(url.path)
+                time.sleep(stub.delay)
+                status, body = stub.respond(url.path, parse_qs(url.query))
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self: "Handler", *args: object) -> None:
+                """Keep test output quiet."""
+
+        return Handler